@@ -0,0 +1,5 @@
+"""Benchmarks for the ad-injector data and control planes.
+
+Run from the repository root with the package importable (``uv run`` or
+``PYTHONPATH=src``), e.g. ``python -m benchmarks.load_test --help``.
+"""
@@ -0,0 +1,185 @@
+"""Synthetic catalogs and ads_match workloads built from the ``Ad`` schema.
+
+Distributions are skewed the way real catalogs are: vertical popularity and
+advertiser size follow a Zipf curve, most ads target one or two locales with a
+share of global ("") ads, a minority carry blocked keywords, and finance,
+health, alcohol and gambling ads set the policy flags.  Everything is driven by
+a seeded ``random.Random`` so runs are reproducible.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+
+import numpy as np
+
+from ad_injector.models import Ad, AdPolicy, AdTargeting
+from ad_injector.models.mcp_requests import MatchConstraints, MatchRequest, PlacementContext
+
+VERTICAL_TOPICS: dict[str, list[str]] = {
+    "technology": ["python", "javascript", "cloud", "ai", "cybersecurity", "gadgets", "smartphones", "laptops"],
+    "education": ["online courses", "languages", "certifications", "tutoring", "programming"],
+    "finance": ["investing", "crypto", "credit cards", "insurance", "mortgages", "budgeting"],
+    "travel": ["flights", "hotels", "cruises", "backpacking", "car rental"],
+    "health": ["fitness", "nutrition", "mental health", "yoga", "sleep"],
+    "food": ["recipes", "meal kits", "coffee", "restaurants", "baking"],
+    "gaming": ["console games", "pc gaming", "esports", "board games"],
+    "home": ["furniture", "gardening", "smart home", "cleaning"],
+    "fashion": ["sneakers", "streetwear", "jewelry", "watches"],
+    "automotive": ["electric vehicles", "car insurance", "auto parts"],
+    "alcohol": ["wine", "craft beer", "spirits"],
+    "gambling": ["sports betting", "casino", "poker"],
+}
+# Index 0 is the most popular vertical
+VERTICALS = list(VERTICAL_TOPICS)
+LOCALES = ["en-US", "en-GB", "de-DE", "fr-FR", "es-ES", "ja-JP", ""]
+LOCALE_WEIGHTS = [0.45, 0.12, 0.08, 0.08, 0.07, 0.05, 0.15]
+BLOCKED_KEYWORDS = [
+    "violence", "politics", "gambling", "alcohol", "drugs", "weapons", "tragedy", "crash",
+    "lawsuit", "scam", "death", "war", "election", "disaster", "hate", "abuse",
+]
+PLACEMENTS = ["inline", "sidebar", "banner"]
+SURFACES = ["chat", "search", "feed"]
+TOP_K_WEIGHTS = {1: 0.20, 3: 0.20, 5: 0.35, 10: 0.15, 50: 0.07, 100: 0.03}
+FILLER = (
+    "i am looking for some help with my project and want to know what the best options are "
+    "for someone who is just getting started can you recommend something that works well "
+    "today this week for beginners and experts alike please compare prices and reviews"
+).split()
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _zipf_weights(n: int, s: float = 1.1) -> list[float]:
+    return [1.0 / (rank ** s) for rank in range(1, n + 1)]
+
+
+class HashEmbeddingProvider:
+    """Deterministic hashing-trick embeddings (no model download).
+
+    Each token is hashed to a dimension and sign, so texts that share words
+    have positive cosine similarity.  Cost is a few microseconds per text,
+    which isolates retrieval and Python overhead from model inference.
+    """
+
+    def __init__(self, dimension: int = 384) -> None:
+        self._dimension = dimension
+
+    def embed(self, text: str) -> list[float]:
+        vec = np.zeros(self._dimension, dtype=np.float32)
+        for token in _TOKEN_RE.findall(text.lower()):
+            h = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+            vec[h % self._dimension] += 1.0 if (h >> 32) & 1 else -1.0
+        norm = float(np.linalg.norm(vec))
+        if norm:
+            vec /= norm
+        return vec.tolist()
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed(t) for t in texts]
+
+
+def generate_catalog(n_ads: int, seed: int = 42) -> list[Ad]:
+    """Generate ``n_ads`` valid ``Ad`` objects with realistic targeting/policy skew."""
+    rng = random.Random(seed)
+    vertical_weights = _zipf_weights(len(VERTICALS))
+    n_advertisers = max(1, n_ads // 20)
+    advertiser_weights = _zipf_weights(n_advertisers, 0.9)
+    advertisers = [f"adv-{i:05d}" for i in range(n_advertisers)]
+    all_topics = [t for topics in VERTICAL_TOPICS.values() for t in topics]
+
+    ads: list[Ad] = []
+    for i in range(n_ads):
+        vertical = rng.choices(VERTICALS, vertical_weights)[0]
+        topics = rng.sample(VERTICAL_TOPICS[vertical], k=min(len(VERTICAL_TOPICS[vertical]), rng.randint(1, 3)))
+        if rng.random() < 0.10:
+            topics.append(rng.choice(all_topics))
+        locales = sorted(set(rng.choices(LOCALES, LOCALE_WEIGHTS, k=rng.choice([1, 1, 1, 2]))))
+        verticals = [vertical]
+        if rng.random() < 0.15:
+            verticals.append(rng.choice(VERTICALS))
+        blocked = rng.sample(BLOCKED_KEYWORDS, k=rng.randint(1, 6)) if rng.random() < 0.20 else []
+        sensitive = vertical == "gambling" or (vertical in ("finance", "health") and rng.random() < 0.10)
+        age_restricted = vertical in ("alcohol", "gambling")
+        headline = topics[0].title()
+        ads.append(
+            Ad(
+                ad_id=f"ad-{i:07d}",
+                advertiser_id=rng.choices(advertisers, advertiser_weights)[0],
+                title=f"{headline} deals from a trusted {vertical} brand",
+                body=(
+                    f"Discover the best in {', '.join(topics)}. "
+                    f"{' '.join(rng.choices(FILLER, k=rng.randint(8, 24)))}."
+                ),
+                cta_text=rng.choice(["Learn More", "Shop Now", "Sign Up", "Get Started", "Book Now"]),
+                landing_url=f"https://example.com/{vertical}/{i}",
+                targeting=AdTargeting(
+                    topics=topics,
+                    locale=locales,
+                    verticals=sorted(set(verticals)),
+                    blocked_keywords=blocked,
+                ),
+                policy=AdPolicy(sensitive=sensitive, age_restricted=age_restricted),
+            )
+        )
+    return ads
+
+
+def _context_text(rng: random.Random, vertical: str, words: int, blocked: bool) -> str:
+    topic_words = " ".join(VERTICAL_TOPICS[vertical]).split()
+    tokens = [rng.choice(topic_words) if rng.random() < 0.3 else rng.choice(FILLER) for _ in range(words)]
+    if blocked:
+        tokens.insert(rng.randrange(len(tokens) + 1), rng.choice(BLOCKED_KEYWORDS))
+    return " ".join(tokens)[:10_000]
+
+
+def generate_workload(ads: list[Ad], n_requests: int, seed: int = 7) -> list[MatchRequest]:
+    """Generate a mixed ads_match workload against ``ads`` (for exclusions)."""
+    rng = random.Random(seed)
+    vertical_weights = _zipf_weights(len(VERTICALS))
+    advertiser_ids = sorted({a.advertiser_id for a in ads}) or ["adv-00000"]
+    ad_ids = [a.ad_id for a in ads] or ["ad-0000000"]
+    top_ks, top_k_weights = zip(*TOP_K_WEIGHTS.items())
+
+    requests: list[MatchRequest] = []
+    for _ in range(n_requests):
+        vertical = rng.choices(VERTICALS, vertical_weights)[0]
+        length_bucket = rng.random()
+        if length_bucket < 0.6:
+            words = rng.randint(5, 20)
+        elif length_bucket < 0.9:
+            words = rng.randint(50, 150)
+        else:
+            words = rng.randint(500, 1500)
+        context = _context_text(rng, vertical, words, blocked=rng.random() < 0.05)
+
+        kind = rng.random()
+        constraints = MatchConstraints()
+        if kind < 0.45:
+            pass
+        elif kind < 0.70:
+            constraints.topics = rng.sample(VERTICAL_TOPICS[vertical], k=rng.randint(1, 2))
+        elif kind < 0.85:
+            constraints.locale = rng.choices(LOCALES[:-1], LOCALE_WEIGHTS[:-1])[0]
+            if rng.random() < 0.5:
+                constraints.topics = [rng.choice(VERTICAL_TOPICS[vertical])]
+        elif kind < 0.95:
+            constraints.verticals = [vertical]
+        else:
+            constraints.exclude_advertiser_ids = rng.sample(advertiser_ids, k=min(len(advertiser_ids), rng.randint(1, 10)))
+            constraints.exclude_ad_ids = rng.sample(ad_ids, k=min(len(ad_ids), rng.randint(1, 20)))
+        if rng.random() < 0.05:
+            constraints.age_restricted_ok = True
+            constraints.sensitive_ok = True
+
+        requests.append(
+            MatchRequest(
+                context_text=context,
+                top_k=rng.choices(top_ks, top_k_weights)[0],
+                placement=PlacementContext(placement=rng.choice(PLACEMENTS), surface=rng.choice(SURFACES)),
+                constraints=constraints,
+            )
+        )
+    return requests
@@ -0,0 +1,270 @@
+"""HTTP benchmark: REST ``POST /v1/match`` vs the MCP ``tools/call`` path.
+
+Starts ``benchmarks.serve`` (or targets ``--url``), then drives the same
+mixed ads_match workload through each path from N client threads, each on
+one persistent (keep-alive) connection:
+
+* ``mcp``       -- JSON-RPC ``tools/call ads_match`` on ``/mcp``
+* ``rest``      -- one request per ``POST /v1/match``
+* ``rest-batch`` -- ``--batch`` requests per ``{"requests": [...]}`` body
+* ``rest-pipelined`` -- ``--pipeline`` requests written back-to-back on the
+  connection before reading the responses (HTTP/1.1 pipelining)
+
+Latency is per HTTP exchange; throughput is match requests per second.
+
+Usage::
+
+    python -m benchmarks.http_bench --requests 2000 --concurrency 8 --workers 2
+    python -m benchmarks.http_bench --url http://127.0.0.1:8000 --paths rest,mcp
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from pathlib import Path
+from typing import Any, Callable
+from urllib.parse import urlsplit
+
+from ad_injector.services.caches import canonical_request
+
+from .catalog import generate_catalog, generate_workload
+from .load_test import summarize
+
+PATHS = ("mcp", "rest", "rest-batch", "rest-pipelined")
+_MCP_HEADERS = {"content-type": "application/json", "accept": "application/json, text/event-stream"}
+_JSON_HEADERS = {"content-type": "application/json"}
+
+
+def match_arguments(request: Any) -> dict[str, Any]:
+    """ads_match arguments for a ``MatchRequest`` (unset constraints omitted)."""
+    canonical = canonical_request(request)
+    constraints = canonical.pop("constraints")
+    canonical["context_text"] = request.context_text
+    canonical.update({k: v for k, v in constraints.items() if v not in (None, False)})
+    return canonical
+
+
+def _read_response(f: Any) -> tuple[int, bytes]:
+    """Read one Content-Length framed HTTP/1.1 response from a socket file."""
+    status = int(f.readline().split()[1])
+    length = 0
+    while True:
+        line = f.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            length = int(value)
+    return status, f.read(length)
+
+
+class _Client:
+    """One keep-alive connection issuing requests for a single path."""
+
+    def __init__(self, host: str, port: int, path: str) -> None:
+        self.host, self.port, self.path = host, port, path
+        self.conn = http.client.HTTPConnection(host, port, timeout=30)
+        self.sock: socket.socket | None = None
+        self.rfile: Any = None
+        self._id = 0
+
+    def _post(self, url: str, body: bytes, headers: dict[str, str]) -> bytes:
+        self.conn.request("POST", url, body=body, headers=headers)
+        resp = self.conn.getresponse()
+        data = resp.read()
+        if resp.status != 200:
+            raise RuntimeError(f"HTTP {resp.status}: {data[:200]!r}")
+        return data
+
+    def mcp(self, args: list[dict[str, Any]]) -> int:
+        for a in args:
+            self._id += 1
+            payload = {"jsonrpc": "2.0", "id": self._id, "method": "tools/call",
+                       "params": {"name": "ads_match", "arguments": a}}
+            result = json.loads(self._post("/mcp", json.dumps(payload).encode(), _MCP_HEADERS))
+            if result.get("result", {}).get("isError"):
+                raise RuntimeError(result["result"]["content"][0]["text"][:200])
+        return len(args)
+
+    def rest(self, args: list[dict[str, Any]]) -> int:
+        for a in args:
+            self._post("/v1/match", json.dumps(a).encode(), _JSON_HEADERS)
+        return len(args)
+
+    def rest_batch(self, args: list[dict[str, Any]]) -> int:
+        data = json.loads(self._post("/v1/match", json.dumps({"requests": args}).encode(), _JSON_HEADERS))
+        errors = [r for r in data["responses"] if "error" in r]
+        if errors:
+            raise RuntimeError(errors[0]["error"])
+        return len(args)
+
+    def rest_pipelined(self, args: list[dict[str, Any]]) -> int:
+        if self.sock is None:
+            self.sock = socket.create_connection((self.host, self.port), timeout=30)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.rfile = self.sock.makefile("rb")
+        out = bytearray()
+        for a in args:
+            body = json.dumps(a).encode()
+            out += (
+                f"POST /v1/match HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n"
+            ).encode() + body
+        self.sock.sendall(out)
+        for _ in args:
+            status, data = _read_response(self.rfile)
+            if status != 200:
+                raise RuntimeError(f"HTTP {status}: {data[:200]!r}")
+        return len(args)
+
+    def close(self) -> None:
+        self.conn.close()
+        if self.sock is not None:
+            self.rfile.close()
+            self.sock.close()
+
+
+def run_path(host: str, port: int, path: str, workload: list[dict[str, Any]], concurrency: int, group: int) -> dict[str, Any]:
+    """Drive ``workload`` through ``path``; ``group`` requests per exchange (batch / pipeline depth)."""
+    groups = [workload[i:i + group] for i in range(0, len(workload), group)]
+    it = iter(groups)
+    lock = threading.Lock()
+    latencies: list[float] = []
+    completed = 0
+    errors = 0
+
+    def worker() -> None:
+        nonlocal completed, errors
+        client = _Client(host, port, path)
+        send: Callable[[list[dict[str, Any]]], int] = getattr(client, path.replace("-", "_"))
+        local_lat: list[float] = []
+        local_done = local_errors = 0
+        try:
+            while True:
+                with lock:
+                    args = next(it, None)
+                if args is None:
+                    break
+                t0 = time.perf_counter()
+                try:
+                    local_done += send(args)
+                except Exception:
+                    local_errors += len(args)
+                    client.close()
+                    client = _Client(host, port, path)
+                    send = getattr(client, path.replace("-", "_"))
+                    continue
+                local_lat.append((time.perf_counter() - t0) * 1000)
+        finally:
+            client.close()
+            with lock:
+                latencies.extend(local_lat)
+                completed += local_done
+                errors += local_errors
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    t_run = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    duration = time.perf_counter() - t_run
+    return {
+        "requests_per_exchange": group,
+        "completed": completed,
+        "errors": errors,
+        "duration_seconds": round(duration, 3),
+        "throughput_rps": round(completed / duration, 1) if duration else 0.0,
+        "exchange_latency_ms": summarize(latencies),
+    }
+
+
+def _wait_ready(base: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base}/healthz", timeout=1) as resp:
+                if resp.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit(f"server at {base} did not become ready")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="REST /v1/match vs MCP tools/call over HTTP")
+    parser.add_argument("--url", default=None, help="Target a running server instead of starting one")
+    parser.add_argument("--paths", default=",".join(PATHS), help=f"Comma-separated subset of {PATHS}")
+    parser.add_argument("--requests", type=int, default=2_000, help="Measured match requests per path")
+    parser.add_argument("--warmup", type=int, default=100, help="Unmeasured warm-up requests per path")
+    parser.add_argument("--concurrency", type=int, default=4, help="Client connections (closed loop)")
+    parser.add_argument("--batch", type=int, default=16, help="Requests per rest-batch body")
+    parser.add_argument("--pipeline", type=int, default=8, help="Pipelined requests per rest-pipelined write")
+    parser.add_argument("--workers", type=int, default=1, help="Server workers (when starting one)")
+    parser.add_argument("--ads", type=int, default=5_000, help="Synthetic catalog size (when starting one)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, default=None, help="Write machine-readable results (JSON)")
+    args = parser.parse_args(argv)
+
+    paths = [p for p in args.paths.split(",") if p]
+    unknown = set(paths) - set(PATHS)
+    if unknown:
+        raise SystemExit(f"unknown --paths {sorted(unknown)}")
+
+    proc = None
+    if args.url:
+        base = args.url.rstrip("/")
+    else:
+        port = _free_port()
+        base = f"http://127.0.0.1:{port}"
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.serve", "--port", str(port),
+             "--workers", str(args.workers), "--ads", str(args.ads), "--seed", str(args.seed)],
+            env={**os.environ, "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING")},
+        )
+    parts = urlsplit(base)
+    host, port = parts.hostname or "127.0.0.1", parts.port or 80
+    group_size = {"mcp": 1, "rest": 1, "rest-batch": args.batch, "rest-pipelined": args.pipeline}
+
+    try:
+        _wait_ready(base)
+        ads = generate_catalog(args.ads, seed=args.seed)
+        workload = [match_arguments(r) for r in generate_workload(ads, args.requests + args.warmup, seed=args.seed + 1)]
+        results: dict[str, Any] = {}
+        for path in paths:
+            run_path(host, port, path, workload[: args.warmup], args.concurrency, group_size[path])
+            results[path] = run_path(host, port, path, workload[args.warmup:], args.concurrency, group_size[path])
+    finally:
+        if proc is not None:
+            proc.send_signal(signal.SIGTERM)
+            proc.wait(timeout=30)
+
+    print(f"{'path':<16}{'req/exch':>9}{'req/s':>10}{'p50':>9}{'p95':>9}{'p99':>9}{'errors':>8}")
+    for path, r in results.items():
+        lat = r["exchange_latency_ms"]
+        print(f"{path:<16}{r['requests_per_exchange']:>9}{r['throughput_rps']:>10}"
+              f"{lat['p50']:>9}{lat['p95']:>9}{lat['p99']:>9}{r['errors']:>8}")
+    if args.output:
+        config = {k: v for k, v in vars(args).items() if k != "output"}
+        args.output.write_text(json.dumps({"config": config, "paths": results}, indent=2), encoding="utf-8")
+    return 1 if any(r["errors"] for r in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""Load test for the data plane: QPS and tail latency of ads_match.
+
+Generates a synthetic catalog, loads it into the in-process store or Qdrant
+local mode, then replays a mixed ``ads_match`` workload from N concurrent
+worker threads (closed loop).  Each request runs ``MatchService.match`` plus
+the tool-side ``render_match`` (trace store + allowlisted JSON), i.e. the same
+work as the MCP tool minus the transport.
+
+Usage::
+
+    python -m benchmarks.load_test --ads 20000 --requests 5000 --concurrency 8
+    python -m benchmarks.load_test --store qdrant-memory --output run.json
+    python -m benchmarks.load_test --store qdrant-path:/tmp/qdrant-bench --compare run.json
+
+Exit status is 1 when ``--compare`` finds a regression beyond ``--max-regression``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from ad_injector.adapters.memory_vector_store import InMemoryVectorStore
+from ad_injector.config.runtime import RuntimeSettings
+from ad_injector.mcp.tools import render_match
+from ad_injector.services.index_service import IndexService
+from ad_injector.services.match_service import MatchService
+
+from .catalog import HashEmbeddingProvider, generate_catalog, generate_workload
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(q * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(values: list[float]) -> dict[str, float]:
+    s = sorted(values)
+    return {
+        "p50": round(percentile(s, 0.50), 3),
+        "p95": round(percentile(s, 0.95), 3),
+        "p99": round(percentile(s, 0.99), 3),
+        "max": round(s[-1], 3) if s else 0.0,
+        "mean": round(sum(s) / len(s), 3) if s else 0.0,
+    }
+
+
+def build_settings(store: str, dimension: int) -> RuntimeSettings:
+    kwargs: dict[str, Any] = {"embedding_dimension": dimension, "qdrant_collection_name": "ads_bench"}
+    if store == "memory":
+        kwargs["vector_store_backend"] = "memory"
+    elif store == "qdrant-memory":
+        kwargs["qdrant_location"] = ":memory:"
+    elif store.startswith("qdrant-path:"):
+        kwargs["qdrant_location"] = store.split(":", 1)[1]
+    elif store != "qdrant":
+        raise SystemExit(f"unknown --store {store!r}")
+    return RuntimeSettings(_env_file=None, **kwargs)
+
+
+def build_adapters(settings: RuntimeSettings, embedder_name: str):
+    if embedder_name == "hash":
+        embedder = HashEmbeddingProvider(settings.embedding_dimension)
+    else:
+        from ad_injector.adapters.fastembed_provider import FastEmbedProvider
+        embedder = FastEmbedProvider(model_id=settings.embedding_model_id)
+    if settings.vector_store_backend == "memory":
+        store = InMemoryVectorStore(settings)
+    else:
+        from ad_injector.adapters.qdrant_vector_store import QdrantVectorStore
+        store = QdrantVectorStore(settings)
+    return embedder, store
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    settings = build_settings(args.store, args.dimension)
+    embedder, store = build_adapters(settings, args.embedder)
+
+    ads = generate_catalog(args.ads, seed=args.seed)
+    index = IndexService(embedding_provider=embedder, vector_store=store, settings=settings)
+    index.ensure_collection(args.dimension)
+    t0 = time.perf_counter()
+    index.upsert_ads(ads)
+    load_seconds = time.perf_counter() - t0
+    print(f"loaded {len(ads)} ads into {args.store} in {load_seconds:.2f}s", file=sys.stderr)
+
+    service = MatchService(embedding_provider=embedder, vector_store=store)
+    workload = generate_workload(ads, args.requests + args.warmup, seed=args.seed + 1)
+    for request in workload[: args.warmup]:
+        render_match(*service.match(request))
+    workload = workload[args.warmup:]
+
+    latencies: list[float] = []
+    stages: dict[str, list[float]] = {}
+    errors = 0
+    lock = threading.Lock()
+    it = iter(workload)
+
+    def worker() -> None:
+        nonlocal errors
+        local_lat: list[float] = []
+        local_stages: dict[str, list[float]] = {}
+        local_errors = 0
+        while True:
+            with lock:
+                request = next(it, None)
+            if request is None:
+                break
+            t_req = time.perf_counter()
+            try:
+                response, trace = service.match(request)
+                t_render = time.perf_counter()
+                render_match(response, trace)
+                t_end = time.perf_counter()
+            except Exception:
+                local_errors += 1
+                continue
+            local_lat.append((t_end - t_req) * 1000)
+            for stage, ms in trace.timings_ms.items():
+                local_stages.setdefault(stage, []).append(ms)
+            local_stages.setdefault("render", []).append((t_end - t_render) * 1000)
+        with lock:
+            latencies.extend(local_lat)
+            errors += local_errors
+            for stage, values in local_stages.items():
+                stages.setdefault(stage, []).extend(values)
+
+    t_run = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for f in [pool.submit(worker) for _ in range(args.concurrency)]:
+            f.result()
+    duration = time.perf_counter() - t_run
+
+    return {
+        "config": {
+            "ads": args.ads,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "store": args.store,
+            "embedder": args.embedder,
+            "dimension": args.dimension,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "load": {"seconds": round(load_seconds, 3), "ads_per_second": round(len(ads) / load_seconds, 1)},
+        "completed": len(latencies),
+        "errors": errors,
+        "duration_seconds": round(duration, 3),
+        "throughput_rps": round(len(latencies) / duration, 1) if duration else 0.0,
+        "latency_ms": summarize(latencies),
+        "stages_ms": {stage: summarize(values) for stage, values in sorted(stages.items())},
+    }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], max_regression: float) -> list[str]:
+    """Return human-readable regressions (latency up / throughput down beyond the threshold)."""
+    regressions = []
+    for q in ("p50", "p95", "p99"):
+        old, new = baseline["latency_ms"][q], current["latency_ms"][q]
+        if old and (new - old) / old > max_regression:
+            regressions.append(f"latency {q}: {old} ms -> {new} ms (+{(new - old) / old:.0%})")
+    old_rps, new_rps = baseline["throughput_rps"], current["throughput_rps"]
+    if old_rps and (old_rps - new_rps) / old_rps > max_regression:
+        regressions.append(f"throughput: {old_rps} -> {new_rps} rps ({(new_rps - old_rps) / old_rps:.0%})")
+    return regressions
+
+
+def print_report(result: dict[str, Any]) -> None:
+    lat = result["latency_ms"]
+    print(
+        f"{result['completed']} requests, {result['errors']} errors, "
+        f"{result['throughput_rps']} req/s at concurrency {result['config']['concurrency']}"
+    )
+    print(f"latency ms: p50={lat['p50']} p95={lat['p95']} p99={lat['p99']} max={lat['max']}")
+    print(f"{'stage':<12}{'p50':>10}{'p95':>10}{'p99':>10}{'mean':>10}")
+    for stage, s in result["stages_ms"].items():
+        print(f"{stage:<12}{s['p50']:>10}{s['p95']:>10}{s['p99']:>10}{s['mean']:>10}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="ads_match load test (QPS, p50/p95/p99, per-stage)")
+    parser.add_argument("--ads", type=int, default=10_000, help="Synthetic catalog size")
+    parser.add_argument("--requests", type=int, default=2_000, help="Measured requests")
+    parser.add_argument("--warmup", type=int, default=100, help="Unmeasured warm-up requests")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent workers (closed loop)")
+    parser.add_argument(
+        "--store",
+        default="memory",
+        help="memory | qdrant-memory | qdrant-path:<dir> | qdrant (QDRANT_HOST/PORT)",
+    )
+    parser.add_argument("--embedder", choices=["hash", "fastembed"], default="hash")
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, default=None, help="Write machine-readable results (JSON)")
+    parser.add_argument("--compare", type=Path, default=None, help="Baseline results JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.10, help="Allowed relative regression")
+    args = parser.parse_args(argv)
+
+    result = run(args)
+    print_report(result)
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    if args.compare:
+        regressions = compare(result, json.loads(args.compare.read_text(encoding="utf-8")), args.max_regression)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
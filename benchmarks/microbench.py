@@ -0,0 +1,359 @@
+"""Deterministic microbenchmarks for the pure-Python per-request hot path.
+
+Covers the code that runs on every ads_match at realistic sizes: filter
+building and translation, policy evaluation over top_k 5/50/100 hits with long
+contexts and many blocked keywords, candidate construction, response shaping
+and JSON serialization (legacy shape + indented ``json.dumps`` next to the
+single-pass ``ResponseSerializer`` with cached creative fragments) and the
+slim hit / candidate types next to their former pydantic equivalents.
+``--alloc`` adds the bytes allocated (tracemalloc peak) by one call.
+
+Timings are the minimum over several repeats (``timeit``), reported in
+nanoseconds per call and *normalized* by a fixed pure-Python calibration loop
+measured right before each benchmark, so baselines transfer between machines
+of different speed and survive CPU frequency drift during a run.  Baselines live in
+``benchmarks/baselines/microbench.json``.
+
+Usage::
+
+    python -m benchmarks.microbench                    # compare against baseline
+    python -m benchmarks.microbench --update-baseline  # record new baseline
+    python -m benchmarks.microbench --filter policy --threshold 0.15
+
+Exit status is 1 when any benchmark regresses beyond ``--threshold``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+from ad_injector.adapters.qdrant_vector_store import QdrantVectorStore
+from ad_injector.domain.policy_engine import PolicyEngine
+from ad_injector.domain.targeting_engine import TargetingEngine
+from ad_injector.mcp.serialization import ResponseSerializer
+from ad_injector.mcp.tools import ALLOWED_MATCH_CANDIDATE_KEYS, ALLOWED_MATCH_RESPONSE_KEYS
+from ad_injector.models.mcp_requests import MatchConstraints, PlacementContext
+from ad_injector.models.mcp_responses import AdCandidate
+from ad_injector.ports.vector_store import VectorHit
+from ad_injector.services.match_result import MatchResult
+from ad_injector.services.match_service import MatchService
+from pydantic import BaseModel
+
+from .catalog import BLOCKED_KEYWORDS, FILLER, HashEmbeddingProvider
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "microbench.json"
+TOP_KS = (5, 50, 100)
+
+# name -> zero-arg callable; populated by the builders below
+BENCHMARKS: dict[str, Callable[[], Any]] = {}
+
+
+def _calibration() -> int:
+    """Fixed pure-Python workload used to normalize timings across machines."""
+    total = 0
+    d: dict[int, int] = {}
+    for i in range(2000):
+        d[i & 63] = d.get(i & 63, 0) + i
+        total += len(str(i))
+    return total
+
+
+# ---------------------------------------------------------------------------
+# Fixtures (deterministic)
+# ---------------------------------------------------------------------------
+
+_rng = random.Random(1234)
+
+
+def _long_context(chars: int = 10_000) -> str:
+    words: list[str] = []
+    size = 0
+    while size < chars:
+        w = _rng.choice(FILLER)
+        words.append(w)
+        size += len(w) + 1
+    return " ".join(words)[:chars]
+
+
+def _hits(n: int, blocked_per_ad: int) -> list[VectorHit]:
+    hits = []
+    for i in range(n):
+        ad_id = f"ad-{i:07d}"
+        hits.append(
+            VectorHit(
+                ad_id=ad_id,
+                advertiser_id=f"adv-{i % 17:05d}",
+                score=1.0 - i / (n + 1),
+                payload={
+                    "ad_id": ad_id,
+                    "advertiser_id": f"adv-{i % 17:05d}",
+                    "title": f"Title for {ad_id} with a realistic headline length",
+                    "body": "Discover the best in python, cloud and ai. " * 3,
+                    "cta_text": "Learn More",
+                    "landing_url": f"https://example.com/technology/{i}",
+                    "topics": ["python", "cloud", "ai"],
+                    "locale": ["en-US", ""],
+                    "verticals": ["technology"],
+                    "blocked_keywords": _rng.sample(BLOCKED_KEYWORDS * 4, k=blocked_per_ad),
+                    "sensitive": i % 11 == 0,
+                    "age_restricted": i % 13 == 0,
+                    "enabled": True,
+                    "embedding_version": "BAAI/bge-small-en-v1.5",
+                },
+            )
+        )
+    return hits
+
+
+class _PydanticVectorHit(BaseModel):
+    """The former pydantic ``VectorHit`` (comparison baseline only)."""
+
+    ad_id: str
+    advertiser_id: str
+    score: float
+    payload: dict
+
+
+def _legacy_shape_match_response(response: Any) -> dict:
+    """The former ``tools._shape_match_response``: allowlisted dict for ``json.dumps`` (comparison baseline only)."""
+    d = response.model_dump() if hasattr(response, "model_dump") else response
+    out: dict = {k: d[k] for k in ALLOWED_MATCH_RESPONSE_KEYS if k in d}
+    if "candidates" in out:
+        out["candidates"] = [
+            {k: c.get(k) for k in ALLOWED_MATCH_CANDIDATE_KEYS if k in c}
+            for c in out["candidates"]
+        ]
+    return out
+
+
+def _construct_hits(cls: Any, points: list[tuple[float, dict]]) -> list[Any]:
+    return [
+        cls(ad_id=p.get("ad_id", ""), advertiser_id=p.get("advertiser_id", ""), score=score, payload=p)
+        for score, p in points
+    ]
+
+
+def _pydantic_candidates(service: MatchService, hits: list[VectorHit], request_id: str) -> list[AdCandidate]:
+    """The former ``_hit_to_candidate``: validated ``AdCandidate`` per eligible hit."""
+    new_match_id = service._match_id.new_match_id
+    return [
+        AdCandidate(
+            ad_id=h.ad_id,
+            advertiser_id=h.advertiser_id,
+            title=h.payload["title"],
+            body=h.payload["body"],
+            cta_text=h.payload["cta_text"],
+            landing_url=h.payload["landing_url"],
+            score=max(0.0, min(1.0, h.score)),
+            match_id=new_match_id(request_id, h.ad_id),
+        )
+        for h in hits
+    ]
+
+
+SHORT_CONTEXT = "how do i learn python for data science quickly"
+LONG_CONTEXT = _long_context()
+FULL_CONSTRAINTS = MatchConstraints(
+    topics=["python", "cloud", "ai", "javascript", "cybersecurity"],
+    locale="en-US",
+    verticals=["technology", "education"],
+    exclude_advertiser_ids=[f"adv-{i:05d}" for i in range(50)],
+    exclude_ad_ids=[f"ad-{i:07d}" for i in range(200)],
+)
+PLACEMENT = PlacementContext(placement="sidebar", surface="chat")
+
+
+def _build() -> None:
+    targeting = TargetingEngine()
+    policy = PolicyEngine()
+    service = MatchService(embedding_provider=HashEmbeddingProvider(8), vector_store=None)
+    vector_filter = targeting.build_filter(FULL_CONSTRAINTS, PLACEMENT)
+    request_id = "6f1c2a8e-8d2b-4a51-9a4c-3f0b5b0e7d11"
+
+    BENCHMARKS["targeting.build_filter[full]"] = lambda: targeting.build_filter(FULL_CONSTRAINTS, PLACEMENT)
+    BENCHMARKS["targeting.build_filter[empty]"] = lambda: targeting.build_filter(MatchConstraints(), PLACEMENT)
+    BENCHMARKS["qdrant._translate_filter[full]"] = lambda: QdrantVectorStore._translate_filter(vector_filter)
+
+    for k in TOP_KS:
+        hits = _hits(k, blocked_per_ad=3)
+        many_blocked = _hits(k, blocked_per_ad=40)
+        BENCHMARKS[f"policy.apply[k={k},short]"] = (
+            lambda h=hits: policy.apply(h, FULL_CONSTRAINTS, PLACEMENT, context_text=SHORT_CONTEXT)
+        )
+        BENCHMARKS[f"policy.apply[k={k},long,many_blocked]"] = (
+            lambda h=many_blocked: policy.apply(h, FULL_CONSTRAINTS, PLACEMENT, context_text=LONG_CONTEXT)
+        )
+        BENCHMARKS[f"policy.verdicts[k={k},long,many_blocked]"] = (
+            lambda h=many_blocked: policy.verdicts(h, FULL_CONSTRAINTS, PLACEMENT, context_text=LONG_CONTEXT)
+        )
+        BENCHMARKS[f"policy.reason[k={k},long,many_blocked]"] = (
+            lambda h=many_blocked: [
+                policy.reason(x, FULL_CONSTRAINTS, PLACEMENT, context_text=LONG_CONTEXT) for x in h
+            ]
+        )
+        points = [(h.score, h.payload) for h in hits]
+        BENCHMARKS[f"hits.slim[k={k}]"] = lambda p=points: _construct_hits(VectorHit, p)
+        BENCHMARKS[f"hits.pydantic[k={k}]"] = lambda p=points: _construct_hits(_PydanticVectorHit, p)
+        BENCHMARKS[f"match._hit_to_candidate[k={k}]"] = (
+            lambda h=hits: [service._hit_to_candidate(x, request_id) for x in h]
+        )
+        BENCHMARKS[f"candidates.pydantic[k={k}]"] = lambda h=hits: _pydantic_candidates(service, h, request_id)
+        result = MatchResult(
+            request_id=request_id,
+            placement="sidebar",
+            candidates=[service._hit_to_candidate(x, request_id) for x in hits],
+        )
+        response = result.to_response()
+        shaped = _legacy_shape_match_response(response)
+        BENCHMARKS[f"legacy._shape_match_response[k={k}]"] = lambda r=response: _legacy_shape_match_response(r)
+        BENCHMARKS[f"json.dumps_indent2[k={k}]"] = lambda s=shaped: json.dumps(s, indent=2)
+        BENCHMARKS[f"render.legacy_shape_indent2[k={k}]"] = (
+            lambda r=response: json.dumps(_legacy_shape_match_response(r), indent=2)
+        )
+        serializer = ResponseSerializer()
+        serializer.render_match(response)  # warm the fragment cache
+        BENCHMARKS[f"render.serializer[k={k},warm]"] = lambda r=result, s=serializer: s.render_match(r)
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+
+def measure(fn: Callable[[], Any], repeat: int, min_time: float) -> float:
+    """Return the best observed nanoseconds per call."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+
+def measure_alloc(fn: Callable[[], Any]) -> int:
+    """Peak bytes allocated by one call (tracemalloc)."""
+    fn()  # warm caches / lazy imports outside the measurement
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        fn()
+        return tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+
+def _measure_normalized(fn: Callable[[], Any], repeat: int, min_time: float) -> tuple[float, float]:
+    calibration_ns = measure(_calibration, repeat, min_time)
+    return measure(fn, repeat, min_time), calibration_ns
+
+
+def run(name_filter: str | None, repeat: int, min_time: float, alloc: bool = False) -> dict[str, Any]:
+    _build()
+    results: dict[str, Any] = {}
+    calibrations: list[float] = []
+    for name, fn in BENCHMARKS.items():
+        if name_filter and name_filter not in name:
+            continue
+        ns, calibration_ns = _measure_normalized(fn, repeat, min_time)
+        calibrations.append(calibration_ns)
+        results[name] = {"ns_per_call": round(ns, 1), "normalized": round(ns / calibration_ns, 5)}
+        if alloc:
+            results[name]["alloc_bytes"] = measure_alloc(fn)
+    return {
+        "calibration_ns": round(min(calibrations), 1) if calibrations else 0.0,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "benchmarks": results,
+    }
+
+
+def compare(
+    current: dict[str, Any],
+    baseline: dict[str, Any],
+    threshold: float,
+    confirm_runs: int = 0,
+    repeat: int = 7,
+    min_time: float = 0.05,
+) -> list[str]:
+    """Return regressions beyond ``threshold``.
+
+    Suspected regressions are re-measured up to ``confirm_runs`` times and the
+    best result kept, so a single noisy sample does not fail the run.
+    """
+    regressions = []
+    base = baseline.get("benchmarks", {})
+    for name, cur in current["benchmarks"].items():
+        old = base.get(name)
+        if old is None:
+            continue
+        best = cur["normalized"]
+        for _ in range(confirm_runs):
+            if best / old["normalized"] - 1.0 <= threshold:
+                break
+            ns, calibration_ns = _measure_normalized(BENCHMARKS[name], repeat, min_time)
+            best = min(best, ns / calibration_ns)
+        cur["normalized"] = round(best, 5)
+        change = best / old["normalized"] - 1.0
+        if change > threshold:
+            regressions.append(f"{name}: {old['normalized']} -> {cur['normalized']} (+{change:.0%})")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Hot-path microbenchmarks with baseline regression check")
+    parser.add_argument("--filter", default=None, help="Only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=7, help="Repeats per benchmark (min is kept)")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Approximate seconds per repeat")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed normalized regression")
+    parser.add_argument("--confirm-runs", type=int, default=2, help="Re-measure suspected regressions")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="Write results as the new baseline")
+    parser.add_argument("--alloc", action="store_true", help="Also report bytes allocated per call")
+    parser.add_argument("--output", type=Path, default=None, help="Also write results JSON here")
+    args = parser.parse_args(argv)
+
+    result = run(args.filter, args.repeat, args.min_time, args.alloc)
+    baseline = (
+        json.loads(args.baseline.read_text(encoding="utf-8"))
+        if args.baseline.exists() and not args.update_baseline
+        else {}
+    )
+    base = baseline.get("benchmarks", {})
+    regressions = (
+        [] if args.update_baseline
+        else compare(result, baseline, args.threshold, args.confirm_runs, args.repeat, args.min_time)
+    )
+    print(f"calibration: {result['calibration_ns']} ns")
+    alloc_header = f"{'alloc B':>12}" if args.alloc else ""
+    print(f"{'benchmark':<48}{'ns/call':>14}{'normalized':>12}{'vs base':>10}{alloc_header}")
+    for name, r in result["benchmarks"].items():
+        delta = ""
+        if name in base:
+            delta = f"{r['normalized'] / base[name]['normalized'] - 1.0:+.0%}"
+        alloc_col = f"{r['alloc_bytes']:>12,}" if args.alloc else ""
+        print(f"{name:<48}{r['ns_per_call']:>14,.0f}{r['normalized']:>12.4f}{delta:>10}{alloc_col}")
+
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    if args.update_baseline:
+        merged = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline.exists() else {}
+        merged.update({k: v for k, v in result.items() if k != "benchmarks"})
+        merged.setdefault("benchmarks", {}).update(result["benchmarks"])
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(merged, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"baseline written to {args.baseline}")
+        return 0
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
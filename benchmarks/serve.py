@@ -0,0 +1,58 @@
+"""Serve the Data Plane over HTTP on a synthetic catalog (for HTTP benchmarks and tests).
+
+Loads ``--ads`` generated ads into the in-process store with the hash
+embedder, points the ads_match tool at that service and runs the pre-forked
+HTTP server (``/mcp``, ``/v1/match``, ``/healthz``, ``/metrics``) until
+SIGTERM.
+
+Usage::
+
+    python -m benchmarks.serve --port 8000 --workers 2 --ads 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from ad_injector.adapters.memory_vector_store import InMemoryVectorStore
+from ad_injector.config.runtime import RuntimeSettings
+from ad_injector.mcp import serving, tools
+from ad_injector.services.index_service import IndexService
+from ad_injector.services.match_service import MatchService
+
+from .catalog import HashEmbeddingProvider, generate_catalog
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve the Data Plane over HTTP on a synthetic catalog")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--transport", choices=["streamable-http", "sse"], default="streamable-http")
+    parser.add_argument("--ads", type=int, default=5_000, help="Synthetic catalog size")
+    parser.add_argument("--dimension", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    settings = RuntimeSettings(
+        _env_file=None,
+        vector_store_backend="memory",
+        embedding_dimension=args.dimension,
+        mcp_transport=args.transport,
+        mcp_host=args.host,
+        mcp_port=args.port,
+        mcp_workers=args.workers,
+        mcp_shutdown_timeout_seconds=1,
+    )
+    embedder = HashEmbeddingProvider(args.dimension)
+    store = InMemoryVectorStore(settings)
+    index = IndexService(embedding_provider=embedder, vector_store=store, settings=settings)
+    index.ensure_collection(args.dimension)
+    index.upsert_ads(generate_catalog(args.ads, seed=args.seed))
+    service = MatchService(embedding_provider=embedder, vector_store=store)
+    tools._get_match_service = lambda: service
+    serving.serve_http("data", settings)
+
+
+if __name__ == "__main__":
+    main()
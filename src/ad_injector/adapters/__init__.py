@@ -1,9 +1,15 @@
 """Concrete adapter implementations."""
 
 from .fastembed_provider import FastEmbedProvider
+from .file_job_store import FileJobStore
+from .memory_vector_store import InMemoryVectorStore
 from .qdrant_vector_store import QdrantVectorStore
+from .sqlite_trace_store import SqliteTraceStore
 
 __all__ = [
     "FastEmbedProvider",
+    "FileJobStore",
+    "InMemoryVectorStore",
     "QdrantVectorStore",
+    "SqliteTraceStore",
 ]
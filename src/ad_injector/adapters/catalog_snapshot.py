@@ -0,0 +1,183 @@
+"""Catalog snapshot files: memory-mappable vectors plus columnar payloads.
+
+A snapshot is a directory with three files:
+
+``vectors.f32``
+    Row-major float32 matrix (``count x dimension``), L2-normalised, no header.
+    Opened with ``numpy.memmap``: rows are paged in by the OS on first use.
+``payloads.col``
+    One section per payload key, concatenated.  A section holds one line per
+    row: the JSON value, or an empty line when that row has no such key.
+``manifest.json``
+    Format version, ``count``, ``dimension``, the ``ads_meta`` of the source
+    collection and the byte range of every payload column.  Written last, so
+    a directory without a manifest is an incomplete export.
+
+``CatalogSnapshot`` maps both data files; payloads are decoded per row on
+first access (``SnapshotPayloads``), and only the ``ad_id`` column is decoded
+up front, so opening a snapshot costs one pass over the ad ids.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import IO, Any, Iterator, Sequence
+
+import numpy as np
+
+SNAPSHOT_FORMAT = "ad-catalog-snapshot"
+SNAPSHOT_FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+VECTORS_FILE = "vectors.f32"
+PAYLOADS_FILE = "payloads.col"
+
+
+class SnapshotWriter:
+    """Stream ``(payload, vector)`` pages into a snapshot directory."""
+
+    def __init__(self, directory: Path | str, dimension: int) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / MANIFEST_FILE).unlink(missing_ok=True)
+        self.dimension = dimension
+        self.count = 0
+        self._vectors = open(self.directory / VECTORS_FILE, "wb")
+        self._tmp = Path(tempfile.mkdtemp(prefix=".columns-", dir=self.directory))
+        self._columns: dict[str, IO[str]] = {}
+
+    def write(self, points: Sequence[tuple[dict, Any]]) -> None:
+        if not points:
+            return
+        matrix = np.asarray([vector for _, vector in points], dtype=np.float32).reshape(len(points), -1)
+        if matrix.shape[1] != self.dimension:
+            raise ValueError(f"vector dimension {matrix.shape[1]} != snapshot dimension {self.dimension}")
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        matrix.tofile(self._vectors)
+        for payload, _ in points:
+            for key in payload.keys() - self._columns.keys():
+                column = open(self._tmp / f"{len(self._columns)}.ndjson", "w", encoding="utf-8")
+                column.write("\n" * self.count)  # earlier rows do not have this key
+                self._columns[key] = column
+            for key, column in self._columns.items():
+                column.write(json.dumps(payload[key]) + "\n" if key in payload else "\n")
+            self.count += 1
+
+    def close(self, ads_meta: dict, **info: Any) -> dict:
+        """Concatenate the columns, write the manifest and return it."""
+        self._vectors.close()
+        ranges: dict[str, list[int]] = {}
+        with open(self.directory / PAYLOADS_FILE, "wb") as out:
+            for key, column in self._columns.items():
+                column.close()
+                start = out.tell()
+                with open(column.name, "rb") as f:
+                    shutil.copyfileobj(f, out)
+                ranges[key] = [start, out.tell() - start]
+        shutil.rmtree(self._tmp, ignore_errors=True)
+        manifest = {
+            "format": SNAPSHOT_FORMAT,
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "count": self.count,
+            "dimension": self.dimension,
+            "dtype": "float32",
+            "ads_meta": ads_meta,
+            "columns": ranges,
+            "created_at": time.time(),
+            **info,
+        }
+        tmp = self.directory / (MANIFEST_FILE + ".tmp")
+        tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        os.replace(tmp, self.directory / MANIFEST_FILE)
+        return manifest
+
+    def abort(self) -> None:
+        self._vectors.close()
+        for column in self._columns.values():
+            column.close()
+        shutil.rmtree(self._tmp, ignore_errors=True)
+
+
+class SnapshotPayloads(Sequence):
+    """Read-only payload list decoded row by row from the mapped columns (cached once decoded)."""
+
+    def __init__(self, snapshot: CatalogSnapshot) -> None:
+        self._snapshot = snapshot
+        self._rows: list[dict | None] = [None] * snapshot.count
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, row: Any) -> Any:
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(len(self)))]
+        payload = self._rows[row]
+        if payload is None:
+            payload = self._rows[row] = self._snapshot.payload(row)
+        return payload
+
+
+class CatalogSnapshot:
+    """Memory-mapped view of a snapshot directory."""
+
+    def __init__(self, directory: Path | str) -> None:
+        self.directory = Path(directory)
+        manifest_path = self.directory / MANIFEST_FILE
+        if not manifest_path.exists():
+            raise ValueError(f"{self.directory} is not a complete snapshot (no {MANIFEST_FILE})")
+        self.manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        version = (self.manifest.get("format"), self.manifest.get("format_version"))
+        if version != (SNAPSHOT_FORMAT, SNAPSHOT_FORMAT_VERSION):
+            raise ValueError(f"{manifest_path}: unsupported snapshot format {version!r}")
+        self.count = int(self.manifest["count"])
+        self.dimension = int(self.manifest["dimension"])
+        self.vectors: Any = np.zeros((0, self.dimension), dtype=np.float32)
+        self._data: Any = b""
+        if self.count:
+            self.vectors = np.memmap(
+                self.directory / VECTORS_FILE, dtype=np.float32, mode="r", shape=(self.count, self.dimension)
+            )
+            with open(self.directory / PAYLOADS_FILE, "rb") as f:
+                if os.fstat(f.fileno()).st_size:
+                    self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._lines: dict[str, list[bytes]] = {}
+
+    @property
+    def ads_meta(self) -> dict:
+        return dict(self.manifest.get("ads_meta") or {})
+
+    def column(self, key: str) -> list[bytes]:
+        """Raw per-row lines of one payload column (split once, cached)."""
+        lines = self._lines.get(key)
+        if lines is None:
+            start, length = self.manifest["columns"][key]
+            lines = self._lines[key] = self._data[start : start + length].split(b"\n")[: self.count]
+        return lines
+
+    def payload(self, row: int) -> dict:
+        out = {}
+        for key in self.manifest["columns"]:
+            raw = self.column(key)[row]
+            if raw:
+                out[key] = json.loads(raw)
+        return out
+
+    def payloads(self) -> SnapshotPayloads:
+        return SnapshotPayloads(self)
+
+    def row_index(self) -> dict[str, int]:
+        """``ad_id -> row`` (the one column decoded up front)."""
+        return {json.loads(raw): row for row, raw in enumerate(self.column("ad_id")) if raw}
+
+    def iter_points(self, batch_size: int = 1000) -> Iterator[list[tuple[dict, np.ndarray]]]:
+        """Pages of ``(payload, vector row)`` in row order."""
+        for start in range(0, self.count, batch_size):
+            stop = min(start + batch_size, self.count)
+            rows = np.asarray(self.vectors[start:stop])
+            yield [(self.payload(row), rows[row - start]) for row in range(start, stop)]
@@ -0,0 +1,42 @@
+"""Job records as one JSON file per job in a local directory.
+
+Implements ``JobStorePort``.  Each ``save`` writes ``<job_id>.json.tmp`` and
+renames it over ``<job_id>.json``, so a crash never leaves a half-written
+record; unreadable files are skipped by ``load``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+
+class FileJobStore:
+    """Job store backed by a directory of JSON files."""
+
+    def __init__(self, directory: Path | str) -> None:
+        self._dir = Path(directory)
+        self._dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, job_id: str) -> Path:
+        return self._dir / f"{job_id}.json"
+
+    def save(self, record: dict[str, Any]) -> None:
+        path = self._path(record["job_id"])
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(record), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def load(self) -> list[dict[str, Any]]:
+        records = []
+        for path in self._dir.glob("*.json"):
+            try:
+                records.append(json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                continue
+        return records
+
+    def delete(self, job_id: str) -> None:
+        self._path(job_id).unlink(missing_ok=True)
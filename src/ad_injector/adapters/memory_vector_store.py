@@ -0,0 +1,367 @@
+"""Adapter: in-process VectorStorePort backed by a NumPy matrix.
+
+Brute-force cosine similarity over L2-normalised float32 rows, with the
+domain ``VectorFilter`` evaluated in Python.  Intended for benchmarks, tests
+and small single-node catalogs; semantics match ``QdrantVectorStore``
+(enabled=False ads are never returned, payloads are the same flat dicts).
+
+Migrations build the next version in a separate store (``open_collection``);
+``switch_alias`` swaps its contents in under the lock, which is what an alias
+switch looks like to readers of this store.
+
+``load_snapshot`` serves a catalog snapshot (``CatalogSnapshot``) in place:
+the matrix is the memory-mapped vectors file and payloads are decoded on
+first access, so a node starts without embedding or copying the catalog.
+Rows are copied into process memory only on the first write.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Iterator, Sequence
+
+import numpy as np
+
+from ..config.runtime import RuntimeSettings
+from .catalog_snapshot import CatalogSnapshot
+from ..domain.filters import VectorFilter
+from ..models import Ad
+from ..ports.vector_store import VectorHit
+
+# Rank this many candidates per requested result before falling back to a full sort
+_OVERSAMPLE = 8
+
+
+class InMemoryVectorStore:
+    """Concrete VectorStorePort that keeps the whole catalog in process memory."""
+
+    def __init__(self, settings: RuntimeSettings) -> None:
+        self._settings = settings
+        self._lock = threading.Lock()
+        self._meta: dict | None = None
+        self._catalog: dict = {}
+        self._dimension = settings.embedding_dimension
+        self._row_of: dict[str, int] = {}
+        self._payloads: Sequence[dict | None] = []
+        # None while the rows are those of a mapped snapshot (``_matrix``)
+        self._rows: list[np.ndarray] | None = []
+        self._matrix = np.zeros((0, self._dimension), dtype=np.float32)
+        self._dirty = False
+        self._live = settings.qdrant_collection_name
+        self._versions: dict[str, InMemoryVectorStore] = {}
+        self._generation = 1
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _snapshot(self) -> tuple[np.ndarray, Sequence[dict | None]]:
+        with self._lock:
+            if self._dirty:
+                self._matrix = (
+                    np.vstack(self._rows) if self._rows
+                    else np.zeros((0, self._dimension), dtype=np.float32)
+                )
+                self._dirty = False
+            return self._matrix, self._payloads
+
+    def query(
+        self,
+        vector: list[float],
+        vector_filter: VectorFilter,
+        top_k: int,
+    ) -> list[VectorHit]:
+        effective_k = min(top_k, self._settings.max_top_k)
+        matrix, payloads = self._snapshot()
+        n = matrix.shape[0]
+        if n == 0 or effective_k <= 0:
+            return []
+        q = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(q))
+        if norm:
+            q = q / norm
+        scores = matrix @ q
+
+        hits: list[VectorHit] = []
+        pool = min(n, effective_k * _OVERSAMPLE)
+        while True:
+            if pool < n:
+                idx = np.argpartition(-scores, pool - 1)[:pool]
+                order = idx[np.argsort(-scores[idx], kind="stable")]
+            else:
+                order = np.argsort(-scores, kind="stable")
+            hits.clear()
+            for i in order:
+                payload = payloads[i]
+                if payload is None or payload.get("enabled", True) is False:
+                    continue
+                if not vector_filter.matches(payload):
+                    continue
+                hits.append(
+                    VectorHit(
+                        ad_id=payload.get("ad_id", ""),
+                        advertiser_id=payload.get("advertiser_id", ""),
+                        score=float(scores[i]),
+                        payload=payload,
+                    )
+                )
+                if len(hits) == effective_k:
+                    return hits
+            if pool >= n:
+                return hits
+            pool = n
+
+    def scroll_ads(self, batch_size: int = 256) -> Iterator[tuple[dict, np.ndarray]]:
+        """Yield ``(payload, normalized vector)`` for every stored ad from one snapshot."""
+        matrix, payloads = self._snapshot()
+        for row, payload in enumerate(payloads):
+            if payload is not None:
+                yield payload, matrix[row]
+
+    def scroll_page(self, offset: Any = None, limit: int = 256) -> tuple[list[tuple[dict, np.ndarray]], Any]:
+        """Up to ``limit`` ``(payload, vector)`` from row ``offset`` on; the next row offset (None at the end)."""
+        matrix, payloads = self._snapshot()
+        row = offset or 0
+        page: list[tuple[dict, np.ndarray]] = []
+        while row < len(payloads) and len(page) < limit:
+            if payloads[row] is not None:
+                page.append((payloads[row], matrix[row]))
+            row += 1
+        return page, (row if row < len(payloads) else None)
+
+    def scroll_fields(self, fields: list[str], offset: Any = None, limit: int = 1024) -> tuple[list[dict], Any]:
+        """Payloads projected to ``fields`` from row ``offset`` on; the next row offset (None at the end)."""
+        _, payloads = self._snapshot()
+        row = offset or 0
+        page: list[dict] = []
+        while row < len(payloads) and len(page) < limit:
+            payload = payloads[row]
+            if payload is not None:
+                page.append({k: payload[k] for k in fields if k in payload})
+            row += 1
+        return page, (row if row < len(payloads) else None)
+
+    # ------------------------------------------------------------------
+    # Mutations
+    # ------------------------------------------------------------------
+
+    def ensure_collection(
+        self,
+        dimension: int,
+        embedding_model_id: str | None = None,
+        schema_version: str | None = None,
+    ) -> dict:
+        with self._lock:
+            created = self._meta is None
+            if created:
+                self._dimension = dimension
+                self._matrix = np.zeros((0, dimension), dtype=np.float32)
+            self._meta = {
+                "dimension": dimension,
+                "embedding_model_id": embedding_model_id or self._settings.embedding_model_id,
+                "schema_version": schema_version or "1",
+            }
+            return {"name": self._settings.qdrant_collection_name, "created": created, **self._meta}
+
+    def delete_collection(self) -> None:
+        with self._lock:
+            self._meta = None
+            self._catalog = {}
+            self._row_of.clear()
+            self._payloads = []
+            self._rows = []
+            self._matrix = np.zeros((0, self._dimension), dtype=np.float32)
+            self._dirty = False
+
+    def collection_info(self) -> dict:
+        with self._lock:
+            meta = dict(self._meta or {})
+            count = len(self._row_of)
+        return {
+            "name": self._settings.qdrant_collection_name,
+            "indexed_vectors_count": count,
+            "points_count": count,
+            "status": "green",
+            "dimension": meta.get("dimension", self._dimension),
+            "embedding_model_id": meta.get("embedding_model_id", self._settings.embedding_model_id),
+            "schema_version": meta.get("schema_version", "1"),
+            "catalog_version": self._catalog.get("catalog_version", 0),
+        }
+
+    def upsert_batch(self, ads_with_embeddings: list[tuple[Ad, list[float]]], wait: bool = True) -> int:
+        # Writes are applied synchronously, so ``wait`` makes no difference here
+        points = []
+        for ad, embedding in ads_with_embeddings:
+            payload = dict(ad.to_pinecone_metadata())
+            payload["embedding_version"] = self._settings.embedding_model_id
+            points.append((payload, embedding))
+        return self.upsert_payloads(points, wait)
+
+    def upsert_payloads(self, payloads_with_vectors: list[tuple[dict, Any]], wait: bool = True) -> int:
+        """Upsert stored-format payloads verbatim (keyed by ``payload["ad_id"]``)."""
+        with self._lock:
+            if self._rows is None:
+                self._rows = list(self._matrix)
+            # Copy-on-write: concurrent readers keep the previous payload list
+            payloads = list(self._payloads)
+            for payload, embedding in payloads_with_vectors:
+                vec = np.asarray(embedding, dtype=np.float32)
+                norm = float(np.linalg.norm(vec))
+                if norm:
+                    vec = vec / norm
+                row = self._row_of.get(payload["ad_id"])
+                if row is None:
+                    self._row_of[payload["ad_id"]] = len(self._rows)
+                    self._rows.append(vec)
+                    payloads.append(payload)
+                else:
+                    self._rows[row] = vec
+                    payloads[row] = payload
+            self._payloads = payloads
+            self._dirty = True
+        return len(payloads_with_vectors)
+
+    def update_payloads(self, payloads: list[dict], wait: bool = True) -> int:
+        """Replace stored payloads in place; ads that are not stored are skipped."""
+        updated = 0
+        with self._lock:
+            current = list(self._payloads)
+            for payload in payloads:
+                row = self._row_of.get(payload["ad_id"])
+                if row is not None:
+                    current[row] = payload
+                    updated += 1
+            self._payloads = current
+        return updated
+
+    def delete_ad(self, ad_id: str) -> None:
+        self.delete_ads([ad_id])
+
+    def delete_ads(self, ad_ids: list[str]) -> int:
+        """Delete the stored ones of ``ad_ids``; returns how many were deleted."""
+        with self._lock:
+            rows = [row for row in (self._row_of.pop(ad_id, None) for ad_id in ad_ids) if row is not None]
+            if rows:
+                payloads = list(self._payloads)
+                for row in rows:
+                    payloads[row] = None
+                self._payloads = payloads
+        return len(rows)
+
+    def get_ad(self, ad_id: str) -> dict | None:
+        with self._lock:
+            row = self._row_of.get(ad_id)
+            return dict(self._payloads[row]) if row is not None else None
+
+    def get_ads(self, ad_ids: list[str], fields: list[str] | None = None) -> dict[str, dict]:
+        with self._lock:
+            rows = [(ad_id, self._row_of.get(ad_id)) for ad_id in ad_ids]
+            payloads = [(ad_id, self._payloads[row]) for ad_id, row in rows if row is not None]
+        if fields is None:
+            return {ad_id: dict(payload) for ad_id, payload in payloads}
+        return {ad_id: {k: payload[k] for k in fields if k in payload} for ad_id, payload in payloads}
+
+    def get_points(self, ad_ids: list[str]) -> dict[str, tuple[dict, np.ndarray]]:
+        """``ad_id -> (payload, normalized vector)`` for the stored ones."""
+        with self._lock:
+            vectors = self._rows if self._rows is not None else self._matrix
+            rows = [(ad_id, self._row_of.get(ad_id)) for ad_id in ad_ids]
+            return {ad_id: (dict(self._payloads[row]), vectors[row]) for ad_id, row in rows if row is not None}
+
+    def bulk_disable(self, filter_spec: dict) -> int:
+        """Set enabled=False for all ads whose payload matches filter_spec. Returns count updated."""
+        updated = 0
+        with self._lock:
+            payloads = list(self._payloads)
+            for row, payload in enumerate(payloads):
+                if payload is None:
+                    continue
+                if all(
+                    (payload.get(k) in v) if isinstance(v, list) else payload.get(k) == v
+                    for k, v in filter_spec.items()
+                ):
+                    payloads[row] = {**payload, "enabled": False}
+                    updated += 1
+            self._payloads = payloads
+        return updated
+
+    def load_snapshot(self, snapshot: CatalogSnapshot) -> int:
+        """Serve ``snapshot`` (replacing the current contents); returns the number of ads."""
+        payloads = snapshot.payloads()
+        row_of = snapshot.row_index()
+        with self._lock:
+            self._meta = {
+                "dimension": snapshot.dimension,
+                "embedding_model_id": self._settings.embedding_model_id,
+                "schema_version": "1",
+                **snapshot.ads_meta,
+            }
+            self._dimension = snapshot.dimension
+            self._row_of = row_of
+            self._payloads = payloads
+            self._rows = None
+            self._matrix = snapshot.vectors
+            self._dirty = False
+        return len(row_of)
+
+    def reconnect(self) -> None:
+        """Nothing to reconnect: the store lives in this process."""
+
+    # ------------------------------------------------------------------
+    # Versioned collections (migrations)
+    # ------------------------------------------------------------------
+
+    def live_collection(self) -> str:
+        return self._live
+
+    def next_collection_name(self) -> str:
+        self._generation += 1
+        return f"{self._settings.qdrant_collection_name}_v{self._generation}"
+
+    def open_collection(self, name: str, dimension: int) -> InMemoryVectorStore:
+        """Separate store for the next version (kept until ``switch_alias`` / ``drop_collection``)."""
+        store = self._versions.get(name)
+        if store is None:
+            store = InMemoryVectorStore(self._settings)
+            store.ensure_collection(dimension)
+            store._live = name
+            self._versions[name] = store
+        return store
+
+    def switch_alias(self, name: str) -> str | None:
+        """Swap the contents of version ``name`` in; returns the previous version's name."""
+        other = self._versions.pop(name)
+        with self._lock, other._lock:
+            self._meta = dict(other._meta) if other._meta is not None else None
+            self._dimension = other._dimension
+            self._row_of = other._row_of
+            self._payloads = other._payloads
+            self._rows = other._rows
+            self._matrix = other._matrix
+            self._dirty = other._dirty
+            previous, self._live = self._live, name
+        return previous
+
+    def drop_collection(self, name: str) -> None:
+        if name == self._live:
+            raise ValueError(f"{name!r} is the live collection")
+        self._versions.pop(name, None)
+
+    # ------------------------------------------------------------------
+    # Catalog version / change feed
+    # ------------------------------------------------------------------
+
+    def catalog_state(self) -> dict:
+        with self._lock:
+            return dict(self._catalog)
+
+    def catalog_version(self) -> int:
+        with self._lock:
+            return int(self._catalog.get("catalog_version") or 0)
+
+    def set_catalog_state(self, state: dict, expected_version: int | None = None) -> bool:
+        with self._lock:
+            if expected_version is not None and int(self._catalog.get("catalog_version") or 0) != expected_version:
+                return False
+            self._catalog = dict(state)
+            return True
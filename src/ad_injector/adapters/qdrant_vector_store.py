@@ -1,17 +1,36 @@
-"""Adapter: Qdrant-based VectorStore implementing VectorStorePort."""
+"""Adapter: Qdrant-based VectorStore implementing VectorStorePort.
+
+The configured collection name (``QDRANT_COLLECTION_NAME``) is served through
+a Qdrant collection alias pointing at a versioned physical collection
+(``<name>_v1``, ``<name>_v2``, ...), so a migration can build the next
+version next to the live one and switch the alias atomically
+(``switch_alias``).  Collections created before aliases were used keep
+working under their plain name until their first migration.
+"""
 
 from __future__ import annotations
 
 import uuid
+import re
+from typing import Any, Iterator
 
 from qdrant_client import QdrantClient
 from qdrant_client.models import (
+    CreateAlias,
+    CreateAliasOperation,
+    DeleteAlias,
+    DeleteAliasOperation,
     Distance,
     FieldCondition,
     Filter,
+    HasIdCondition,
+    IsEmptyCondition,
     MatchAny,
     MatchValue,
+    OverwritePayloadOperation,
+    PayloadField,
     PointStruct,
+    SetPayload,
     VectorParams,
 )
 
@@ -20,31 +39,62 @@ from ..domain.filters import FieldFilter, FilterOp, VectorFilter
 from ..models import Ad
 from ..ports.vector_store import VectorHit
 
+# Point ids per delete / retrieve / payload-update request
+_ID_CHUNK = 1000
+
 
 class QdrantVectorStore:
     """Concrete VectorStorePort backed by Qdrant."""
 
-    def __init__(self, settings: RuntimeSettings) -> None:
+    def __init__(
+        self,
+        settings: RuntimeSettings,
+        collection: str | None = None,
+        client: QdrantClient | None = None,
+    ) -> None:
         self._settings = settings
-        self._client: QdrantClient | None = None
+        self._client = client
+        self._owns_client = client is None
+        # Set for stores bound to one physical collection (``open_collection``)
+        self._bound = collection
 
-    # Meta collection for dimension, embedding_model_id, schema_version
+    # Meta collection for dimension, embedding_model_id, schema_version and the catalog change feed
     _META_COLLECTION = "ads_meta"
     _META_POINT_ID = 0
+    _CATALOG_KEYS = ("catalog_version", "catalog_changes")
+    # Random token of the last conditional catalog write, read back to tell whether ours applied
+    _CATALOG_WRITER_KEY = "catalog_writer"
 
     @property
     def _collection(self) -> str:
-        return self._settings.qdrant_collection_name
+        return self._bound or self._settings.qdrant_collection_name
 
     def _get_client(self) -> QdrantClient:
         if self._client is None:
-            self._client = QdrantClient(
-                host=self._settings.qdrant_host,
-                port=self._settings.qdrant_port,
-                timeout=self._settings.request_timeout_seconds,
-            )
+            location = self._settings.qdrant_location
+            if location == ":memory:":
+                self._client = QdrantClient(location=":memory:")
+            elif location:
+                self._client = QdrantClient(path=location)
+            else:
+                self._client = QdrantClient(
+                    host=self._settings.qdrant_host,
+                    port=self._settings.qdrant_port,
+                    timeout=self._settings.request_timeout_seconds,
+                )
         return self._client
 
+    def reconnect(self) -> None:
+        """Close the client so the next call builds a fresh one (each forked worker needs its own pool).
+
+        A client passed in by the caller, and the embedded (``:memory:`` / path)
+        clients that hold the data themselves, are kept.
+        """
+        if not self._owns_client or self._settings.qdrant_location or self._client is None:
+            return
+        client, self._client = self._client, None
+        client.close()
+
     def _ad_id_to_uuid(self, ad_id: str) -> str:
         return str(uuid.uuid5(self._settings.ad_id_namespace, ad_id))
 
@@ -83,6 +133,45 @@ class QdrantVectorStore:
             for hit in response.points
         ]
 
+    def scroll_ads(self, batch_size: int = 256) -> Iterator[tuple[dict, list[float]]]:
+        """Yield ``(payload, vector)`` for every stored ad, paging with ``scroll``."""
+        client = self._get_client()
+        offset = None
+        while True:
+            points, offset = client.scroll(
+                collection_name=self._collection,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True,
+            )
+            for point in points:
+                yield dict(point.payload or {}), point.vector
+            if offset is None or not points:
+                break
+
+    def scroll_page(self, offset: Any = None, limit: int = 256) -> tuple[list[tuple[dict, list[float]]], Any]:
+        """One ``scroll`` page of ``(payload, vector)`` and the next offset (None at the end)."""
+        points, next_offset = self._get_client().scroll(
+            collection_name=self._collection,
+            limit=limit,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        return [(dict(point.payload or {}), point.vector) for point in points], next_offset
+
+    def scroll_fields(self, fields: list[str], offset: Any = None, limit: int = 1024) -> tuple[list[dict], Any]:
+        """One ``scroll`` page of payloads projected to ``fields`` server-side, without vectors."""
+        points, next_offset = self._get_client().scroll(
+            collection_name=self._collection,
+            limit=limit,
+            offset=offset,
+            with_payload=list(fields),
+            with_vectors=False,
+        )
+        return [dict(point.payload or {}) for point in points], next_offset
+
     # ------------------------------------------------------------------
     # Mutations
     # ------------------------------------------------------------------
@@ -94,13 +183,15 @@ class QdrantVectorStore:
         schema_version: str | None = None,
     ) -> dict:
         client = self._get_client()
-        collections = [c.name for c in client.get_collections().collections]
         created = False
-        if self._collection not in collections:
+        if not client.collection_exists(self._collection):
+            physical = self.next_collection_name() if self._bound is None else self._collection
             client.create_collection(
-                collection_name=self._collection,
+                collection_name=physical,
                 vectors_config=VectorParams(size=dimension, distance=Distance.COSINE),
             )
+            if physical != self._collection:
+                self.switch_alias(physical)
             created = True
         # Persist metadata in ads_meta collection
         if embedding_model_id is None:
@@ -122,7 +213,12 @@ class QdrantVectorStore:
 
     def delete_collection(self) -> None:
         client = self._get_client()
-        client.delete_collection(self._collection)
+        live = self.live_collection()
+        if live != self._collection:
+            client.update_collection_aliases(
+                change_aliases_operations=[DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=self._collection))]
+            )
+        client.delete_collection(live)
         if self._META_COLLECTION in [c.name for c in client.get_collections().collections]:
             client.delete_collection(self._META_COLLECTION)
 
@@ -137,8 +233,66 @@ class QdrantVectorStore:
             "dimension": meta.get("dimension", self._settings.embedding_dimension),
             "embedding_model_id": meta.get("embedding_model_id", self._settings.embedding_model_id),
             "schema_version": meta.get("schema_version", "1"),
+            "catalog_version": meta.get("catalog_version", 0),
         }
 
+    # ------------------------------------------------------------------
+    # Versioned collections behind the alias (migrations)
+    # ------------------------------------------------------------------
+
+    def _aliases(self) -> dict[str, str]:
+        return {a.alias_name: a.collection_name for a in self._get_client().get_aliases().aliases}
+
+    def live_collection(self) -> str:
+        """Physical collection currently served under the configured name."""
+        return self._aliases().get(self._collection, self._collection)
+
+    def next_collection_name(self) -> str:
+        """``<name>_v<n>`` with n one above every existing version."""
+        base = self._settings.qdrant_collection_name
+        pattern = re.compile(rf"^{re.escape(base)}_v(\d+)$")
+        versions = [
+            int(m.group(1))
+            for c in self._get_client().get_collections().collections
+            if (m := pattern.match(c.name))
+        ]
+        return f"{base}_v{max(versions, default=0) + 1}"
+
+    def open_collection(self, name: str, dimension: int) -> QdrantVectorStore:
+        """Store bound to physical collection ``name`` (created if missing); shares this client."""
+        client = self._get_client()
+        if not client.collection_exists(name):
+            client.create_collection(
+                collection_name=name,
+                vectors_config=VectorParams(size=dimension, distance=Distance.COSINE),
+            )
+        return QdrantVectorStore(self._settings, collection=name, client=client)
+
+    def switch_alias(self, name: str) -> str | None:
+        """Serve physical collection ``name`` under the configured name; returns the previous one.
+
+        Moving an existing alias is one atomic alias operation.  A legacy
+        physical collection under the configured name has to be deleted first
+        (queries fail for that moment) and None is returned.
+        """
+        client = self._get_client()
+        alias = self._settings.qdrant_collection_name
+        previous = self._aliases().get(alias)
+        operations: list = []
+        if previous is not None:
+            operations.append(DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias)))
+        elif client.collection_exists(alias):
+            client.delete_collection(alias)
+        operations.append(CreateAliasOperation(create_alias=CreateAlias(collection_name=name, alias_name=alias)))
+        client.update_collection_aliases(change_aliases_operations=operations)
+        return previous
+
+    def drop_collection(self, name: str) -> None:
+        """Delete a physical collection that is not being served."""
+        if name == self.live_collection():
+            raise ValueError(f"{name!r} is the live collection")
+        self._get_client().delete_collection(name)
+
     def _get_collection_meta(self) -> dict:
         client = self._get_client()
         colls = [c.name for c in client.get_collections().collections]
@@ -161,6 +315,7 @@ class QdrantVectorStore:
         dimension: int,
         embedding_model_id: str,
         schema_version: str,
+        catalog: dict | None = None,
     ) -> None:
         client = self._get_client()
         colls = [c.name for c in client.get_collections().collections]
@@ -169,6 +324,9 @@ class QdrantVectorStore:
                 collection_name=self._META_COLLECTION,
                 vectors_config=VectorParams(size=1, distance=Distance.COSINE),
             )
+        if catalog is None:
+            # Keep the catalog version across collection_ensure calls
+            catalog = self.catalog_state()
         client.upsert(
             collection_name=self._META_COLLECTION,
             points=[
@@ -179,12 +337,87 @@ class QdrantVectorStore:
                         "dimension": dimension,
                         "embedding_model_id": embedding_model_id,
                         "schema_version": schema_version,
+                        **catalog,
                     },
                 )
             ],
         )
 
-    def upsert_batch(self, ads_with_embeddings: list[tuple[Ad, list[float]]]) -> int:
+    # ------------------------------------------------------------------
+    # Catalog version / change feed (stored on the ads_meta point)
+    # ------------------------------------------------------------------
+
+    def catalog_state(self) -> dict:
+        """One ``retrieve`` of the meta point; empty dict if it does not exist yet."""
+        try:
+            results = self._get_client().retrieve(
+                collection_name=self._META_COLLECTION,
+                ids=[self._META_POINT_ID],
+                with_payload=list(self._CATALOG_KEYS),
+            )
+        except Exception:
+            return {}
+        if not results:
+            return {}
+        payload = results[0].payload or {}
+        return {k: payload[k] for k in self._CATALOG_KEYS if k in payload}
+
+    def catalog_version(self) -> int:
+        """One ``retrieve`` of the meta point's ``catalog_version`` only (the change log stays on the server)."""
+        try:
+            results = self._get_client().retrieve(
+                collection_name=self._META_COLLECTION,
+                ids=[self._META_POINT_ID],
+                with_payload=["catalog_version"],
+            )
+        except Exception:
+            return 0
+        return int((results[0].payload or {}).get("catalog_version") or 0) if results else 0
+
+    def set_catalog_state(self, state: dict, expected_version: int | None = None) -> bool:
+        """Write the catalog keys of the meta point.
+
+        With ``expected_version`` the ``set_payload`` selects the meta point
+        only while it still carries that version; Qdrant applies a collection's
+        updates one at a time, so of two writers racing from the same version
+        exactly one matches.  The write token read back afterwards tells which.
+        """
+        meta = self._get_collection_meta()
+        if not meta:
+            self._set_collection_meta(
+                dimension=self._settings.embedding_dimension,
+                embedding_model_id=self._settings.embedding_model_id,
+                schema_version="1",
+                catalog=dict(state),
+            )
+            return True
+        client = self._get_client()
+        if expected_version is None:
+            client.set_payload(
+                collection_name=self._META_COLLECTION,
+                payload=dict(state),
+                points=[self._META_POINT_ID],
+            )
+            return True
+        token = uuid.uuid4().hex
+        if expected_version:
+            current = FieldCondition(key="catalog_version", match=MatchValue(value=expected_version))
+        else:
+            current = IsEmptyCondition(is_empty=PayloadField(key="catalog_version"))
+        client.set_payload(
+            collection_name=self._META_COLLECTION,
+            payload={**state, self._CATALOG_WRITER_KEY: token},
+            points=Filter(must=[HasIdCondition(has_id=[self._META_POINT_ID]), current]),
+            wait=True,
+        )
+        written = client.retrieve(
+            collection_name=self._META_COLLECTION,
+            ids=[self._META_POINT_ID],
+            with_payload=[self._CATALOG_WRITER_KEY],
+        )
+        return bool(written) and (written[0].payload or {}).get(self._CATALOG_WRITER_KEY) == token
+
+    def upsert_batch(self, ads_with_embeddings: list[tuple[Ad, list[float]]], wait: bool = True) -> int:
         client = self._get_client()
         points = []
         for ad, embedding in ads_with_embeddings:
@@ -197,15 +430,47 @@ class QdrantVectorStore:
                     payload=payload,
                 )
             )
-        client.upsert(collection_name=self._collection, points=points)
+        client.upsert(collection_name=self._collection, points=points, wait=wait)
+        return len(points)
+
+    def upsert_payloads(self, payloads_with_vectors: list[tuple[dict, Any]], wait: bool = True) -> int:
+        """Upsert stored-format payloads verbatim (point id from ``payload["ad_id"]``)."""
+        points = [
+            PointStruct(id=self._ad_id_to_uuid(payload["ad_id"]), vector=[float(v) for v in vector], payload=payload)
+            for payload, vector in payloads_with_vectors
+        ]
+        self._get_client().upsert(collection_name=self._collection, points=points, wait=wait)
         return len(points)
 
+    def update_payloads(self, payloads: list[dict], wait: bool = True) -> int:
+        """Overwrite payloads of existing points (vectors untouched), one batch request per chunk."""
+        client = self._get_client()
+        for i in range(0, len(payloads), _ID_CHUNK):
+            operations = [
+                OverwritePayloadOperation(
+                    overwrite_payload=SetPayload(payload=payload, points=[self._ad_id_to_uuid(payload["ad_id"])])
+                )
+                for payload in payloads[i : i + _ID_CHUNK]
+            ]
+            client.batch_update_points(collection_name=self._collection, update_operations=operations, wait=wait)
+        return len(payloads)
+
     def delete_ad(self, ad_id: str) -> None:
         self._get_client().delete(
             collection_name=self._collection,
             points_selector=[self._ad_id_to_uuid(ad_id)],
         )
 
+    def delete_ads(self, ad_ids: list[str]) -> int:
+        """Delete in one points-selector request per chunk; returns the ids sent (Qdrant does not report hits)."""
+        client = self._get_client()
+        for i in range(0, len(ad_ids), _ID_CHUNK):
+            client.delete(
+                collection_name=self._collection,
+                points_selector=[self._ad_id_to_uuid(ad_id) for ad_id in ad_ids[i : i + _ID_CHUNK]],
+            )
+        return len(ad_ids)
+
     def get_ad(self, ad_id: str) -> dict | None:
         results = self._get_client().retrieve(
             collection_name=self._collection,
@@ -216,6 +481,38 @@ class QdrantVectorStore:
             return None
         return results[0].payload
 
+    def get_ads(self, ad_ids: list[str], fields: list[str] | None = None) -> dict[str, dict]:
+        client = self._get_client()
+        out: dict[str, dict] = {}
+        for i in range(0, len(ad_ids), _ID_CHUNK):
+            chunk = ad_ids[i : i + _ID_CHUNK]
+            by_point = {self._ad_id_to_uuid(ad_id): ad_id for ad_id in chunk}
+            points = client.retrieve(
+                collection_name=self._collection,
+                ids=list(by_point),
+                with_payload=list(fields) if fields is not None else True,
+                with_vectors=False,
+            )
+            for point in points:
+                out[by_point[str(point.id)]] = dict(point.payload or {})
+        return out
+
+    def get_points(self, ad_ids: list[str]) -> dict[str, tuple[dict, list[float]]]:
+        client = self._get_client()
+        out: dict[str, tuple[dict, list[float]]] = {}
+        for i in range(0, len(ad_ids), _ID_CHUNK):
+            chunk = ad_ids[i : i + _ID_CHUNK]
+            by_point = {self._ad_id_to_uuid(ad_id): ad_id for ad_id in chunk}
+            points = client.retrieve(
+                collection_name=self._collection,
+                ids=list(by_point),
+                with_payload=True,
+                with_vectors=True,
+            )
+            for point in points:
+                out[by_point[str(point.id)]] = (dict(point.payload or {}), point.vector)
+        return out
+
     def bulk_disable(self, filter_spec: dict) -> int:
         """Set enabled=False for all points matching filter_spec. Returns count updated."""
         from qdrant_client.models import PointStruct
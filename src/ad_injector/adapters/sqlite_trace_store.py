@@ -0,0 +1,282 @@
+"""SQLite (WAL) trace store shared by all Data Plane workers on a node.
+
+Implements ``TraceStorePort``.  ``put`` only appends to an in-process
+pending buffer and a bounded queue; a daemon writer thread materializes the
+traces (``MatchTrace.to_dict``) and commits them in batches, one transaction
+per batch.  ``get`` checks this process's pending buffer first, then reads
+SQLite through a per-thread read-only connection; with WAL, readers never
+wait for the writer, and the busy timeout bounds the wait on checkpoints.
+
+Every ``expire_interval_seconds`` the writer runs a maintenance pass: rows
+older than ``ttl_seconds`` (already ignored on read) are deleted, the oldest
+rows are pruned while the live pages (``page_count - freelist_count``) exceed
+``max_bytes``, and the freed pages are returned with an incremental vacuum and
+a ``wal_checkpoint(TRUNCATE)`` so neither the database nor its WAL grows
+without bound.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import math
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from ..services.match_trace import MatchTrace
+
+# Pruning removes enough rows to land this far under max_bytes, so a busy store
+# is not pruned again on every pass
+_PRUNE_TARGET = 0.9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS traces (
+    request_id TEXT PRIMARY KEY,
+    created REAL NOT NULL,
+    body BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS match_index (
+    match_id TEXT PRIMARY KEY,
+    request_id TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS traces_created ON traces(created);
+CREATE INDEX IF NOT EXISTS match_index_created ON match_index(created);
+"""
+
+
+class SqliteTraceStore:
+    """Trace store backed by a local SQLite database in WAL mode."""
+
+    def __init__(
+        self,
+        path: Path | str,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float = 3600.0,
+        max_context_chars: int = 500,
+        batch_size: int = 256,
+        flush_interval_seconds: float = 0.05,
+        expire_interval_seconds: float = 60.0,
+        read_timeout_seconds: float = 0.05,
+        queue_size: int = 10_000,
+    ) -> None:
+        self._path = Path(path)
+        self._max_bytes = max_bytes
+        self._ttl = ttl_seconds
+        self._max_context = max_context_chars
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval_seconds
+        self._expire_interval = expire_interval_seconds
+        self._read_timeout = read_timeout_seconds
+        self._queue: queue.Queue[MatchTrace | None] = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._pending: dict[str, MatchTrace] = {}
+        self._pending_by_match: dict[str, str] = {}
+        self._local = threading.local()
+        self._counts = {"written": 0, "dropped": 0, "expired": 0, "pruned": 0, "hits": 0, "misses": 0, "errors": 0}
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect(timeout=5.0)
+        try:
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ad-trace-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # -- port API ----------------------------------------------------------
+
+    def put(self, trace: MatchTrace) -> bool:
+        """Buffer a trace for the writer; never blocks (drops when the queue is full)."""
+        if not trace.sampled or not any(trace.match_ids):
+            return False
+        trace.context_text = trace.context_text[: self._max_context]
+        with self._lock:
+            try:
+                self._queue.put_nowait(trace)
+            except queue.Full:
+                self._counts["dropped"] += 1
+                return False
+            self._pending[trace.request_id] = trace
+            for match_id in trace.match_ids:
+                if match_id is not None:
+                    self._pending_by_match[match_id] = trace.request_id
+        return True
+
+    def get(self, match_id: str) -> dict[str, Any] | None:
+        """Materialized trace for ``match_id`` (or a request_id), or None if unknown/expired."""
+        with self._lock:
+            pending = self._pending.get(self._pending_by_match.get(match_id, match_id))
+        if pending is not None:
+            self._count("hits")
+            return pending.to_dict(self._max_context)
+        try:
+            row = self._reader().execute(
+                "SELECT t.body, t.created FROM traces t WHERE t.request_id = COALESCE("
+                "(SELECT request_id FROM match_index WHERE match_id = ?), ?)",
+                (match_id, match_id),
+            ).fetchone()
+        except sqlite3.Error:
+            self._count("errors")
+            return None
+        if row is None or (self._ttl > 0 and time.time() - row[1] > self._ttl):
+            self._count("misses")
+            return None
+        self._count("hits")
+        return json.loads(row[0])
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+            pending = len(self._pending)
+        files = [self._path, self._path.with_name(self._path.name + "-wal")]
+        return {
+            "backend": "sqlite",
+            "path": str(self._path),
+            "pending": pending,
+            "bytes": sum(p.stat().st_size for p in files if p.exists()),
+            "max_bytes": self._max_bytes,
+            "ttl_seconds": self._ttl,
+            **counts,
+        }
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Block until everything queued so far is committed (tests, shutdown)."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if not self._pending:
+                    return
+            time.sleep(self._flush_interval / 2)
+
+    def close(self) -> None:
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._queue.put(None)
+        self._thread.join(5.0)
+
+    # -- internals ---------------------------------------------------------
+
+    def _connect(self, timeout: float) -> sqlite3.Connection:
+        return sqlite3.connect(self._path, timeout=timeout, isolation_level=None, check_same_thread=False)
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect(self._read_timeout)
+            conn.execute("PRAGMA query_only=ON")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self._counts[key] += n
+
+    def _run(self) -> None:
+        conn = self._connect(timeout=5.0)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        next_maintenance = time.monotonic() + self._expire_interval
+        stop = False
+        while not stop:
+            batch: list[MatchTrace] = []
+            deadline = time.monotonic() + self._flush_interval
+            while len(batch) < self._batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            if batch:
+                self._write(conn, batch)
+            if time.monotonic() >= next_maintenance:
+                self._maintain(conn)
+                next_maintenance = time.monotonic() + self._expire_interval
+        conn.close()
+
+    def _write(self, conn: sqlite3.Connection, batch: list[MatchTrace]) -> None:
+        now = time.time()
+        rows = []
+        index_rows = []
+        for trace in batch:
+            body = json.dumps(trace.to_dict(self._max_context), separators=(",", ":"))
+            rows.append((trace.request_id, now, body))
+            index_rows.extend((m, trace.request_id, now) for m in trace.match_ids if m is not None)
+        try:
+            conn.execute("BEGIN")
+            conn.executemany("INSERT OR REPLACE INTO traces VALUES (?, ?, ?)", rows)
+            conn.executemany("INSERT OR REPLACE INTO match_index VALUES (?, ?, ?)", index_rows)
+            conn.execute("COMMIT")
+            written = len(batch)
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            written = 0
+            self._count("errors")
+        with self._lock:
+            self._counts["written"] += written
+            for trace in batch:
+                if self._pending.get(trace.request_id) is trace:
+                    del self._pending[trace.request_id]
+                for match_id in trace.match_ids:
+                    if match_id is not None and self._pending_by_match.get(match_id) == trace.request_id:
+                        del self._pending_by_match[match_id]
+
+    def _maintain(self, conn: sqlite3.Connection) -> None:
+        expired = pruned = 0
+        try:
+            if self._ttl > 0:
+                cutoff = time.time() - self._ttl
+                expired = conn.execute("DELETE FROM traces WHERE created < ?", (cutoff,)).rowcount
+                conn.execute("DELETE FROM match_index WHERE created < ?", (cutoff,))
+            if self._max_bytes > 0:
+                pruned = self._prune(conn)
+            conn.execute("PRAGMA incremental_vacuum")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            self._count("errors")
+            return
+        with self._lock:
+            self._counts["expired"] += max(0, expired)
+            self._counts["pruned"] += max(0, pruned)
+
+    def _prune(self, conn: sqlite3.Connection) -> int:
+        """Delete the oldest rows so the live pages fit under ``max_bytes``; returns the traces removed."""
+        page_size, page_count, free_pages = (
+            conn.execute(f"PRAGMA {name}").fetchone()[0] for name in ("page_size", "page_count", "freelist_count")
+        )
+        used = (page_count - free_pages) * page_size
+        if used <= self._max_bytes:
+            return 0
+        rows = conn.execute("SELECT COUNT(*) FROM traces").fetchone()[0]
+        if rows == 0:
+            return 0
+        # Rows are roughly the same size: drop the oldest share that brings the file under the target
+        excess = math.ceil(rows * (1 - _PRUNE_TARGET * self._max_bytes / used))
+        oldest = "SELECT rowid FROM traces ORDER BY created, rowid LIMIT ?"
+        conn.execute("BEGIN")
+        (cutoff,) = conn.execute(f"SELECT MAX(created) FROM traces WHERE rowid IN ({oldest})", (excess,)).fetchone()
+        pruned = conn.execute(f"DELETE FROM traces WHERE rowid IN ({oldest})", (excess,)).rowcount
+        # A batch shares one timestamp: only the cutoff batch needs the per-row check
+        conn.execute("DELETE FROM match_index WHERE created < ?", (cutoff,))
+        conn.execute(
+            "DELETE FROM match_index WHERE created = ? AND request_id NOT IN "
+            "(SELECT request_id FROM traces WHERE created = ?)",
+            (cutoff, cutoff),
+        )
+        conn.execute("COMMIT")
+        return pruned
@@ -3,44 +3,241 @@
 import argparse
 import json
 import sys
+import time
 from pathlib import Path
 
-from .models import Ad
+from .services.index_service import IndexService
 from .wiring import build_index_service
 
 # Default path to demo ads JSON (project root / data / test_ads.json)
 _DEFAULT_ADS_PATH = Path(__file__).resolve().parent.parent.parent / "data" / "test_ads.json"
 
 
-def load_ads_from_file(path: Path) -> list[Ad]:
-    """Load ads from a JSON file. Raises on missing file or invalid JSON/schema."""
+def seed_ads(
+    svc: IndexService,
+    file_path: Path | None = None,
+    reject_path: Path | None = None,
+    batch_size: int | None = None,
+    vectors_path: Path | None = None,
+    embedding_model_id: str | None = None,
+) -> None:
+    """Stream ads from an NDJSON (optionally gzipped) or JSON-array file into the collection."""
+    from .config.runtime import get_settings
+    from .ops.ingest import ingest
+
+    path = file_path if file_path is not None else _DEFAULT_ADS_PATH
     if not path.exists():
         print(f"Error: ads file not found: {path}", file=sys.stderr)
         print("Create data/test_ads.json or pass --file <path>.", file=sys.stderr)
         sys.exit(1)
-    with open(path, encoding="utf-8") as f:
-        raw = json.load(f)
-    if not isinstance(raw, list):
-        print("Error: JSON file must contain a list of ad objects.", file=sys.stderr)
+    if reject_path is None:
+        reject_path = path.with_name(path.name + ".rejects.ndjson")
+    print(f"Adding ads from {path}...")
+    last_print = [time.monotonic()]
+
+    def progress(report) -> None:
+        if time.monotonic() - last_print[0] >= 2.0:
+            last_print[0] = time.monotonic()
+            print(
+                f"  {report.read} read, {report.upserted} upserted, {report.rejected} rejected"
+                f"  ({report.ads_per_second:.0f} ads/s)"
+            )
+
+    try:
+        report = ingest(
+            svc,
+            path,
+            batch_size=batch_size or get_settings().max_batch_size,
+            reject_path=reject_path,
+            progress=progress,
+            vectors_path=vectors_path,
+            embedding_model_id=embedding_model_id,
+        )
+    except (OSError, ValueError) as e:
+        print(f"Error: cannot read {path}: {e}", file=sys.stderr)
         sys.exit(1)
-    ads: list[Ad] = []
-    for i, item in enumerate(raw):
-        try:
-            ads.append(Ad.model_validate(item))
-        except Exception as e:
-            print(f"Error: invalid ad at index {i}: {e}", file=sys.stderr)
-            sys.exit(1)
-    return ads
-
-
-def seed_ads(file_path: Path | None = None) -> None:
-    """Load demo ads from a JSON file and upsert them via IndexService."""
-    path = file_path if file_path is not None else _DEFAULT_ADS_PATH
-    ads = load_ads_from_file(path)
-    print(f"Adding {len(ads)} ads from {path}...")
-    svc = build_index_service()
-    count = svc.upsert_ads(ads)
-    print(f"Successfully added {count} ads.")
+    print(
+        f"Successfully added {report.upserted} ads in {report.seconds:.1f}s"
+        f" ({report.ads_per_second:.0f} ads/s)."
+    )
+    if report.rejected:
+        print(f"Rejected {report.rejected} invalid rows; see {reject_path}", file=sys.stderr)
+
+
+def bulk_load_ads(
+    svc: IndexService,
+    file_path: Path,
+    state_path: Path | None = None,
+    reject_path: Path | None = None,
+    restart: bool = False,
+    batch_size: int | None = None,
+    embed_workers: int = 2,
+    barrier_every: int = 8,
+    vectors_path: Path | None = None,
+    embedding_model_id: str | None = None,
+) -> None:
+    """Resumable staged load of a large NDJSON catalog; prints per-stage throughput."""
+    from .ops.ingest import bulk_ingest
+
+    if not file_path.exists():
+        print(f"Error: ads file not found: {file_path}", file=sys.stderr)
+        sys.exit(1)
+    state_path = state_path or file_path.with_name(file_path.name + ".checkpoint.json")
+    reject_path = reject_path or file_path.with_name(file_path.name + ".rejects.ndjson")
+    print(f"Bulk loading {file_path} (checkpoint: {state_path})...")
+
+    def progress(report) -> None:
+        print(f"  checkpoint line {report.checkpoint}: {report.upserted} upserted, {report.rejected} rejected")
+
+    try:
+        report = bulk_ingest(
+            svc,
+            file_path,
+            state_path,
+            reject_path=reject_path,
+            restart=restart,
+            progress=progress,
+            batch_size=batch_size,
+            embed_workers=embed_workers,
+            barrier_every=barrier_every,
+            vectors_path=vectors_path,
+            embedding_model_id=embedding_model_id,
+        )
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    summary = report.to_dict()
+    if report.skipped:
+        print(f"Resumed from checkpoint: skipped {report.skipped} rows loaded by an earlier run.")
+    print(
+        f"Loaded {summary['upserted']} ads in {summary['seconds']}s ({summary['ads_per_second']} ads/s),"
+        f" {summary['barriers']} barriers."
+    )
+    for name, stage in summary["stages"].items():
+        print(
+            f"  {name:<9} {stage['items']:>9} items  {stage['per_second']:>9} /s busy"
+            f"  blocked {stage['blocked_seconds']}s"
+        )
+    if report.rejected:
+        print(f"Rejected {report.rejected} invalid rows; see {reject_path}", file=sys.stderr)
+
+
+def sync_ads(
+    svc: IndexService,
+    file_path: Path,
+    reject_path: Path | None = None,
+    batch_size: int | None = None,
+    keep_missing: bool = False,
+    dry_run: bool = False,
+) -> None:
+    """Apply only the differences between a catalog file and the collection; prints the diff summary."""
+    from .config.runtime import get_settings
+    from .ops.sync import sync_catalog
+
+    if not file_path.exists():
+        print(f"Error: ads file not found: {file_path}", file=sys.stderr)
+        sys.exit(1)
+    reject_path = reject_path or file_path.with_name(file_path.name + ".rejects.ndjson")
+    print(f"Syncing the collection with {file_path}{' (dry run)' if dry_run else ''}...")
+    try:
+        report = sync_catalog(
+            svc,
+            file_path,
+            batch_size=batch_size or get_settings().max_batch_size,
+            reject_path=reject_path,
+            delete_missing=not keep_missing,
+            dry_run=dry_run,
+        )
+    except (OSError, ValueError) as e:
+        print(f"Error: cannot read {file_path}: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"{report.read} ads read in {report.seconds:.1f}s:")
+    print(f"  unchanged   {report.unchanged:>9}")
+    print(f"  added       {report.added:>9}")
+    print(f"  re-embedded {report.reembedded:>9}")
+    print(f"  updated     {report.updated:>9}  (payload only, vector kept)")
+    print(f"  deleted     {report.deleted:>9}")
+    if report.deletes_skipped:
+        print("Deletions skipped: some rows could not be parsed, so missing ads may be in the file.", file=sys.stderr)
+    if report.rejected:
+        print(f"Rejected {report.rejected} invalid rows; see {reject_path}", file=sys.stderr)
+
+
+def export_catalog(svc: IndexService, directory: Path, page_size: int = 1000) -> None:
+    """Write the collection to a memory-mappable snapshot directory."""
+    from .ops.snapshot import export_snapshot
+
+    print(f"Exporting the collection to {directory}...")
+    manifest = export_snapshot(svc, directory, page_size=page_size)
+    print(
+        f"Exported {manifest['count']} ads ({manifest['dimension']} dimensions, "
+        f"{manifest['ads_meta']['embedding_model_id']}) in {manifest['export_seconds']}s."
+    )
+
+
+def import_catalog(svc: IndexService, directory: Path, batch_size: int = 1000) -> None:
+    """Bulk-load a snapshot directory into the collection without embedding."""
+    from .ops.snapshot import import_snapshot
+
+    print(f"Importing snapshot {directory}...")
+    try:
+        summary = import_snapshot(svc, directory, batch_size=batch_size)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Imported {summary['upserted']} ads in {summary['seconds']}s ({summary['ads_per_second']} ads/s).")
+
+
+def show_profiles(profile_dir: Path, show: Path | None = None) -> None:
+    """Print flight-recorder dumps and sampling profiles written by the Data Plane."""
+    from .mcp.flight_recorder import FLIGHT_FILE_PREFIX, list_dumps
+
+    if show is not None:
+        print(show.read_text(encoding="utf-8"), end="")
+        return
+    dumps = list_dumps(profile_dir)
+    if not dumps:
+        print(f"No flight-recorder dumps or profiles in {profile_dir}.")
+        return
+    print(f"Files in {profile_dir} (newest first):")
+    for p in dumps:
+        print(f"  {p.name}  ({p.stat().st_size} bytes)")
+    latest_flight = next((p for p in dumps if p.name.startswith(FLIGHT_FILE_PREFIX)), None)
+    if latest_flight is None:
+        return
+    data = json.loads(latest_flight.read_text(encoding="utf-8"))
+    print(f"\nSlowest requests in {latest_flight.name}:")
+    for entry in data.get("slowest", []):
+        timings = ", ".join(f"{k}={v}" for k, v in (entry.get("timings_ms") or {}).items())
+        print(f"  {entry.get('latency_ms')} ms  {entry.get('tool')}  {entry.get('request_id', entry.get('match_id'))}")
+        if timings:
+            print(f"      {timings}")
+
+
+def replay_log(
+    log_path: Path,
+    speed: float = 0.0,
+    concurrency: int = 1,
+    limit: int | None = None,
+    output: Path | None = None,
+) -> None:
+    """Replay a Data Plane query log against the configuration in the current environment."""
+    from .ops.replay import load_records, replay
+    from .wiring import build_match_service
+
+    records = load_records(log_path, limit)
+    if not records:
+        print(f"Error: no query-log records found at {log_path}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Replaying {len(records)} requests from {log_path} (speed={speed}, concurrency={concurrency})...")
+    result = replay(build_match_service(), records, speed=speed, concurrency=concurrency)
+    print(f"Completed: {result['completed']}  errors: {result['errors']}  in {result['duration_seconds']}s")
+    for label in ("recorded", "replayed"):
+        lat = result["latency_ms"][label]
+        print(f"  {label:<9} latency ms: p50={lat['p50']} p95={lat['p95']} p99={lat['p99']} max={lat['max']}")
+    print(f"Recall@k: {result['recall_at_k']}  exact-match rate: {result['exact_match_rate']}")
+    if output is not None:
+        output.write_text(json.dumps(result, indent=2), encoding="utf-8")
 
 
 def main():
@@ -63,15 +260,131 @@ def main():
     subparsers.add_parser("info", help="Show collection information")
 
     # Seed command
-    seed_parser = subparsers.add_parser("seed", help="Load demo ads from a JSON file and add to the collection")
+    seed_parser = subparsers.add_parser(
+        "seed", help="Stream ads from an NDJSON / JSON file (optionally gzipped) into the collection"
+    )
     seed_parser.add_argument(
         "--file",
         type=Path,
         default=None,
-        help=f"Path to JSON file with ads (default: {_DEFAULT_ADS_PATH})",
+        help=f"NDJSON (.ndjson[.gz]) or JSON-array file with ads (default: {_DEFAULT_ADS_PATH})",
+    )
+    seed_parser.add_argument(
+        "--rejects",
+        type=Path,
+        default=None,
+        help="Where invalid rows are written (default: <file>.rejects.ndjson)",
+    )
+    seed_parser.add_argument(
+        "--batch-size", type=int, default=None, help="Ads per embed/upsert batch (default: MAX_BATCH_SIZE)"
+    )
+    seed_parser.add_argument(
+        "--vectors",
+        type=Path,
+        default=None,
+        help="Companion .npy file with precomputed float32 vectors, one row per record (NaN row = embed locally)",
+    )
+    seed_parser.add_argument(
+        "--embedding-model-id",
+        default=None,
+        help="Model that produced the precomputed vectors; must match the collection's",
+    )
+
+    # Bulk-load command (staged, checkpointed, resumable)
+    bulk_parser = subparsers.add_parser(
+        "bulk-load", help="Resumable, checkpointed load of a large NDJSON catalog (optionally gzipped)"
+    )
+    bulk_parser.add_argument("--file", type=Path, required=True, help="NDJSON (.ndjson[.gz]) file with ads")
+    bulk_parser.add_argument(
+        "--state", type=Path, default=None, help="Checkpoint file (default: <file>.checkpoint.json)"
+    )
+    bulk_parser.add_argument(
+        "--rejects", type=Path, default=None, help="Where invalid rows are written (default: <file>.rejects.ndjson)"
+    )
+    bulk_parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    bulk_parser.add_argument(
+        "--batch-size", type=int, default=None, help="Ads per embed/upsert batch (default: MAX_BATCH_SIZE)"
+    )
+    bulk_parser.add_argument("--embed-workers", type=int, default=2, help="Embedding threads (default: 2)")
+    bulk_parser.add_argument(
+        "--barrier-every",
+        type=int,
+        default=8,
+        help="Batches between blocking upserts / checkpoints (default: 8)",
+    )
+    bulk_parser.add_argument(
+        "--vectors",
+        type=Path,
+        default=None,
+        help="Companion .npy file with precomputed float32 vectors, one row per record (NaN row = embed locally)",
+    )
+    bulk_parser.add_argument(
+        "--embedding-model-id",
+        default=None,
+        help="Model that produced the precomputed vectors; must match the collection's",
+    )
+
+    # Sync command (delta against the live collection)
+    sync_parser = subparsers.add_parser(
+        "sync", help="Apply only the ads that changed in a regenerated catalog file (and delete the missing ones)"
+    )
+    sync_parser.add_argument("--file", type=Path, required=True, help="NDJSON / JSON file with the full catalog")
+    sync_parser.add_argument(
+        "--rejects", type=Path, default=None, help="Where invalid rows are written (default: <file>.rejects.ndjson)"
+    )
+    sync_parser.add_argument(
+        "--batch-size", type=int, default=None, help="Ads per upsert / update / delete (default: MAX_BATCH_SIZE)"
+    )
+    sync_parser.add_argument("--keep-missing", action="store_true", help="Do not delete ads missing from the file")
+    sync_parser.add_argument("--dry-run", action="store_true", help="Only print the diff summary")
+
+    # Snapshot export / import (stored vectors, no embedding)
+    export_parser = subparsers.add_parser(
+        "export", help="Write the collection to a memory-mappable snapshot (vectors + payload columns + manifest)"
+    )
+    export_parser.add_argument("--dir", type=Path, required=True, help="Snapshot directory")
+    export_parser.add_argument("--page-size", type=int, default=1000, help="Ads per scroll page (default: 1000)")
+    import_parser = subparsers.add_parser(
+        "import", help="Bulk-load a snapshot written by 'export' using its stored vectors"
+    )
+    import_parser.add_argument("--dir", type=Path, required=True, help="Snapshot directory")
+    import_parser.add_argument("--batch-size", type=int, default=1000, help="Ads per upsert (default: 1000)")
+
+    # Profile command (reads Data Plane flight-recorder dumps; no Qdrant access)
+    profile_parser = subparsers.add_parser(
+        "profile", help="Show slow-request dumps and sampling profiles written by the Data Plane"
+    )
+    profile_parser.add_argument(
+        "--dir",
+        type=Path,
+        default=None,
+        help="Profile directory (default: PROFILE_DIR setting)",
+    )
+    profile_parser.add_argument("--show", type=Path, default=None, help="Print one dump/profile file")
+
+    # Replay command (query log -> MatchService built from the current env config)
+    replay_parser = subparsers.add_parser(
+        "replay", help="Replay a Data Plane query log and compare latency/recall with the recording"
+    )
+    replay_parser.add_argument("--log", type=Path, required=True, help="Query log path (QUERY_LOG_PATH)")
+    replay_parser.add_argument(
+        "--speed",
+        type=float,
+        default=0.0,
+        help="Pacing: 1 = original arrival times, N = N times faster, 0 = as fast as possible (default)",
     )
+    replay_parser.add_argument("--concurrency", type=int, default=1, help="Concurrent replay workers")
+    replay_parser.add_argument("--limit", type=int, default=None, help="Replay only the most recent N requests")
+    replay_parser.add_argument("--output", type=Path, default=None, help="Write the report as JSON")
 
     args = parser.parse_args()
+    if args.command == "profile":
+        from .config.runtime import get_settings
+        show_profiles(args.dir or get_settings().profile_dir, args.show)
+        return
+    if args.command == "replay":
+        replay_log(args.log, args.speed, args.concurrency, args.limit, args.output)
+        return
     svc = build_index_service()
 
     if args.command == "create":
@@ -90,7 +403,26 @@ def main():
         print(f"Points count: {info['points_count']}")
         print(f"Indexed vectors count: {info['indexed_vectors_count']}")
     elif args.command == "seed":
-        seed_ads(args.file)
+        seed_ads(svc, args.file, args.rejects, args.batch_size, args.vectors, args.embedding_model_id)
+    elif args.command == "sync":
+        sync_ads(svc, args.file, args.rejects, args.batch_size, args.keep_missing, args.dry_run)
+    elif args.command == "bulk-load":
+        bulk_load_ads(
+            svc,
+            args.file,
+            args.state,
+            args.rejects,
+            args.restart,
+            args.batch_size,
+            args.embed_workers,
+            args.barrier_every,
+            args.vectors,
+            args.embedding_model_id,
+        )
+    elif args.command == "export":
+        export_catalog(svc, args.dir, args.page_size)
+    elif args.command == "import":
+        import_catalog(svc, args.dir, args.batch_size)
     else:
         parser.print_help()
 
@@ -9,6 +9,7 @@ from __future__ import annotations
 import uuid
 from enum import Enum
 from functools import lru_cache
+from pathlib import Path
 from typing import Literal
 
 from pydantic import Field, field_validator
@@ -35,6 +36,18 @@ class RuntimeSettings(BaseSettings):
     qdrant_host: str = Field(default="localhost", description="Qdrant server host")
     qdrant_port: int = Field(default=6333, description="Qdrant server port")
     qdrant_collection_name: str = Field(default="ads", description="Qdrant collection name")
+    qdrant_location: str | None = Field(
+        default=None,
+        description="Qdrant local mode: ':memory:' or a directory path (overrides host/port)",
+    )
+    vector_store_backend: Literal["qdrant", "memory"] = Field(
+        default="qdrant",
+        description="Vector store adapter: 'qdrant' or 'memory' (in-process NumPy store)",
+    )
+    snapshot_path: Path | None = Field(
+        default=None,
+        description="Catalog snapshot directory the memory backend serves memory-mapped at startup (ad-index export)",
+    )
 
     # --- Embeddings ---
     embedding_model_id: str = Field(
@@ -56,8 +69,152 @@ class RuntimeSettings(BaseSettings):
     # --- Limits ---
     max_top_k: int = Field(default=100, ge=1, le=1000, description="Maximum top_k for match queries")
     max_batch_size: int = Field(default=500, ge=1, le=10000, description="Maximum ads per upsert batch")
+    max_ids_per_call: int = Field(
+        default=10_000, ge=1, le=100_000, description="Maximum ad_ids per ads_get_many / ads_delete_many call"
+    )
     request_timeout_seconds: float = Field(default=30.0, gt=0, description="Per-request timeout")
 
+    # --- Data Plane admission control ---
+    admission_max_concurrent: int = Field(
+        default=8, ge=1, le=40, description="Match requests executed at once per process (<= worker thread pool)"
+    )
+    admission_max_queue: int = Field(default=64, ge=0, description="Match requests allowed to wait for a slot")
+
+    # --- Data Plane degraded mode ---
+    degraded_mode_enabled: bool = Field(
+        default=True, description="Serve fallback results when embedding / the vector store fail or time out"
+    )
+    embed_budget_ms: float = Field(default=0.0, ge=0, description="Embed stage time budget (0 = request deadline only)")
+    query_budget_ms: float = Field(
+        default=0.0, ge=0, description="Vector query time budget (0 = request deadline only)"
+    )
+    circuit_breaker_failures: int = Field(
+        default=5, ge=1, description="Consecutive vector-store failures that open the circuit breaker"
+    )
+    circuit_breaker_reset_seconds: float = Field(
+        default=10.0, gt=0, description="Open-breaker cool-down before a probe query is attempted"
+    )
+    fallback_cache_size: int = Field(default=10_000, ge=1, description="Last-known-good results kept per canonical request")
+    fallback_per_topic: int = Field(default=50, ge=1, description="Ads kept in each per-topic fallback list")
+
+    # --- Materialized top-ads lists ---
+    top_ads_enabled: bool = Field(
+        default=False, description="Precompute ranked ad lists per (topic, locale) and (vertical, locale)"
+    )
+    top_ads_per_list: int = Field(default=100, ge=1, description="Ads kept in each materialized list")
+    top_ads_max_context_chars: int = Field(
+        default=32, ge=0, description="Contexts shorter than this are answered from the lists (0 = only as fallback)"
+    )
+    top_ads_check_interval_seconds: float = Field(
+        default=30.0, gt=0, description="How often the catalog version is checked for a list rebuild"
+    )
+
+    # --- Control Plane upload sessions ---
+    upload_max_sessions: int = Field(default=16, ge=1, description="Upload sessions open at once")
+    upload_max_pending_chunks: int = Field(
+        default=4, ge=1, description="Chunks per session waiting to be upserted before appends are refused"
+    )
+    upload_session_ttl_seconds: float = Field(
+        default=3600.0, gt=0, description="Idle time after which an upload session is forgotten"
+    )
+
+    # --- Control Plane background jobs ---
+    jobs_max_workers: int = Field(default=2, ge=1, le=64, description="Background jobs executed at once")
+    jobs_max_queued: int = Field(
+        default=32, ge=0, description="Jobs allowed to wait for a worker; beyond that submit fails"
+    )
+    jobs_max_records: int = Field(default=200, ge=1, description="Finished job records kept (memory and disk)")
+    jobs_dir: Path = Field(
+        default=Path(".ad_injector/jobs"), description="Directory for durable job records (one JSON file per job)"
+    )
+
+    # --- Collection migrations (collection_migrate) ---
+    migration_state_path: Path = Field(
+        default=Path(".ad_injector/migration.json"), description="Checkpoint of the running collection migration"
+    )
+    migration_page_size: int = Field(default=1000, ge=1, description="Ads per scroll page / upsert while re-indexing")
+    migration_workers: int = Field(default=2, ge=1, le=64, description="Threads transforming / re-embedding pages")
+    migration_max_ads_per_second: float = Field(
+        default=0.0, ge=0, description="Copy throttle so a migration does not starve live traffic (0 = unthrottled)"
+    )
+    migration_sample_size: int = Field(default=50, ge=0, description="Ads sampled for the recall check before cutover")
+    migration_min_recall: float = Field(
+        default=0.9, ge=0, le=1, description="Minimum sample top-10 recall of the new collection for the alias switch"
+    )
+
+    # --- Catalog version / change feed ---
+    catalog_change_log_size: int = Field(
+        default=10_000, ge=1, description="Changed ad_ids kept in the catalog change log (ads_meta)"
+    )
+    catalog_watch_enabled: bool = Field(
+        default=True, description="Data Plane polls the catalog version and invalidates changed ads in its caches"
+    )
+    catalog_poll_interval_seconds: float = Field(
+        default=2.0, gt=0, description="How often the Data Plane reads the catalog version"
+    )
+
+    # --- Data Plane serving ---
+    mcp_transport: Literal["stdio", "streamable-http", "sse"] = Field(
+        default="stdio", description="Data Plane transport"
+    )
+    mcp_host: str = Field(default="127.0.0.1", description="HTTP bind address")
+    mcp_port: int = Field(default=8000, ge=1, le=65535, description="HTTP port")
+    mcp_workers: int = Field(default=1, ge=1, le=256, description="Pre-forked HTTP worker processes")
+    mcp_shutdown_timeout_seconds: float = Field(
+        default=10.0, ge=0, description="Grace period for in-flight requests on SIGTERM"
+    )
+    rest_api_enabled: bool = Field(
+        default=True, description="Serve POST /v1/match (plain JSON ads_match) next to the MCP endpoint"
+    )
+    rest_max_batch: int = Field(default=100, ge=1, le=10000, description="Maximum match requests per REST batch body")
+
+    # --- Data Plane caches (0 disables) ---
+    embedding_cache_size: int = Field(default=0, ge=0, description="Max cached context embeddings")
+    result_cache_size: int = Field(default=0, ge=0, description="Max cached retrieval results (canonical requests)")
+    result_cache_ttl_seconds: float = Field(default=30.0, ge=0, description="Result cache TTL (0 = no TTL)")
+    creative_fragment_cache_size: int = Field(
+        default=50_000, ge=1, description="Pre-serialized ad creative fragments kept for ads_match output"
+    )
+    cache_warm_log_path: Path | None = Field(
+        default=None,
+        description="Query log (NDJSON) replayed at Data Plane startup to pre-warm the caches",
+    )
+    cache_warm_max_requests: int = Field(default=1000, ge=0, description="Most recent log requests used for warm-up")
+
+    # --- ads_explain trace store ---
+    trace_store_backend: Literal["memory", "sqlite"] = Field(
+        default="memory",
+        description="memory = per-process; sqlite = WAL database shared by all workers on the node",
+    )
+    trace_store_path: Path = Field(
+        default=Path(".ad_injector/traces.db"), description="SQLite trace store file (trace_store_backend=sqlite)"
+    )
+    trace_store_max_bytes: int = Field(
+        default=64 * 1024 * 1024, ge=0, description="Byte budget for stored ads_match audit traces"
+    )
+    trace_store_ttl_seconds: float = Field(default=3600.0, ge=0, description="Trace TTL (0 = no TTL)")
+    trace_sample_rate: float = Field(
+        default=1.0, ge=0, le=1, description="Fraction of ads_match calls whose decisions are captured for explain"
+    )
+
+    # --- Query log (sampled ads_match capture for replay) ---
+    query_log_path: Path | None = Field(default=None, description="NDJSON query log path (unset = disabled)")
+    query_log_sample_rate: float = Field(default=0.01, ge=0, le=1, description="Fraction of ads_match calls logged")
+    query_log_max_bytes: int = Field(default=64 * 1024 * 1024, ge=0, description="Rotate the log at this size")
+    query_log_backups: int = Field(default=5, ge=0, description="Rotated query-log files kept")
+
+    # --- Diagnostics (Data Plane flight recorder / sampling profiler) ---
+    flight_recorder_enabled: bool = Field(default=False, description="Keep the slowest recent requests in memory")
+    flight_recorder_size: int = Field(default=50, ge=1, le=10000, description="Number of slow requests kept")
+    flight_recorder_window_seconds: float = Field(
+        default=300.0, gt=0, description="Requests older than this drop out of the slow-request buffer"
+    )
+    profile_dir: Path = Field(
+        default=Path(".ad_injector/profiles"),
+        description="Directory for flight-recorder dumps and sampling profiles",
+    )
+    profile_sample_interval_ms: float = Field(default=5.0, gt=0, description="Sampling profiler interval")
+
     @field_validator("qdrant_port")
     @classmethod
     def _port_range(cls, v: int) -> int:
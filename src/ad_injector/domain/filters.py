@@ -44,3 +44,31 @@ class VectorFilter(BaseModel):
     @property
     def is_empty(self) -> bool:
         return not self.must and not self.must_not
+
+    def matches(self, payload: dict) -> bool:
+        """Evaluate the filter against a stored payload in Python.
+
+        Mirrors the Qdrant translation: every ``must`` condition matches and no
+        ``must_not`` condition matches.  Used by in-process stores.
+        """
+        for f in self.must:
+            if not _condition_matches(f, payload):
+                return False
+        for f in self.must_not:
+            if _condition_matches(f, payload):
+                return False
+        return True
+
+
+def _condition_matches(f: FieldFilter, payload: dict) -> bool:
+    """True if the payload field matches the condition (array fields match any element).
+
+    ``not_equals``/``not_in`` carry the positive match; the negation comes from
+    placing them in ``must_not``, exactly as in the Qdrant adapter.
+    """
+    stored = payload.get(f.field)
+    stored_values = stored if isinstance(stored, list) else [stored]
+    if f.op in (FilterOp.equals, FilterOp.not_equals):
+        return f.value in stored_values
+    values = f.value if isinstance(f.value, list) else [f.value]
+    return any(v in values for v in stored_values)
@@ -13,12 +13,40 @@ from ..ports.vector_store import VectorHit
 
 _WHITESPACE_RE = re.compile(r"\s+")
 
+# Verdict bits (0 = allowed); reason() reports the first set bit in this order
+DENY_AGE_RESTRICTED = 1
+DENY_SENSITIVE = 2
+DENY_BLOCKED_KEYWORDS = 4
+
+_REASONS = (
+    (DENY_AGE_RESTRICTED, "denied: age_restricted"),
+    (DENY_SENSITIVE, "denied: sensitive"),
+    (DENY_BLOCKED_KEYWORDS, "denied: blocked_keywords"),
+)
+
 
 def _tokenize_context(text: str) -> set[str]:
     """Deterministic tokenization: split on whitespace, lowercase."""
     return {t.lower() for t in _WHITESPACE_RE.split(text.strip()) if t}
 
 
+def _token_haystack(text: str) -> str:
+    """Context tokens joined by NUL: ``kw in haystack`` <=> kw is a substring of some token.
+
+    Tokens never contain whitespace or NUL, so a keyword can only match inside
+    one token; exact token matches are a special case of substring matches.
+    """
+    return "\0".join(_tokenize_context(text))
+
+
+def reason_for_verdict(verdict: int) -> str:
+    """Audit reason string for a verdict bitmask."""
+    for bit, reason in _REASONS:
+        if verdict & bit:
+            return reason
+    return "allowed"
+
+
 class PolicyEngine:
     """Filter vector hits by policy rules.
 
@@ -36,11 +64,34 @@ class PolicyEngine:
         context_text: str = "",
     ) -> list[VectorHit]:
         """Return only hits that pass all policy checks."""
-        eligible: list[VectorHit] = []
+        verdicts = self.verdicts(hits, constraints, placement, context_text=context_text)
+        return [hit for hit, verdict in zip(hits, verdicts) if not verdict]
+
+    def verdicts(
+        self,
+        hits: list[VectorHit],
+        constraints: MatchConstraints,
+        placement: PlacementContext,
+        context_text: str = "",
+    ) -> list[int]:
+        """Verdict bitmask per hit (0 = allowed); the context is tokenized once."""
+        haystack: str | None = None
+        out: list[int] = []
         for hit in hits:
-            if self._allowed(hit, constraints, context_text):
-                eligible.append(hit)
-        return eligible
+            meta = hit.payload
+            verdict = 0
+            if meta.get("age_restricted", False) and not constraints.age_restricted_ok:
+                verdict |= DENY_AGE_RESTRICTED
+            if meta.get("sensitive", False) and not constraints.sensitive_ok:
+                verdict |= DENY_SENSITIVE
+            blocked = meta.get("blocked_keywords")
+            if blocked:
+                if haystack is None:
+                    haystack = _token_haystack(context_text)
+                if self._blocked_in(blocked, haystack):
+                    verdict |= DENY_BLOCKED_KEYWORDS
+            out.append(verdict)
+        return out
 
     def reason(
         self,
@@ -50,40 +101,15 @@ class PolicyEngine:
         context_text: str = "",
     ) -> str:
         """Return audit reason for this hit: 'allowed' or 'denied: <reason>'."""
-        meta = hit.payload
-        if meta.get("age_restricted", False) and not constraints.age_restricted_ok:
-            return "denied: age_restricted"
-        if meta.get("sensitive", False) and not constraints.sensitive_ok:
-            return "denied: sensitive"
-        if self._blocked_keywords_intersect(hit, context_text):
-            return "denied: blocked_keywords"
-        return "allowed"
-
-    def _allowed(
-        self,
-        hit: VectorHit,
-        constraints: MatchConstraints,
-        context_text: str,
-    ) -> bool:
-        meta = hit.payload
-        if meta.get("age_restricted", False) and not constraints.age_restricted_ok:
-            return False
-        if meta.get("sensitive", False) and not constraints.sensitive_ok:
-            return False
-        if self._blocked_keywords_intersect(hit, context_text):
-            return False
-        return True
+        return reason_for_verdict(self.verdicts([hit], constraints, placement, context_text=context_text)[0])
 
     def _blocked_keywords_intersect(self, hit: VectorHit, context_text: str) -> bool:
         """True if ad.blocked_keywords intersects context_text tokens (substring or exact)."""
         blocked = hit.payload.get("blocked_keywords") or []
-        if not blocked:
+        return bool(blocked) and self._blocked_in(blocked, _token_haystack(context_text))
+
+    @staticmethod
+    def _blocked_in(blocked: list[str], haystack: str) -> bool:
+        if not haystack:
             return False
-        tokens = _tokenize_context(context_text)
-        for kw in blocked:
-            kw_lower = kw.lower()
-            if kw_lower in tokens:
-                return True
-            if any(kw_lower in t for t in tokens):
-                return True
-        return False
+        return any(kw.lower() in haystack for kw in blocked)
@@ -8,6 +8,8 @@ Usage:
     python -m ad_injector.main_runtime
     # or via the script entrypoint:
     ad-data-plane
+    # HTTP with 4 pre-forked workers:
+    MCP_TRANSPORT=streamable-http MCP_PORT=8000 MCP_WORKERS=4 ad-data-plane
 """
 
 from __future__ import annotations
@@ -15,9 +17,35 @@ from __future__ import annotations
 from .mcp.server import create_server
 
 
+def _warm_caches() -> None:
+    """Pre-warm the Data Plane caches from a query log when CACHE_WARM_LOG_PATH is set."""
+    from .config.runtime import get_settings
+
+    settings = get_settings()
+    if settings.cache_warm_log_path is None:
+        return
+    if not (settings.embedding_cache_size or settings.result_cache_size):
+        return
+    from .mcp.observability import get_logger
+    from .mcp.tools import _get_match_service
+    from .ops.replay import warm_caches
+
+    try:
+        warmed = warm_caches(_get_match_service(), settings.cache_warm_log_path, settings.cache_warm_max_requests)
+        get_logger().info("cache_warm_done", extra={"requests": warmed})
+    except Exception as e:
+        get_logger().error("cache_warm_failed", extra={"error": str(e)})
+
+
 def main() -> None:
+    from .config.runtime import get_settings
     from .mcp.auth import check_scope
     check_scope("data")
+    if get_settings().mcp_transport != "stdio":
+        from .mcp.serving import serve_http
+        serve_http("data")  # preloads the model and warms caches before forking workers
+        return
+    _warm_caches()
     server = create_server(mode="data")
     server.run(transport="stdio")
 
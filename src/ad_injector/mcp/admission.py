@@ -0,0 +1,185 @@
+"""Admission control for the Data Plane match path.
+
+``AdmissionController.admit`` bounds how many ads_match / REST match calls
+run at once (``admission_max_concurrent``) and how many may wait for a slot
+(``admission_max_queue``).  Every request carries a deadline: the caller's
+budget (``timeout_ms``) capped by ``request_timeout_seconds``.
+
+A request is shed (``Overloaded``) instead of queued when
+
+* the wait queue is full (``queue_full``),
+* the expected wait -- its queue position times the moving average service
+  time, divided by the slot count -- already exceeds its budget
+  (``deadline``), or
+* it is still waiting when its deadline passes (``timeout``).
+
+Slots are handed directly from a finishing request to the oldest waiter, so
+queued requests are served FIFO.  In-flight count, queue depth, wait time and
+shed counts are exported as ``ad_admission_*`` metrics.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, AsyncIterator
+
+import anyio
+
+from .observability import REGISTRY
+
+ADMISSION_IN_FLIGHT = REGISTRY.gauge("ad_admission_in_flight", "Match requests currently admitted")
+ADMISSION_QUEUE_DEPTH = REGISTRY.gauge("ad_admission_queue_depth", "Match requests waiting for a slot")
+ADMISSION_WAIT_SECONDS = REGISTRY.histogram(
+    "ad_admission_wait_seconds", "Time admitted match requests waited for a slot"
+)
+ADMISSION_SHED = REGISTRY.counter(
+    "ad_admission_shed_total", "Match requests rejected by admission control", ("reason",)
+)
+
+# Weight of the newest sample in the service-time moving average
+_EWMA_ALPHA = 0.1
+
+
+class Overloaded(Exception):
+    """Request rejected by admission control."""
+
+    def __init__(self, reason: str, retry_after_seconds: float) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after_seconds = retry_after_seconds
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "error": "overloaded",
+            "reason": self.reason,
+            "retry_after_ms": int(math.ceil(self.retry_after_seconds * 1000)),
+        }
+
+
+class AdmissionController:
+    """Concurrency limit with a bounded FIFO wait queue and per-request deadlines."""
+
+    def __init__(self, max_concurrent: int = 8, max_queue: int = 64, default_timeout_seconds: float = 30.0) -> None:
+        self._max_concurrent = max_concurrent
+        self._max_queue = max_queue
+        self._default_timeout = default_timeout_seconds
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiters: deque[anyio.Event] = deque()
+        self._service_seconds = 0.0  # moving average; 0 until the first request completes
+        self._counts = {"admitted": 0, "queue_full": 0, "deadline": 0, "timeout": 0}
+
+    def budget(self, timeout_ms: float | None = None) -> float:
+        """Seconds a request may take: the caller's budget capped by the default timeout."""
+        if timeout_ms is None or timeout_ms <= 0:
+            return self._default_timeout
+        return min(timeout_ms / 1000.0, self._default_timeout)
+
+    def _expected_wait(self, position: int) -> float:
+        return math.ceil(position / self._max_concurrent) * self._service_seconds
+
+    def _shed(self, reason: str, retry_after: float) -> Overloaded:
+        self._counts[reason] += 1
+        ADMISSION_SHED.inc(reason=reason)
+        return Overloaded(reason, max(retry_after, self._service_seconds))
+
+    @asynccontextmanager
+    async def admit(self, timeout_ms: float | None = None) -> AsyncIterator[float]:
+        """Hold a slot for the body; yields the request's absolute deadline (``time.monotonic``)."""
+        t0 = time.monotonic()
+        budget = self.budget(timeout_ms)
+        deadline = t0 + budget
+        event: anyio.Event | None = None
+        with self._lock:
+            if self._in_flight < self._max_concurrent and not self._waiters:
+                self._in_flight += 1
+                ADMISSION_IN_FLIGHT.set(self._in_flight)
+            else:
+                position = len(self._waiters) + 1
+                if position > self._max_queue:
+                    raise self._shed("queue_full", self._expected_wait(position))
+                expected = self._expected_wait(position)
+                if expected > budget:
+                    raise self._shed("deadline", expected)
+                event = anyio.Event()
+                self._waiters.append(event)
+                ADMISSION_QUEUE_DEPTH.set(len(self._waiters))
+
+        if event is not None:
+            try:
+                with anyio.move_on_after(max(0.0, deadline - time.monotonic())):
+                    await event.wait()
+            except BaseException:
+                # Cancelled while queued: give back the slot if it was already handed over
+                if not self._abandon(event):
+                    self._release(None)
+                raise
+            if not event.is_set() and self._abandon(event):
+                with self._lock:
+                    raise self._shed("timeout", self._expected_wait(len(self._waiters) + 1))
+
+        started = time.monotonic()
+        ADMISSION_WAIT_SECONDS.observe(started - t0)
+        with self._lock:
+            self._counts["admitted"] += 1
+        try:
+            yield deadline
+        finally:
+            self._release(time.monotonic() - started)
+
+    def _abandon(self, event: anyio.Event) -> bool:
+        """Drop a waiter from the queue; False if it was granted a slot meanwhile."""
+        with self._lock:
+            try:
+                self._waiters.remove(event)
+            except ValueError:
+                return False
+            ADMISSION_QUEUE_DEPTH.set(len(self._waiters))
+            return True
+
+    def _release(self, service_seconds: float | None) -> None:
+        with self._lock:
+            if service_seconds is not None:
+                if self._service_seconds:
+                    self._service_seconds += _EWMA_ALPHA * (service_seconds - self._service_seconds)
+                else:
+                    self._service_seconds = service_seconds
+            if self._waiters:
+                # Hand the slot over: in-flight count is unchanged
+                event = self._waiters.popleft()
+                ADMISSION_QUEUE_DEPTH.set(len(self._waiters))
+            else:
+                event = None
+                self._in_flight -= 1
+                ADMISSION_IN_FLIGHT.set(self._in_flight)
+        if event is not None:
+            event.set()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "max_concurrent": self._max_concurrent,
+                "max_queue": self._max_queue,
+                "in_flight": self._in_flight,
+                "queued": len(self._waiters),
+                "service_ms_avg": round(self._service_seconds * 1000, 3),
+                **self._counts,
+            }
+
+
+@lru_cache(maxsize=1)
+def get_admission_controller() -> AdmissionController:
+    """Process-wide controller sized from settings."""
+    from ..config.runtime import get_settings
+
+    settings = get_settings()
+    return AdmissionController(
+        max_concurrent=settings.admission_max_concurrent,
+        max_queue=settings.admission_max_queue,
+        default_timeout_seconds=settings.request_timeout_seconds,
+    )
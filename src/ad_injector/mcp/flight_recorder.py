@@ -0,0 +1,329 @@
+"""Flight recorder: keep the N slowest recent data-plane requests; on-demand sampling profiler.
+
+Opt-in via ``FLIGHT_RECORDER_ENABLED``.  The recorder is cheap on the hot path:
+``should_record(latency_ms)`` is a single comparison under a lock, and the
+entry dict is only built for requests that make it into the buffer.
+
+The profiler samples the stacks of threads that are executing a profiled
+request (``sys._current_frames``) every ``sample_interval`` seconds and writes
+the aggregate in folded-stack format (one ``frame;frame;frame count`` line per
+stack, consumable by flamegraph.pl / speedscope) to ``profile_dir``.
+
+The recorder is driven from the Control Plane (``ads_flight_recorder``), never
+from the LLM-facing Data Plane.  The Control Plane writes a request file
+(``write_request``) into ``profile_dir``.  Each Data Plane recorder checks it
+at most once per ``request_poll_seconds`` at the start of a request, and
+acts on each new request once: it dumps, or arms the profiler.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from .observability import get_logger
+
+FLIGHT_FILE_PREFIX = "flight-"
+PROFILE_FILE_PREFIX = "profile-"
+REQUEST_FILE = "recorder-request.json"
+REQUEST_ACTIONS = ("dump", "profile")
+
+
+class SamplingProfiler:
+    """Background thread that samples the stacks of registered target threads."""
+
+    def __init__(self, sample_interval: float = 0.005, max_depth: int = 64) -> None:
+        self._interval = sample_interval
+        self._max_depth = max_depth
+        self._lock = threading.Lock()
+        self._targets: set[int] = set()
+        self._stacks: Counter[str] = Counter()
+        self._samples = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ad-sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def add_target(self, thread_id: int) -> None:
+        with self._lock:
+            self._targets.add(thread_id)
+
+    def remove_target(self, thread_id: int) -> None:
+        with self._lock:
+            self._targets.discard(thread_id)
+
+    @property
+    def samples(self) -> int:
+        return self._samples
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            with self._lock:
+                targets = set(self._targets)
+            if not targets:
+                continue
+            frames = sys._current_frames()
+            for tid in targets:
+                frame = frames.get(tid)
+                if frame is None:
+                    continue
+                stack: list[str] = []
+                while frame is not None and len(stack) < self._max_depth:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                key = ";".join(reversed(stack))
+                with self._lock:
+                    self._stacks[key] += 1
+                    self._samples += 1
+
+    def folded(self) -> str:
+        with self._lock:
+            items = self._stacks.most_common()
+        return "".join(f"{stack} {count}\n" for stack, count in items)
+
+
+class FlightRecorder:
+    """Ring buffer of the slowest recent requests plus a one-shot profiler trigger."""
+
+    def __init__(
+        self,
+        capacity: int = 50,
+        window_seconds: float = 300.0,
+        profile_dir: Path | str = ".ad_injector/profiles",
+        sample_interval: float = 0.005,
+        request_poll_seconds: float = 1.0,
+    ) -> None:
+        self._capacity = capacity
+        self._window = window_seconds
+        self._profile_dir = Path(profile_dir)
+        self._sample_interval = sample_interval
+        self._lock = threading.Lock()
+        # min-heap of (latency_ms, seq, recorded_at, entry): heap[0] is the fastest kept request
+        self._heap: list[tuple[float, int, float, dict[str, Any]]] = []
+        self._seq = itertools.count()
+        # Profiler state: remaining requests to start profiling, requests in flight
+        self._profile_remaining = 0
+        self._profile_active = 0
+        self._profile_requests = 0
+        self._profiler: SamplingProfiler | None = None
+        self._last_profile: str | None = None
+        # Control Plane requests: requests written before this recorder started are stale
+        self._request_poll = request_poll_seconds
+        self._next_poll = 0.0
+        self._started_at = time.time()
+        self._handled_request: str | None = None
+
+    # ------------------------------------------------------------------
+    # Slow-request ring buffer
+    # ------------------------------------------------------------------
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self._window
+        if any(item[2] < cutoff for item in self._heap):
+            self._heap = [item for item in self._heap if item[2] >= cutoff]
+            heapq.heapify(self._heap)
+
+    def should_record(self, latency_ms: float) -> bool:
+        """Cheap pre-check so callers only build entries that will be kept."""
+        with self._lock:
+            if len(self._heap) < self._capacity:
+                return True
+            fastest = self._heap[0]
+            return latency_ms > fastest[0] or fastest[2] < time.time() - self._window
+
+    def record(self, latency_ms: float, build_entry: Callable[[], dict[str, Any]]) -> None:
+        """Keep this request if it is among the N slowest of the recent window."""
+        if not self.should_record(latency_ms):
+            return
+        entry = build_entry()
+        entry["latency_ms"] = round(latency_ms, 3)
+        now = time.time()
+        entry.setdefault("recorded_at", now)
+        with self._lock:
+            self._expire(now)
+            item = (latency_ms, next(self._seq), now, entry)
+            if len(self._heap) < self._capacity:
+                heapq.heappush(self._heap, item)
+            elif latency_ms > self._heap[0][0]:
+                heapq.heapreplace(self._heap, item)
+
+    def slowest(self) -> list[dict[str, Any]]:
+        """Return kept entries, slowest first."""
+        with self._lock:
+            self._expire(time.time())
+            items = sorted(self._heap, key=lambda i: i[0], reverse=True)
+        return [item[3] for item in items]
+
+    # ------------------------------------------------------------------
+    # Sampling profiler
+    # ------------------------------------------------------------------
+
+    def arm_profiler(self, requests: int) -> dict[str, Any]:
+        """Profile the next ``requests`` requests; the result is written to profile_dir."""
+        if requests < 1:
+            raise ValueError("requests must be >= 1")
+        with self._lock:
+            if self._profiler is not None:
+                return {"armed": False, "reason": "profile already in progress", **self._profile_status()}
+            self._profile_remaining = requests
+            self._profile_requests = requests
+            self._profiler = SamplingProfiler(self._sample_interval)
+            self._profiler.start()
+            return {"armed": True, **self._profile_status()}
+
+    def _profile_status(self) -> dict[str, Any]:
+        return {
+            "profile_pending": self._profile_remaining,
+            "profile_active": self._profile_active,
+            "last_profile": self._last_profile,
+        }
+
+    def poll_requests(self) -> dict[str, Any] | None:
+        """Act on a new Control Plane request in ``profile_dir`` (rate-limited); returns it when handled."""
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next_poll:
+                return None
+            self._next_poll = now + self._request_poll
+        try:
+            request = json.loads((self._profile_dir / REQUEST_FILE).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if request.get("id") == self._handled_request or request.get("requested_at", 0) < self._started_at:
+            return None
+        self._handled_request = request.get("id")
+        try:
+            if request.get("action") == "dump":
+                self.dump()
+            elif request.get("action") == "profile":
+                self.arm_profiler(int(request.get("requests", 10)))
+        except (OSError, ValueError) as e:
+            get_logger().warning("recorder_request_failed", extra={"error": str(e)})
+        return request
+
+    @contextmanager
+    def profile_request(self) -> Iterator[bool]:
+        """Wrap one request; samples its thread if the profiler is armed. Yields whether profiled."""
+        self.poll_requests()
+        with self._lock:
+            profiler = self._profiler if self._profile_remaining > 0 else None
+            if profiler is not None:
+                self._profile_remaining -= 1
+                self._profile_active += 1
+        if profiler is None:
+            yield False
+            return
+        tid = threading.get_ident()
+        profiler.add_target(tid)
+        try:
+            yield True
+        finally:
+            profiler.remove_target(tid)
+            with self._lock:
+                self._profile_active -= 1
+                done = self._profile_remaining == 0 and self._profile_active == 0
+                if done:
+                    self._profiler = None
+            if done:
+                profiler.stop()
+                self._write_profile(profiler)
+
+    def _write_profile(self, profiler: SamplingProfiler) -> None:
+        stamp = time.strftime("%Y%m%dT%H%M%S")
+        try:
+            self._profile_dir.mkdir(parents=True, exist_ok=True)
+            path = self._profile_dir / f"{PROFILE_FILE_PREFIX}{stamp}-{os.getpid()}.folded"
+            path.write_text(profiler.folded(), encoding="utf-8")
+            self.dump()
+        except OSError as e:
+            get_logger().warning("profile_write_failed", extra={"error": str(e)})
+            return
+        with self._lock:
+            self._last_profile = str(path)
+        get_logger().info(
+            "profile_written",
+            extra={"path": str(path), "samples": profiler.samples, "requests": self._profile_requests},
+        )
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+
+    def status(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "capacity": self._capacity,
+                "window_seconds": self._window,
+                "kept": len(self._heap),
+                "profile_dir": str(self._profile_dir),
+                **self._profile_status(),
+            }
+
+    def dump(self) -> Path:
+        """Write the slow-request buffer to ``profile_dir/flight-<ts>-<pid>.json``."""
+        self._profile_dir.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%dT%H%M%S")
+        path = self._profile_dir / f"{FLIGHT_FILE_PREFIX}{stamp}-{os.getpid()}.json"
+        body = {"pid": os.getpid(), "dumped_at": time.time(), "slowest": self.slowest()}
+        path.write_text(json.dumps(body, indent=2), encoding="utf-8")
+        return path
+
+
+def write_request(profile_dir: Path | str, action: str, requests: int = 10) -> dict[str, Any]:
+    """Ask the Data Plane recorders polling ``profile_dir`` to ``dump`` or ``profile`` (Control Plane side)."""
+    if action not in REQUEST_ACTIONS:
+        raise ValueError(f"action must be one of {REQUEST_ACTIONS}")
+    if requests < 1:
+        raise ValueError("requests must be >= 1")
+    d = Path(profile_dir)
+    d.mkdir(parents=True, exist_ok=True)
+    request = {"id": os.urandom(8).hex(), "action": action, "requests": requests, "requested_at": time.time()}
+    tmp = d / (REQUEST_FILE + ".tmp")
+    tmp.write_text(json.dumps(request), encoding="utf-8")
+    os.replace(tmp, d / REQUEST_FILE)
+    return request
+
+
+def list_dumps(profile_dir: Path | str) -> list[Path]:
+    """Flight and profile files in ``profile_dir``, newest first (for the CLI)."""
+    d = Path(profile_dir)
+    if not d.is_dir():
+        return []
+    files = [p for p in d.iterdir() if p.name.startswith((FLIGHT_FILE_PREFIX, PROFILE_FILE_PREFIX))]
+    return sorted(files, key=lambda p: p.stat().st_mtime, reverse=True)
+
+
+@lru_cache(maxsize=1)
+def get_flight_recorder() -> FlightRecorder | None:
+    """Return the process-wide recorder, or None when FLIGHT_RECORDER_ENABLED is false."""
+    from ..config.runtime import get_settings
+
+    settings = get_settings()
+    if not settings.flight_recorder_enabled:
+        return None
+    return FlightRecorder(
+        capacity=settings.flight_recorder_size,
+        window_seconds=settings.flight_recorder_window_seconds,
+        profile_dir=settings.profile_dir,
+        sample_interval=settings.profile_sample_interval_ms / 1000.0,
+    )
@@ -1,21 +1,290 @@
-"""Observability: structured logs (trace_id, tool, latency_ms), optional metrics stub."""
+"""Observability: structured logs (trace_id, tool, latency_ms) and lock-safe metrics.
+
+Metrics live in a process-wide ``REGISTRY`` of counters, gauges and
+fixed-bucket histograms.  ``render_prometheus()`` produces the Prometheus
+text exposition format; ``metrics_snapshot()`` returns a JSON-friendly dict.
+"""
 
 from __future__ import annotations
 
+import bisect
 import logging
+import threading
 import time
-from typing import Any
+from contextlib import contextmanager
+from typing import Any, Iterator
 
 _LOGGER = logging.getLogger("ad_injector.mcp")
 
-# Optional metrics stub: tool_calls[name] = count, errors[name] = count
-METRICS: dict[str, dict[str, int]] = {"tool_calls": {}, "errors": {}}
+# Latency buckets in seconds: 0.5 ms .. 10 s (covers embedding on CPU and slow Qdrant)
+DEFAULT_LATENCY_BUCKETS: tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
 
 
 def get_logger() -> logging.Logger:
     return _LOGGER
 
 
+# ---------------------------------------------------------------------------
+# Metric primitives
+# ---------------------------------------------------------------------------
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape_label(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    if float(v).is_integer():
+        return str(int(v))
+    return repr(float(v))
+
+
+class _Metric:
+    """Base class: a named metric family with a fixed label schema."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        try:
+            return tuple(str(labels[n]) for n in self.labelnames)
+        except KeyError as e:
+            raise ValueError(f"{self.name}: missing label {e.args[0]!r}") from None
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        with self._lock:
+            items = list(self._values.items())
+        return [{"labels": dict(zip(self.labelnames, k)), "value": v} for k, v in items]
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = self._header()
+        for key, v in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}")
+        return lines
+
+
+class Gauge(Counter):
+    """Value that can go up and down (queue depth, in-flight requests)."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram; ``observe`` is a bisect plus three adds under a lock."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts (+Inf last), sum, count]
+        self._series: dict[tuple[str, ...], list[Any]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._series[key] = series
+            series[0][idx] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe the wall-clock duration of the ``with`` block (also on error)."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def _quantile(self, counts: list[int], total: int, q: float) -> float | None:
+        """Estimate a quantile by linear interpolation inside the matching bucket."""
+        if total == 0:
+            return None
+        rank = q * total
+        cumulative = 0
+        lower = 0.0
+        for i, c in enumerate(counts):
+            upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+            if c and cumulative + c >= rank:
+                return lower + (upper - lower) * ((rank - cumulative) / c)
+            cumulative += c
+            lower = upper
+        return self.buckets[-1]
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        with self._lock:
+            items = [(k, list(s[0]), s[1], s[2]) for k, s in self._series.items()]
+        out = []
+        for key, counts, total_sum, total in items:
+            out.append({
+                "labels": dict(zip(self.labelnames, key)),
+                "count": total,
+                "sum": total_sum,
+                "p50": self._quantile(counts, total, 0.50),
+                "p95": self._quantile(counts, total, 0.95),
+                "p99": self._quantile(counts, total, 0.99),
+            })
+        return out
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted((k, list(s[0]), s[1], s[2]) for k, s in self._series.items())
+        lines = self._header()
+        for key, counts, total_sum, total in items:
+            cumulative = 0
+            for bound, c in zip(self.buckets + (float("inf"),), counts):
+                cumulative += c
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+                )
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total_sum)}")
+            lines.append(f"{self.name}_count{labels} {total}")
+        return lines
+
+
+class MetricsRegistry:
+    """Process-wide set of metric families, keyed by name (get-or-create)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._metrics: dict[str, _Metric] = {}
+
+    def _get_or_create(self, cls: type, name: str, help: str, labelnames: tuple[str, ...], **kw: Any):
+        with self._lock:
+            existing = self._metrics.get(name)
+            if existing is not None:
+                if not isinstance(existing, cls) or existing.labelnames != tuple(labelnames):
+                    raise ValueError(f"Metric {name!r} already registered with a different schema")
+                return existing
+            metric = cls(name, help, tuple(labelnames), **kw)
+            self._metrics[name] = metric
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, help, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines: list[str] = []
+        for m in metrics:
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {m.name: {"type": m.kind, "series": m.snapshot()} for m in metrics}
+
+
+REGISTRY = MetricsRegistry()
+
+TOOL_CALLS = REGISTRY.counter("ad_tool_calls_total", "MCP tool invocations", ("tool",))
+TOOL_ERRORS = REGISTRY.counter("ad_tool_errors_total", "MCP tool invocations that failed", ("tool",))
+TOOL_LATENCY_SECONDS = REGISTRY.histogram(
+    "ad_tool_latency_seconds", "End-to-end MCP tool latency", ("tool",)
+)
+# Per-stage timings of MatchService.match plus tool-side shaping (see MatchService stages)
+MATCH_STAGE_SECONDS = REGISTRY.histogram(
+    "ad_match_stage_seconds",
+    "Per-stage latency of ads_match",
+    ("stage", "placement", "cache"),
+)
+MATCH_DEGRADED = REGISTRY.counter(
+    "ad_match_degraded_total",
+    "ads_match requests answered from degraded-mode fallback results",
+    ("reason", "source"),
+)
+CONTROL_OPERATION_SECONDS = REGISTRY.histogram(
+    "ad_control_operation_seconds",
+    "Latency of Control Plane operations",
+    ("operation",),
+)
+INDEX_STAGE_SECONDS = REGISTRY.histogram(
+    "ad_index_stage_seconds",
+    "Per-batch latency of IndexService ingestion stages",
+    ("stage",),
+)
+
+
+# ---------------------------------------------------------------------------
+# Tool logging
+# ---------------------------------------------------------------------------
+
+
 def log_tool_invocation(
     tool: str,
     trace_id: str | None,
@@ -23,7 +292,7 @@ def log_tool_invocation(
     error: str | None = None,
     extra: dict[str, Any] | None = None,
 ) -> None:
-    """Emit structured log and update metrics stub."""
+    """Emit structured log and update tool metrics."""
     payload: dict[str, Any] = {
         "tool": tool,
         "trace_id": trace_id,
@@ -34,12 +303,40 @@ def log_tool_invocation(
     if extra:
         payload.update(extra)
     _LOGGER.info("tool_invocation", extra=payload)
-    # Metrics stub
-    METRICS["tool_calls"][tool] = METRICS["tool_calls"].get(tool, 0) + 1
+    TOOL_CALLS.inc(tool=tool)
+    TOOL_LATENCY_SECONDS.observe(latency_ms / 1000.0, tool=tool)
     if error:
-        METRICS["errors"][tool] = METRICS["errors"].get(tool, 0) + 1
+        TOOL_ERRORS.inc(tool=tool)
+
+
+@contextmanager
+def observe_operation(operation: str) -> Iterator[None]:
+    """Time a Control Plane operation and log it like a tool invocation."""
+    t0 = time.perf_counter()
+    error: str | None = None
+    try:
+        yield
+    except Exception as e:
+        error = type(e).__name__
+        raise
+    finally:
+        elapsed = time.perf_counter() - t0
+        CONTROL_OPERATION_SECONDS.observe(elapsed, operation=operation)
+        log_tool_invocation(operation, None, elapsed * 1000, error=error)
+
 
+def render_prometheus() -> str:
+    """Return all metrics in the Prometheus text exposition format (v0.0.4)."""
+    return REGISTRY.render()
 
-def metrics_snapshot() -> dict[str, dict[str, int]]:
+
+def metrics_snapshot() -> dict[str, Any]:
     """Return current metrics (for optional /metrics endpoint or health)."""
-    return {k: dict(v) for k, v in METRICS.items()}
+    def _by_tool(counter: Counter) -> dict[str, int]:
+        return {s["labels"]["tool"]: int(s["value"]) for s in counter.snapshot()}
+
+    return {
+        "tool_calls": _by_tool(TOOL_CALLS),
+        "errors": _by_tool(TOOL_ERRORS),
+        "metrics": REGISTRY.snapshot(),
+    }
@@ -0,0 +1,172 @@
+"""Sampled, non-blocking ads_match request log (rotating NDJSON).
+
+Opt-in via ``QUERY_LOG_PATH``.  ``maybe_log`` is called on the request path:
+it draws the sample, builds the record only for sampled requests and hands it
+to a bounded queue with ``put_nowait`` (records are dropped, and counted, when
+the writer falls behind).  A daemon thread writes one JSON object per line and
+rotates ``path`` -> ``path.1`` -> ... -> ``path.N`` at ``max_bytes``.  Pre-forked
+HTTP workers each write their own file (``worker_log_path``), so no process
+rotates a file another one is still appending to; ``log_files`` collects them
+all for replay.
+
+Each line holds the canonical request (``services.caches.canonical_request``),
+per-stage timings, end-to-end latency, the cache outcome and the returned
+ad_ids, which is what ``ad-index replay`` needs to compare latency and recall.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import queue
+import random
+import re
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable
+
+from .observability import REGISTRY, get_logger
+
+QUERY_LOG_RECORDS = REGISTRY.counter(
+    "ad_query_log_records_total", "Query-log records by outcome", ("outcome",)
+)
+
+
+class QueryLogger:
+    """Background NDJSON writer with sampling, a bounded queue and size-based rotation."""
+
+    def __init__(
+        self,
+        path: Path | str,
+        sample_rate: float = 0.01,
+        max_bytes: int = 64 * 1024 * 1024,
+        backups: int = 5,
+        queue_size: int = 10_000,
+    ) -> None:
+        self._path = Path(path)
+        self._sample_rate = sample_rate
+        self._max_bytes = max_bytes
+        self._backups = backups
+        self._queue: queue.Queue[dict[str, Any] | None] = queue.Queue(maxsize=queue_size)
+        self._rand = random.random
+        self._thread = threading.Thread(target=self._run, name="ad-query-log", daemon=True)
+        self._thread.start()
+
+    def maybe_log(self, build_record: Callable[[], dict[str, Any]]) -> bool:
+        """Sample and enqueue a record; never blocks. Returns True if enqueued."""
+        if self._sample_rate < 1.0 and self._rand() >= self._sample_rate:
+            return False
+        try:
+            self._queue.put_nowait(build_record())
+        except queue.Full:
+            QUERY_LOG_RECORDS.inc(outcome="dropped")
+            return False
+        return True
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush queued records and stop the writer thread."""
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _rotate(self) -> None:
+        for i in range(self._backups - 1, 0, -1):
+            src = self._path.with_name(f"{self._path.name}.{i}")
+            if src.exists():
+                os.replace(src, self._path.with_name(f"{self._path.name}.{i + 1}"))
+        if self._backups > 0:
+            os.replace(self._path, self._path.with_name(f"{self._path.name}.1"))
+        else:
+            self._path.unlink()
+
+    def _run(self) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        f = open(self._path, "a", encoding="utf-8")
+        try:
+            while True:
+                record = self._queue.get()
+                if record is None:
+                    break
+                batch = [record]
+                # Drain what is already queued so bursts cost one write/flush
+                while len(batch) < 512:
+                    try:
+                        nxt = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if nxt is None:
+                        self._queue.put(None)
+                        break
+                    batch.append(nxt)
+                f.write("".join(json.dumps(r, separators=(",", ":")) + "\n" for r in batch))
+                f.flush()
+                QUERY_LOG_RECORDS.inc(len(batch), outcome="written")
+                if self._max_bytes and f.tell() >= self._max_bytes:
+                    f.close()
+                    self._rotate()
+                    f = open(self._path, "a", encoding="utf-8")
+        except Exception as e:
+            get_logger().error("query_log_writer_failed", extra={"error": str(e)})
+        finally:
+            f.close()
+
+
+def iter_log_records(paths: list[Path]) -> Any:
+    """Yield records from NDJSON query logs (oldest rotated file first), skipping bad lines."""
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+def worker_log_path(path: Path | str, worker_id: int) -> Path:
+    """Per-worker log file: ``queries.ndjson`` -> ``queries.w3.ndjson``."""
+    path = Path(path)
+    return path.with_name(f"{path.stem}.w{worker_id}{path.suffix}")
+
+
+def log_files(path: Path | str) -> list[list[Path]]:
+    """Rotated files (oldest first) of ``path`` and of each of its per-worker logs, one list per writer."""
+    path = Path(path)
+    worker_name = re.compile(rf"{re.escape(path.stem)}\.w\d+{re.escape(path.suffix)}")
+    workers = sorted(p for p in path.parent.glob(f"{path.stem}.w*") if worker_name.fullmatch(p.name))
+    return [files for files in map(rotated_log_files, [path, *workers]) if files]
+
+
+def rotated_log_files(path: Path | str) -> list[Path]:
+    """``path`` plus its rotated backups, oldest first."""
+    path = Path(path)
+    backups = sorted(
+        (p for p in path.parent.glob(f"{path.name}.*") if p.suffix[1:].isdigit()),
+        key=lambda p: int(p.suffix[1:]),
+        reverse=True,
+    )
+    return backups + ([path] if path.exists() else [])
+
+
+@lru_cache(maxsize=1)
+def get_query_logger() -> QueryLogger | None:
+    """Return the process-wide query logger, or None when QUERY_LOG_PATH is unset."""
+    from ..config.runtime import get_settings
+
+    from .serving import worker_status
+
+    settings = get_settings()
+    if settings.query_log_path is None:
+        return None
+    path = settings.query_log_path
+    worker = worker_status()
+    if worker is not None and settings.mcp_workers > 1:
+        path = worker_log_path(path, worker["worker_id"])
+    return QueryLogger(
+        path,
+        sample_rate=settings.query_log_sample_rate,
+        max_bytes=settings.query_log_max_bytes,
+        backups=settings.query_log_backups,
+    )
@@ -0,0 +1,132 @@
+"""Plain HTTP JSON fast path for ads_match, served next to the MCP Data Plane.
+
+``POST /v1/match`` takes the ads_match arguments as a JSON object and returns
+the same allowlisted response the tool returns, without JSON-RPC / tool-call
+envelopes.  A batch body ``{"requests": [{...}, ...]}`` returns
+``{"responses": [...]}`` in order, one entry per request; a failing entry
+becomes ``{"error": ...}``.  Only registered in HTTP serving mode.
+
+A body may carry ``timeout_ms`` (top level for batches).  Each body passes
+admission control as one unit; a shed body gets 503 with ``Retry-After`` and
+the ``{"error": "overloaded", ...}`` object ads_match returns.
+
+Matching, request shaping, the response allowlist/serializer and the trace
+store are shared with the MCP tool (``tools.build_match_request`` /
+``tools._run_match``), so match_ids returned here resolve via ads_explain.
+Keep-alive and HTTP/1.1 pipelining are handled by the uvicorn worker.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import time
+from typing import Any
+
+import anyio
+from pydantic import ValidationError
+
+from .admission import Overloaded, get_admission_controller
+from .observability import log_tool_invocation
+from .tools import _run_match, build_match_request
+
+REST_MATCH_PATH = "/v1/match"
+MATCH_FIELDS = frozenset({
+    "context_text", "top_k", "placement", "surface", "topics", "locale", "verticals",
+    "exclude_advertiser_ids", "exclude_ad_ids", "age_restricted_ok", "sensitive_ok",
+})
+_JSON = "application/json"
+
+
+class RestRequestError(ValueError):
+    """Client error in a REST match body (mapped to HTTP 400)."""
+
+
+def parse_match_item(item: Any) -> Any:
+    """Validate one match object and shape it into a ``MatchRequest``."""
+    if not isinstance(item, dict):
+        raise RestRequestError("match request must be a JSON object")
+    unknown = set(item) - MATCH_FIELDS
+    if unknown:
+        raise RestRequestError(f"unknown fields: {sorted(unknown)}")
+    if not isinstance(item.get("context_text"), str):
+        raise RestRequestError("context_text (string) is required")
+    if not isinstance(item.get("top_k", 5), int):
+        raise RestRequestError("top_k must be an integer")
+    try:
+        return build_match_request(**item)
+    except ValidationError as e:
+        raise RestRequestError(e.errors(include_url=False, include_context=False, include_input=False)) from e
+
+
+def _error(message: Any) -> str:
+    return json.dumps({"error": message})
+
+
+def _timeout_ms(data: dict[str, Any]) -> float | None:
+    value = data.pop("timeout_ms", None)
+    if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+        raise RestRequestError("timeout_ms must be a number")
+    return value
+
+
+def _run_batch(items: list[Any], t0: float, deadline: float) -> str:
+    outs = []
+    for item in items:
+        try:
+            outs.append(_run_match(parse_match_item(item), t0, "rest_match", deadline))
+        except RestRequestError as e:
+            outs.append(_error(e.args[0]))
+        except Overloaded as e:
+            outs.append(json.dumps(e.to_dict()))
+        except Exception as e:
+            outs.append(_error(type(e).__name__))
+    return '{"responses":[' + ",".join(outs) + "]}"
+
+
+def add_rest_routes(server: Any, max_batch: int = 100, max_body_bytes: int = 4 * 1024 * 1024) -> None:
+    """Register ``POST /v1/match`` on a FastMCP server (HTTP mode)."""
+    from starlette.responses import Response
+
+    @server.custom_route(REST_MATCH_PATH, methods=["POST"])
+    async def rest_match(request):
+        t0 = time.monotonic()
+        body = await request.body()
+        if len(body) > max_body_bytes:
+            return Response(_error("request body too large"), status_code=413, media_type=_JSON)
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return Response(_error("invalid JSON"), status_code=400, media_type=_JSON)
+
+        batch = isinstance(data, dict) and "requests" in data
+        try:
+            timeout_ms = _timeout_ms(data) if isinstance(data, dict) else None
+            if batch:
+                if set(data) != {"requests"}:
+                    raise RestRequestError(f"unknown fields: {sorted(set(data) - {'requests'})}")
+                items = data["requests"]
+                if not isinstance(items, list) or not items:
+                    raise RestRequestError("requests must be a non-empty list")
+                if len(items) > max_batch:
+                    return Response(_error(f"batch larger than {max_batch}"), status_code=413, media_type=_JSON)
+            else:
+                match_request = parse_match_item(data)
+        except RestRequestError as e:
+            return Response(_error(e.args[0]), status_code=400, media_type=_JSON)
+
+        try:
+            async with get_admission_controller().admit(timeout_ms) as deadline:
+                if batch:
+                    out = await anyio.to_thread.run_sync(_run_batch, items, t0, deadline)
+                else:
+                    out = await anyio.to_thread.run_sync(_run_match, match_request, t0, "rest_match", deadline)
+        except Overloaded as e:
+            log_tool_invocation("rest_match", None, (time.monotonic() - t0) * 1000, error="overloaded")
+            return Response(
+                json.dumps(e.to_dict()),
+                status_code=503,
+                media_type=_JSON,
+                headers={"Retry-After": str(max(1, math.ceil(e.retry_after_seconds)))},
+            )
+        return Response(out, media_type=_JSON)
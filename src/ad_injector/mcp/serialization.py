@@ -0,0 +1,99 @@
+"""Fast JSON output for the Data Plane.
+
+``dumps`` uses orjson when installed (``pip install ad-injector[fast-json]``)
+and falls back to ``json`` with compact separators; output is never indented.
+
+``ResponseSerializer.render_match`` writes the allowlisted ads_match response
+straight from the candidates in one pass.  The static creative part of each
+candidate (ad_id, advertiser_id, title, body, cta_text, landing_url) is
+serialized once and cached per (ad_id, catalog version); a cached fragment is
+reused only if its source fields still equal the candidate's, so a stale
+version never leaks an outdated creative.  On a catalog change
+(``invalidate``) the fragments of the changed ads are dropped; a
+collection-wide change moves ``catalog_version`` to the new version.
+Per-request fields (score, match_id) are appended per call.
+"""
+
+from __future__ import annotations
+
+import json
+from functools import lru_cache
+from typing import Any
+
+from ..services.caches import LruCache
+
+try:  # optional dependency
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is absent
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+if orjson is not None:
+
+    def dumps(obj: Any) -> str:
+        """Compact JSON text."""
+        return orjson.dumps(obj).decode()
+
+else:
+    _encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+    def dumps(obj: Any) -> str:
+        """Compact JSON text."""
+        return _encoder.encode(obj)
+
+
+_CREATIVE_FIELDS = ("ad_id", "advertiser_id", "title", "body", "cta_text", "landing_url")
+
+
+class ResponseSerializer:
+    """Allowlisted ads_match JSON with cached per-ad creative fragments."""
+
+    def __init__(self, fragment_cache_size: int = 50_000) -> None:
+        self._fragments: LruCache[tuple[str, str], tuple[tuple[str, ...], str]] = LruCache(fragment_cache_size)
+        self.catalog_version = ""
+
+    def _fragment(self, c: Any) -> str:
+        source = (c.ad_id, c.advertiser_id, c.title, c.body, c.cta_text, c.landing_url)
+        key = (c.ad_id, self.catalog_version)
+        cached = self._fragments.get(key)
+        if cached is not None and cached[0] == source:
+            return cached[1]
+        # '{"ad_id":...,"landing_url":"..."}' without the closing brace
+        fragment = dumps(dict(zip(_CREATIVE_FIELDS, source)))[:-1]
+        self._fragments.put(key, (source, fragment))
+        return fragment
+
+    def render_match(self, response: Any) -> str:
+        """Serialize ``MatchResponse`` (or any object with the same attributes)."""
+        parts = [
+            f'{self._fragment(c)},"score":{float(c.score)!r},"match_id":{dumps(c.match_id)}}}'
+            for c in response.candidates
+        ]
+        return (
+            f'{{"candidates":[{",".join(parts)}],'
+            f'"request_id":{dumps(response.request_id)},"placement":{dumps(response.placement)}}}'
+        )
+
+    def clear(self) -> None:
+        self._fragments.clear()
+
+    def invalidate(self, ad_ids: frozenset[str] | None, version: int) -> None:
+        """Catalog change: drop the fragments of ``ad_ids`` (None = all, new catalog_version)."""
+        if ad_ids is None:
+            self.catalog_version = str(version)
+            self._fragments.clear()
+            return
+        for ad_id in ad_ids:
+            self._fragments.pop((ad_id, self.catalog_version))
+
+    def stats(self) -> dict[str, Any]:
+        return {"json_backend": JSON_BACKEND, "catalog_version": self.catalog_version, **self._fragments.stats()}
+
+
+@lru_cache(maxsize=1)
+def get_serializer() -> ResponseSerializer:
+    """Process-wide serializer sized from settings."""
+    from ..config.runtime import get_settings
+
+    return ResponseSerializer(get_settings().creative_fragment_cache_size)
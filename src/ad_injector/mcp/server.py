@@ -16,12 +16,16 @@ _SERVER_NAMES = {
 }
 
 
-def create_server(mode: str = "data") -> FastMCP:
+def create_server(mode: str = "data", http: bool = False) -> FastMCP:
     """Build and return a configured FastMCP server.
 
     Args:
         mode: ``"data"`` for the Data Plane (LLM-facing, read-only)
               or ``"admin"`` for the Control Plane.
+        http: Configure for HTTP serving: stateless sessions and JSON
+              responses (any worker may answer any request) plus the
+              /healthz and /metrics routes, and for the Data Plane the
+              REST ``POST /v1/match`` route (``rest_api_enabled``).
 
     Returns:
         A FastMCP instance with the appropriate tools registered.
@@ -29,10 +33,22 @@ def create_server(mode: str = "data") -> FastMCP:
     if mode not in _SERVER_NAMES:
         raise ValueError(f"Unknown MCP mode {mode!r}; expected 'data' or 'admin'")
 
-    server = FastMCP(_SERVER_NAMES[mode])
+    if http:
+        server = FastMCP(_SERVER_NAMES[mode], stateless_http=True, json_response=True)
+        from .serving import add_http_routes
+        add_http_routes(server)
+    else:
+        server = FastMCP(_SERVER_NAMES[mode])
 
     if mode == "data":
         register_data_plane_tools(server)
+        if http:
+            from ..config.runtime import get_settings
+            from .rest import add_rest_routes
+
+            settings = get_settings()
+            if settings.rest_api_enabled:
+                add_rest_routes(server, max_batch=settings.rest_max_batch)
     else:
         register_control_plane_tools(server)
 
@@ -0,0 +1,213 @@
+"""HTTP serving for the Data Plane: streamable-HTTP / SSE with pre-forked workers.
+
+``serve_http`` builds the match service and loads the embedding model in the
+parent process, binds the listening socket, then forks ``mcp_workers``
+children that all accept on the shared socket.  Model weights and the
+warmed caches are shared copy-on-write.  Network clients are not: the warm-up
+used the parent's vector-store connection pool, so each child reconnects
+(``reset_after_fork``) before serving.  Anything that starts threads (query
+log writer, SQLite trace writer, flight recorder) is created lazily, so only
+inside the workers.  With several workers each one writes its own query log
+(``QUERY_LOG_PATH`` with ``.w<worker_id>`` before the suffix) and rotates only
+that file; ``ad-index replay`` merges them by timestamp.
+
+Each worker runs uvicorn on FastMCP's app in stateless mode, since any worker
+may receive any request.  The parent forwards SIGTERM/SIGINT to the workers,
+waits up to ``mcp_shutdown_timeout_seconds`` for them to drain, then kills
+stragglers.  Workers that die unexpectedly are restarted.
+
+Per-worker readiness (``worker_status``) is reported by ``ads_health`` and by
+the ``GET /healthz`` probe route (503 until started and while draining).
+``GET /metrics`` serves the answering worker's Prometheus metrics.
+"""
+
+from __future__ import annotations
+
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Any
+
+from ..config.runtime import RuntimeSettings, get_settings
+from .observability import get_logger, render_prometheus
+
+# Set in each worker process; None when not serving over HTTP
+_WORKER: dict[str, Any] | None = None
+
+
+def worker_status() -> dict[str, Any] | None:
+    """This process's worker state (id, pid, ready, draining, uptime), or None for stdio."""
+    if _WORKER is None:
+        return None
+    return {**_WORKER, "uptime_seconds": round(time.time() - _WORKER["started_at"], 3)}
+
+
+def _set_worker(**fields: Any) -> None:
+    if _WORKER is not None:
+        _WORKER.update(fields)
+
+
+def add_http_routes(server: Any) -> None:
+    """Register the /healthz and /metrics routes on a FastMCP server."""
+    from starlette.responses import JSONResponse, PlainTextResponse
+
+    @server.custom_route("/healthz", methods=["GET"])
+    async def healthz(request):
+        status = worker_status() or {"ready": True, "draining": False}
+        ok = status["ready"] and not status["draining"]
+        return JSONResponse({"ok": ok, "worker": status}, status_code=200 if ok else 503)
+
+    @server.custom_route("/metrics", methods=["GET"])
+    async def metrics(request):
+        return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """Listening socket shared by all workers (inherited across fork).
+
+    Created with an explicit ``IPPROTO_TCP`` so asyncio enables TCP_NODELAY on
+    accepted connections; otherwise Nagle + delayed ACK add ~40 ms to every
+    request after the first on a keep-alive connection.
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def preload(settings: RuntimeSettings) -> None:
+    """Build the match service, load the model and warm the caches before fork so workers share them.
+
+    No threads are started here (a lock held by one at fork time would stay
+    held in every child).
+    """
+    from ..main_runtime import _warm_caches
+    from .tools import _get_match_service
+
+    t0 = time.perf_counter()
+    service = _get_match_service()
+    # Reads only: the watcher / refresh threads start with each worker's first request
+    with service.background_deferred():
+        service.warm_up()
+        _warm_caches()
+    get_logger().info("preload_done", extra={"seconds": round(time.perf_counter() - t0, 3)})
+
+
+def reset_after_fork() -> None:
+    """Drop the network clients a forked worker inherited from the parent.
+
+    The parent's keep-alive sockets would otherwise be shared by every worker,
+    which could then interleave requests and read each other's responses.
+    """
+    from .tools import _get_index_service, _get_match_service
+
+    _get_match_service().reconnect()
+    _get_index_service.cache_clear()
+
+
+def _run_worker(worker_id: int, sock: socket.socket, mode: str, settings: RuntimeSettings) -> None:
+    """Worker body: serve the MCP app on the inherited socket until told to stop."""
+    import uvicorn
+
+    from .server import create_server
+
+    global _WORKER
+    _WORKER = {"worker_id": worker_id, "pid": os.getpid(), "ready": False, "draining": False, "started_at": time.time()}
+
+    server = create_server(mode, http=True)
+    app = server.sse_app() if settings.mcp_transport == "sse" else server.streamable_http_app()
+
+    class _Server(uvicorn.Server):
+        async def startup(self, sockets=None) -> None:
+            await super().startup(sockets=sockets)
+            _set_worker(ready=True)
+
+        def handle_exit(self, sig: int, frame: Any) -> None:
+            _set_worker(ready=False, draining=True)
+            super().handle_exit(sig, frame)
+
+    config = uvicorn.Config(
+        app,
+        log_level="warning",
+        timeout_graceful_shutdown=int(settings.mcp_shutdown_timeout_seconds),
+        lifespan="on",
+    )
+    _Server(config).run(sockets=[sock])
+
+
+def serve_http(mode: str = "data", settings: RuntimeSettings | None = None) -> None:
+    """Serve ``mode`` over HTTP with ``settings.mcp_workers`` pre-forked workers."""
+    settings = settings or get_settings()
+    log = get_logger()
+    preload(settings)
+    sock = bind_socket(settings.mcp_host, settings.mcp_port)
+    log.info(
+        "http_listen",
+        extra={"host": settings.mcp_host, "port": settings.mcp_port,
+               "workers": settings.mcp_workers, "transport": settings.mcp_transport},
+    )
+    if settings.mcp_workers <= 1:
+        _run_worker(0, sock, mode, settings)
+        return
+
+    children: dict[int, int] = {}  # pid -> worker_id
+    stopping = False
+
+    def spawn(worker_id: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                reset_after_fork()
+                _run_worker(worker_id, sock, mode, settings)
+            except BaseException:
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = worker_id
+
+    def stop(signum: int, frame: Any) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    for worker_id in range(settings.mcp_workers):
+        spawn(worker_id)
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    deadline: float | None = None
+    while children:
+        if stopping and deadline is None:
+            deadline = time.monotonic() + settings.mcp_shutdown_timeout_seconds + 5
+        if deadline is not None and time.monotonic() > deadline:
+            for pid in list(children):
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid == 0:
+            time.sleep(0.2)
+            continue
+        worker_id = children.pop(pid, None)
+        if worker_id is not None and not stopping:
+            log.error("worker_exited", extra={"worker_id": worker_id, "pid": pid, "status": status})
+            time.sleep(1.0)  # avoid a tight crash loop
+            spawn(worker_id)
+    sock.close()
+    sys.exit(0)
@@ -8,13 +8,29 @@ from __future__ import annotations
 
 import json
 import time
+from contextlib import nullcontext
+from functools import lru_cache
 from typing import Any
 
-from .observability import log_tool_invocation
+import anyio
+
+from .admission import Overloaded, get_admission_controller
+from .flight_recorder import get_flight_recorder
+from .observability import (
+    MATCH_DEGRADED,
+    MATCH_STAGE_SECONDS,
+    log_tool_invocation,
+    observe_operation,
+    render_prometheus,
+)
+from .query_log import get_query_logger
+from .serialization import get_serializer
+from .trace_store import get_trace_store
 
 from ..config.runtime import get_settings
 from ..models import Ad
 from ..models.mcp_requests import MatchConstraints, MatchRequest, PlacementContext
+from ..services.match_trace import MatchTrace
 
 # ---------------------------------------------------------------------------
 # Response allowlists (field-level)
@@ -25,7 +41,7 @@ ALLOWED_MATCH_CANDIDATE_KEYS = frozenset({
 ALLOWED_MATCH_RESPONSE_KEYS = frozenset({"candidates", "request_id", "placement"})
 ALLOWED_COLLECTION_INFO_KEYS = frozenset({
     "name", "points_count", "indexed_vectors_count", "status",
-    "dimension", "embedding_model_id", "schema_version",
+    "dimension", "embedding_model_id", "schema_version", "catalog_version",
 })
 ALLOWED_COLLECTION_ENSURE_KEYS = frozenset({"name", "created", "dimension", "embedding_model_id", "schema_version"})
 ALLOWED_ADS_GET_KEYS = frozenset({
@@ -33,22 +49,6 @@ ALLOWED_ADS_GET_KEYS = frozenset({
     "topics", "locale", "verticals", "blocked_keywords", "sensitive", "age_restricted", "enabled",
 })
 
-# In-memory trace store for ads.explain (match_id -> audit_trace), optional TTL
-_trace_store: dict[str, dict[str, Any]] = {}
-_TRACE_STORE_MAX = 10_000
-
-
-def _shape_match_response(response: Any) -> dict:
-    """Return only allowed fields for ads.match response."""
-    d = response.model_dump() if hasattr(response, "model_dump") else response
-    out: dict = {k: d[k] for k in ALLOWED_MATCH_RESPONSE_KEYS if k in d}
-    if "candidates" in out:
-        out["candidates"] = [
-            {k: c.get(k) for k in ALLOWED_MATCH_CANDIDATE_KEYS if k in c}
-            for c in out["candidates"]
-        ]
-    return out
-
 
 def _shape_collection_info(d: dict) -> dict:
     return {k: d[k] for k in ALLOWED_COLLECTION_INFO_KEYS if k in d}
@@ -64,40 +64,232 @@ def _shape_ads_get(payload: dict | None) -> dict | None:
     return {k: payload[k] for k in ALLOWED_ADS_GET_KEYS if k in payload}
 
 
-def _store_trace_for_explain(response: Any, audit_trace: dict[str, Any]) -> None:
-    """Store audit trace keyed by each match_id for ads.explain."""
-    global _trace_store
-    candidates = getattr(response, "candidates", []) or []
-    for c in candidates:
-        match_id = getattr(c, "match_id", None) or (c.get("match_id") if isinstance(c, dict) else None)
-        if match_id:
-            _trace_store[match_id] = audit_trace
-    while len(_trace_store) > _TRACE_STORE_MAX:
-        # Drop oldest (arbitrary)
-        _trace_store.pop(next(iter(_trace_store)))
-
-
+def _parse_ad_ids(ad_ids_json: str, max_ids: int) -> tuple[list[str] | None, dict | None]:
+    """``(ad_ids, None)`` from a JSON array of strings (duplicates dropped), or ``(None, error)``."""
+    try:
+        ad_ids = json.loads(ad_ids_json)
+    except json.JSONDecodeError as e:
+        return None, {"error": "ad_ids_json must be a JSON array of strings", "detail": str(e)}
+    if not isinstance(ad_ids, list) or not all(isinstance(ad_id, str) for ad_id in ad_ids):
+        return None, {"error": "ad_ids_json must be a JSON array of strings"}
+    ad_ids = list(dict.fromkeys(ad_ids))
+    if len(ad_ids) > max_ids:
+        return None, {"error": "too many ad_ids", "received": len(ad_ids), "max_ids_per_call": max_ids}
+    return ad_ids, None
+
+
+def render_match(response: Any, trace: MatchTrace) -> str:
+    """Tail of ads_match: store the explain trace and serialize the allowlisted response.
+
+    Shared with the benchmarks so they measure exactly what the tool does.
+    """
+    get_trace_store().put(trace)
+    return get_serializer().render_match(response)
+
+
+def _flight_entry(
+    request: MatchRequest,
+    response: Any,
+    trace: MatchTrace,
+    out: str,
+    shape_seconds: float,
+    tool: str = "ads_match",
+) -> dict[str, Any]:
+    """Flight-recorder entry for one ads_match call (built only for slow requests)."""
+    c = request.constraints
+    timings = dict(trace.timings_ms)
+    timings["shape"] = round(shape_seconds * 1000, 3)
+    return {
+        "tool": tool,
+        "request_id": response.request_id,
+        "placement": request.placement.placement,
+        "surface": request.placement.surface,
+        "top_k": request.top_k,
+        "timings_ms": timings,
+        "filter_shape": {
+            "topics": len(c.topics or ()),
+            "locale": bool(c.locale),
+            "verticals": len(c.verticals or ()),
+            "exclude_advertiser_ids": len(c.exclude_advertiser_ids or ()),
+            "exclude_ad_ids": len(c.exclude_ad_ids or ()),
+            "age_restricted_ok": c.age_restricted_ok,
+            "sensitive_ok": c.sensitive_ok,
+        },
+        "hits": {
+            "retrieved": trace.retrieved,
+            "eligible": len(response.candidates),
+        },
+        "sizes": {"context_chars": len(request.context_text), "response_bytes": len(out)},
+    }
+
+
+@lru_cache(maxsize=1)
+def _get_vector_store():
+    """Process-wide vector store shared by the match and index services (one client, or the one memory store)."""
+    from ..wiring import build_vector_store
+    return build_vector_store()
+
+
+@lru_cache(maxsize=1)
 def _get_match_service():
+    """Process-wide MatchService (built once so embedding/result caches persist)."""
     from ..wiring import build_match_service
-    return build_match_service()
+    return build_match_service(vector_store=_get_vector_store())
+
+
+def _query_log_record(request: MatchRequest, response: Any, trace: MatchTrace, latency_ms: float) -> dict:
+    """Query-log line for one ads_match call (built only for sampled requests)."""
+    from ..services.caches import canonical_request
+
+    return {
+        "ts": round(time.time(), 3),
+        "request": canonical_request(request),
+        "timings_ms": trace.timings_ms,
+        "latency_ms": round(latency_ms, 3),
+        "cache": trace.cache,
+        "hits": trace.retrieved,
+        "ad_ids": [c.ad_id for c in response.candidates],
+    }
+
+
+def build_match_request(
+    context_text: str,
+    top_k: int = 5,
+    placement: str = "inline",
+    surface: str = "chat",
+    topics: list[str] | None = None,
+    locale: str | None = None,
+    verticals: list[str] | None = None,
+    exclude_advertiser_ids: list[str] | None = None,
+    exclude_ad_ids: list[str] | None = None,
+    age_restricted_ok: bool = False,
+    sensitive_ok: bool = False,
+) -> MatchRequest:
+    """Request shaping shared by ads_match and the REST endpoint (truncate / clamp, then validate)."""
+    return MatchRequest(
+        context_text=context_text[:10_000],
+        top_k=max(1, min(100, top_k)),
+        placement=PlacementContext(placement=placement, surface=surface),
+        constraints=MatchConstraints(
+            topics=topics,
+            locale=locale,
+            verticals=verticals,
+            exclude_advertiser_ids=exclude_advertiser_ids,
+            exclude_ad_ids=exclude_ad_ids,
+            age_restricted_ok=age_restricted_ok,
+            sensitive_ok=sensitive_ok,
+        ),
+    )
+
+
+def _run_match(request: MatchRequest, t0: float, tool: str = "ads_match", deadline: float | None = None) -> str:
+    """Blocking body of ads_match (runs in a worker thread): match, render, log, record."""
+    if deadline is not None and time.monotonic() > deadline:
+        raise Overloaded("deadline", 0.0)
+    placement = request.placement.placement
+    recorder = get_flight_recorder()
+    try:
+        with recorder.profile_request() if recorder is not None else nullcontext():
+            service = _get_match_service()
+            response, trace = service.match(request, deadline)
+            t_shape = time.perf_counter()
+            out = render_match(response, trace)
+            shape_seconds = time.perf_counter() - t_shape
+        MATCH_STAGE_SECONDS.observe(
+            shape_seconds, stage="shape", placement=placement, cache=trace.cache
+        )
+    except Exception as e:
+        log_tool_invocation(tool, None, (time.monotonic() - t0) * 1000, error=type(e).__name__)
+        raise
+    if trace.degraded is not None:
+        MATCH_DEGRADED.inc(reason=trace.degraded[0], source=trace.degraded[1])
+    latency_ms = (time.monotonic() - t0) * 1000
+    log_tool_invocation(tool, response.request_id, latency_ms, extra={"candidates_count": len(response.candidates)})
+    query_logger = get_query_logger()
+    if query_logger is not None:
+        query_logger.maybe_log(lambda: _query_log_record(request, response, trace, latency_ms))
+    if recorder is not None:
+        recorder.record(
+            latency_ms,
+            lambda: _flight_entry(request, response, trace, out, shape_seconds, tool),
+        )
+    return out
 
 
+@lru_cache(maxsize=1)
 def _get_index_service():
+    """Process-wide IndexService on the same store as ``_get_match_service``."""
     from ..wiring import build_index_service
-    return build_index_service()
+    return build_index_service(vector_store=_get_vector_store())
+
+
+@lru_cache(maxsize=1)
+def _get_upload_manager():
+    """Process-wide upload session manager (sessions live in Control Plane memory)."""
+    from ..services.upload_sessions import UploadSessionManager
+
+    settings = get_settings()
+    return UploadSessionManager(
+        _get_index_service(),
+        max_sessions=settings.upload_max_sessions,
+        max_pending_chunks=settings.upload_max_pending_chunks,
+        max_chunk_items=settings.max_batch_size,
+        ttl_seconds=settings.upload_session_ttl_seconds,
+    )
+
+
+def _upload_call(operation: str, call: Any) -> str:
+    """Run an upload-session operation; session and chunk errors become ``{"error": ...}`` JSON."""
+    from ..services.upload_sessions import ChunkFormatError
+
+    try:
+        with observe_operation(operation):
+            return json.dumps(call(_get_upload_manager()))
+    except ChunkFormatError as e:
+        return json.dumps({"error": "ads_json must be a JSON array", "detail": str(e)})
+    except ValueError as e:
+        return json.dumps({"error": str(e)})
+
+
+# Ads per upsert_ads call in a background upsert job (progress / cancellation granularity)
+_JOB_UPSERT_STEP = 64
+
+
+@lru_cache(maxsize=1)
+def _get_job_scheduler():
+    """Process-wide Control Plane job scheduler (records under JOBS_DIR)."""
+    from ..wiring import build_job_scheduler
+    return build_job_scheduler()
+
+
+def _job_call(operation: str, call: Any) -> str:
+    """Run a job-scheduler operation; unknown jobs / a full queue become ``{"error": ...}`` JSON."""
+    from ..services.jobs import JobError
+
+    try:
+        with observe_operation(operation):
+            return json.dumps(call(_get_job_scheduler()))
+    except JobError as e:
+        return json.dumps({"error": str(e)})
+
+
+def _submit_job(kind: str, fn: Any, params: dict, total: int | None = None) -> str:
+    return _job_call(f"{kind}_submit", lambda s: s.submit(kind, fn, params, total))
 
 
 # ---------------------------------------------------------------------------
 # Data Plane tools
 # ---------------------------------------------------------------------------
-DATA_PLANE_ALLOWED_TOOLS = frozenset({"ads_match", "ads_explain", "ads_health", "ads_capabilities"})
+DATA_PLANE_ALLOWED_TOOLS = frozenset({
+    "ads_match", "ads_explain", "ads_health", "ads_capabilities", "ads_metrics",
+})
 
 
 def register_data_plane_tools(mcp):
     """Register Data Plane (runtime / LLM-facing) tools with request shaping and response allowlist."""
 
     @mcp.tool()
-    def ads_match(
+    async def ads_match(
         context_text: str,
         top_k: int = 5,
         placement: str = "inline",
@@ -109,6 +301,7 @@ def register_data_plane_tools(mcp):
         exclude_ad_ids: list[str] | None = None,
         age_restricted_ok: bool = False,
         sensitive_ok: bool = False,
+        timeout_ms: int | None = None,
     ) -> str:
         """Match ads by semantic context (read-only). Returns ranked candidates and match_id for explain.
 
@@ -124,34 +317,35 @@ def register_data_plane_tools(mcp):
             exclude_ad_ids: Ad IDs to exclude
             age_restricted_ok: Allow age-restricted ads
             sensitive_ok: Allow sensitive-content ads
+            timeout_ms: Latency budget; capped by the server's request timeout
 
         Returns:
-            JSON with candidates (ad_id, title, cta_text, landing_url, score, match_id), request_id, placement
+            JSON with candidates (ad_id, title, cta_text, landing_url, score, match_id), request_id, placement;
+            or {"error": "overloaded", "reason", "retry_after_ms"} when the request was shed
         """
         t0 = time.monotonic()
-        request = MatchRequest(
-            context_text=context_text[:10_000],
-            top_k=max(1, min(100, top_k)),
-            placement=PlacementContext(placement=placement, surface=surface),
-            constraints=MatchConstraints(
-                topics=topics,
-                locale=locale,
-                verticals=verticals,
-                exclude_advertiser_ids=exclude_advertiser_ids,
-                exclude_ad_ids=exclude_ad_ids,
-                age_restricted_ok=age_restricted_ok,
-                sensitive_ok=sensitive_ok,
-            ),
+        request = build_match_request(
+            context_text=context_text,
+            top_k=top_k,
+            placement=placement,
+            surface=surface,
+            topics=topics,
+            locale=locale,
+            verticals=verticals,
+            exclude_advertiser_ids=exclude_advertiser_ids,
+            exclude_ad_ids=exclude_ad_ids,
+            age_restricted_ok=age_restricted_ok,
+            sensitive_ok=sensitive_ok,
         )
-        service = _get_match_service()
-        response, audit_trace = service.match(request)
-        _store_trace_for_explain(response, audit_trace)
-        latency_ms = (time.monotonic() - t0) * 1000
-        log_tool_invocation("ads_match", response.request_id, latency_ms, extra={"candidates_count": len(response.candidates)})
-        return json.dumps(_shape_match_response(response), indent=2)
+        try:
+            async with get_admission_controller().admit(timeout_ms) as deadline:
+                return await anyio.to_thread.run_sync(_run_match, request, t0, "ads_match", deadline)
+        except Overloaded as e:
+            log_tool_invocation("ads_match", None, (time.monotonic() - t0) * 1000, error="overloaded")
+            return json.dumps(e.to_dict())
 
     @mcp.tool()
-    def ads_explain(match_id: str) -> str:
+    async def ads_explain(match_id: str) -> str:
         """Return audit trace for a prior match (why eligible/ineligible, filters, scores).
 
         Args:
@@ -160,17 +354,40 @@ def register_data_plane_tools(mcp):
         Returns:
             JSON trace with request_id, placement, context_text, constraints, decisions (ad_id, score, reason)
         """
-        trace = _trace_store.get(match_id)
+        t0 = time.monotonic()
+        trace = await anyio.to_thread.run_sync(get_trace_store().get, match_id)
         if trace is None:
-            return json.dumps({"error": "match_id not found", "match_id": match_id})
-        return json.dumps(trace, indent=2)
+            out = json.dumps({"error": "match_id not found", "match_id": match_id})
+        else:
+            out = json.dumps(trace, indent=2)
+        recorder = get_flight_recorder()
+        if recorder is not None:
+            recorder.record(
+                (time.monotonic() - t0) * 1000,
+                lambda: {"tool": "ads_explain", "match_id": match_id,
+                         "found": trace is not None, "sizes": {"response_bytes": len(out)}},
+            )
+        return out
 
     @mcp.tool()
-    def ads_health() -> str:
-        """Liveness/readiness: Qdrant and embedding provider reachable."""
+    async def ads_health() -> str:
+        """Liveness/readiness: Qdrant and embedding provider reachable; worker state when serving HTTP."""
         try:
             from ..ops.smoke_check import run_smoke_check
-            result = run_smoke_check()
+            from .serving import worker_status
+            result = await anyio.to_thread.run_sync(run_smoke_check)
+            result["admission"] = get_admission_controller().stats()
+            degradation = _get_match_service().degradation_stats()
+            if degradation is not None:
+                result["degradation"] = degradation
+            catalog = _get_match_service().catalog_stats()
+            if catalog is not None:
+                result["catalog"] = catalog
+            worker = worker_status()
+            if worker is not None:
+                result["worker"] = worker
+                if not worker["ready"] or worker["draining"]:
+                    result["ok"] = False
             return json.dumps(result)
         except Exception as e:
             return json.dumps({"ok": False, "error": str(e)})
@@ -193,6 +410,11 @@ def register_data_plane_tools(mcp):
             "schema_version": schema_version,
         })
 
+    @mcp.tool()
+    def ads_metrics() -> str:
+        """Process metrics (tool counters, per-stage latency histograms) in Prometheus text format."""
+        return render_prometheus()
+
 
 # ---------------------------------------------------------------------------
 # Control Plane tools
@@ -206,6 +428,7 @@ def register_control_plane_tools(mcp):
         dimension: int = 384,
         embedding_model_id: str = "BAAI/bge-small-en-v1.5",
         schema_version: str = "1",
+        background: bool = False,
     ) -> str:
         """Ensure the ads collection exists with the given config.
 
@@ -213,80 +436,269 @@ def register_control_plane_tools(mcp):
             dimension: Embedding vector dimension
             embedding_model_id: Model used for embeddings
             schema_version: Schema version tag
+            background: Run as a background job and return its record (poll with jobs_status)
 
         Returns:
-            JSON with name, created, dimension, embedding_model_id, schema_version
+            JSON with name, created, dimension, embedding_model_id, schema_version (or the job record)
         """
         from ..mcp.auth import require_admin_scope
         require_admin_scope()
-        svc = _get_index_service()
-        result = svc.ensure_collection(
-            dimension=dimension,
-            embedding_model_id=embedding_model_id,
-            schema_version=schema_version,
-        )
-        return json.dumps(_shape_collection_ensure(result))
+
+        def ensure() -> dict:
+            with observe_operation("collection_ensure"):
+                result = _get_index_service().ensure_collection(
+                    dimension=dimension,
+                    embedding_model_id=embedding_model_id,
+                    schema_version=schema_version,
+                )
+            return _shape_collection_ensure(result)
+
+        if background:
+            params = {
+                "dimension": dimension, "embedding_model_id": embedding_model_id, "schema_version": schema_version,
+            }
+            return _submit_job("collection_ensure", lambda ctx: ensure(), params)
+        return json.dumps(ensure())
 
     @mcp.tool()
     def collection_info() -> str:
         """Return metadata about the current ads collection.
 
         Returns:
-            JSON with name, points_count, status, dimension, embedding_model_id, schema_version
+            JSON with name, points_count, status, dimension, embedding_model_id, schema_version,
+            catalog_version
         """
         from ..mcp.auth import require_admin_scope
         require_admin_scope()
-        result = _get_index_service().collection_info()
+        with observe_operation("collection_info"):
+            result = _get_index_service().collection_info()
         return json.dumps(_shape_collection_info(result))
 
     @mcp.tool()
-    def collection_migrate(from_version: str, to_version: str) -> str:
-        """Optional: run schema migrations / re-index between versions.
+    def collection_migrate(
+        from_version: str,
+        to_version: str,
+        embedding_model_id: str | None = None,
+        dimension: int | None = None,
+        reembed: bool | None = None,
+        drop_old: bool = False,
+        restart: bool = False,
+    ) -> str:
+        """Re-index into a new versioned collection in the background, then switch the alias to it.
+
+        Resumable: calling it again with the same arguments continues an interrupted migration.
 
         Args:
-            from_version: Current schema version
-            to_version: Target schema version
+            from_version: Current schema version (must match ads_meta)
+            to_version: Target schema version (payload transform registered in ops.migrations, if any)
+            embedding_model_id: Re-embed with this model (default: keep the current model and vectors)
+            dimension: Vector dimension of the new model (default: probed from the model)
+            reembed: Force (or skip) re-embedding; default is "the model changes"
+            drop_old: Delete the previous collection after the cutover (default: keep it for rollback)
+            restart: Discard the checkpoint of an unfinished migration and start over
 
         Returns:
-            JSON status
+            JSON job record; poll jobs_status for progress and the migration summary
         """
         from ..mcp.auth import require_admin_scope
+        from ..ops.migrations import MigrationPlan, migrate_collection
         require_admin_scope()
-        return json.dumps({
-            "status": "noop",
-            "message": "collection_migrate not implemented",
-            "from_version": from_version,
-            "to_version": to_version,
-        })
+        busy = [
+            j["job_id"] for j in _get_job_scheduler().list(limit=1000)
+            if j["kind"] == "collection_migrate" and j["state"] in ("queued", "running")
+        ]
+        if busy:
+            return json.dumps({"error": "a migration is already running", "job_ids": busy})
+        settings = get_settings()
+        index = _get_index_service()
+        plan = MigrationPlan(from_version, to_version, embedding_model_id, dimension, reembed)
+
+        def migrate(ctx) -> dict:
+            from ..wiring import build_embedding_provider
+
+            provider = build_embedding_provider(embedding_model_id) if embedding_model_id else None
+            with observe_operation("collection_migrate"):
+                return migrate_collection(
+                    index,
+                    plan,
+                    settings.migration_state_path,
+                    provider,
+                    page_size=settings.migration_page_size,
+                    workers=settings.migration_workers,
+                    max_ads_per_second=settings.migration_max_ads_per_second,
+                    sample_size=settings.migration_sample_size,
+                    min_recall=settings.migration_min_recall,
+                    drop_old=drop_old,
+                    restart=restart,
+                    progress=ctx.progress,
+                    check=ctx.check_cancelled,
+                )
+
+        params = {
+            "from_version": from_version, "to_version": to_version, "embedding_model_id": embedding_model_id,
+            "dimension": dimension, "reembed": reembed, "drop_old": drop_old, "restart": restart,
+        }
+        return _submit_job("collection_migrate", migrate, params)
 
     @mcp.tool()
-    def ads_upsert_batch(ads_json: str) -> str:
+    def ads_upsert_batch(ads_json: str, background: bool = False) -> str:
         """Upsert a batch of ads. Validate Ad schema, embed, upsert. Size limit from config.
 
+        Larger catalogs go through upload_open / upload_append / upload_commit.
+
         Args:
-            ads_json: JSON array of ad objects
+            ads_json: JSON array of ad objects (at most MAX_BATCH_SIZE)
+            background: Validate now, embed and upsert in a background job (progress / cancel via jobs_*)
 
         Returns:
-            JSON with upserted count
+            JSON with upserted count (or the job record), or an error (invalid ads, batch too large);
+            nothing is upserted on error
         """
         from ..mcp.auth import require_admin_scope
+        from ..services.upload_sessions import ChunkFormatError, validate_chunk
         require_admin_scope()
         settings = get_settings()
-        raw = json.loads(ads_json)
-        if not isinstance(raw, list):
-            return json.dumps({"error": "ads_json must be a JSON array"})
-        ads: list[Ad] = []
-        for i, item in enumerate(raw):
-            try:
-                ads.append(Ad.model_validate(item))
-            except Exception as e:
-                return json.dumps({"error": f"invalid ad at index {i}", "detail": str(e)})
-        batch_size = min(len(ads), settings.max_batch_size)
-        ads = ads[:batch_size]
-        svc = _get_index_service()
-        count = svc.upsert_ads(ads)
+        try:
+            ads, errors = validate_chunk(ads_json)
+        except ChunkFormatError as e:
+            return json.dumps({"error": "ads_json must be a JSON array", "detail": str(e)})
+        if errors:
+            index, _, detail = errors[0]
+            return json.dumps({
+                "error": f"invalid ad at index {index}",
+                "detail": detail,
+                "errors": [{"index": i, "ad_id": ad_id, "error": msg} for i, ad_id, msg in errors[:100]],
+            })
+        if len(ads) > settings.max_batch_size:
+            return json.dumps({
+                "error": "batch too large",
+                "received": len(ads),
+                "max_batch_size": settings.max_batch_size,
+                "detail": "use upload_open / upload_append / upload_commit for larger uploads",
+            })
+        if background:
+            index = _get_index_service()
+
+            def upsert(ctx) -> dict:
+                done = 0
+                for i in range(0, len(ads), _JOB_UPSERT_STEP):
+                    ctx.check_cancelled()
+                    with observe_operation("ads_upsert_batch"):
+                        done += index.upsert_ads(ads[i : i + _JOB_UPSERT_STEP])
+                    ctx.progress(done)
+                return {"upserted": done}
+
+            return _submit_job("ads_upsert_batch", upsert, {"ads": len(ads)}, total=len(ads))
+        with observe_operation("ads_upsert_batch"):
+            count = _get_index_service().upsert_ads(ads)
         return json.dumps({"upserted": count})
 
+    @mcp.tool()
+    def upload_open(expected_items: int | None = None) -> str:
+        """Open a chunked upload session.
+
+        Args:
+            expected_items: Optional total number of ads the client intends to send (informational)
+
+        Returns:
+            JSON session status including session_id
+        """
+        from ..mcp.auth import require_admin_scope
+        require_admin_scope()
+        return _upload_call("upload_open", lambda m: m.open(expected_items))
+
+    @mcp.tool()
+    def upload_append(session_id: str, ads_json: str) -> str:
+        """Append a chunk of ads to an open session; valid ads are embedded and upserted in the background.
+
+        Args:
+            session_id: Session from upload_open
+            ads_json: JSON array of ad objects (at most MAX_BATCH_SIZE per chunk)
+
+        Returns:
+            JSON with the chunk number, accepted / rejected counts and per-item errors. A "session busy"
+            error means earlier chunks are still being upserted: retry the same chunk.
+        """
+        from ..mcp.auth import require_admin_scope
+        require_admin_scope()
+        return _upload_call("upload_append", lambda m: m.append(session_id, ads_json))
+
+    @mcp.tool()
+    def upload_commit(session_id: str) -> str:
+        """Close a session for appends; it completes when its queued chunks are upserted.
+
+        Args:
+            session_id: Session from upload_open
+
+        Returns:
+            JSON session status (state committing or completed)
+        """
+        from ..mcp.auth import require_admin_scope
+        require_admin_scope()
+        return _upload_call("upload_commit", lambda m: m.commit(session_id))
+
+    @mcp.tool()
+    def upload_status(session_id: str) -> str:
+        """Progress and per-item errors of an upload session.
+
+        Args:
+            session_id: Session from upload_open
+
+        Returns:
+            JSON with state, received / accepted / rejected / upserted counts, pending chunks and errors
+        """
+        from ..mcp.auth import require_admin_scope
+        require_admin_scope()
+        return _upload_call("upload_status", lambda m: m.status(session_id))
+
+    @mcp.tool()
+    def upload_abort(session_id: str) -> str:
+        """Abort a session; chunks not yet upserted are dropped (ads already upserted stay).
+
+        Args:
+            session_id: Session from upload_open
+
+        Returns:
+            JSON session status
+        """
+        from ..mcp.auth import require_admin_scope
+        require_admin_scope()
+        return _upload_call("upload_abort", lambda m: m.abort(session_id))
+
+    @mcp.tool()
+    def ads_flight_recorder(action: str = "status", profile_requests: int = 10) -> str:
+        """Data Plane diagnostics through PROFILE_DIR: slowest requests and on-demand sampling profiles.
+
+        Data Plane workers with FLIGHT_RECORDER_ENABLED=true and the same PROFILE_DIR pick up
+        'dump' / 'profile' requests within about a second.
+
+        Args:
+            action: 'status' (files in profile_dir), 'slowest' (latest flight dump), 'dump' (ask
+                Data Plane workers to write their slowest requests) or 'profile' (ask them to
+                sample their next profile_requests requests)
+            profile_requests: Number of requests to profile for action='profile'
+
+        Returns:
+            JSON with the requested recorder data or the request written
+        """
+        from ..mcp.auth import require_admin_scope
+        from .flight_recorder import FLIGHT_FILE_PREFIX, list_dumps, write_request
+        require_admin_scope()
+        profile_dir = get_settings().profile_dir
+        with observe_operation("ads_flight_recorder"):
+            if action == "status":
+                files = [p.name for p in list_dumps(profile_dir)[:20]]
+                return json.dumps({"profile_dir": str(profile_dir), "files": files})
+            if action == "slowest":
+                latest = next((p for p in list_dumps(profile_dir) if p.name.startswith(FLIGHT_FILE_PREFIX)), None)
+                if latest is None:
+                    return json.dumps({"error": "no flight dump yet; call action='dump' first"})
+                return json.dumps({"file": latest.name, **json.loads(latest.read_text(encoding="utf-8"))}, indent=2)
+            try:
+                return json.dumps({"requested": write_request(profile_dir, action, profile_requests)})
+            except ValueError as e:
+                return json.dumps({"error": str(e)})
+
     @mcp.tool()
     def ads_delete(ad_id: str) -> str:
         """Delete a single ad by ID.
@@ -299,18 +711,40 @@ def register_control_plane_tools(mcp):
         """
         from ..mcp.auth import require_admin_scope
         require_admin_scope()
-        _get_index_service().delete_ad(ad_id)
+        with observe_operation("ads_delete"):
+            _get_index_service().delete_ad(ad_id)
         return json.dumps({"deleted": ad_id})
 
     @mcp.tool()
-    def ads_bulk_disable(filter_json: str) -> str:
+    def ads_delete_many(ad_ids_json: str) -> str:
+        """Delete many ads by ID (one batched store request per chunk).
+
+        Args:
+            ad_ids_json: JSON array of ad identifiers (at most MAX_IDS_PER_CALL)
+
+        Returns:
+            JSON with the deleted ids and the ids that were not found
+        """
+        from ..mcp.auth import require_admin_scope
+        require_admin_scope()
+        ad_ids, error = _parse_ad_ids(ad_ids_json, get_settings().max_ids_per_call)
+        if error is not None:
+            return json.dumps(error)
+        with observe_operation("ads_delete_many"):
+            deleted = _get_index_service().delete_ads(ad_ids)
+        found = set(deleted)
+        return json.dumps({"deleted": deleted, "not_found": [ad_id for ad_id in ad_ids if ad_id not in found]})
+
+    @mcp.tool()
+    def ads_bulk_disable(filter_json: str, background: bool = False) -> str:
         """Set enabled=false for all ads matching the filter.
 
         Args:
             filter_json: JSON object e.g. {"advertiser_id": "x"} or {"ad_id": ["a","b"]}
+            background: Run as a background job and return its record (poll with jobs_status)
 
         Returns:
-            JSON with count of disabled ads
+            JSON with count of disabled ads (or the job record)
         """
         from ..mcp.auth import require_admin_scope
         require_admin_scope()
@@ -320,8 +754,14 @@ def register_control_plane_tools(mcp):
             return json.dumps({"error": "invalid filter_json", "detail": str(e)})
         if not isinstance(filter_spec, dict):
             return json.dumps({"error": "filter_json must be a JSON object"})
-        count = _get_index_service().bulk_disable(filter_spec)
-        return json.dumps({"disabled": count})
+
+        def disable() -> dict:
+            with observe_operation("ads_bulk_disable"):
+                return {"disabled": _get_index_service().bulk_disable(filter_spec)}
+
+        if background:
+            return _submit_job("ads_bulk_disable", lambda ctx: disable(), {"filter": filter_spec})
+        return json.dumps(disable())
 
     @mcp.tool()
     def ads_get(ad_id: str) -> str:
@@ -335,9 +775,86 @@ def register_control_plane_tools(mcp):
         """
         from ..mcp.auth import require_admin_scope
         require_admin_scope()
-        payload = _get_index_service().get_ad(ad_id)
+        with observe_operation("ads_get"):
+            payload = _get_index_service().get_ad(ad_id)
         if payload is None:
             return json.dumps({"error": "not found", "ad_id": ad_id})
         payload.setdefault("enabled", True)
         shaped = _shape_ads_get(payload)
         return json.dumps(shaped or payload)
+
+    @mcp.tool()
+    def ads_get_many(ad_ids_json: str) -> str:
+        """Get many ads by ID (one batched store read per chunk).
+
+        Args:
+            ad_ids_json: JSON array of ad identifiers (at most MAX_IDS_PER_CALL)
+
+        Returns:
+            JSON with the ad payloads in request order (allowlisted fields) and the ids that were not found
+        """
+        from ..mcp.auth import require_admin_scope
+        require_admin_scope()
+        ad_ids, error = _parse_ad_ids(ad_ids_json, get_settings().max_ids_per_call)
+        if error is not None:
+            return json.dumps(error)
+        with observe_operation("ads_get_many"):
+            payloads = _get_index_service().get_ads(ad_ids)
+        ads = []
+        for ad_id in ad_ids:
+            payload = payloads.get(ad_id)
+            if payload is not None:
+                payload.setdefault("enabled", True)
+                ads.append(_shape_ads_get(payload))
+        return json.dumps({"ads": ads, "not_found": [ad_id for ad_id in ad_ids if ad_id not in payloads]})
+
+    @mcp.tool()
+    def jobs_status(job_id: str) -> str:
+        """State, progress (done / total), result or error of a background job.
+
+        Args:
+            job_id: Job id returned by a tool called with background=true
+
+        Returns:
+            JSON job record (state: queued, running, succeeded, failed, cancelled or interrupted)
+        """
+        from ..mcp.auth import require_admin_scope
+        require_admin_scope()
+        return _job_call("jobs_status", lambda s: s.status(job_id))
+
+    @mcp.tool()
+    def jobs_list(state: str | None = None, limit: int = 20) -> str:
+        """Recent background jobs, newest first (including outcomes recorded before a restart).
+
+        Args:
+            state: Only jobs in this state (optional)
+            limit: Maximum number of jobs returned
+
+        Returns:
+            JSON with a jobs array of job records
+        """
+        from ..mcp.auth import require_admin_scope
+        require_admin_scope()
+        limit = max(1, min(limit, 200))
+        return _job_call("jobs_list", lambda s: {"jobs": s.list(state, limit)})
+
+    @mcp.tool()
+    def jobs_cancel(job_id: str) -> str:
+        """Cancel a background job: a queued job never starts, a running one stops at its next step.
+
+        Args:
+            job_id: Job to cancel
+
+        Returns:
+            JSON job record (cancel_requested=true; state becomes cancelled once the job stops)
+        """
+        from ..mcp.auth import require_admin_scope
+        require_admin_scope()
+        return _job_call("jobs_cancel", lambda s: s.cancel(job_id))
+
+    @mcp.tool()
+    def ops_metrics() -> str:
+        """Control Plane process metrics (operation latency histograms) in Prometheus text format."""
+        from ..mcp.auth import require_admin_scope
+        require_admin_scope()
+        return render_prometheus()
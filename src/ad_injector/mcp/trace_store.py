@@ -0,0 +1,196 @@
+"""Bounded in-process store of ads_match traces for ads_explain.
+
+Default ``TraceStorePort`` backend; use ``adapters.sqlite_trace_store`` when
+several worker processes must see each other's traces.
+
+One record per request_id, with a ``match_id -> request_id`` index so every
+candidate of a request resolves to the same record.  Records are the compact
+``MatchTrace`` objects produced by ``MatchService`` (parallel id / score /
+verdict / match_id columns plus a constraints reference); the readable trace
+is materialized with ``MatchTrace.to_dict`` only when a match is explained.
+The context is cut to ``max_context_chars`` when a trace is stored.
+
+Eviction is LRU (``get`` refreshes a record) under a byte budget, plus a TTL
+checked on read and swept from the cold end on write.  Sizes are estimated
+with ``sys.getsizeof`` of the stored objects and index entries.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any
+
+from ..ports.trace_store import TraceStorePort
+from ..services.match_trace import MatchTrace
+from .observability import REGISTRY
+
+TRACE_STORE_BYTES = REGISTRY.gauge("ad_trace_store_bytes", "Estimated bytes held by the explain trace store")
+TRACE_STORE_RECORDS = REGISTRY.gauge("ad_trace_store_records", "Requests held by the explain trace store")
+TRACE_STORE_EVICTIONS = REGISTRY.counter(
+    "ad_trace_store_evictions_total", "Explain trace store evictions by reason", ("reason",)
+)
+TRACE_STORE_LOOKUPS = REGISTRY.counter(
+    "ad_trace_store_lookups_total", "Explain trace store lookups by outcome", ("outcome",)
+)
+
+# Per match_id index entry: dict slot + key string (the value is shared with the record)
+_INDEX_ENTRY_OVERHEAD = 100
+
+
+def _list_size(values: Any) -> int:
+    return sys.getsizeof(values) + sum(sys.getsizeof(v) for v in values) if values else 0
+
+
+def _trace_size(trace: MatchTrace) -> int:
+    """Estimated bytes retained by a stored trace, including its match_id index entries."""
+    constraints = trace.constraints
+    fields = getattr(constraints, "__dict__", {})
+    return (
+        sys.getsizeof(trace)
+        + sys.getsizeof(trace.context_text)
+        + sys.getsizeof(trace.timings_ms)
+        + sys.getsizeof(constraints)
+        + sys.getsizeof(fields)
+        + sum(_list_size(v) for v in fields.values() if isinstance(v, list))
+        + _list_size(trace.ad_ids)
+        + _list_size(trace.scores)
+        + sys.getsizeof(trace.verdicts)
+        + sys.getsizeof(trace.match_ids)
+        + sum(sys.getsizeof(m) + _INDEX_ENTRY_OVERHEAD for m in trace.match_ids if m is not None)
+    )
+
+
+class _TraceRecord:
+    __slots__ = ("created", "trace", "nbytes")
+
+    def __init__(self, trace: MatchTrace) -> None:
+        self.created = time.monotonic()
+        self.trace = trace
+        self.nbytes = sys.getsizeof(self) + _trace_size(trace)
+
+
+class TraceStore:
+    """LRU + TTL trace store bounded by an estimated byte budget."""
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float = 3600.0,
+        max_context_chars: int = 500,
+    ) -> None:
+        self._max_bytes = max_bytes
+        self._ttl = ttl_seconds
+        self._max_context = max_context_chars
+        self._lock = threading.Lock()
+        self._records: OrderedDict[str, _TraceRecord] = OrderedDict()
+        self._by_match: dict[str, str] = {}
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = {"capacity": 0, "ttl": 0}
+
+    # -- public API --------------------------------------------------------
+
+    def put(self, trace: MatchTrace) -> bool:
+        """Store a trace; returns False when it was not sampled or has no match_ids."""
+        if not trace.sampled or not any(trace.match_ids):
+            return False
+        # The store owns the trace from here on; keep only the explain-sized context
+        trace.context_text = trace.context_text[: self._max_context]
+        record = _TraceRecord(trace)
+        request_id = trace.request_id
+        with self._lock:
+            self._drop(request_id)
+            self._records[request_id] = record
+            for match_id in trace.match_ids:
+                if match_id is not None:
+                    self._by_match[match_id] = request_id
+            self._bytes += record.nbytes
+            self._evict()
+            self._publish()
+        return True
+
+    def get(self, match_id: str) -> dict[str, Any] | None:
+        """Return the materialized trace for ``match_id`` (or a request_id), or None."""
+        with self._lock:
+            request_id = self._by_match.get(match_id, match_id)
+            record = self._records.get(request_id)
+            if record is not None and self._expired(record, time.monotonic()):
+                self._drop(request_id)
+                self._evictions["ttl"] += 1
+                TRACE_STORE_EVICTIONS.inc(reason="ttl")
+                self._publish()
+                record = None
+            if record is None:
+                self._misses += 1
+                TRACE_STORE_LOOKUPS.inc(outcome="miss")
+                return None
+            self._records.move_to_end(request_id)
+            self._hits += 1
+        TRACE_STORE_LOOKUPS.inc(outcome="hit")
+        return record.trace.to_dict(self._max_context)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
+            self._by_match.clear()
+            self._bytes = 0
+            self._publish()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "records": len(self._records),
+                "match_ids": len(self._by_match),
+                "bytes": self._bytes,
+                "max_bytes": self._max_bytes,
+                "ttl_seconds": self._ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": dict(self._evictions),
+            }
+
+    # -- internals (lock held) ---------------------------------------------
+
+    def _expired(self, record: _TraceRecord, now: float) -> bool:
+        return self._ttl > 0 and now - record.created > self._ttl
+
+    def _drop(self, request_id: str) -> None:
+        record = self._records.pop(request_id, None)
+        if record is None:
+            return
+        self._bytes -= record.nbytes
+        for match_id in record.trace.match_ids:
+            if match_id is not None and self._by_match.get(match_id) == request_id:
+                del self._by_match[match_id]
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        while self._records:
+            request_id, record = next(iter(self._records.items()))
+            if self._expired(record, now):
+                reason = "ttl"
+            elif self._bytes > self._max_bytes:
+                reason = "capacity"
+            else:
+                break
+            self._drop(request_id)
+            self._evictions[reason] += 1
+            TRACE_STORE_EVICTIONS.inc(reason=reason)
+
+    def _publish(self) -> None:
+        TRACE_STORE_BYTES.set(self._bytes)
+        TRACE_STORE_RECORDS.set(len(self._records))
+
+
+@lru_cache(maxsize=1)
+def get_trace_store() -> TraceStorePort:
+    """Process-wide trace store for the configured backend (TRACE_STORE_BACKEND)."""
+    from ..wiring import build_trace_store
+
+    return build_trace_store()
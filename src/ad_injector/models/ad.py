@@ -1,5 +1,8 @@
 """Ad schema models using Pydantic."""
 
+import hashlib
+import json
+
 from pydantic import BaseModel, Field
 
 
@@ -37,6 +40,17 @@ class Ad(BaseModel):
         topics_text = " ".join(self.targeting.topics)
         return f"{self.title} {self.body} {topics_text}".strip()
 
+    @property
+    def content_hash(self) -> str:
+        """Hash of the creative, targeting and policy (``ad-index sync`` change detection)."""
+        content = json.dumps(self.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()[:32]
+
+    @property
+    def embedding_hash(self) -> str:
+        """Hash of ``embedding_text``: the vector only needs recomputing when this changes."""
+        return hashlib.sha256(self.embedding_text.encode("utf-8")).hexdigest()[:32]
+
     def to_pinecone_metadata(self) -> dict:
         """Convert ad to Pinecone metadata format. Includes enabled for bulk_disable support."""
         return {
@@ -53,4 +67,28 @@ class Ad(BaseModel):
             "sensitive": self.policy.sensitive,
             "age_restricted": self.policy.age_restricted,
             "enabled": True,
+            "content_hash": self.content_hash,
+            "embedding_hash": self.embedding_hash,
         }
+
+    @classmethod
+    def from_pinecone_metadata(cls, payload: dict) -> "Ad":
+        """Rebuild an ad from its stored flat payload (inverse of ``to_pinecone_metadata``)."""
+        return cls(
+            ad_id=payload["ad_id"],
+            advertiser_id=payload["advertiser_id"],
+            title=payload["title"],
+            body=payload["body"],
+            cta_text=payload["cta_text"],
+            landing_url=payload["landing_url"],
+            targeting=AdTargeting(
+                topics=payload.get("topics", []),
+                locale=payload.get("locale", []),
+                verticals=payload.get("verticals", []),
+                blocked_keywords=payload.get("blocked_keywords", []),
+            ),
+            policy=AdPolicy(
+                sensitive=payload.get("sensitive", False),
+                age_restricted=payload.get("age_restricted", False),
+            ),
+        )
@@ -0,0 +1,283 @@
+"""Streaming ad ingestion for ``ad-index seed``.
+
+``iter_records`` reads NDJSON (one ad object per line), gzip-compressed or
+not, one line at a time; a JSON array file (first non-blank character ``[``)
+is still accepted but parsed whole, so keep those small.
+
+``ingest`` runs parse -> validate -> embed batch -> upsert as a two-stage
+pipeline: a reader thread parses and validates rows into a bounded queue of
+batches while the calling thread embeds and upserts them through
+``IndexService.upsert_ads``.  Memory stays at about ``queue_batches + 2``
+batches whatever the file size.  Rows that fail to parse or validate are
+written to the reject file (NDJSON: line number, error, raw row) and the run
+continues; ``progress`` is called after every upserted batch.
+
+``bulk_ingest`` is the resumable variant for full catalog loads: it feeds the
+same records into ``IndexService.bulk_load`` (separate reader, validator,
+embedder-pool and uploader stages) and after every consistency barrier writes
+the last durably upserted line number to a JSON state file.  A restart with
+the same state file resumes after that line; the state file is removed once
+the load completes.
+
+Both accept precomputed embeddings (see ``services.precomputed``): an
+``embedding`` field on a record, or a companion ``.npy`` file
+(``vectors_path``, float array with one row per record, memory-mapped).
+They are checked once per run against ``ads_meta`` and upserted as given;
+records without a vector are embedded locally.  A bad vector rejects its row.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import queue
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import IO, Any, Callable, Iterator
+
+from ..models import Ad
+from ..services.bulk_load import BulkLoadReport
+from ..services.index_service import IndexService
+from ..services.precomputed import WithVector, unwrap_raw
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_DONE = object()
+
+
+@dataclass(slots=True)
+class IngestReport:
+    """Counters of one ingestion run (also passed to the progress callback)."""
+
+    read: int = 0
+    upserted: int = 0
+    rejected: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    reject_path: str | None = None
+
+    @property
+    def ads_per_second(self) -> float:
+        return self.upserted / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "seconds": round(self.seconds, 3), "ads_per_second": round(self.ads_per_second, 1)}
+
+
+def open_text(path: Path) -> IO[str]:
+    """Open ``path`` for reading text, decompressing gzip (by magic bytes, not extension)."""
+    with open(path, "rb") as f:
+        magic = f.read(2)
+    if magic == _GZIP_MAGIC:
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def iter_records(path: Path) -> Iterator[tuple[int, Any]]:
+    """Yield ``(line_no, raw)``: the raw line text for NDJSON, the parsed item for a JSON array."""
+    with open_text(path) as f:
+        line_no = 0
+        for line_no, line in enumerate(f, start=1):
+            head = line.lstrip()[:1]
+            if not head:
+                continue
+            if head == "[":
+                for i, item in enumerate(json.loads(line + f.read())):
+                    yield i + 1, item
+                return
+            yield line_no, line
+            break
+        for line_no, line in enumerate(f, start=line_no + 1):
+            if line.strip():
+                yield line_no, line
+
+
+def load_vectors(path: Path) -> Any:
+    """Memory-mapped ``(records, dimension)`` float array from a ``.npy`` file."""
+    import numpy as np
+
+    rows = np.load(path, mmap_mode="r", allow_pickle=False)
+    if rows.ndim != 2 or rows.dtype.kind != "f":
+        raise ValueError(f"{path}: expected a 2-D float array, got {rows.dtype} with shape {rows.shape}")
+    return rows
+
+
+def with_vectors(records: Iterator[tuple[int, Any]], rows: Any) -> Iterator[tuple[int, Any]]:
+    """Pair the i-th record with row i of ``rows`` (``WithVector``; None past the last row)."""
+    for i, (offset, raw) in enumerate(records):
+        yield offset, WithVector(raw, rows[i] if i < len(rows) else None)
+
+
+def _records(path: Path, vectors_path: Path | None) -> Iterator[tuple[int, Any]]:
+    records = iter_records(path)
+    return with_vectors(records, load_vectors(vectors_path)) if vectors_path is not None else records
+
+
+class _RejectWriter:
+    """Append-only NDJSON reject file, created on the first rejected row."""
+
+    def __init__(self, path: Path | None, append: bool = False) -> None:
+        self.path = path
+        self._mode = "a" if append else "w"
+        self._file: IO[str] | None = None
+
+    def write(self, line_no: int, error: Exception, raw: Any) -> None:
+        if self.path is None:
+            return
+        if self._file is None:
+            self._file = open(self.path, self._mode, encoding="utf-8")
+        raw = unwrap_raw(raw)
+        raw_text = raw.rstrip("\n") if isinstance(raw, str) else json.dumps(raw)
+        record = {"line": line_no, "error": f"{type(error).__name__}: {error}", "raw": raw_text}
+        self._file.write(json.dumps(record) + "\n")
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+
+def ingest(
+    index_service: IndexService,
+    path: Path,
+    batch_size: int = 500,
+    reject_path: Path | None = None,
+    progress: Callable[[IngestReport], None] | None = None,
+    queue_batches: int = 2,
+    vectors_path: Path | None = None,
+    embedding_model_id: str | None = None,
+) -> IngestReport:
+    """Stream the ads in ``path`` into the collection; bad rows go to ``reject_path``.
+
+    ``embedding_model_id`` names the model that produced precomputed vectors
+    (ValueError if it is not the collection's).
+    """
+    report = IngestReport(reject_path=str(reject_path) if reject_path is not None else None)
+    vectors = index_service.precomputed_vectors(embedding_model_id)
+    records = _records(path, vectors_path)
+    batches: queue.Queue = queue.Queue(maxsize=queue_batches)
+    stop = threading.Event()
+    rejects = _RejectWriter(reject_path)
+
+    def put(item: Any) -> bool:
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def read() -> None:
+        try:
+            ads: list[Ad] = []
+            batch_vectors: list[list[float] | None] = []
+            for line_no, raw in records:
+                report.read += 1
+                try:
+                    ad, vector = vectors.parse(raw)
+                except Exception as e:
+                    report.rejected += 1
+                    rejects.write(line_no, e, raw)
+                    continue
+                ads.append(ad)
+                batch_vectors.append(vector)
+                if len(ads) >= batch_size:
+                    if not put((ads, batch_vectors)):
+                        return
+                    ads, batch_vectors = [], []
+            if ads:
+                put((ads, batch_vectors))
+            put(_DONE)
+        except BaseException as e:  # file-level failure: hand it to the consumer
+            put(e)
+
+    t0 = time.perf_counter()
+    reader = threading.Thread(target=read, name="ad-ingest-reader", daemon=True)
+    reader.start()
+    try:
+        while True:
+            item = batches.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            report.upserted += index_service.upsert_ads(*item)
+            report.batches += 1
+            report.seconds = time.perf_counter() - t0
+            if progress is not None:
+                progress(report)
+    finally:
+        stop.set()
+        reader.join()
+        rejects.close()
+    report.seconds = time.perf_counter() - t0
+    return report
+
+
+def _source_identity(path: Path) -> dict[str, Any]:
+    st = path.stat()
+    return {"source": str(path.resolve()), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def load_checkpoint(state_path: Path, path: Path) -> int:
+    """Line number to resume after (0 = start); ValueError if the state belongs to another file."""
+    if not state_path.exists():
+        return 0
+    state = json.loads(state_path.read_text(encoding="utf-8"))
+    identity = _source_identity(path)
+    if any(state.get(k) != v for k, v in identity.items()):
+        raise ValueError(
+            f"checkpoint {state_path} was written for {state.get('source')} "
+            f"(size {state.get('size')}); remove it to start over"
+        )
+    return int(state.get("offset", 0))
+
+
+def _write_checkpoint(state_path: Path, identity: dict[str, Any], offset: int, report: BulkLoadReport) -> None:
+    tmp = state_path.with_name(state_path.name + ".tmp")
+    tmp.write_text(
+        json.dumps({**identity, "offset": offset, "upserted": report.upserted, "updated_at": time.time()}),
+        encoding="utf-8",
+    )
+    os.replace(tmp, state_path)
+
+
+def bulk_ingest(
+    index_service: IndexService,
+    path: Path,
+    state_path: Path,
+    reject_path: Path | None = None,
+    restart: bool = False,
+    progress: Callable[[BulkLoadReport], None] | None = None,
+    vectors_path: Path | None = None,
+    embedding_model_id: str | None = None,
+    **options: Any,
+) -> BulkLoadReport:
+    """Resumable load of ``path``; ``options`` go to ``IndexService.bulk_load`` (batch_size, embed_workers, ...)."""
+    vectors = index_service.precomputed_vectors(embedding_model_id)
+    if restart:
+        state_path.unlink(missing_ok=True)
+    start_after = load_checkpoint(state_path, path)
+    identity = _source_identity(path)
+    rejects = _RejectWriter(reject_path, append=start_after > 0)
+
+    def checkpoint(offset: int, report: BulkLoadReport) -> None:
+        _write_checkpoint(state_path, identity, offset, report)
+        if progress is not None:
+            progress(report)
+
+    try:
+        report = index_service.bulk_load(
+            _records(path, vectors_path),
+            start_after,
+            on_checkpoint=checkpoint,
+            on_reject=rejects.write,
+            vectors=vectors,
+            **options,
+        )
+    finally:
+        rejects.close()
+    state_path.unlink(missing_ok=True)
+    return report
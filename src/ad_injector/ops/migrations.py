@@ -1,7 +1,299 @@
-"""Schema migrations (optional).
+"""Schema / embedding-model migrations as a background re-index with an alias cutover.
 
-Use collection_migrate(from_version, to_version) via Control Plane MCP
-or run one-off scripts here for re-indexing / payload changes.
+``migrate_collection`` (the ``collection_migrate`` Control Plane tool runs it
+as a background job) never touches the live collection until the very end:
+
+1. prepare: pick the next versioned collection (``<name>_v<n>``) and create
+   it with the target dimension.
+2. copy: scroll the live collection in pages of ``page_size``; payloads go
+   through the registered transform for ``(from_version, to_version)``
+   (``register_transform``) and, when re-embedding, pages are embedded on
+   ``workers`` threads.  Pages are upserted in scroll order, throttled to
+   ``max_ads_per_second``, and the scroll offset is checkpointed to the state
+   file after each one.
+3. catch-up: ads changed on the live collection meanwhile (the catalog change
+   log since the version recorded at the start) are re-read with their stored
+   vectors and copied like the pages (transformed, re-embedded only when
+   re-embedding), or deleted.  If the log no longer covers that window, the
+   copy starts over.
+4. verify: the point counts must match and the sample recall (top-k overlap
+   with the live collection, or self-recall after re-embedding) must reach
+   ``min_recall``.
+5. cutover: the served name is switched to the new collection in one alias
+   operation, ``ads_meta`` gets the new dimension / model / schema version,
+   and a collection-wide catalog change makes Data Planes flush their caches.
+   The old collection is kept for rollback unless ``drop_old``.
+
+Every step is resumable: re-running the same plan with the same state file
+continues where the previous run stopped (crash, cancellation or a failed
+verification); a different plan is refused until the state file is removed.
+Writes that land on the live collection in the instant between the last
+catch-up and the alias switch are not copied, so pause ingestion for the
+cutover of a busy catalog.  After an embedding-model change, Data Planes
+must run with the new ``EMBEDDING_MODEL_ID``.
 """
 
-__all__: list[str] = []
+from __future__ import annotations
+
+import json
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from ..domain.filters import VectorFilter
+from ..models import Ad
+from ..services.catalog import CATALOG_VERSION_KEY, changed_since
+from ..services.index_service import IndexService
+
+PayloadTransform = Callable[[dict], dict]
+
+# (from_version, to_version) -> payload transform; identity when not registered
+PAYLOAD_TRANSFORMS: dict[tuple[str, str], PayloadTransform] = {}
+
+
+def register_transform(from_version: str, to_version: str) -> Callable[[PayloadTransform], PayloadTransform]:
+    """Decorator registering the stored-payload transform of a schema migration."""
+
+    def decorator(fn: PayloadTransform) -> PayloadTransform:
+        PAYLOAD_TRANSFORMS[(from_version, to_version)] = fn
+        return fn
+
+    return decorator
+
+
+@dataclass(frozen=True)
+class MigrationPlan:
+    """What to migrate to; ``reembed`` defaults to "the embedding model changes"."""
+
+    from_version: str
+    to_version: str
+    embedding_model_id: str | None = None
+    dimension: int | None = None
+    reembed: bool | None = None
+
+
+def _write_state(state_path: Path, state: dict[str, Any]) -> None:
+    tmp = state_path.with_name(state_path.name + ".tmp")
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp.write_text(json.dumps({**state, "updated_at": time.time()}), encoding="utf-8")
+    os.replace(tmp, state_path)
+
+
+def _embedder(provider: Any) -> Callable[[list[str]], list[list[float]]]:
+    embed_batch = getattr(provider, "embed_batch", None)
+    return embed_batch if embed_batch is not None else (lambda texts: [provider.embed(t) for t in texts])
+
+
+def _vector_list(vector: Any) -> list[float]:
+    return vector.tolist() if hasattr(vector, "tolist") else list(vector)
+
+
+def migrate_collection(
+    index_service: IndexService,
+    plan: MigrationPlan,
+    state_path: Path,
+    embedding_provider: Any | None = None,
+    *,
+    page_size: int = 1000,
+    workers: int = 2,
+    max_ads_per_second: float = 0.0,
+    sample_size: int = 50,
+    recall_k: int = 10,
+    min_recall: float = 0.9,
+    drop_old: bool = False,
+    restart: bool = False,
+    progress: Callable[[int, int], None] | None = None,
+    check: Callable[[], None] | None = None,
+) -> dict[str, Any]:
+    """Run (or resume) ``plan``; returns a summary.  See the module docstring.
+
+    ``embedding_provider`` embeds with the target model (required when the
+    model changes); ``check`` is called between pages and may raise to stop
+    (the state file is kept for a resume).  Raises ``ValueError`` when the plan
+    does not apply or verification fails.
+    """
+    store = index_service.vector_store
+    info = index_service.collection_info()
+    if restart:
+        state_path.unlink(missing_ok=True)
+    plan_dict = asdict(plan)
+    state: dict[str, Any] | None = None
+    if state_path.exists():
+        state = json.loads(state_path.read_text(encoding="utf-8"))
+        if state.get("plan") != plan_dict:
+            raise ValueError(f"another migration is in progress ({state_path}: {state.get('plan')}); pass restart")
+    elif str(info.get("schema_version")) != plan.from_version:
+        raise ValueError(f"collection is at schema_version {info.get('schema_version')!r}, not {plan.from_version!r}")
+
+    model = plan.embedding_model_id or info["embedding_model_id"]
+    reembed = plan.reembed if plan.reembed is not None else model != info["embedding_model_id"]
+    if model != info["embedding_model_id"] and embedding_provider is None:
+        raise ValueError(f"re-embedding with {model!r} needs an embedding provider for that model")
+    embed_new = _embedder(embedding_provider) if embedding_provider is not None else index_service.embed_texts
+    transform = PAYLOAD_TRANSFORMS.get((plan.from_version, plan.to_version), lambda payload: payload)
+
+    if state is None:
+        dimension = plan.dimension or (len(embed_new(["dimension probe"])[0]) if reembed else info["dimension"])
+        state = {
+            "plan": plan_dict,
+            "source": store.live_collection(),
+            "target": store.next_collection_name(),
+            "dimension": dimension,
+            "phase": "copy",
+            "offset": None,
+            "copied": 0,
+            "caught_up": 0,
+            "deleted": 0,
+            "start_version": store.catalog_state().get(CATALOG_VERSION_KEY, 0),
+            "started_at": time.time(),
+        }
+        _write_state(state_path, state)
+    target = store.open_collection(state["target"], state["dimension"])
+    total = int(info.get("points_count") or 0)
+    t0 = time.perf_counter()
+
+    def convert(points: list[tuple[dict, Any]]) -> list[tuple[dict, Any]]:
+        payloads = [transform(dict(payload)) for payload, _ in points]
+        if not reembed:
+            return [(payload, _vector_list(vector)) for payload, (_, vector) in zip(payloads, points)]
+        vectors = embed_new([Ad.from_pinecone_metadata(p).embedding_text for p in payloads])
+        return [({**p, "embedding_version": model}, v) for p, v in zip(payloads, vectors)]
+
+    def copy_all() -> None:
+        copied_at_start = state["copied"]
+        pending: deque = deque()
+        offset, more = state["offset"], True
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="ad-migrate") as pool:
+            while more or pending:
+                while more and len(pending) < 2 * max(1, workers):
+                    page, next_offset = store.scroll_page(offset, page_size)
+                    pending.append((pool.submit(convert, page), next_offset))
+                    offset, more = next_offset, next_offset is not None
+                future, next_offset = pending.popleft()
+                if check is not None:
+                    check()
+                points = future.result()
+                if points:
+                    target.upsert_payloads(points)
+                state["copied"] += len(points)
+                state["offset"] = next_offset
+                _write_state(state_path, state)
+                if progress is not None:
+                    progress(state["copied"], max(total, state["copied"]))
+                if max_ads_per_second > 0:
+                    ahead = (state["copied"] - copied_at_start) / max_ads_per_second - (time.perf_counter() - t0)
+                    if ahead > 0:
+                        time.sleep(ahead)
+
+    def catch_up() -> bool:
+        """Copy ads changed since ``synced_version``; True when nothing was left to copy."""
+        nonlocal target
+        catalog = store.catalog_state()
+        version = catalog.get(CATALOG_VERSION_KEY, 0)
+        changed = changed_since(catalog, state["synced_version"])
+        if changed is None:  # the change log no longer covers the window: copy everything again
+            store.drop_collection(state["target"])
+            target = store.open_collection(state["target"], state["dimension"])
+            state.update(phase="copy", offset=None, copied=0, start_version=version)
+            _write_state(state_path, state)
+            return False
+        ad_ids = sorted(changed)
+        for i in range(0, len(ad_ids), page_size):
+            chunk = ad_ids[i : i + page_size]
+            stored = store.get_points(chunk)
+            missing = [ad_id for ad_id in chunk if ad_id not in stored]
+            if missing:
+                target.delete_ads(missing)
+                state["deleted"] += len(missing)
+            if stored:
+                target.upsert_payloads(convert([stored[ad_id] for ad_id in chunk if ad_id in stored]))
+                state["caught_up"] += len(stored)
+        state["synced_version"] = version
+        _write_state(state_path, state)
+        return not changed
+
+    while state["phase"] != "verify":
+        if state["phase"] == "copy":
+            copy_all()
+            state.update(phase="catch_up", synced_version=state["start_version"])
+            _write_state(state_path, state)
+        for _ in range(5):
+            if check is not None:
+                check()
+            if state["phase"] != "catch_up" or catch_up():
+                break
+        if state["phase"] == "catch_up":
+            state["phase"] = "verify"
+            _write_state(state_path, state)
+
+    live_count = int(store.collection_info().get("points_count") or 0)
+    target_count = int(target.collection_info().get("points_count") or 0)
+    if target_count != live_count:
+        state["phase"] = "catch_up"
+        _write_state(state_path, state)
+        raise ValueError(f"count mismatch: live {live_count}, {state['target']} {target_count}; re-run to resume")
+    recall = _sample_recall(store, target, sample_size, recall_k, compare_neighbours=not reembed)
+    if recall < min_recall:
+        raise ValueError(f"sample recall {recall:.3f} below {min_recall}; {state['target']} kept, alias unchanged")
+
+    previous = store.switch_alias(state["target"])
+    store.ensure_collection(state["dimension"], embedding_model_id=model, schema_version=plan.to_version)
+    index_service.record_catalog_change(None)
+    dropped = False
+    if drop_old and previous is not None and previous != state["target"]:
+        store.drop_collection(previous)
+        dropped = True
+    summary = {
+        "source": state["source"],
+        "target": state["target"],
+        "previous": previous,
+        "dropped_old": dropped,
+        "from_version": plan.from_version,
+        "to_version": plan.to_version,
+        "embedding_model_id": model,
+        "dimension": state["dimension"],
+        "reembedded": reembed,
+        "copied": state["copied"],
+        "caught_up": state["caught_up"],
+        "deleted": state["deleted"],
+        "points_count": target_count,
+        "sample_recall": round(recall, 4),
+        "seconds": round(time.time() - state["started_at"], 3),
+    }
+    state_path.unlink(missing_ok=True)
+    return summary
+
+
+def _sample_recall(source: Any, target: Any, sample_size: int, k: int, compare_neighbours: bool) -> float:
+    """Mean top-``k`` overlap of the target with the source (or self-recall) over sampled enabled ads."""
+    points: list[tuple[dict, Any]] = []
+    offset, seen = None, 0
+    rng = random.Random(0)
+    while True:  # reservoir sample over the target collection
+        page, offset = target.scroll_page(offset, 1000)
+        for payload, vector in page:
+            if payload.get("enabled", True) is False:
+                continue
+            seen += 1
+            if len(points) < sample_size:
+                points.append((payload, vector))
+            elif (j := rng.randrange(seen)) < sample_size:
+                points[j] = (payload, vector)
+        if offset is None:
+            break
+    if not points:
+        return 1.0
+    no_filter = VectorFilter()
+    total = 0.0
+    for payload, vector in points:
+        vector = _vector_list(vector)
+        got = {hit.ad_id for hit in target.query(vector, no_filter, k)}
+        expected = {hit.ad_id for hit in source.query(vector, no_filter, k)} if compare_neighbours else set()
+        expected = expected or {payload["ad_id"]}
+        total += len(got & expected) / len(expected)
+    return total / len(points)
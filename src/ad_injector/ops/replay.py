@@ -0,0 +1,131 @@
+"""Query-log replay: compare a target configuration against recorded traffic.
+
+Records come from the sampled ads_match log (``mcp.query_log``).  ``replay``
+re-issues each canonical request against a ``MatchService`` — at original
+pacing (``speed=1``), accelerated (``speed=N``) or as fast as possible
+(``speed=0``) — and reports new vs recorded latency percentiles plus
+recall@k / exact-match rate of the returned ad_ids.  ``warm_caches`` runs the
+most recent logged requests through a service so its embedding and result
+caches start hot.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from ..mcp.query_log import iter_log_records, log_files
+from ..services.caches import request_from_canonical
+from ..services.match_service import MatchService
+
+
+def load_records(log_path: Path | str, limit: int | None = None) -> list[dict[str, Any]]:
+    """Logged records (oldest first, rotated backups and per-worker logs included); ``limit`` keeps the most recent."""
+    writers = log_files(log_path)
+    records = [
+        r for files in writers for r in iter_log_records(files) if isinstance(r.get("request"), dict)
+    ]
+    if len(writers) > 1:
+        records.sort(key=lambda r: r.get("ts", 0))
+    if limit is not None:
+        records = records[-limit:] if limit else []
+    return records
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(q * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def _summary(values: list[float]) -> dict[str, float]:
+    s = sorted(values)
+    return {q: round(_percentile(s, p), 3) for q, p in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99))} | {
+        "max": round(s[-1], 3) if s else 0.0,
+    }
+
+
+def replay(
+    service: MatchService,
+    records: list[dict[str, Any]],
+    speed: float = 0.0,
+    concurrency: int = 1,
+) -> dict[str, Any]:
+    """Replay ``records`` against ``service`` and compare with what was recorded.
+
+    ``speed`` scales the recorded inter-arrival gaps (1 = original, 10 = ten
+    times faster, 0 = no pacing).  Latency here is ``MatchService.match`` only.
+    """
+    new_latency: list[float] = []
+    old_latency: list[float] = []
+    recalls: list[float] = []
+    exact = 0
+    compared = 0
+    errors = 0
+    lock = threading.Lock()
+
+    def run_one(record: dict[str, Any]) -> None:
+        nonlocal exact, compared, errors
+        try:
+            request = request_from_canonical(record["request"])
+            t0 = time.perf_counter()
+            response, _ = service.match(request)
+            ms = (time.perf_counter() - t0) * 1000
+        except Exception:
+            with lock:
+                errors += 1
+            return
+        new_ids = [c.ad_id for c in response.candidates]
+        old_ids = record.get("ad_ids")
+        with lock:
+            new_latency.append(ms)
+            if "latency_ms" in record:
+                old_latency.append(float(record["latency_ms"]))
+            if old_ids is not None:
+                compared += 1
+                exact += new_ids == old_ids
+                if old_ids:
+                    recalls.append(len(set(new_ids) & set(old_ids)) / len(old_ids))
+
+    ts0 = records[0].get("ts", 0.0) if records else 0.0
+    t_start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = []
+        for record in records:
+            if speed > 0:
+                due = (record.get("ts", ts0) - ts0) / speed
+                delay = due - (time.monotonic() - t_start)
+                if delay > 0:
+                    time.sleep(delay)
+            futures.append(pool.submit(run_one, record))
+        for f in futures:
+            f.result()
+    duration = time.monotonic() - t_start
+
+    return {
+        "requests": len(records),
+        "completed": len(new_latency),
+        "errors": errors,
+        "duration_seconds": round(duration, 3),
+        "speed": speed,
+        "concurrency": concurrency,
+        "latency_ms": {"recorded": _summary(old_latency), "replayed": _summary(new_latency)},
+        "recall_at_k": round(sum(recalls) / len(recalls), 4) if recalls else None,
+        "exact_match_rate": round(exact / compared, 4) if compared else None,
+    }
+
+
+def warm_caches(service: MatchService, log_path: Path | str, limit: int = 1000) -> int:
+    """Run the most recent ``limit`` logged requests through ``service``; returns the count warmed."""
+    warmed = 0
+    for record in load_records(log_path, limit):
+        try:
+            service.match(request_from_canonical(record["request"]))
+        except Exception:
+            continue
+        warmed += 1
+    return warmed
@@ -0,0 +1,101 @@
+"""Catalog snapshots: export a collection to memory-mappable files, import without embedding.
+
+``export_snapshot`` streams the live collection page by page (``scroll_page``)
+into a snapshot directory (``adapters.catalog_snapshot``): vectors as one
+float32 matrix, payloads column by column, and a manifest with the
+collection's ``ads_meta``.  ``import_snapshot`` bulk-loads a snapshot into
+the configured collection with the stored vectors, so a new node (or a
+Qdrant restore) needs no embedding work; the in-process store can also serve
+a snapshot directly (``SNAPSHOT_PATH``).
+"""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from ..adapters.catalog_snapshot import CatalogSnapshot, SnapshotWriter
+from ..services.index_service import IndexService
+
+
+def export_snapshot(
+    index_service: IndexService,
+    directory: Path,
+    page_size: int = 1000,
+    progress: Callable[[int, int], None] | None = None,
+) -> dict[str, Any]:
+    """Write the live collection to ``directory``; returns the manifest."""
+    store = index_service.vector_store
+    info = index_service.collection_info()
+    total = int(info.get("points_count") or 0)
+    writer = SnapshotWriter(directory, int(info["dimension"]))
+    t0 = time.perf_counter()
+    try:
+        offset = None
+        while True:
+            page, offset = store.scroll_page(offset, page_size)
+            writer.write(page)
+            if progress is not None:
+                progress(writer.count, max(total, writer.count))
+            if offset is None:
+                break
+    except BaseException:
+        writer.abort()
+        raise
+    ads_meta = {key: info[key] for key in ("dimension", "embedding_model_id", "schema_version")}
+    return writer.close(
+        ads_meta,
+        collection=store.live_collection(),
+        catalog_version=info.get("catalog_version", 0),
+        export_seconds=round(time.perf_counter() - t0, 3),
+    )
+
+
+def import_snapshot(
+    index_service: IndexService,
+    directory: Path,
+    batch_size: int = 1000,
+    progress: Callable[[int, int], None] | None = None,
+) -> dict[str, Any]:
+    """Upsert every ad of the snapshot in ``directory`` with its stored vector; returns a summary.
+
+    The collection is created with the snapshot's ``ads_meta`` when it is
+    missing or empty; a non-empty collection must have the same dimension and
+    embedding model (``ValueError`` otherwise).
+    """
+    snapshot = CatalogSnapshot(directory)
+    meta = snapshot.ads_meta
+    store = index_service.vector_store
+    try:
+        info: dict[str, Any] | None = index_service.collection_info()
+    except Exception:  # no collection yet
+        info = None
+    if info is not None and int(info.get("points_count") or 0) > 0:
+        ours = (int(info["dimension"]), info["embedding_model_id"])
+        theirs = (snapshot.dimension, meta.get("embedding_model_id"))
+        if ours != theirs:
+            raise ValueError(f"snapshot (dimension, model) {theirs} does not match the collection's {ours}")
+    else:
+        store.ensure_collection(
+            snapshot.dimension,
+            embedding_model_id=meta.get("embedding_model_id"),
+            schema_version=meta.get("schema_version"),
+        )
+    t0 = time.perf_counter()
+    upserted = 0
+    for page in snapshot.iter_points(batch_size):
+        # Only the last page waits: once it is applied, every earlier one is too
+        upserted += store.upsert_payloads(page, wait=upserted + len(page) >= snapshot.count)
+        if progress is not None:
+            progress(upserted, snapshot.count)
+    index_service.record_catalog_change(None)
+    seconds = time.perf_counter() - t0
+    return {
+        "upserted": upserted,
+        "dimension": snapshot.dimension,
+        "embedding_model_id": meta.get("embedding_model_id"),
+        "source_collection": snapshot.manifest.get("collection"),
+        "seconds": round(seconds, 3),
+        "ads_per_second": round(upserted / seconds, 1) if seconds > 0 else 0.0,
+    }
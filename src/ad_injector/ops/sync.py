@@ -0,0 +1,155 @@
+"""Delta sync for ``ad-index sync``: apply only what changed in a regenerated catalog file.
+
+Every stored payload carries ``content_hash`` (creative, targeting, policy)
+and ``embedding_hash`` (``embedding_text``), see ``Ad.to_pinecone_metadata``.
+``sync_catalog`` reads those hashes for the whole collection with a
+payload-projected scroll (no vectors transferred), then streams the catalog
+file (same formats as ``seed``) and sorts every ad into:
+
+- unchanged: same content hash, nothing is written;
+- updated: content changed but ``embedding_text`` did not (and the stored
+  vector is from the collection's model): the payload is rewritten and the
+  vector kept;
+- re-embedded / added: embedded and upserted like ``seed``;
+- deleted: stored ads missing from the file, removed in batches.
+
+Ads stored before the hashes existed count as changed once.  Because
+unchanged ads are not rewritten, ads switched off with ``ads_bulk_disable``
+stay disabled until their content changes.  Deletions are skipped when a row
+could not be attributed to an ad_id (unparseable JSON), since its ad would
+otherwise be removed; rows that parse but fail validation still count as
+present.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from ..models import Ad
+from ..services.index_service import IndexService
+from .ingest import _RejectWriter, iter_records
+
+SYNC_FIELDS = ["ad_id", "content_hash", "embedding_hash", "embedding_version"]
+
+
+@dataclass(slots=True)
+class SyncReport:
+    """Diff of one sync run (also passed to the progress callback)."""
+
+    read: int = 0
+    unchanged: int = 0
+    added: int = 0
+    updated: int = 0
+    reembedded: int = 0
+    deleted: int = 0
+    rejected: int = 0
+    deletes_skipped: bool = False
+    dry_run: bool = False
+    seconds: float = 0.0
+    reject_path: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "seconds": round(self.seconds, 3)}
+
+
+def stored_hashes(index_service: IndexService, model: str, page_size: int = 1000) -> dict[str, tuple[Any, Any]]:
+    """``ad_id -> (content_hash, embedding_hash)`` for every stored ad, from a payload-projected scroll.
+
+    The embedding hash is None when the stored vector is not from ``model`` (it cannot be reused).
+    """
+    store = index_service.vector_store
+    out: dict[str, tuple[Any, Any]] = {}
+    offset = None
+    while True:
+        page, offset = store.scroll_fields(SYNC_FIELDS, offset, page_size)
+        for payload in page:
+            embedding = payload.get("embedding_hash") if payload.get("embedding_version") == model else None
+            out[payload["ad_id"]] = (payload.get("content_hash"), embedding)
+        if offset is None:
+            return out
+
+
+def sync_catalog(
+    index_service: IndexService,
+    path: Path,
+    batch_size: int = 500,
+    reject_path: Path | None = None,
+    delete_missing: bool = True,
+    dry_run: bool = False,
+    page_size: int = 1000,
+    progress: Callable[[SyncReport], None] | None = None,
+) -> SyncReport:
+    """Make the collection match the catalog in ``path``, writing only the differences."""
+    report = SyncReport(dry_run=dry_run, reject_path=str(reject_path) if reject_path is not None else None)
+    t0 = time.perf_counter()
+    model = index_service.collection_info()["embedding_model_id"]
+    stored = stored_hashes(index_service, model, page_size)
+    rejects = _RejectWriter(reject_path)
+    seen: set[str] = set()
+    unattributed = 0
+    upserts: list[Ad] = []
+    updates: list[Ad] = []
+
+    def flush(final: bool = False) -> None:
+        wrote = False
+        if upserts and (final or len(upserts) >= batch_size):
+            if not dry_run:
+                index_service.upsert_ads(upserts)
+            upserts.clear()
+            wrote = True
+        if updates and (final or len(updates) >= batch_size):
+            if not dry_run:
+                index_service.update_ads(updates)
+            updates.clear()
+            wrote = True
+        if wrote and progress is not None:
+            report.seconds = time.perf_counter() - t0
+            progress(report)
+
+    try:
+        for line_no, raw in iter_records(path):
+            report.read += 1
+            item: Any = None
+            try:
+                item = json.loads(raw) if isinstance(raw, str) else raw
+                ad = Ad.model_validate(item)
+            except Exception as e:
+                report.rejected += 1
+                rejects.write(line_no, e, raw)
+                if isinstance(item, dict) and isinstance(item.get("ad_id"), str):
+                    seen.add(item["ad_id"])  # a bad row is not a removal
+                else:
+                    unattributed += 1
+                continue
+            seen.add(ad.ad_id)
+            current = stored.get(ad.ad_id)
+            if current is None:
+                report.added += 1
+                upserts.append(ad)
+            elif current[0] == ad.content_hash:
+                report.unchanged += 1
+            elif current[1] == ad.embedding_hash:
+                report.updated += 1
+                updates.append(ad)
+            else:
+                report.reembedded += 1
+                upserts.append(ad)
+            flush()
+        flush(final=True)
+
+        missing = [ad_id for ad_id in stored if ad_id not in seen]
+        if missing and delete_missing:
+            if unattributed:
+                report.deletes_skipped = True
+            else:
+                for i in range(0, len(missing), batch_size):
+                    chunk = missing[i : i + batch_size]
+                    report.deleted += len(chunk) if dry_run else len(index_service.delete_ads(chunk))
+    finally:
+        rejects.close()
+    report.seconds = time.perf_counter() - t0
+    return report
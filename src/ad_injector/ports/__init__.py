@@ -5,13 +5,19 @@ No Qdrant, fastembed, or other infrastructure imports allowed here.
 """
 
 from .embedding import EmbeddingProvider
+from .job_store import JobStorePort
 from .id_gen import MatchIdProvider, RequestIdProvider
+from .metrics import StageObserver
+from .trace_store import TraceStorePort
 from .vector_store import VectorHit, VectorStorePort
 
 __all__ = [
     "EmbeddingProvider",
+    "JobStorePort",
     "MatchIdProvider",
     "RequestIdProvider",
+    "StageObserver",
+    "TraceStorePort",
     "VectorHit",
     "VectorStorePort",
 ]
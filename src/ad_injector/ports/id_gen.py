@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import hashlib
 import uuid
 from typing import Protocol, runtime_checkable
 
@@ -33,7 +34,25 @@ class UuidRequestIdProvider:
 
 
 class UuidMatchIdProvider:
-    """Uses uuid5(request_id, ad_id) for deterministic match IDs."""
+    """Uses uuid5(request_id, ad_id) for deterministic match IDs.
+
+    Same value as ``str(uuid.uuid5(uuid.UUID(request_id), ad_id))``, computed
+    directly from the SHA-1 digest; the parsed request_id of the previous call
+    is reused since one request assigns all of its match_ids in a row.
+    """
+
+    def __init__(self) -> None:
+        self._last: tuple[str, bytes] = ("", b"")
 
     def new_match_id(self, request_id: str, ad_id: str) -> str:
-        return str(uuid.uuid5(uuid.UUID(request_id), ad_id))
+        last = self._last
+        if last[0] == request_id:
+            namespace = last[1]
+        else:
+            namespace = uuid.UUID(request_id).bytes
+            self._last = (request_id, namespace)
+        digest = bytearray(hashlib.sha1(namespace + ad_id.encode()).digest()[:16])
+        digest[6] = (digest[6] & 0x0F) | 0x50
+        digest[8] = (digest[8] & 0x3F) | 0x80
+        h = digest.hex()
+        return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
@@ -0,0 +1,20 @@
+"""Port: durable records of Control Plane background jobs."""
+
+from __future__ import annotations
+
+from typing import Any, Protocol, runtime_checkable
+
+
+@runtime_checkable
+class JobStorePort(Protocol):
+    """Persist job records (plain JSON-able dicts keyed by ``job_id``).
+
+    ``save`` replaces the record of that job; ``load`` returns every stored
+    record (any order) so a restarted process can report earlier outcomes.
+    """
+
+    def save(self, record: dict[str, Any]) -> None: ...
+
+    def load(self) -> list[dict[str, Any]]: ...
+
+    def delete(self, job_id: str) -> None: ...
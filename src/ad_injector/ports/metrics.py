@@ -0,0 +1,15 @@
+"""Port: metrics sink for per-stage latency observations."""
+
+from __future__ import annotations
+
+from typing import Any, Protocol, runtime_checkable
+
+
+@runtime_checkable
+class StageObserver(Protocol):
+    """Record one latency observation (seconds) with string labels.
+
+    ``mcp.observability.Histogram`` satisfies this protocol.
+    """
+
+    def observe(self, value: float, **labels: Any) -> None: ...
@@ -0,0 +1,23 @@
+"""Port: storage for ads_match traces looked up by ads_explain."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Protocol, runtime_checkable
+
+if TYPE_CHECKING:
+    from ..services.match_trace import MatchTrace
+
+
+@runtime_checkable
+class TraceStorePort(Protocol):
+    """Write compact match traces; read back the materialized audit trace.
+
+    ``put`` must not block the request path for I/O; ``get`` resolves any
+    match_id of a request (or the request_id itself).
+    """
+
+    def put(self, trace: MatchTrace) -> bool: ...
+
+    def get(self, match_id: str) -> dict[str, Any] | None: ...
+
+    def stats(self) -> dict[str, Any]: ...
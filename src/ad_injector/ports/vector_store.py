@@ -2,20 +2,24 @@
 
 from __future__ import annotations
 
-from typing import Protocol, runtime_checkable
-
-from pydantic import BaseModel, Field
+from dataclasses import dataclass
+from typing import Any, Iterator, Protocol, runtime_checkable
 
 from ..domain.filters import VectorFilter
 
 
-class VectorHit(BaseModel):
-    """A single result from a vector similarity query."""
+@dataclass(slots=True)
+class VectorHit:
+    """A single result from a vector similarity query.
+
+    Plain slotted dataclass (no validation): adapters build one per returned
+    point on the hot path from trusted stored payloads.
+    """
 
-    ad_id: str = Field(..., description="Ad identifier")
-    advertiser_id: str = Field(..., description="Advertiser identifier")
-    score: float = Field(..., description="Similarity score")
-    payload: dict = Field(..., description="Full stored metadata")
+    ad_id: str  # Ad identifier
+    advertiser_id: str  # Advertiser identifier
+    score: float  # Similarity score
+    payload: dict[str, Any]  # Full stored metadata
 
 
 @runtime_checkable
@@ -31,6 +35,23 @@ class VectorStorePort(Protocol):
         top_k: int,
     ) -> list[VectorHit]: ...
 
+    def scroll_ads(self, batch_size: int = 256) -> Iterator[tuple[dict, Any]]:
+        """Yield ``(payload, vector)`` for every stored ad (vector: sequence of floats)."""
+        ...
+
+    def scroll_page(self, offset: Any = None, limit: int = 256) -> tuple[list[tuple[dict, Any]], Any]:
+        """One page of ``(payload, vector)`` from ``offset`` (None = start) and the next offset.
+
+        The next offset is JSON-serializable (resumable) and None after the last page.
+        """
+        ...
+
+    def scroll_fields(
+        self, fields: list[str], offset: Any = None, limit: int = 1024
+    ) -> tuple[list[dict], Any]:
+        """Like ``scroll_page`` but payloads only, projected to ``fields`` (no vectors transferred)."""
+        ...
+
     # --- mutations ---
 
     def ensure_collection(self, dimension: int) -> dict: ...
@@ -40,11 +61,78 @@ class VectorStorePort(Protocol):
     def collection_info(self) -> dict: ...
 
     def upsert_batch(
-        self, ads_with_embeddings: list[tuple[object, list[float]]]
-    ) -> int: ...
+        self, ads_with_embeddings: list[tuple[object, list[float]]], wait: bool = True
+    ) -> int:
+        """Upsert; ``wait=False`` may return before the write is applied (a later
+        ``wait=True`` upsert returns only once every earlier one is applied)."""
+        ...
+
+    def upsert_payloads(self, payloads_with_vectors: list[tuple[dict, Any]], wait: bool = True) -> int:
+        """Upsert stored-format payloads (as returned by ``scroll_page``) verbatim."""
+        ...
+
+    def update_payloads(self, payloads: list[dict], wait: bool = True) -> int:
+        """Replace the payloads of existing points (by ``payload["ad_id"]``), keeping their vectors."""
+        ...
 
     def delete_ad(self, ad_id: str) -> None: ...
 
+    def delete_ads(self, ad_ids: list[str]) -> int:
+        """Delete many ads in one request per chunk (unknown ids are ignored); returns the ids sent."""
+        ...
+
     def get_ad(self, ad_id: str) -> dict | None: ...
 
+    def get_ads(self, ad_ids: list[str], fields: list[str] | None = None) -> dict[str, dict]:
+        """``ad_id -> payload`` (projected to ``fields`` when given) for the stored ones, one request per chunk."""
+        ...
+
+    def get_points(self, ad_ids: list[str]) -> dict[str, tuple[dict, Any]]:
+        """``ad_id -> (payload, vector)`` (as ``scroll_page`` yields them) for the stored ones, one request per chunk."""
+        ...
+
     def bulk_disable(self, filter_spec: dict) -> int: ...
+
+    def reconnect(self) -> None:
+        """Drop connections inherited across ``os.fork``; the next call opens this process's own."""
+        ...
+
+    # --- catalog version / change feed (collection metadata) ---
+
+    def catalog_state(self) -> dict:
+        """``{"catalog_version": int, "catalog_changes": [[version, ad_ids | None], ...]}`` in one read.
+
+        Empty dict when nothing was recorded yet.
+        """
+        ...
+
+    def catalog_version(self) -> int:
+        """``catalog_version`` alone (0 when nothing was recorded): the cheap read for pollers."""
+        ...
+
+    def set_catalog_state(self, state: dict, expected_version: int | None = None) -> bool:
+        """Store ``state``; with ``expected_version``, only if the stored version still equals it.
+
+        Returns False when the conditional write lost to another writer.
+        """
+        ...
+
+    # --- versioned collections behind the served name (migrations) ---
+
+    def live_collection(self) -> str:
+        """Physical collection currently served."""
+        ...
+
+    def next_collection_name(self) -> str: ...
+
+    def open_collection(self, name: str, dimension: int) -> VectorStorePort:
+        """Store bound to physical collection ``name``, created if missing."""
+        ...
+
+    def switch_alias(self, name: str) -> str | None:
+        """Serve ``name`` from now on (atomically for readers); returns the previously served collection."""
+        ...
+
+    def drop_collection(self, name: str) -> None:
+        """Delete a collection that is not served (ValueError for the live one)."""
+        ...
@@ -0,0 +1,314 @@
+"""Staged bulk-load pipeline used by ``IndexService.bulk_load``.
+
+Depends only on ports and models — no infrastructure imports.
+
+Stages run in their own threads connected by bounded queues (a full queue
+blocks the stage before it, so a slow embedder or vector store throttles the
+reader instead of letting batches pile up in memory)::
+
+    reader -> validator -> embedder pool (N threads) -> uploader
+
+The validator turns each raw record into an ``Ad`` plus an optional
+precomputed vector (``parse``, see ``services.precomputed``); the embedder
+pool embeds only the ads without one.  The reader groups ``(offset, raw)`` records into numbered batches, skipping
+offsets up to ``start_after``.  The uploader reorders batches by number (the
+embedder pool finishes them out of order) so a later row for the same ad_id
+always wins; a semaphore bounds the batches between validator and upload so
+the reorder buffer cannot grow behind one slow embedder.  It issues non-blocking upserts (``wait=False``) and makes every
+``barrier_every``-th upsert, and the last one, blocking: a consistency
+barrier, since once it returns every earlier upsert is applied.  Only then
+are the offset of that batch and the changed ad_ids reported
+(``on_checkpoint``), so a restart from the checkpoint never skips a row that
+was not stored.
+
+``BulkLoadReport.stages`` gives per-stage items, busy seconds (throughput =
+items / busy) and seconds blocked on a full output queue (backpressure).
+"""
+
+from __future__ import annotations
+
+import json
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable
+
+from ..models import Ad
+from .precomputed import complete_vectors
+
+_DONE = object()
+
+Record = tuple[int, Any]  # (offset, raw JSON text | dict | Ad)
+
+
+@dataclass
+class StageStats:
+    """Throughput and backpressure counters of one pipeline stage."""
+
+    items: int = 0
+    busy_seconds: float = 0.0
+    blocked_seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, items: int, busy: float = 0.0, blocked: float = 0.0) -> None:
+        with self._lock:
+            self.items += items
+            self.busy_seconds += busy
+            self.blocked_seconds += blocked
+
+    def to_dict(self) -> dict[str, float]:
+        per_second = self.items / self.busy_seconds if self.busy_seconds > 0 else 0.0
+        return {
+            "items": self.items,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "blocked_seconds": round(self.blocked_seconds, 3),
+            "per_second": round(per_second, 1),
+        }
+
+
+@dataclass
+class BulkLoadReport:
+    """Outcome of one ``bulk_load`` run."""
+
+    read: int = 0
+    skipped: int = 0
+    upserted: int = 0
+    rejected: int = 0
+    barriers: int = 0
+    checkpoint: int = 0
+    seconds: float = 0.0
+    stages: dict[str, StageStats] = field(
+        default_factory=lambda: {name: StageStats() for name in ("read", "validate", "embed", "upload")}
+    )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "read": self.read,
+            "skipped": self.skipped,
+            "upserted": self.upserted,
+            "rejected": self.rejected,
+            "barriers": self.barriers,
+            "checkpoint": self.checkpoint,
+            "seconds": round(self.seconds, 3),
+            "ads_per_second": round(self.upserted / self.seconds, 1) if self.seconds > 0 else 0.0,
+            "stages": {name: s.to_dict() for name, s in self.stages.items()},
+        }
+
+
+def validate_record(raw: Any) -> Ad:
+    """``Ad`` from a raw NDJSON line, a dict or an ``Ad``."""
+    if isinstance(raw, Ad):
+        return raw
+    return Ad.model_validate(json.loads(raw) if isinstance(raw, str) else raw)
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class BulkLoader:
+    """One run of the staged pipeline (see module docstring)."""
+
+    def __init__(
+        self,
+        embed_texts: Callable[[list[str]], list[list[float]]],
+        upsert: Callable[[list[tuple[Ad, list[float]]], bool], int],
+        *,
+        batch_size: int = 500,
+        embed_workers: int = 2,
+        queue_batches: int = 4,
+        barrier_every: int = 8,
+        on_checkpoint: Callable[[int, list[str], BulkLoadReport], None] | None = None,
+        on_reject: Callable[[int, Exception, Any], None] | None = None,
+        parse: Callable[[Any], tuple[Ad, list[float] | None]] | None = None,
+    ) -> None:
+        self._embed_texts = embed_texts
+        self._parse = parse
+        self._upsert = upsert
+        self._batch_size = max(1, batch_size)
+        self._workers = max(1, embed_workers)
+        self._queue_batches = max(1, queue_batches)
+        self._barrier_every = max(1, barrier_every)
+        self._on_checkpoint = on_checkpoint
+        self._on_reject = on_reject
+        self._stop = threading.Event()
+        # Batches between validator and upload (queues + workers + reorder buffer)
+        self._in_flight = threading.Semaphore(2 * self._queue_batches + self._workers)
+        self.report = BulkLoadReport()
+
+    def _put(self, q: queue.Queue, item: Any, stage: str) -> None:
+        t0 = time.perf_counter()
+        while True:
+            if self._stop.is_set():
+                raise _Cancelled
+            try:
+                q.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        self.report.stages[stage].add(0, blocked=time.perf_counter() - t0)
+
+    def _get(self, q: queue.Queue) -> Any:
+        while True:
+            if self._stop.is_set():
+                raise _Cancelled
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+    def _acquire_slot(self, stage: str) -> None:
+        t0 = time.perf_counter()
+        while not self._in_flight.acquire(timeout=0.1):
+            if self._stop.is_set():
+                raise _Cancelled
+        self.report.stages[stage].add(0, blocked=time.perf_counter() - t0)
+
+    # -- stages ----------------------------------------------------------
+
+    def _read(self, records: Iterable[Record], start_after: int, out: queue.Queue) -> None:
+        stats = self.report.stages["read"]
+        seq = 0
+        batch: list[Record] = []
+        t0 = time.perf_counter()
+        for offset, raw in records:
+            if offset <= start_after:
+                self.report.skipped += 1
+                continue
+            batch.append((offset, raw))
+            if len(batch) == self._batch_size:
+                stats.add(len(batch), busy=time.perf_counter() - t0)
+                self._put(out, (seq, batch), "read")
+                seq, batch = seq + 1, []
+                t0 = time.perf_counter()
+        if batch:
+            stats.add(len(batch), busy=time.perf_counter() - t0)
+            self._put(out, (seq, batch), "read")
+        self._put(out, _DONE, "read")
+
+    def _validate(self, inp: queue.Queue, out: queue.Queue) -> None:
+        stats = self.report.stages["validate"]
+        while (item := self._get(inp)) is not _DONE:
+            seq, batch = item
+            t0 = time.perf_counter()
+            ads: list[Ad] = []
+            vectors: list[list[float] | None] = []
+            for offset, raw in batch:
+                try:
+                    if self._parse is not None:
+                        ad, vector = self._parse(raw)
+                    else:
+                        ad, vector = validate_record(raw), None
+                    ads.append(ad)
+                    vectors.append(vector)
+                except Exception as e:
+                    self.report.rejected += 1
+                    if self._on_reject is not None:
+                        self._on_reject(offset, e, raw)
+            stats.add(len(batch), busy=time.perf_counter() - t0)
+            self._acquire_slot("validate")
+            self._put(out, (seq, ads, vectors, batch[-1][0], len(batch)), "validate")
+        for _ in range(self._workers):
+            self._put(out, _DONE, "validate")
+
+    def _embed(self, inp: queue.Queue, out: queue.Queue) -> None:
+        stats = self.report.stages["embed"]
+        while (item := self._get(inp)) is not _DONE:
+            seq, ads, vectors, last_offset, rows = item
+            t0 = time.perf_counter()
+            vectors = complete_vectors(self._embed_texts, ads, vectors)
+            stats.add(len(ads), busy=time.perf_counter() - t0)
+            self._put(out, (seq, list(zip(ads, vectors)), last_offset, rows), "embed")
+        self._put(out, _DONE, "embed")
+
+    def _upload(self, inp: queue.Queue) -> None:
+        pending: dict[int, tuple] = {}
+        next_seq = 0
+        # Newest non-empty batch, sent once the next one (or the end) is known so
+        # that the last upsert of the run can be the final, blocking barrier.
+        held: tuple[list, int] | None = None
+        changed: list[str] = []
+        since_barrier = 0
+        last_offset: int | None = None
+        done = 0
+        while done < self._workers:
+            item = self._get(inp)
+            if item is _DONE:
+                done += 1
+                continue
+            pending[item[0]] = item
+            while next_seq in pending:
+                _, pairs, last_offset, rows = pending.pop(next_seq)
+                next_seq += 1
+                self._in_flight.release()
+                self.report.read += rows
+                if not pairs:
+                    continue
+                if held is not None:
+                    since_barrier += 1
+                    if self._send(held, since_barrier >= self._barrier_every, changed):
+                        since_barrier = 0
+                held = (pairs, last_offset)
+        if held is not None:
+            self._send(held, True, changed)
+        if last_offset is not None and last_offset > self.report.checkpoint:
+            self._checkpoint(last_offset, changed)  # trailing batches with only rejected rows
+
+    def _send(self, held: tuple[list, int], barrier: bool, changed: list[str]) -> bool:
+        pairs, offset = held
+        t0 = time.perf_counter()
+        self.report.upserted += self._upsert(pairs, barrier)
+        self.report.stages["upload"].add(len(pairs), busy=time.perf_counter() - t0)
+        changed.extend(ad.ad_id for ad, _ in pairs)
+        if barrier:
+            self._checkpoint(offset, changed)
+            changed.clear()
+        return barrier
+
+    def _checkpoint(self, offset: int, changed: list[str]) -> None:
+        self.report.barriers += 1
+        self.report.checkpoint = offset
+        if self._on_checkpoint is not None:
+            self._on_checkpoint(offset, list(changed), self.report)
+
+    def _guarded(self, stage: Callable[..., None], *args: Any) -> None:
+        """Run a stage thread; on failure stop the others so nothing blocks on a dead queue."""
+        try:
+            stage(*args)
+        except BaseException:
+            self._stop.set()
+            raise
+
+    # -- driver ----------------------------------------------------------
+
+    def run(self, records: Iterable[Record], start_after: int = 0) -> BulkLoadReport:
+        """Load ``records`` (offset order) after ``start_after``; re-raises the first stage error."""
+        self.report.checkpoint = start_after
+        raw_q: queue.Queue = queue.Queue(self._queue_batches)
+        ads_q: queue.Queue = queue.Queue(self._queue_batches)
+        vec_q: queue.Queue = queue.Queue(self._queue_batches)
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=2 + self._workers, thread_name_prefix="ad-bulk-load") as pool:
+            futures = [
+                pool.submit(self._guarded, self._read, records, start_after, raw_q),
+                pool.submit(self._guarded, self._validate, raw_q, ads_q),
+                *(pool.submit(self._guarded, self._embed, ads_q, vec_q) for _ in range(self._workers)),
+            ]
+            error: BaseException | None = None
+            try:
+                self._upload(vec_q)
+            except BaseException as e:
+                error = e
+            self._stop.set()
+            for future in futures:
+                exc = future.exception()
+                if exc is not None and not isinstance(exc, _Cancelled) and (
+                    error is None or isinstance(error, _Cancelled)
+                ):
+                    error = exc
+        self.report.seconds = time.perf_counter() - t0
+        if error is not None:
+            raise error
+        return self.report
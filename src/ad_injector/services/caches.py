@@ -0,0 +1,208 @@
+"""Data Plane caches: request canonicalization, LRU/TTL cache, embedding and result caches.
+
+Depends only on ports and models — no infrastructure imports.
+
+- ``canonical_request`` gives a stable dict form of a ``MatchRequest``
+  (whitespace-collapsed context, sorted/deduplicated constraint lists); the
+  query log stores it and ``result_cache_key`` derives cache keys from it.
+- ``CachingEmbeddingProvider`` wraps any ``EmbeddingProvider``.
+- ``ResultCache`` holds raw vector-store hits per canonical request (policy
+  and candidate construction still run per request, so match_ids stay unique).
+  On a catalog change it drops the results that contain a changed ad; new
+  ads show up in cached results once the TTL expires.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, TypeVar
+
+from ..models.mcp_requests import MatchConstraints, MatchRequest, PlacementContext
+from ..ports.embedding import EmbeddingProvider
+from ..ports.vector_store import VectorHit
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+# ---------------------------------------------------------------------------
+# Canonical request form
+# ---------------------------------------------------------------------------
+
+
+def _norm_list(values: list[str] | None) -> list[str] | None:
+    return sorted(set(values)) if values else None
+
+
+def canonical_request(request: MatchRequest) -> dict[str, Any]:
+    """Stable, JSON-serializable form of a request (equal requests -> equal dicts)."""
+    c = request.constraints
+    return {
+        "context_text": _WHITESPACE_RE.sub(" ", request.context_text.strip()),
+        "top_k": request.top_k,
+        "placement": request.placement.placement,
+        "surface": request.placement.surface,
+        "constraints": {
+            "topics": _norm_list(c.topics),
+            "locale": c.locale or None,
+            "verticals": _norm_list(c.verticals),
+            "exclude_advertiser_ids": _norm_list(c.exclude_advertiser_ids),
+            "exclude_ad_ids": _norm_list(c.exclude_ad_ids),
+            "age_restricted_ok": c.age_restricted_ok,
+            "sensitive_ok": c.sensitive_ok,
+        },
+    }
+
+
+def request_from_canonical(data: dict[str, Any]) -> MatchRequest:
+    """Rebuild a ``MatchRequest`` from ``canonical_request`` output (e.g. a query-log line)."""
+    return MatchRequest(
+        context_text=data["context_text"],
+        top_k=data.get("top_k", 5),
+        placement=PlacementContext(
+            placement=data.get("placement", "inline"),
+            surface=data.get("surface", "chat"),
+        ),
+        constraints=MatchConstraints(**(data.get("constraints") or {})),
+    )
+
+
+def result_cache_key(canonical: dict[str, Any]) -> str:
+    """Cache key for retrieval results: placement/surface are annotate-only, so excluded."""
+    return json.dumps(
+        [canonical["context_text"], canonical["top_k"], canonical["constraints"]],
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Generic LRU with optional TTL
+# ---------------------------------------------------------------------------
+
+
+class LruCache(Generic[K, V]):
+    """Thread-safe LRU cache; entries older than ``ttl_seconds`` (if > 0) are misses."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float = 0.0) -> None:
+        self._max = max_entries
+        self._ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or (self._ttl > 0 and time.monotonic() - item[0] > self._ttl):
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def put(self, key: K, value: V) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self._max:
+                self._data.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def evict_if(self, predicate: Callable[[V], bool]) -> int:
+        """Remove entries whose value satisfies ``predicate``; returns how many were removed."""
+        with self._lock:
+            stale = [key for key, (_, value) in self._data.items() if predicate(value)]
+            for key in stale:
+                del self._data[key]
+        return len(stale)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._data), "max_entries": self._max, "hits": self.hits, "misses": self.misses}
+
+
+# ---------------------------------------------------------------------------
+# Embedding and result caches
+# ---------------------------------------------------------------------------
+
+
+class CachingEmbeddingProvider:
+    """``EmbeddingProvider`` decorator memoizing vectors by (whitespace-normalized) text."""
+
+    def __init__(self, inner: EmbeddingProvider, max_entries: int) -> None:
+        self._inner = inner
+        self._cache: LruCache[str, list[float]] = LruCache(max_entries)
+
+    def embed(self, text: str) -> list[float]:
+        vector = self._cache.get(text)
+        if vector is None:
+            vector = self._inner.embed(text)
+            self._cache.put(text, vector)
+        return vector
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """Cached vectors for the hits; the (distinct) misses go to the inner provider in one batched call."""
+        found: dict[str, list[float]] = {}
+        missing: list[str] = []
+        for text in dict.fromkeys(texts):
+            vector = self._cache.get(text)
+            if vector is None:
+                missing.append(text)
+            else:
+                found[text] = vector
+        if missing:
+            embed_batch = getattr(self._inner, "embed_batch", None)
+            vectors = embed_batch(missing) if embed_batch is not None else [self._inner.embed(t) for t in missing]
+            for text, vector in zip(missing, vectors):
+                self._cache.put(text, vector)
+                found[text] = vector
+        return [found[text] for text in texts]
+
+    def stats(self) -> dict[str, int]:
+        return self._cache.stats()
+
+
+class ResultCache:
+    """Raw vector-store hits per canonical request, bounded by entries and TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self._cache: LruCache[str, tuple[VectorHit, ...]] = LruCache(max_entries, ttl_seconds)
+
+    def get(self, key: str) -> tuple[VectorHit, ...] | None:
+        return self._cache.get(key)
+
+    def put(self, key: str, hits: list[VectorHit]) -> None:
+        self._cache.put(key, tuple(hits))
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def invalidate(self, ad_ids: frozenset[str] | None, version: int = 0) -> None:
+        """Catalog change: drop results containing any of ``ad_ids`` (None = all)."""
+        if ad_ids is None:
+            self._cache.clear()
+        else:
+            self._cache.evict_if(lambda hits: any(h.ad_id in ad_ids for h in hits))
+
+    def stats(self) -> dict[str, int]:
+        return self._cache.stats()
@@ -0,0 +1,164 @@
+"""Catalog version counter and change feed.
+
+Depends only on ports — no infrastructure imports.
+
+The Control Plane bumps a monotonically increasing ``catalog_version`` in the
+collection metadata (the ``ads_meta`` point in Qdrant) on every upsert,
+delete, bulk_disable and migration, and appends the changed ad_ids to a
+bounded ``catalog_changes`` log (``next_catalog_state``), with a conditional
+write that is retried when another writer moved the version first.  Data
+Plane nodes poll the version alone (``CatalogWatcher``), fetch the change log
+only when it moved, and pass the set of changed ad_ids to their caches;
+``None`` means "assume everything changed" (a collection-wide change, or the
+log no longer reaches back to the version the node last saw).
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Any, Iterable, Protocol
+
+from ..ports.vector_store import VectorStorePort
+
+CATALOG_VERSION_KEY = "catalog_version"
+CATALOG_CHANGES_KEY = "catalog_changes"
+
+
+class CatalogListener(Protocol):
+    """A cache that drops entries for changed ads (``ad_ids`` None = drop everything)."""
+
+    def invalidate(self, ad_ids: frozenset[str] | None, version: int) -> None: ...
+
+
+def next_catalog_state(state: dict, ad_ids: Iterable[str] | None, max_logged_ids: int = 10_000) -> dict:
+    """State after one more change: version + 1 and ``[version, ad_ids]`` appended to the log.
+
+    The log keeps the newest entries holding at most ``max_logged_ids`` ad_ids in
+    total; a single change touching more ads than that is logged as ``None``.
+    """
+    version = int(state.get(CATALOG_VERSION_KEY) or 0) + 1
+    ids = None if ad_ids is None else sorted(set(ad_ids))
+    if ids is not None and len(ids) > max_logged_ids:
+        ids = None
+    changes = [*(state.get(CATALOG_CHANGES_KEY) or ()), [version, ids]]
+    kept: list = []
+    total = 0
+    for entry in reversed(changes):
+        total += len(entry[1]) if entry[1] is not None else 1
+        if kept and total > max_logged_ids:
+            break
+        kept.append(entry)
+    kept.reverse()
+    return {CATALOG_VERSION_KEY: version, CATALOG_CHANGES_KEY: kept}
+
+
+def changed_since(state: dict, version: int) -> frozenset[str] | None:
+    """Ad_ids changed after ``version``, or None if that cannot be told from the log."""
+    current = int(state.get(CATALOG_VERSION_KEY) or 0)
+    if current < version:
+        return None  # collection re-created behind our back
+    entries = [entry for entry in state.get(CATALOG_CHANGES_KEY) or () if entry[0] > version]
+    if len(entries) < current - version:
+        return None  # log trimmed past the version we saw
+    changed: set[str] = set()
+    for _, ids in entries:
+        if ids is None:
+            return None
+        changed.update(ids)
+    return frozenset(changed)
+
+
+class CatalogWatcher:
+    """Polls the catalog state and tells the subscribed caches what changed.
+
+    The first poll only records the version.  The polling thread starts lazily
+    in the process that first calls ``ensure_running`` (so a pre-fork parent
+    can establish the version and each worker polls for itself).
+    """
+
+    def __init__(
+        self,
+        store: VectorStorePort,
+        check_interval_seconds: float = 2.0,
+        logger: Any = None,
+    ) -> None:
+        self._store = store
+        self._interval = check_interval_seconds
+        self._logger = logger
+        self._listeners: list[CatalogListener] = []
+        self._version: int | None = None
+        self._lock = threading.Lock()
+        self._poll_lock = threading.Lock()
+        self._thread_pid: int | None = None
+        self._stop = threading.Event()
+        self.invalidations = 0
+        self.full_invalidations = 0
+        self.errors = 0
+
+    def subscribe(self, listener: CatalogListener) -> None:
+        self._listeners.append(listener)
+
+    @property
+    def version(self) -> int | None:
+        """Last catalog version seen (None before the first successful poll)."""
+        return self._version
+
+    def version_source(self) -> str:
+        """Current version as a string (polls once if none is known yet), e.g. for ``TopAdsRefresher``."""
+        if self._version is None:
+            self.poll()
+        return str(self._version)
+
+    def poll(self) -> bool:
+        """Read the catalog version; on a change, read the log and invalidate the listeners. True if they were."""
+        with self._poll_lock:
+            version = self._store.catalog_version()
+            last = self._version
+            if last is None or version == last:
+                self._version = version
+                return False
+            state = self._store.catalog_state()
+            version = int(state.get(CATALOG_VERSION_KEY) or 0)
+            changed = changed_since(state, last)
+            for listener in self._listeners:
+                listener.invalidate(changed, version)
+            self._version = version
+            self.invalidations += 1
+            if changed is None:
+                self.full_invalidations += 1
+        if self._logger:
+            self._logger.info(
+                "catalog_changed",
+                extra={"from": last, "to": version, "ads": None if changed is None else len(changed)},
+            )
+        return True
+
+    def ensure_running(self) -> None:
+        if self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+            self._stop.clear()
+            threading.Thread(target=self._run, name="ad-catalog-watch", daemon=True).start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            try:
+                self.poll()
+            except Exception:
+                self.errors += 1
+
+    def close(self) -> None:
+        self._stop.set()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "version": self._version,
+            "listeners": len(self._listeners),
+            "invalidations": self.invalidations,
+            "full_invalidations": self.full_invalidations,
+            "errors": self.errors,
+        }
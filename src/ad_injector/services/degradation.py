@@ -0,0 +1,255 @@
+"""Degraded-mode support for ``MatchService``: circuit breaker, stage budgets, fallback results.
+
+Depends only on ports, domain and models — no infrastructure imports.
+
+- ``CircuitBreaker`` opens after ``failure_threshold`` consecutive
+  vector-store failures; while open, queries are not attempted.  After
+  ``reset_timeout_seconds`` one probe request is let through (half-open):
+  success closes the breaker, failure re-opens it.
+- ``call_with_budget`` runs a stage on that stage's own small thread pool and
+  gives up after its time budget (``StageTimeout``); the abandoned call
+  finishes in the background.  Once a stage's pool is taken up by abandoned
+  calls (a hung dependency), further calls fail at once instead of queueing
+  behind them.  Without a budget the stage runs inline.
+- ``FallbackResults`` remembers the last-known-good raw hits per canonical
+  request and keeps a per-topic list of good hits (learned from live results
+  or set from precomputed lists).  Fallback hits are re-checked against the
+  request's ``VectorFilter``; ``MatchService`` then runs them through
+  ``PolicyEngine`` against the current context like live hits.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, Iterable, TypeVar
+
+from ..domain.filters import VectorFilter
+from ..models.mcp_requests import MatchRequest
+from ..ports.vector_store import VectorHit
+from .caches import LruCache
+
+T = TypeVar("T")
+
+# Topic key of the catalog-wide fallback list (requests without a topic constraint)
+ANY_TOPIC = "*"
+
+
+class StageTimeout(TimeoutError):
+    """A match stage exceeded its time budget."""
+
+
+class CircuitOpen(RuntimeError):
+    """The vector-store circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker (closed -> open -> half-open -> closed)."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout_seconds: float = 10.0) -> None:
+        self._threshold = failure_threshold
+        self._reset_timeout = reset_timeout_seconds
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self._trips = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._probing or time.monotonic() - self._opened_at >= self._reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """True if a call may be attempted (closed, or the single half-open probe)."""
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or (self._opened_at is None and self._failures >= self._threshold):
+                self._opened_at = time.monotonic()
+                self._trips += 1
+            self._probing = False
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"state": self._state(), "consecutive_failures": self._failures, "trips": self._trips}
+
+
+_STAGE_WORKERS = 32
+
+_executor_lock = threading.Lock()
+_executors: dict[str, ThreadPoolExecutor] = {}
+_abandoned: dict[str, int] = {}
+
+
+def _stage_executor(stage: str) -> ThreadPoolExecutor:
+    with _executor_lock:
+        executor = _executors.get(stage)
+        if executor is None:
+            executor = _executors[stage] = ThreadPoolExecutor(
+                max_workers=_STAGE_WORKERS, thread_name_prefix=f"ad-match-{stage}"
+            )
+        return executor
+
+
+def _release(stage: str) -> None:
+    with _executor_lock:
+        _abandoned[stage] -= 1
+
+
+def stage_pool_stats() -> dict[str, int]:
+    """Abandoned (timed out, still running) calls per stage."""
+    with _executor_lock:
+        return dict(_abandoned)
+
+
+def call_with_budget(fn: Callable[[], T], budget_seconds: float | None, stage: str = "stage") -> T:
+    """``fn()``, or ``StageTimeout`` if it takes longer than ``budget_seconds`` (None = no budget)."""
+    if budget_seconds is None:
+        return fn()
+    if budget_seconds <= 0:
+        raise StageTimeout("no time left")
+    with _executor_lock:
+        abandoned = _abandoned.get(stage, 0)
+    if abandoned >= _STAGE_WORKERS:
+        raise StageTimeout(f"{stage} pool busy with {abandoned} abandoned calls")
+    future = _stage_executor(stage).submit(fn)
+    try:
+        return future.result(timeout=budget_seconds)
+    except FutureTimeout:
+        if not future.cancel():
+            with _executor_lock:
+                _abandoned[stage] = _abandoned.get(stage, 0) + 1
+            future.add_done_callback(lambda _: _release(stage))
+        raise StageTimeout(f"exceeded {budget_seconds * 1000:.0f} ms") from None
+
+
+class FallbackResults:
+    """Last-known-good hits per canonical request plus per-topic fallback lists."""
+
+    def __init__(self, max_requests: int = 10_000, per_topic: int = 50) -> None:
+        self._last_good: LruCache[str, tuple[VectorHit, ...]] = LruCache(max_requests)
+        self._per_topic = per_topic
+        self._lock = threading.Lock()
+        self._topics: dict[str, dict[str, VectorHit]] = {}
+        self._floors: dict[str, float] = {}  # lowest kept score of full lists
+        self._pinned: set[str] = set()
+
+    def remember(self, key: str | None, hits: list[VectorHit]) -> None:
+        """Record a successful live result (called on every non-degraded query)."""
+        if not hits:
+            return
+        if key is not None:
+            self._last_good.put(key, tuple(hits))
+        with self._lock:
+            for hit in hits:
+                for topic in (ANY_TOPIC, *(hit.payload.get("topics") or ())):
+                    if topic not in self._pinned:
+                        self._add(topic, hit)
+
+    def _add(self, topic: str, hit: VectorHit) -> None:
+        if hit.score <= self._floors.get(topic, float("-inf")):
+            return
+        ranked = self._topics.setdefault(topic, {})
+        known = ranked.get(hit.ad_id)
+        if known is not None and known.score >= hit.score:
+            return
+        ranked[hit.ad_id] = hit
+        if len(ranked) > self._per_topic:
+            del ranked[min(ranked, key=lambda ad_id: ranked[ad_id].score)]
+            self._floors[topic] = min(h.score for h in ranked.values())
+
+    def set_topic_fallback(self, topic: str, hits: Iterable[VectorHit]) -> None:
+        """Install a precomputed list for ``topic`` (no longer updated from live results)."""
+        with self._lock:
+            self._topics[topic] = {h.ad_id: h for h in list(hits)[: self._per_topic]}
+            self._floors.pop(topic, None)
+            self._pinned.add(topic)
+
+    def invalidate(self, ad_ids: frozenset[str] | None, version: int = 0) -> None:
+        """Catalog change: forget results and list entries of ``ad_ids`` (None = all learned state)."""
+        if ad_ids is None:
+            self._last_good.clear()
+            with self._lock:
+                for topic in set(self._topics) - self._pinned:
+                    del self._topics[topic]
+                self._floors.clear()
+            return
+        self._last_good.evict_if(lambda hits: any(h.ad_id in ad_ids for h in hits))
+        with self._lock:
+            for topic, ranked in self._topics.items():
+                if any(ad_id in ranked for ad_id in ad_ids):
+                    for ad_id in ad_ids:
+                        ranked.pop(ad_id, None)
+                    self._floors.pop(topic, None)
+
+    def lookup(
+        self, key: str | None, request: MatchRequest, vector_filter: VectorFilter
+    ) -> tuple[list[VectorHit], str]:
+        """Fallback hits for ``request`` and their source: last_known_good, topic_fallback or none."""
+        hits = self.last_known_good(key, request, vector_filter)
+        if hits is not None:
+            return hits, "last_known_good"
+        return self.topic_fallback(request, vector_filter)
+
+    def last_known_good(
+        self, key: str | None, request: MatchRequest, vector_filter: VectorFilter
+    ) -> list[VectorHit] | None:
+        """Eligible hits of the last live result for the same canonical request, if any."""
+        cached = self._last_good.get(key) if key is not None else None
+        if cached is None:
+            return None
+        return self._eligible(cached, vector_filter, request.top_k)
+
+    def topic_fallback(self, request: MatchRequest, vector_filter: VectorFilter) -> tuple[list[VectorHit], str]:
+        """Best eligible hits of the per-topic lists (source topic_fallback, or none if empty)."""
+        topics = request.constraints.topics or [ANY_TOPIC]
+        with self._lock:
+            pool: dict[str, VectorHit] = {}
+            for topic in topics:
+                for ad_id, hit in self._topics.get(topic, {}).items():
+                    if ad_id not in pool or pool[ad_id].score < hit.score:
+                        pool[ad_id] = hit
+        ranked = sorted(pool.values(), key=lambda h: h.score, reverse=True)
+        hits = self._eligible(ranked, vector_filter, request.top_k)
+        return hits, "topic_fallback" if hits else "none"
+
+    @staticmethod
+    def _eligible(hits: Iterable[VectorHit], vector_filter: VectorFilter, top_k: int) -> list[VectorHit]:
+        out = []
+        for hit in hits:
+            if hit.payload.get("enabled", True) is False or not vector_filter.matches(hit.payload):
+                continue
+            out.append(hit)
+            if len(out) == top_k:
+                break
+        return out
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            topics = len(self._topics)
+        return {"last_known_good": self._last_good.stats(), "topics": topics, "pinned_topics": len(self._pinned)}
@@ -1,17 +1,33 @@
 """IndexService — Control Plane orchestration.
 
 Handles collection management and ad ingestion.
-CLI and MCP admin tools call this service.
+CLI and MCP admin tools call this service.  Every mutation bumps the
+catalog version and logs the changed ad_ids (see ``services.catalog``) so
+Data Plane caches can be invalidated per ad.
 
 Depends only on ports — never on concrete adapters.
 """
 
 from __future__ import annotations
 
+import threading
+import time
+from typing import Any, Callable, Iterable
+
 from ..config.runtime import RuntimeSettings
 from ..models import Ad  # for upsert_ads
 from ..ports.embedding import EmbeddingProvider
+from ..ports.metrics import StageObserver
 from ..ports.vector_store import VectorStorePort
+from .bulk_load import BulkLoader, BulkLoadReport, Record
+from .catalog import CATALOG_VERSION_KEY, next_catalog_state
+from .precomputed import PrecomputedVectors, complete_vectors
+
+
+# Serializes catalog-state updates of every IndexService in this process; writers in
+# other processes are caught by the conditional write (``set_catalog_state``)
+_CATALOG_LOCK = threading.Lock()
+_CATALOG_WRITE_ATTEMPTS = 20
 
 
 class IndexService:
@@ -22,10 +38,12 @@ class IndexService:
         embedding_provider: EmbeddingProvider,
         vector_store: VectorStorePort,
         settings: RuntimeSettings,
+        stage_observer: StageObserver | None = None,
     ) -> None:
         self._embed = embedding_provider
         self._store = vector_store
         self._settings = settings
+        self._observer = stage_observer
 
     def ensure_collection(
         self,
@@ -35,36 +53,172 @@ class IndexService:
     ) -> dict:
         if dimension is None:
             dimension = self._settings.embedding_dimension
-        return self._store.ensure_collection(
+        try:
+            before = self._collection_meta(self._store.collection_info())
+        except Exception:  # no collection yet
+            before = None
+        result = self._store.ensure_collection(
             dimension,
             embedding_model_id=embedding_model_id,
             schema_version=schema_version,
         )
+        if not result.get("created") and self._collection_meta(result) != before:
+            # Model / schema metadata changed under existing vectors
+            self.record_catalog_change(None)
+        return result
+
+    @staticmethod
+    def _collection_meta(info: dict) -> tuple:
+        return (info.get("dimension"), info.get("embedding_model_id"), info.get("schema_version"))
 
     def delete_collection(self) -> None:
-        self._store.delete_collection()
+        # The version must keep increasing across a re-create, so carry it over
+        with _CATALOG_LOCK:
+            state = self._store.catalog_state()
+            self._store.delete_collection()
+            self._store.set_catalog_state(
+                next_catalog_state(state, None, self._settings.catalog_change_log_size)
+            )
 
     def collection_info(self) -> dict:
         return self._store.collection_info()
 
-    def upsert_ads(self, ads: list[Ad]) -> int:
+    @property
+    def vector_store(self) -> VectorStorePort:
+        """The underlying store (for ``ops.migrations``, which works below the ad level)."""
+        return self._store
+
+    def precomputed_vectors(self, embedding_model_id: str | None = None) -> PrecomputedVectors:
+        """Checks for bring-your-own vectors against ``ads_meta`` (dimension, embedding_model_id).
+
+        Raises ``ValueError`` if ``embedding_model_id`` (the model that produced
+        the vectors) differs from the collection's.
+        """
+        info = self._store.collection_info()
+        model = info.get("embedding_model_id") or self._settings.embedding_model_id
+        if embedding_model_id is not None and embedding_model_id != model:
+            raise ValueError(f"vectors from {embedding_model_id!r} cannot go into a collection embedded with {model!r}")
+        return PrecomputedVectors(int(info.get("dimension") or self._settings.embedding_dimension), model)
+
+    def upsert_ads(self, ads: list[Ad], vectors: list[list[float] | None] | None = None) -> int:
+        """Embed and upsert ``ads``; ``vectors[i]``, when given and not None, is used instead of embedding ``ads[i]``.
+
+        Precomputed vectors must already be checked (``precomputed_vectors().check``).
+        """
+        if vectors is not None and len(vectors) != len(ads):
+            raise ValueError(f"{len(vectors)} vectors for {len(ads)} ads")
         batch_size = self._settings.max_batch_size
         total = 0
         for i in range(0, len(ads), batch_size):
             batch = ads[i : i + batch_size]
-            ads_with_embeddings = [
-                (ad, self._embed.embed(ad.embedding_text)) for ad in batch
-            ]
+            batch_vectors = vectors[i : i + batch_size] if vectors is not None else None
+            t0 = time.perf_counter()
+            ads_with_embeddings = list(zip(batch, complete_vectors(self.embed_texts, batch, batch_vectors)))
+            t1 = time.perf_counter()
             total += self._store.upsert_batch(ads_with_embeddings)
+            self.record_catalog_change(ad.ad_id for ad in batch)
+            if self._observer is not None:
+                self._observer.observe(t1 - t0, stage="embed")
+                self._observer.observe(time.perf_counter() - t1, stage="upsert")
         return total
 
+    def bulk_load(
+        self,
+        records: Iterable[Record],
+        start_after: int = 0,
+        *,
+        batch_size: int | None = None,
+        embed_workers: int = 2,
+        queue_batches: int = 4,
+        barrier_every: int = 8,
+        on_checkpoint: Callable[[int, BulkLoadReport], None] | None = None,
+        on_reject: Callable[[int, Exception, Any], None] | None = None,
+        vectors: PrecomputedVectors | None = None,
+    ) -> BulkLoadReport:
+        """Load ``(offset, raw)`` records through the staged pipeline (``services.bulk_load``).
+
+        Records with offset <= ``start_after`` are skipped (resume).  With
+        ``vectors``, records may carry precomputed embeddings (``services.precomputed``).  After each
+        consistency barrier the catalog change is recorded and ``on_checkpoint``
+        receives the offset up to which every row is durably stored.
+        """
+
+        def checkpoint(offset: int, ad_ids: list[str], report: BulkLoadReport) -> None:
+            if ad_ids:
+                self.record_catalog_change(ad_ids)
+            if on_checkpoint is not None:
+                on_checkpoint(offset, report)
+
+        def upsert(pairs: list[tuple[Ad, list[float]]], wait: bool) -> int:
+            return self._store.upsert_batch(pairs, wait=wait)
+
+        loader = BulkLoader(
+            self.embed_texts,
+            upsert,
+            batch_size=batch_size or self._settings.max_batch_size,
+            embed_workers=embed_workers,
+            queue_batches=queue_batches,
+            barrier_every=barrier_every,
+            on_checkpoint=checkpoint,
+            on_reject=on_reject,
+            parse=vectors.parse if vectors is not None else None,
+        )
+        return loader.run(records, start_after)
+
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        """One batched model call when the provider supports it (FastEmbed does)."""
+        embed_batch = getattr(self._embed, "embed_batch", None)
+        if embed_batch is not None:
+            return embed_batch(texts)
+        return [self._embed.embed(t) for t in texts]
+
     def delete_ad(self, ad_id: str) -> None:
         self._store.delete_ad(ad_id)
+        self.record_catalog_change([ad_id])
+
+    def delete_ads(self, ad_ids: list[str]) -> list[str]:
+        """Delete the stored ones of ``ad_ids``; returns those (the rest were not found)."""
+        found = self._store.get_ads(ad_ids, fields=["ad_id"])
+        deleted = [ad_id for ad_id in dict.fromkeys(ad_ids) if ad_id in found]
+        if deleted:
+            self._store.delete_ads(deleted)
+            self.record_catalog_change(deleted)
+        return deleted
+
+    def update_ads(self, ads: list[Ad]) -> int:
+        """Rewrite the stored payloads of ``ads`` without re-embedding (their ``embedding_text`` is unchanged)."""
+        payloads = [
+            {**ad.to_pinecone_metadata(), "embedding_version": self._settings.embedding_model_id} for ad in ads
+        ]
+        count = self._store.update_payloads(payloads)
+        self.record_catalog_change(ad.ad_id for ad in ads)
+        return count
 
     def get_ad(self, ad_id: str) -> dict | None:
         """Return raw ad payload (flat dict from store) or None. For MCP/CLI use."""
         return self._store.get_ad(ad_id)
 
+    def get_ads(self, ad_ids: list[str]) -> dict[str, dict]:
+        """``ad_id -> raw payload`` for the stored ones of ``ad_ids`` (batched reads)."""
+        return self._store.get_ads(ad_ids)
+
     def bulk_disable(self, filter_spec: dict) -> int:
         """Set enabled=False for all ads matching filter_spec. Returns count updated."""
-        return self._store.bulk_disable(filter_spec)
+        count = self._store.bulk_disable(filter_spec)
+        if count:
+            ad_ids = filter_spec.get("ad_id") if set(filter_spec) == {"ad_id"} else None
+            self.record_catalog_change([ad_ids] if isinstance(ad_ids, str) else ad_ids)
+        return count
+
+    def record_catalog_change(self, ad_ids: Iterable[str] | None = None) -> int:
+        """Bump the catalog version, logging ``ad_ids`` (None = the whole catalog). Returns the new version."""
+        ad_ids = None if ad_ids is None else list(ad_ids)
+        with _CATALOG_LOCK:
+            for attempt in range(_CATALOG_WRITE_ATTEMPTS):
+                current = self._store.catalog_state()
+                state = next_catalog_state(current, ad_ids, self._settings.catalog_change_log_size)
+                expected = int(current.get(CATALOG_VERSION_KEY) or 0)
+                if self._store.set_catalog_state(state, expected_version=expected):
+                    return state[CATALOG_VERSION_KEY]
+                time.sleep(0.005 * (attempt + 1))  # another process moved the version: re-read and retry
+        raise RuntimeError(f"catalog version kept moving; change not recorded after {_CATALOG_WRITE_ATTEMPTS} attempts")
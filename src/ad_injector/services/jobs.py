@@ -0,0 +1,264 @@
+"""In-process background jobs for long-running Control Plane operations.
+
+Depends only on ports — no infrastructure imports.
+
+``JobScheduler.submit`` queues a callable on a bounded worker pool and
+returns its job record at once; the callable receives a ``JobContext`` to
+report progress (``done`` / ``total``) and to check for cancellation between
+units of work (``check_cancelled`` raises ``JobCancelled``).  A queued job is
+cancelled immediately; a running one stops at its next check, so work it
+already finished stays done.
+
+Records are written to a ``JobStorePort`` on every state change and at most
+every ``persist_interval_seconds`` while progress moves.  On start-up the
+scheduler loads the stored records, so outcomes survive a restart; jobs
+that were still queued or running when the previous process stopped are
+reported as ``interrupted`` (they are not re-run).  Only the newest
+``max_records`` finished jobs are kept.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+from ..ports.job_store import JobStorePort
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED, INTERRUPTED = (
+    "queued", "running", "succeeded", "failed", "cancelled", "interrupted",
+)
+_ACTIVE = frozenset({QUEUED, RUNNING})
+
+
+class JobError(ValueError):
+    """Unknown job id, or the job queue is full."""
+
+
+class JobCancelled(Exception):
+    """Raised by ``JobContext.check_cancelled`` once cancellation was requested."""
+
+
+class Job:
+    """State of one job (mutated under the scheduler lock)."""
+
+    def __init__(self, job_id: str, kind: str, params: dict[str, Any], total: int | None) -> None:
+        self.job_id = job_id
+        self.kind = kind
+        self.params = params
+        self.state = QUEUED
+        self.done = 0
+        self.total = total
+        self.result: Any = None
+        self.error: str | None = None
+        self.cancel_requested = False
+        self.created_at = time.time()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.future: Future | None = None
+        self.cancel_event = threading.Event()
+
+    @classmethod
+    def from_dict(cls, record: dict[str, Any]) -> Job:
+        job = cls(record["job_id"], record.get("kind", "?"), record.get("params") or {}, record.get("total"))
+        job.state = record.get("state", INTERRUPTED)
+        job.done = record.get("done", 0)
+        job.result = record.get("result")
+        job.error = record.get("error")
+        job.cancel_requested = record.get("cancel_requested", False)
+        job.created_at = record.get("created_at", 0.0)
+        job.started_at = record.get("started_at")
+        job.finished_at = record.get("finished_at")
+        return job
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "state": self.state,
+            "params": self.params,
+            "done": self.done,
+            "total": self.total,
+            "result": self.result,
+            "error": self.error,
+            "cancel_requested": self.cancel_requested,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobContext:
+    """Handle given to a running job for progress and cancellation."""
+
+    def __init__(self, scheduler: JobScheduler, job: Job) -> None:
+        self._scheduler = scheduler
+        self._job = job
+
+    @property
+    def cancelled(self) -> bool:
+        return self._job.cancel_event.is_set()
+
+    def check_cancelled(self) -> None:
+        if self._job.cancel_event.is_set():
+            raise JobCancelled
+
+    def progress(self, done: int, total: int | None = None) -> None:
+        self._scheduler._progress(self._job, done, total)
+
+
+class JobScheduler:
+    """Bounded worker pool with job ids, progress, cancellation and durable records."""
+
+    def __init__(
+        self,
+        store: JobStorePort | None = None,
+        max_workers: int = 2,
+        max_queued: int = 32,
+        max_records: int = 200,
+        persist_interval_seconds: float = 1.0,
+    ) -> None:
+        self._store = store
+        self._max_active = max_workers + max_queued
+        self._max_records = max_records
+        self._persist_interval = persist_interval_seconds
+        self._lock = threading.Lock()
+        self._persist_lock = threading.Lock()  # keeps store writes in snapshot order
+        self._jobs: dict[str, Job] = {}
+        self._last_persist: dict[str, float] = {}
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ad-job")
+        if store is not None:
+            self._recover(store)
+
+    def _recover(self, store: JobStorePort) -> None:
+        for record in sorted(store.load(), key=lambda r: r.get("created_at", 0.0)):
+            job = Job.from_dict(record)
+            if job.state in _ACTIVE:
+                job.state = INTERRUPTED
+                job.error = "server restarted before the job finished"
+                job.finished_at = job.finished_at or time.time()
+                store.save(job.to_dict())
+            self._jobs[job.job_id] = job
+        self._prune()
+
+    # -- API ---------------------------------------------------------------
+
+    def submit(
+        self,
+        kind: str,
+        fn: Callable[[JobContext], Any],
+        params: dict[str, Any] | None = None,
+        total: int | None = None,
+    ) -> dict[str, Any]:
+        """Queue ``fn(ctx)``; its JSON-able return value becomes the job result."""
+        with self._lock:
+            active = sum(1 for j in self._jobs.values() if j.state in _ACTIVE)
+            if active >= self._max_active:
+                raise JobError(f"job queue full ({active} queued or running jobs)")
+            job = Job(uuid.uuid4().hex, kind, params or {}, total)
+            self._jobs[job.job_id] = job
+            record = job.to_dict()
+        self._persist(job, force=True)
+        job.future = self._pool.submit(self._run, job, fn)
+        return record
+
+    def status(self, job_id: str) -> dict[str, Any]:
+        with self._lock:
+            return self._get(job_id).to_dict()
+
+    def list(self, state: str | None = None, limit: int = 50) -> list[dict[str, Any]]:
+        """Newest first, optionally only jobs in ``state``."""
+        with self._lock:
+            jobs = [j for j in self._jobs.values() if state is None or j.state == state]
+            jobs.sort(key=lambda j: j.created_at, reverse=True)
+            return [j.to_dict() for j in jobs[:limit]]
+
+    def cancel(self, job_id: str) -> dict[str, Any]:
+        """Cancel a queued job now, or ask a running one to stop at its next check."""
+        with self._lock:
+            job = self._get(job_id)
+            if job.state in _ACTIVE:
+                job.cancel_requested = True
+                job.cancel_event.set()
+                if job.state == QUEUED and job.future is not None and job.future.cancel():
+                    job.state = CANCELLED
+                    job.finished_at = time.time()
+            record = job.to_dict()
+        self._persist(job, force=True)
+        return record
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            states: dict[str, int] = {}
+            for j in self._jobs.values():
+                states[j.state] = states.get(j.state, 0) + 1
+            return states
+
+    def close(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
+
+    # -- internals ---------------------------------------------------------
+
+    def _get(self, job_id: str) -> Job:
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise JobError(f"unknown job {job_id!r}")
+        return job
+
+    def _run(self, job: Job, fn: Callable[[JobContext], Any]) -> None:
+        with self._lock:
+            if job.state != QUEUED:
+                return
+            job.state = RUNNING
+            job.started_at = time.time()
+        self._persist(job, force=True)
+        try:
+            if job.cancel_event.is_set():
+                raise JobCancelled
+            result = fn(JobContext(self, job))
+            state, error = SUCCEEDED, None
+        except JobCancelled:
+            result, state, error = None, CANCELLED, None
+        except Exception as e:
+            result, state, error = None, FAILED, f"{type(e).__name__}: {e}"
+        with self._lock:
+            job.state = state
+            job.result = result
+            job.error = error
+            job.finished_at = time.time()
+        self._persist(job, force=True)
+        with self._lock:
+            self._prune()
+
+    def _progress(self, job: Job, done: int, total: int | None) -> None:
+        with self._lock:
+            job.done = done
+            if total is not None:
+                job.total = total
+        self._persist(job)
+
+    def _persist(self, job: Job, force: bool = False) -> None:
+        if self._store is None:
+            return
+        with self._persist_lock:
+            now = time.monotonic()
+            with self._lock:
+                if not force and now - self._last_persist.get(job.job_id, 0.0) < self._persist_interval:
+                    return
+                self._last_persist[job.job_id] = now
+                record = job.to_dict()
+            self._store.save(record)
+
+    def _prune(self) -> None:
+        """Drop the oldest finished jobs beyond ``max_records`` (caller holds the lock)."""
+        finished = [j for j in self._jobs.values() if j.state not in _ACTIVE]
+        if len(finished) <= self._max_records:
+            return
+        finished.sort(key=lambda j: j.created_at)
+        for job in finished[: len(finished) - self._max_records]:
+            del self._jobs[job.job_id]
+            self._last_persist.pop(job.job_id, None)
+            if self._store is not None:
+                self._store.delete(job.job_id)
@@ -0,0 +1,57 @@
+"""Slim internal result types for the ads_match hot path.
+
+``Candidate`` and ``MatchResult`` mirror the attribute names of the pydantic
+``AdCandidate`` / ``MatchResponse`` DTOs, so the serializer and callers read
+either interchangeably.  Values come from our own index and are already
+clamped, so no validation runs per request; ``to_response`` builds the
+pydantic DTOs with ``model_construct`` (trusted, no validation) for callers
+that need the boundary types.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from ..models.mcp_responses import AdCandidate, MatchResponse
+
+
+@dataclass(slots=True)
+class Candidate:
+    """One eligible ad with its per-request score and match_id."""
+
+    ad_id: str
+    advertiser_id: str
+    title: str
+    body: str
+    cta_text: str
+    landing_url: str
+    score: float
+    match_id: str
+
+    def to_model(self) -> AdCandidate:
+        return AdCandidate.model_construct(
+            ad_id=self.ad_id,
+            advertiser_id=self.advertiser_id,
+            title=self.title,
+            body=self.body,
+            cta_text=self.cta_text,
+            landing_url=self.landing_url,
+            score=self.score,
+            match_id=self.match_id,
+        )
+
+
+@dataclass(slots=True)
+class MatchResult:
+    """Ranked candidates for one request (internal form of ``MatchResponse``)."""
+
+    request_id: str
+    placement: str
+    candidates: list[Candidate] = field(default_factory=list)
+
+    def to_response(self) -> MatchResponse:
+        return MatchResponse.model_construct(
+            candidates=[c.to_model() for c in self.candidates],
+            request_id=self.request_id,
+            placement=self.placement,
+        )
@@ -1,19 +1,51 @@
 """MatchService — Data Plane orchestration.
 
-Single public method: ``match(request) -> (MatchResponse, audit_trace)``.
+Single public method: ``match(request) -> (MatchResult, MatchTrace)``.
 All business logic for ad matching lives here; MCP tools are thin wrappers.
-Produces response DTOs and audit trace for ads.explain.
+Produces slim result types (``MatchResult.to_response()`` gives the pydantic
+DTO) and a compact ``MatchTrace`` (hit ids, scores, policy
+verdict bitmasks); the audit trace for ads.explain is materialized from it on
+demand.  ``trace_sample_rate`` < 1 skips capturing the decision columns for
+that share of requests.
+
+Each stage (embed, filter, query, policy, candidates, total) is timed; the
+timings go to the optional ``StageObserver`` (labelled with the result-cache
+outcome: hit / miss / bypass) and into ``MatchTrace.timings_ms``.  On a
+result-cache hit the embed, filter and query stages are skipped.
+
+Degraded mode (enabled by passing ``fallback``): the embed and query stages
+run under their ``stage_budgets`` (seconds, capped by the request
+``deadline``), vector-store failures feed the ``circuit_breaker``, and when
+a stage fails, times out or the breaker is open the request is answered from
+``FallbackResults`` (last-known-good hits for the same canonical request, else
+the per-topic list).  Fallback hits go through policy like live hits; the
+trace records ``degraded = (reason, source)``.
+
+Materialized lists (``top_ads``): requests whose whitespace-normalized context
+is shorter than ``top_ads_max_context_chars`` and that constrain topics or
+verticals are answered from the precomputed per-(topic|vertical, locale)
+lists without embedding or ANN search; the lists also serve as a fallback
+(after last-known-good) when embedding or the vector store fails.
+``MatchTrace.retrieval`` records where the hits came from (ann, materialized
+or the degraded-mode source).
+
+Catalog changes (``catalog_watcher``): the watcher's polling thread is started
+on the first match in each process (not inside ``background_deferred``, which
+the pre-fork preload uses) and invalidates the changed ads in the
+subscribed caches (result cache, fallback, materialized lists).
 """
 
 from __future__ import annotations
 
+import random
 import re
-from typing import Any
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
 
 from ..domain.policy_engine import PolicyEngine
 from ..domain.targeting_engine import TargetingEngine
 from ..models.mcp_requests import MatchRequest
-from ..models.mcp_responses import AdCandidate, MatchResponse
 from ..ports.embedding import EmbeddingProvider
 from ..ports.id_gen import (
     MatchIdProvider,
@@ -21,7 +53,21 @@ from ..ports.id_gen import (
     UuidMatchIdProvider,
     UuidRequestIdProvider,
 )
+from ..ports.metrics import StageObserver
 from ..ports.vector_store import VectorHit, VectorStorePort
+from .caches import ResultCache, canonical_request, result_cache_key
+from .catalog import CatalogWatcher
+from .degradation import (
+    CircuitBreaker,
+    CircuitOpen,
+    FallbackResults,
+    StageTimeout,
+    call_with_budget,
+    stage_pool_stats,
+)
+from .match_result import Candidate, MatchResult
+from .match_trace import MatchTrace
+from .top_ads import TopAdsRefresher
 
 _WHITESPACE_RE = re.compile(r"\s+")
 
@@ -38,6 +84,15 @@ class MatchService:
         request_id_provider: RequestIdProvider | None = None,
         match_id_provider: MatchIdProvider | None = None,
         logger: Any = None,
+        stage_observer: StageObserver | None = None,
+        result_cache: ResultCache | None = None,
+        trace_sample_rate: float = 1.0,
+        fallback: FallbackResults | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        stage_budgets: dict[str, float] | None = None,
+        top_ads: TopAdsRefresher | None = None,
+        top_ads_max_context_chars: int = 0,
+        catalog_watcher: CatalogWatcher | None = None,
     ) -> None:
         self._embed = embedding_provider
         self._store = vector_store
@@ -46,8 +101,24 @@ class MatchService:
         self._req_id = request_id_provider or UuidRequestIdProvider()
         self._match_id = match_id_provider or UuidMatchIdProvider()
         self._logger = logger
+        self._observer = stage_observer
+        self._results = result_cache
+        self._trace_sample_rate = trace_sample_rate
+        self._fallback = fallback
+        self._breaker = circuit_breaker
+        self._budgets = stage_budgets or {}
+        self._top_ads = top_ads
+        self._top_ads_max_chars = top_ads_max_context_chars
+        self._catalog = catalog_watcher
+        self._defer_threads = False
 
-    def match(self, request: MatchRequest) -> tuple[MatchResponse, dict[str, Any]]:
+    def match(self, request: MatchRequest, deadline: float | None = None) -> tuple[MatchResult, MatchTrace]:
+        """Run the pipeline; ``deadline`` (``time.monotonic``) caps the stage budgets in degraded mode."""
+        clock = time.perf_counter
+        t_start = clock()
+        timings: dict[str, float] = {}
+        if self._catalog is not None and not self._defer_threads:
+            self._catalog.ensure_running()
         # 1. Generate request_id (trace_id)
         request_id = self._req_id.new_request_id()
         if self._logger:
@@ -63,64 +134,105 @@ class MatchService:
         # 2. Normalize input text
         text = _WHITESPACE_RE.sub(" ", request.context_text.strip())
 
-        # 3. Embed
-        vector = self._embed.embed(text)
+        # 3. Result cache (raw hits per canonical request)
+        cache = "bypass"
+        cache_key: str | None = None
+        raw_hits: list[VectorHit] | None = None
+        if self._results is not None:
+            cache_key = result_cache_key(canonical_request(request))
+            cached = self._results.get(cache_key)
+            cache = "miss" if cached is None else "hit"
+            if cached is not None:
+                raw_hits = list(cached)
+        t1 = clock()
 
-        # 4. Build filter from typed constraints
-        vector_filter = self._targeting.build_filter(
-            request.constraints, request.placement
-        )
+        # 3b. Materialized lists for short contexts with typed constraints (no embed / ANN)
+        retrieval = "ann"
+        if raw_hits is None and self._top_ads is not None and len(text) < self._top_ads_max_chars:
+            vector_filter = self._targeting.build_filter(request.constraints, request.placement)
+            raw_hits = self._top_ads.lookup(request, vector_filter, start=not self._defer_threads)
+            if raw_hits is not None:
+                retrieval = "materialized"
+                t0, t1 = t1, clock()
+                timings["materialized"] = t1 - t0
 
-        # 5. Query vector store
-        raw_hits = self._store.query(
-            vector=vector,
-            vector_filter=vector_filter,
-            top_k=request.top_k,
-        )
+        degraded: tuple[str, str] | None = None
+        if raw_hits is None and (self._fallback is not None or self._top_ads is not None):
+            raw_hits, degraded = self._retrieve_or_fallback(request, text, cache_key, timings, deadline)
+            t1 = clock()
+            if degraded is not None:
+                retrieval = degraded[1]
+        elif raw_hits is None:
+            # 4. Embed
+            t0 = t1
+            vector = self._embed.embed(text)
+            t1 = clock()
+            timings["embed"] = t1 - t0
+
+            # 5. Build filter from typed constraints
+            vector_filter = self._targeting.build_filter(
+                request.constraints, request.placement
+            )
+            t0 = clock()
+            timings["filter"] = t0 - t1
 
-        # 6. Policy: apply post-retrieval filtering, then build decisions for audit
-        eligible = self._policy.apply(
+            # 6. Query vector store
+            raw_hits = self._store.query(
+                vector=vector,
+                vector_filter=vector_filter,
+                top_k=request.top_k,
+            )
+            t1 = clock()
+            timings["query"] = t1 - t0
+            if cache_key is not None:
+                self._results.put(cache_key, raw_hits)
+
+        # 7. Policy: one verdict bitmask per hit (0 = eligible)
+        verdicts = self._policy.verdicts(
             raw_hits,
             request.constraints,
             request.placement,
             context_text=request.context_text,
         )
-        decisions: list[dict[str, Any]] = []
-        for hit in raw_hits:
-            reason = self._policy.reason(
-                hit,
-                request.constraints,
-                request.placement,
-                context_text=request.context_text,
-            )
-            decisions.append({
-                "ad_id": hit.ad_id,
-                "score": hit.score,
-                "reason": reason,
-            })
-
-        # 7. Convert to AdCandidates and assign match_id
-        candidates: list[AdCandidate] = []
-        for hit in eligible:
-            c = self._hit_to_candidate(hit, request_id)
-            candidates.append(c)
-            for d in decisions:
-                if d["ad_id"] == hit.ad_id:
-                    d["match_id"] = c.match_id
-                    break
-
-        response = MatchResponse(
+        t0 = clock()
+        timings["policy"] = t0 - t1
+
+        # 8. Convert eligible hits to Candidates and assign match_id
+        candidates: list[Candidate] = []
+        for hit, verdict in zip(raw_hits, verdicts):
+            if not verdict:
+                candidates.append(self._hit_to_candidate(hit, request_id))
+
+        response = MatchResult(
+            request_id=request_id,
+            placement=request.placement.placement,
             candidates=candidates,
+        )
+        trace = MatchTrace(
             request_id=request_id,
             placement=request.placement.placement,
+            context_text=request.context_text,
+            constraints=request.constraints,
+            timings_ms={},
+            cache=cache,
+            retrieved=len(raw_hits),
+            degraded=degraded,
+            retrieval=retrieval,
         )
-        audit_trace: dict[str, Any] = {
-            "request_id": request_id,
-            "placement": request.placement.placement,
-            "context_text": request.context_text[:500],
-            "constraints": request.constraints.model_dump(),
-            "decisions": decisions,
-        }
+        if self._trace_sample_rate >= 1.0 or random.random() < self._trace_sample_rate:
+            # Compact columns only; the readable trace is built by ads_explain
+            match_ids = iter(c.match_id for c in candidates)
+            trace.ad_ids = tuple(h.ad_id for h in raw_hits)
+            trace.scores = tuple(h.score for h in raw_hits)
+            trace.verdicts = bytes(verdicts)
+            trace.match_ids = tuple(None if v else next(match_ids) for v in verdicts)
+        else:
+            trace.sampled = False
+        t1 = clock()
+        timings["candidates"] = t1 - t0
+        timings["total"] = t1 - t_start
+        self._observe(timings, request.placement.placement, cache)
+        trace.timings_ms = {k: round(v * 1000, 3) for k, v in timings.items()}
         if self._logger:
             self._logger.info(
                 "match_done",
@@ -130,19 +242,161 @@ class MatchService:
                     "candidates_count": len(candidates),
                 },
             )
-        return response, audit_trace
+        return response, trace
 
-    def _hit_to_candidate(self, hit: VectorHit, request_id: str) -> AdCandidate:
+    def _retrieve_or_fallback(
+        self,
+        request: MatchRequest,
+        text: str,
+        cache_key: str | None,
+        timings: dict[str, float],
+        deadline: float | None,
+    ) -> tuple[list[VectorHit], tuple[str, str] | None]:
+        """Steps 4-6 under stage budgets and the breaker; fallback hits on failure."""
+        clock = time.perf_counter
+        t0 = clock()
+        vector_filter = self._targeting.build_filter(request.constraints, request.placement)
+        reason = None
+        error: Exception | None = None
+        t1 = clock()
+        timings["filter"] = t1 - t0
+        t0 = t1
+        try:
+            vector = call_with_budget(lambda: self._embed.embed(text), self._budget("embed", deadline), "embed")
+        except Exception as e:
+            reason, error = ("embed_timeout" if isinstance(e, StageTimeout) else "embed_error"), e
+        t1 = clock()
+        timings["embed"] = t1 - t0
+        if reason is None:
+            try:
+                if self._breaker is not None and not self._breaker.allow():
+                    raise CircuitOpen("vector store circuit breaker open")
+                hits = call_with_budget(
+                    lambda: self._store.query(vector=vector, vector_filter=vector_filter, top_k=request.top_k),
+                    self._budget("query", deadline),
+                    "query",
+                )
+            except CircuitOpen as e:
+                reason, error = "circuit_open", e
+            except Exception as e:
+                reason, error = ("query_timeout" if isinstance(e, StageTimeout) else "query_error"), e
+                if self._breaker is not None:
+                    self._breaker.record_failure()
+            else:
+                if self._breaker is not None:
+                    self._breaker.record_success()
+            t0, t1 = t1, clock()
+            timings["query"] = t1 - t0
+            if reason is None:
+                if cache_key is not None and self._results is not None:
+                    self._results.put(cache_key, hits)
+                if self._fallback is not None:
+                    self._fallback.remember(cache_key or result_cache_key(canonical_request(request)), hits)
+                return hits, None
+
+        # t1 is when the failing stage gave up
+        fallback = self._fallback_hits(request, cache_key, vector_filter)
+        if fallback is None:
+            raise error
+        hits, source = fallback
+        timings["fallback"] = clock() - t1
+        if self._logger:
+            self._logger.warning("match_degraded", extra={"reason": reason, "source": source})
+        return hits, (reason, source)
+
+    def _fallback_hits(
+        self, request: MatchRequest, cache_key: str | None, vector_filter: Any
+    ) -> tuple[list[VectorHit], str] | None:
+        """Last-known-good, then materialized lists, then per-topic lists; None if none has eligible hits."""
+        if self._fallback is not None:
+            key = cache_key or result_cache_key(canonical_request(request))
+            hits = self._fallback.last_known_good(key, request, vector_filter)
+            if hits is not None:
+                return hits, "last_known_good"
+        if self._top_ads is not None:
+            hits = self._top_ads.lookup(request, vector_filter, partial=True, start=not self._defer_threads)
+            if hits:
+                return hits, "materialized"
+        if self._fallback is not None:
+            hits, source = self._fallback.topic_fallback(request, vector_filter)
+            if source != "none":
+                return hits, source
+        return None
+
+    def _budget(self, stage: str, deadline: float | None) -> float | None:
+        """The stage budget, capped by the time left until ``deadline``; either alone when the other is unset."""
+        budget = self._budgets.get(stage) or None
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            budget = remaining if budget is None else min(budget, remaining)
+        return budget
+
+    def degradation_stats(self) -> dict[str, Any] | None:
+        """Breaker state, fallback sizes and materialized lists, or None when none are configured."""
+        if self._fallback is None and self._top_ads is None:
+            return None
+        return {
+            "breaker": self._breaker.stats() if self._breaker is not None else None,
+            "fallback": self._fallback.stats() if self._fallback is not None else None,
+            "top_ads": self._top_ads.stats() if self._top_ads is not None else None,
+            "stage_budgets_ms": {k: round(v * 1000, 3) for k, v in self._budgets.items()},
+            "abandoned_calls": stage_pool_stats(),
+        }
+
+    def catalog_stats(self) -> dict[str, Any] | None:
+        """Catalog watcher state (version, invalidations), or None when not watching."""
+        return self._catalog.stats() if self._catalog is not None else None
+
+    def warm_up(self) -> None:
+        """Load lazy adapters (e.g. the embedding model), read the catalog version, build materialized lists."""
+        self._embed.embed("warm up")
+        if self._catalog is not None:
+            try:
+                self._catalog.poll()
+            except Exception:
+                if self._logger:
+                    self._logger.warning("catalog_poll_failed", exc_info=True)
+        if self._top_ads is not None:
+            try:
+                self._top_ads.refresh()
+            except Exception:
+                # Missing collection etc.: the refresh thread retries
+                if self._logger:
+                    self._logger.warning("top_ads_refresh_failed", exc_info=True)
+
+    @contextmanager
+    def background_deferred(self) -> Iterator[None]:
+        """Match without starting the catalog-watch / top-ads refresh threads (pre-fork preload).
+
+        The threads start with the first request afterwards, in the process that serves it.
+        """
+        self._defer_threads = True
+        try:
+            yield
+        finally:
+            self._defer_threads = False
+
+    def reconnect(self) -> None:
+        """Give this process its own vector-store connections (call in each worker after ``os.fork``)."""
+        self._store.reconnect()
+
+    def _observe(self, timings: dict[str, float], placement: str, cache: str) -> None:
+        if self._observer is None:
+            return
+        for stage, seconds in timings.items():
+            self._observer.observe(seconds, stage=stage, placement=placement, cache=cache)
+
+    def _hit_to_candidate(self, hit: VectorHit, request_id: str) -> Candidate:
         score = max(0.0, min(1.0, hit.score))
         match_id = self._match_id.new_match_id(request_id, hit.ad_id)
-
-        return AdCandidate(
-            ad_id=hit.ad_id,
-            advertiser_id=hit.advertiser_id,
-            title=hit.payload["title"],
-            body=hit.payload["body"],
-            cta_text=hit.payload["cta_text"],
-            landing_url=hit.payload["landing_url"],
-            score=score,
-            match_id=match_id,
+        payload = hit.payload
+        return Candidate(
+            hit.ad_id,
+            hit.advertiser_id,
+            payload["title"],
+            payload["body"],
+            payload["cta_text"],
+            payload["landing_url"],
+            score,
+            match_id,
         )
@@ -0,0 +1,90 @@
+"""Compact per-request record captured by ``MatchService.match``.
+
+Holds only what is cheap to capture on the hot path — hit ids, scores,
+policy verdict bitmasks and match_ids as parallel columns plus references to
+the request's context and constraints.  The human-readable audit trace
+(``to_dict``) is built only when ``ads_explain`` asks for it.
+
+When trace capture is sampled out, the record keeps timings, cache outcome
+and the retrieved-hit count (for metrics / flight recorder) but no columns.
+``degraded`` is ``(reason, source)`` when the hits came from the degraded-mode
+fallback instead of a live query; ``retrieval`` says where the hits came from
+(``ann``, ``materialized`` or the fallback source).
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from ..domain.policy_engine import reason_for_verdict
+from ..models.mcp_requests import MatchConstraints
+
+_EMPTY: tuple = ()
+
+
+class MatchTrace:
+    """Raw decisions for one ads_match request (see module docstring)."""
+
+    __slots__ = (
+        "request_id", "placement", "context_text", "constraints", "timings_ms", "cache",
+        "retrieved", "sampled", "ad_ids", "scores", "verdicts", "match_ids", "degraded",
+        "retrieval",
+    )
+
+    def __init__(
+        self,
+        request_id: str,
+        placement: str,
+        context_text: str,
+        constraints: MatchConstraints,
+        timings_ms: dict[str, float],
+        cache: str,
+        retrieved: int,
+        sampled: bool = True,
+        ad_ids: tuple[str, ...] = _EMPTY,
+        scores: tuple[float, ...] = _EMPTY,
+        verdicts: bytes = b"",
+        match_ids: tuple[str | None, ...] = _EMPTY,
+        degraded: tuple[str, str] | None = None,
+        retrieval: str = "ann",
+    ) -> None:
+        self.request_id = request_id
+        self.placement = placement
+        self.context_text = context_text
+        self.constraints = constraints
+        self.timings_ms = timings_ms
+        self.cache = cache
+        self.retrieved = retrieved
+        self.sampled = sampled
+        self.ad_ids = ad_ids
+        self.scores = scores
+        self.verdicts = verdicts
+        self.match_ids = match_ids
+        self.degraded = degraded
+        self.retrieval = retrieval
+
+    def decisions(self) -> list[dict[str, Any]]:
+        """Per-hit audit decisions (ad_id, score, reason, match_id if eligible)."""
+        out: list[dict[str, Any]] = []
+        for ad_id, score, verdict, match_id in zip(self.ad_ids, self.scores, self.verdicts, self.match_ids):
+            d: dict[str, Any] = {"ad_id": ad_id, "score": score, "reason": reason_for_verdict(verdict)}
+            if match_id is not None:
+                d["match_id"] = match_id
+            out.append(d)
+        return out
+
+    def to_dict(self, max_context_chars: int = 500) -> dict[str, Any]:
+        """Materialize the human-readable audit trace returned by ads_explain."""
+        out = {
+            "request_id": self.request_id,
+            "placement": self.placement,
+            "context_text": self.context_text[:max_context_chars],
+            "constraints": self.constraints.model_dump(),
+            "decisions": self.decisions(),
+            "timings_ms": self.timings_ms,
+            "cache": self.cache,
+            "retrieval": self.retrieval,
+        }
+        if self.degraded is not None:
+            out["degraded"] = {"reason": self.degraded[0], "source": self.degraded[1]}
+        return out
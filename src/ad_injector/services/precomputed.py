@@ -0,0 +1,95 @@
+"""Bring-your-own embeddings: precomputed vectors carried by ingestion records.
+
+Depends only on models — no infrastructure imports.
+
+A record may carry its vector in an ``embedding`` field (a list of floats,
+optionally with the ``embedding_model_id`` that produced it), or the
+ingestion run may supply it from a companion ``.npy`` array whose row *i*
+belongs to the *i*-th record of the file (``WithVector``).  An all-NaN row
+means "no vector".  ``PrecomputedVectors`` is built once per run from the
+collection's ``ads_meta`` (``IndexService.precomputed_vectors``): every
+vector must have the collection dimension and finite values, and a
+record-level model id must match the collection's.  Records without a
+vector are embedded locally in the same run.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from typing import Any, Callable, NamedTuple
+
+from ..models import Ad
+
+EMBEDDING_FIELD = "embedding"
+EMBEDDING_MODEL_FIELD = "embedding_model_id"
+
+
+class WithVector(NamedTuple):
+    """A raw record paired with its row of a companion vectors file (None = past its end)."""
+
+    raw: Any
+    vector: Any
+
+
+def unwrap_raw(raw: Any) -> Any:
+    """The raw record without its companion vector (for reject files)."""
+    return raw.raw if isinstance(raw, WithVector) else raw
+
+
+class PrecomputedVectors:
+    """Validation of precomputed vectors for one ingestion run."""
+
+    def __init__(self, dimension: int, embedding_model_id: str) -> None:
+        self.dimension = dimension
+        self.embedding_model_id = embedding_model_id
+
+    def check(self, vector: Any) -> list[float] | None:
+        """``vector`` as floats; None for an all-NaN row; ValueError on a wrong length or non-finite value."""
+        values = vector.tolist() if hasattr(vector, "tolist") else list(vector)
+        if len(values) != self.dimension:
+            raise ValueError(f"embedding has {len(values)} dimensions, collection has {self.dimension}")
+        values = [float(v) for v in values]
+        if all(math.isnan(v) for v in values):
+            return None
+        if not all(math.isfinite(v) for v in values):
+            raise ValueError("embedding contains NaN or infinite values")
+        return values
+
+    def parse(self, raw: Any) -> tuple[Ad, list[float] | None]:
+        """``(Ad, vector or None)`` from a raw NDJSON line, dict, ``Ad`` or ``WithVector``."""
+        row = None
+        if isinstance(raw, WithVector):
+            if raw.vector is None:
+                raise ValueError("vectors file has no row for this record")
+            raw, row = raw
+        if isinstance(raw, Ad):
+            return raw, self.check(row) if row is not None else None
+        item = json.loads(raw) if isinstance(raw, str) else raw
+        vector = row
+        if isinstance(item, dict) and EMBEDDING_FIELD in item:
+            item = dict(item)
+            vector = item.pop(EMBEDDING_FIELD)
+            model = item.pop(EMBEDDING_MODEL_FIELD, None)
+            if model is not None and model != self.embedding_model_id:
+                raise ValueError(
+                    f"embedding_model_id {model!r} does not match the collection's {self.embedding_model_id!r}"
+                )
+        ad = Ad.model_validate(item)
+        return ad, self.check(vector) if vector is not None else None
+
+
+def complete_vectors(
+    embed_texts: Callable[[list[str]], list[list[float]]],
+    ads: list[Ad],
+    vectors: list[list[float] | None] | None,
+) -> list[list[float]]:
+    """Vectors for ``ads``: the precomputed ones as given, the missing ones from one ``embed_texts`` call."""
+    if vectors is None:
+        return embed_texts([ad.embedding_text for ad in ads]) if ads else []
+    missing = [i for i, v in enumerate(vectors) if v is None]
+    out = list(vectors)
+    if missing:
+        for i, vector in zip(missing, embed_texts([ads[i].embedding_text for i in missing])):
+            out[i] = vector
+    return out
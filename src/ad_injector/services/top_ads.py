@@ -0,0 +1,253 @@
+"""Materialized top-ads lists per (topic, locale) and (vertical, locale).
+
+Depends only on ports, domain and models — no infrastructure imports.
+
+``build_top_ads`` scans the catalog once (``VectorStorePort.scroll_ads``),
+groups enabled ads by topic and by vertical -- per stored locale, plus an
+any-locale list ``"*"`` -- and ranks each group by cosine similarity to the
+group's centroid, i.e. by how representative an ad is of that topic or
+vertical.  ``TopAdsLists.lookup`` answers a request whose constraints name
+topics (else verticals) without embedding or ANN search: it merges the lists
+for the requested values, keeps the ads that pass the request's
+``VectorFilter`` and returns the best ``top_k`` as ``VectorHit``s (score =
+centroid similarity).  Requests without topics/verticals, or whose filter
+leaves fewer than ``top_k`` of the listed ads, are not answerable (the lists
+hold only ``per_list`` ads per group; the ANN query sees the whole catalog).
+Listed hits keep only the payload fields that filtering, policy and the
+response need (``LIST_FIELDS``).
+
+``TopAdsRefresher`` rebuilds the lists in a daemon thread whenever the catalog
+version reported by ``version_source`` changes (checked every
+``check_interval_seconds``); ads reported changed through ``invalidate``
+are removed from the current lists right away.  The thread starts lazily in
+the process that first reads the lists, so lists built before a pre-fork are
+shared and each worker keeps its own copy fresh.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any, Callable, Iterable
+
+import numpy as np
+
+from ..domain.filters import VectorFilter
+from ..models.mcp_requests import MatchRequest
+from ..ports.vector_store import VectorHit, VectorStorePort
+
+# Locale key of the lists that ignore locale (requests without a locale constraint)
+ANY_LOCALE = "*"
+
+ListKey = tuple[str, str, str]  # ("topic" | "vertical", value, locale)
+
+# Payload fields kept on listed hits: targeting filter, policy and the served candidate
+LIST_FIELDS = (
+    "ad_id", "advertiser_id", "title", "body", "cta_text", "landing_url",
+    "topics", "locale", "verticals", "blocked_keywords", "sensitive", "age_restricted", "enabled",
+)
+
+
+class TopAdsLists:
+    """Immutable set of ranked lists keyed by (kind, value, locale)."""
+
+    def __init__(self, lists: dict[ListKey, tuple[VectorHit, ...]], version: str = "", ads: int = 0) -> None:
+        self.lists = lists
+        self.version = version
+        self.ads = ads
+        self.built_at = time.time()
+
+    def lookup(
+        self, request: MatchRequest, vector_filter: VectorFilter, partial: bool = False
+    ) -> list[VectorHit] | None:
+        """Best ``top_k`` eligible hits, or None when the request names no topics or verticals.
+
+        Also None when fewer than ``top_k`` listed ads pass the filter, unless
+        ``partial`` (fallback use: a short answer beats none).
+        """
+        c = request.constraints
+        if c.topics:
+            kind, values = "topic", c.topics
+        elif c.verticals:
+            kind, values = "vertical", c.verticals
+        else:
+            return None
+        locales = (c.locale, "") if c.locale else (ANY_LOCALE,)
+        lists = [self.lists.get((kind, v, loc), ()) for v in values for loc in locales]
+        if len(lists) == 1:
+            ranked: Iterable[VectorHit] = lists[0]
+        else:
+            best: dict[str, VectorHit] = {}
+            for hits in lists:
+                for hit in hits:
+                    if hit.ad_id not in best or best[hit.ad_id].score < hit.score:
+                        best[hit.ad_id] = hit
+            ranked = sorted(best.values(), key=lambda h: h.score, reverse=True)
+        out: list[VectorHit] = []
+        for hit in ranked:
+            if vector_filter.is_empty or vector_filter.matches(hit.payload):
+                out.append(hit)
+                if len(out) == request.top_k:
+                    break
+        if len(out) < request.top_k and not partial:
+            return None
+        return out
+
+    def without(self, ad_ids: frozenset[str]) -> TopAdsLists:
+        """Copy of the lists with ``ad_ids`` removed (same version)."""
+        lists = {
+            key: tuple(h for h in hits if h.ad_id not in ad_ids) if any(h.ad_id in ad_ids for h in hits) else hits
+            for key, hits in self.lists.items()
+        }
+        out = TopAdsLists(lists, self.version, self.ads)
+        out.built_at = self.built_at
+        return out
+
+    def stats(self) -> dict[str, Any]:
+        return {"version": self.version, "ads": self.ads, "lists": len(self.lists), "built_at": round(self.built_at, 3)}
+
+
+def build_top_ads(ads: Iterable[tuple[dict, Any]], per_list: int = 100, version: str = "") -> TopAdsLists:
+    """Rank each (topic|vertical, locale) group of ``(payload, vector)`` pairs by centroid similarity.
+
+    Payloads are projected to ``LIST_FIELDS`` and vectors held as float32 rows
+    while ranking, so the scan does not keep the full catalog in memory.
+    """
+    payloads: list[dict] = []
+    vectors: list[np.ndarray] = []
+    groups: dict[ListKey, list[int]] = {}
+    for payload, vector in ads:
+        if payload.get("enabled", True) is False or vector is None:
+            continue
+        row = len(payloads)
+        payloads.append({k: payload[k] for k in LIST_FIELDS if k in payload})
+        vectors.append(np.asarray(vector, dtype=np.float32))
+        locales = (ANY_LOCALE, *(payload.get("locale") or ()))
+        for kind, field in (("topic", "topics"), ("vertical", "verticals")):
+            for value in payload.get(field) or ():
+                for loc in locales:
+                    groups.setdefault((kind, value, loc), []).append(row)
+    if not payloads:
+        return TopAdsLists({}, version, 0)
+
+    matrix = np.vstack(vectors)
+    del vectors
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.where(norms == 0, 1.0, norms)
+
+    lists: dict[ListKey, tuple[VectorHit, ...]] = {}
+    for key, rows in groups.items():
+        idx = np.asarray(rows)
+        members = matrix[idx]
+        centroid = members.mean(axis=0)
+        norm = float(np.linalg.norm(centroid))
+        scores = members @ (centroid / norm) if norm else np.zeros(len(rows), dtype=np.float32)
+        order = np.argsort(-scores, kind="stable")[:per_list]
+        lists[key] = tuple(
+            VectorHit(
+                ad_id=payloads[idx[i]].get("ad_id", ""),
+                advertiser_id=payloads[idx[i]].get("advertiser_id", ""),
+                score=float(scores[i]),
+                payload=payloads[idx[i]],
+            )
+            for i in order
+        )
+    return TopAdsLists(lists, version, len(payloads))
+
+
+def collection_fingerprint(store: VectorStorePort) -> Callable[[], str]:
+    """Version source derived from ``collection_info`` (point count, model, schema)."""
+
+    def version() -> str:
+        info = store.collection_info() or {}
+        return f"{info.get('points_count')}:{info.get('embedding_model_id')}:{info.get('schema_version')}"
+
+    return version
+
+
+class TopAdsRefresher:
+    """Holds the current ``TopAdsLists`` and rebuilds them when the catalog version changes."""
+
+    def __init__(
+        self,
+        store: VectorStorePort,
+        version_source: Callable[[], str] | None = None,
+        per_list: int = 100,
+        check_interval_seconds: float = 30.0,
+        logger: Any = None,
+    ) -> None:
+        self._store = store
+        self._version = version_source or collection_fingerprint(store)
+        self._per_list = per_list
+        self._interval = check_interval_seconds
+        self._logger = logger
+        self._lists: TopAdsLists | None = None
+        self._lock = threading.Lock()
+        self._thread_pid: int | None = None
+        self._stop = threading.Event()
+        self.refreshes = 0
+        self.errors = 0
+
+    def current(self, start: bool = True) -> TopAdsLists | None:
+        """Lists in effect (None until the first build); starts the refresh thread if needed (and ``start``)."""
+        if start and self._thread_pid != os.getpid():
+            self._start()
+        return self._lists
+
+    def lookup(
+        self, request: MatchRequest, vector_filter: VectorFilter, partial: bool = False, start: bool = True
+    ) -> list[VectorHit] | None:
+        lists = self.current(start)
+        return None if lists is None else lists.lookup(request, vector_filter, partial)
+
+    def invalidate(self, ad_ids: frozenset[str] | None, version: int = 0) -> None:
+        """Catalog change: drop changed ads now (all lists if None); the next refresh rebuilds."""
+        lists = self._lists
+        if lists is not None:
+            self._lists = None if ad_ids is None else lists.without(ad_ids)
+
+    def refresh(self, force: bool = False) -> bool:
+        """Rebuild if the catalog version changed (or ``force``); True if the lists were replaced."""
+        version = self._version()
+        current = self._lists
+        if not force and current is not None and current.version == version:
+            return False
+        t0 = time.perf_counter()
+        lists = build_top_ads(self._store.scroll_ads(), self._per_list, version)
+        self._lists = lists
+        self.refreshes += 1
+        if self._logger:
+            self._logger.info(
+                "top_ads_refreshed",
+                extra={"version": version, "lists": len(lists.lists), "seconds": round(time.perf_counter() - t0, 3)},
+            )
+        return True
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+            self._stop.clear()
+            threading.Thread(target=self._run, name="ad-top-ads-refresh", daemon=True).start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.refresh()
+            except Exception:
+                self.errors += 1
+            if self._stop.wait(self._interval):
+                return
+
+    def close(self) -> None:
+        self._stop.set()
+
+    def stats(self) -> dict[str, Any]:
+        lists = self._lists
+        return {
+            **(lists.stats() if lists is not None else {"version": None, "lists": 0}),
+            "refreshes": self.refreshes,
+            "errors": self.errors,
+        }
@@ -0,0 +1,243 @@
+"""Chunked upload sessions for the Control Plane (``upload_*`` tools).
+
+Depends only on models and services — no infrastructure imports.
+
+A client opens a session, appends chunks (JSON arrays of at most
+``max_chunk_items`` ads) and commits.  Each chunk is validated in one pass
+with a ``TypeAdapter(list[Ad])`` JSON validator; if that reports errors, the
+failing indexes are taken from the error locations, the remaining items are
+kept and every invalid item is recorded as ``{"chunk", "index", "ad_id",
+"error"}``.  Valid ads are embedded and upserted in the background through
+``IndexService.upsert_ads`` (one worker thread, chunks in arrival order), so
+an append returns as soon as its chunk is validated.
+
+A session holding ``max_pending_chunks`` chunks that are not upserted yet is
+busy: further appends are refused until the worker catches up, which bounds
+the memory held per session.  ``commit`` closes a session for appends; it
+becomes ``completed`` (or ``failed``) once its last chunk is upserted.
+Upserts are not transactional: ads of a failed or aborted session that were
+already upserted stay.  Sessions are forgotten ``ttl_seconds`` after their
+last activity (abandoned open sessions included).
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from pydantic import TypeAdapter, ValidationError
+
+from ..models import Ad
+from .index_service import IndexService
+
+_ADS_ADAPTER = TypeAdapter(list[Ad])
+
+OPEN, COMMITTING, COMPLETED, FAILED, ABORTED = "open", "committing", "completed", "failed", "aborted"
+_FINISHED = frozenset({COMPLETED, FAILED, ABORTED})
+
+
+class UploadSessionError(ValueError):
+    """Unknown session, wrong session state, or a refused append (busy / too large)."""
+
+
+class ChunkFormatError(ValueError):
+    """A chunk that is not valid JSON or not a JSON array of objects."""
+
+
+def validate_chunk(ads_json: str | bytes) -> tuple[list[Ad], list[tuple[int, str | None, str]]]:
+    """Valid ads of a JSON array plus ``(index, ad_id, error)`` per invalid item.
+
+    Raises ``ChunkFormatError`` if ``ads_json`` is not valid JSON or not an array.
+    """
+    try:
+        return _ADS_ADAPTER.validate_json(ads_json), []
+    except ValidationError as e:
+        problems: dict[int, list[str]] = {}
+        for err in e.errors():
+            loc = err["loc"]
+            if not loc or not isinstance(loc[0], int):
+                raise ChunkFormatError(f"ads_json must be a JSON array of ad objects: {err['msg']}") from None
+            field = ".".join(str(part) for part in loc[1:]) or "item"
+            problems.setdefault(loc[0], []).append(f"{field}: {err['msg']}")
+    items = json.loads(ads_json)
+    ads = _ADS_ADAPTER.validate_python([item for i, item in enumerate(items) if i not in problems])
+    errors = [
+        (i, items[i].get("ad_id") if isinstance(items[i], dict) else None, "; ".join(messages))
+        for i, messages in sorted(problems.items())
+    ]
+    return ads, errors
+
+
+class UploadSession:
+    """Progress of one upload session (mutated by the manager and its worker)."""
+
+    def __init__(self, session_id: str, expected_items: int | None) -> None:
+        self.session_id = session_id
+        self.expected_items = expected_items
+        self.state = OPEN
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.chunks = 0
+        self.received = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.upserted = 0
+        self.pending_chunks = 0
+        self.errors: list[dict[str, Any]] = []
+        self.failure: str | None = None
+
+    def to_dict(self, max_errors: int | None = None) -> dict[str, Any]:
+        errors = self.errors if max_errors is None else self.errors[:max_errors]
+        return {
+            "session_id": self.session_id,
+            "state": self.state,
+            "expected_items": self.expected_items,
+            "chunks": self.chunks,
+            "received": self.received,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "upserted": self.upserted,
+            "pending_chunks": self.pending_chunks,
+            "failure": self.failure,
+            "errors": errors,
+            "errors_truncated": len(errors) < self.rejected,
+            "created_at": round(self.created_at, 3),
+            "updated_at": round(self.updated_at, 3),
+        }
+
+
+class UploadSessionManager:
+    """Open / append / commit / abort upload sessions; one background upsert worker."""
+
+    def __init__(
+        self,
+        index_service: IndexService,
+        max_sessions: int = 16,
+        max_pending_chunks: int = 4,
+        max_chunk_items: int = 500,
+        max_errors: int = 1000,
+        ttl_seconds: float = 3600.0,
+    ) -> None:
+        self._index = index_service
+        self._max_sessions = max_sessions
+        self._max_pending = max_pending_chunks
+        self._max_chunk_items = max_chunk_items
+        self._max_errors = max_errors
+        self._ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self._sessions: dict[str, UploadSession] = {}
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ad-upload")
+
+    def open(self, expected_items: int | None = None) -> dict[str, Any]:
+        with self._lock:
+            self._expire()
+            active = sum(1 for s in self._sessions.values() if s.state not in _FINISHED)
+            if active >= self._max_sessions:
+                raise UploadSessionError(f"too many active upload sessions ({active})")
+            session = UploadSession(uuid.uuid4().hex, expected_items)
+            self._sessions[session.session_id] = session
+            return session.to_dict()
+
+    def append(self, session_id: str, ads_json: str | bytes) -> dict[str, Any]:
+        """Validate one chunk and queue its valid ads; returns the chunk's counts and errors."""
+        session = self._get(session_id)
+        self._check_appendable(session)
+        ads, errors = validate_chunk(ads_json)
+        items = len(ads) + len(errors)
+        if items > self._max_chunk_items:
+            raise UploadSessionError(f"chunk has {items} items; at most {self._max_chunk_items} per chunk")
+        with self._lock:
+            self._check_appendable(session)
+            chunk = session.chunks
+            chunk_errors = [
+                {"chunk": chunk, "index": i, "ad_id": ad_id, "error": msg} for i, ad_id, msg in errors
+            ]
+            session.chunks += 1
+            session.pending_chunks += 1
+            session.received += items
+            session.accepted += len(ads)
+            session.rejected += len(errors)
+            session.errors.extend(chunk_errors[: max(0, self._max_errors - len(session.errors))])
+            session.updated_at = time.time()
+        self._worker.submit(self._upsert, session, ads)
+        return {
+            "session_id": session_id,
+            "chunk": chunk,
+            "accepted": len(ads),
+            "rejected": len(errors),
+            "errors": chunk_errors[: self._max_errors],
+        }
+
+    def commit(self, session_id: str) -> dict[str, Any]:
+        session = self._get(session_id)
+        with self._lock:
+            if session.state != OPEN:
+                raise UploadSessionError(f"session is {session.state}, not open")
+            session.state = COMMITTING if session.pending_chunks else COMPLETED
+            session.updated_at = time.time()
+            return session.to_dict(max_errors=0)
+
+    def abort(self, session_id: str) -> dict[str, Any]:
+        """Stop a session; chunks not yet upserted are dropped (already upserted ads stay)."""
+        session = self._get(session_id)
+        with self._lock:
+            if session.state not in _FINISHED:
+                session.state = ABORTED
+                session.updated_at = time.time()
+            return session.to_dict(max_errors=0)
+
+    def status(self, session_id: str) -> dict[str, Any]:
+        session = self._get(session_id)
+        with self._lock:
+            return session.to_dict()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            states: dict[str, int] = {}
+            for s in self._sessions.values():
+                states[s.state] = states.get(s.state, 0) + 1
+            return states
+
+    def close(self) -> None:
+        self._worker.shutdown(wait=True)
+
+    # -- internals ---------------------------------------------------------
+
+    def _get(self, session_id: str) -> UploadSession:
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session is None:
+            raise UploadSessionError(f"unknown upload session {session_id!r}")
+        return session
+
+    def _check_appendable(self, session: UploadSession) -> None:
+        if session.state != OPEN:
+            raise UploadSessionError(f"session is {session.state}, not open")
+        if session.pending_chunks >= self._max_pending:
+            raise UploadSessionError("session busy: previous chunks are still being upserted, retry")
+
+    def _expire(self) -> None:
+        cutoff = time.time() - self._ttl
+        for sid in [sid for sid, s in self._sessions.items() if s.updated_at < cutoff]:
+            del self._sessions[sid]
+
+    def _upsert(self, session: UploadSession, ads: list[Ad]) -> None:
+        try:
+            if ads and session.state not in (FAILED, ABORTED):
+                count = self._index.upsert_ads(ads)
+                with self._lock:
+                    session.upserted += count
+        except Exception as e:
+            with self._lock:
+                session.state = FAILED
+                session.failure = f"{type(e).__name__}: {e}"
+        finally:
+            with self._lock:
+                session.pending_chunks -= 1
+                session.updated_at = time.time()
+                if session.state == COMMITTING and session.pending_chunks == 0:
+                    session.state = COMPLETED
@@ -7,27 +7,128 @@ elsewhere.
 
 from __future__ import annotations
 
+from .adapters.catalog_snapshot import CatalogSnapshot
 from .adapters.fastembed_provider import FastEmbedProvider
+from .adapters.file_job_store import FileJobStore
+from .adapters.memory_vector_store import InMemoryVectorStore
 from .adapters.qdrant_vector_store import QdrantVectorStore
+from .adapters.sqlite_trace_store import SqliteTraceStore
 from .config.runtime import RuntimeSettings, get_settings
+from .mcp.observability import INDEX_STAGE_SECONDS, MATCH_STAGE_SECONDS
+from .mcp.serialization import get_serializer
+from .ports.trace_store import TraceStorePort
+from .ports.vector_store import VectorStorePort
+from .services.caches import CachingEmbeddingProvider, ResultCache
+from .services.catalog import CatalogWatcher
+from .services.degradation import CircuitBreaker, FallbackResults
+from .services.top_ads import TopAdsRefresher
 from .services.index_service import IndexService
+from .services.jobs import JobScheduler
 from .services.match_service import MatchService
 
 
-def build_match_service(settings: RuntimeSettings | None = None) -> MatchService:
-    """Construct a MatchService with real adapters."""
+def build_vector_store(settings: RuntimeSettings | None = None) -> VectorStorePort:
+    """Construct the configured vector store adapter (VECTOR_STORE_BACKEND)."""
     settings = settings or get_settings()
+    if settings.vector_store_backend == "memory":
+        store = InMemoryVectorStore(settings)
+        if settings.snapshot_path is not None:
+            store.load_snapshot(CatalogSnapshot(settings.snapshot_path))
+        return store
+    return QdrantVectorStore(settings)
+
+
+def build_trace_store(settings: RuntimeSettings | None = None) -> TraceStorePort:
+    """Construct the configured ads_explain trace store (TRACE_STORE_BACKEND)."""
+    from .mcp.trace_store import TraceStore
+
+    settings = settings or get_settings()
+    if settings.trace_store_backend == "sqlite":
+        return SqliteTraceStore(
+            settings.trace_store_path,
+            max_bytes=settings.trace_store_max_bytes,
+            ttl_seconds=settings.trace_store_ttl_seconds,
+        )
+    return TraceStore(max_bytes=settings.trace_store_max_bytes, ttl_seconds=settings.trace_store_ttl_seconds)
+
+
+def build_embedding_provider(model_id: str | None = None, settings: RuntimeSettings | None = None):
+    """Construct the embedding adapter for ``model_id`` (default: EMBEDDING_MODEL_ID)."""
+    settings = settings or get_settings()
+    return FastEmbedProvider(model_id=model_id or settings.embedding_model_id)
+
+
+def build_job_scheduler(settings: RuntimeSettings | None = None) -> JobScheduler:
+    """Construct the Control Plane job scheduler with its on-disk job records (JOBS_DIR)."""
+    settings = settings or get_settings()
+    return JobScheduler(
+        FileJobStore(settings.jobs_dir),
+        max_workers=settings.jobs_max_workers,
+        max_queued=settings.jobs_max_queued,
+        max_records=settings.jobs_max_records,
+    )
+
+
+def build_match_service(
+    settings: RuntimeSettings | None = None, vector_store: VectorStorePort | None = None
+) -> MatchService:
+    """Construct a MatchService with real adapters and the configured caches.
+
+    Pass ``vector_store`` to share one store with an ``IndexService`` (needed
+    for the memory backend, whose data lives in the store object).
+    """
+    settings = settings or get_settings()
+    embedder = FastEmbedProvider(model_id=settings.embedding_model_id)
+    if settings.embedding_cache_size:
+        embedder = CachingEmbeddingProvider(embedder, settings.embedding_cache_size)
+    result_cache = None
+    if settings.result_cache_size:
+        result_cache = ResultCache(settings.result_cache_size, settings.result_cache_ttl_seconds)
+    options: dict = {}
+    if settings.degraded_mode_enabled:
+        budgets = {"embed": settings.embed_budget_ms, "query": settings.query_budget_ms}
+        options = {
+            "fallback": FallbackResults(settings.fallback_cache_size, settings.fallback_per_topic),
+            "circuit_breaker": CircuitBreaker(
+                settings.circuit_breaker_failures, settings.circuit_breaker_reset_seconds
+            ),
+            "stage_budgets": {stage: ms / 1000 for stage, ms in budgets.items() if ms},
+        }
+    store = vector_store or build_vector_store(settings)
+    watcher = None
+    if settings.catalog_watch_enabled:
+        watcher = CatalogWatcher(store, settings.catalog_poll_interval_seconds)
+        options["catalog_watcher"] = watcher
+    if settings.top_ads_enabled:
+        options["top_ads"] = TopAdsRefresher(
+            store,
+            version_source=watcher.version_source if watcher is not None else None,
+            per_list=settings.top_ads_per_list,
+            check_interval_seconds=settings.top_ads_check_interval_seconds,
+        )
+        options["top_ads_max_context_chars"] = settings.top_ads_max_context_chars
+    if watcher is not None:
+        for listener in (result_cache, options.get("fallback"), options.get("top_ads"), get_serializer()):
+            if listener is not None:
+                watcher.subscribe(listener)
     return MatchService(
-        embedding_provider=FastEmbedProvider(model_id=settings.embedding_model_id),
-        vector_store=QdrantVectorStore(settings),
+        embedding_provider=embedder,
+        vector_store=store,
+        stage_observer=MATCH_STAGE_SECONDS,
+        result_cache=result_cache,
+        trace_sample_rate=settings.trace_sample_rate,
+        **options,
     )
 
 
-def build_index_service(settings: RuntimeSettings | None = None) -> IndexService:
-    """Construct an IndexService with real adapters."""
+def build_index_service(
+    settings: RuntimeSettings | None = None, vector_store: VectorStorePort | None = None
+) -> IndexService:
+    """Construct an IndexService with real adapters (``vector_store``: share an existing store)."""
     settings = settings or get_settings()
     return IndexService(
         embedding_provider=FastEmbedProvider(model_id=settings.embedding_model_id),
-        vector_store=QdrantVectorStore(settings),
+        vector_store=vector_store or build_vector_store(settings),
         settings=settings,
+        stage_observer=INDEX_STAGE_SECONDS,
     )
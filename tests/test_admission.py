@@ -0,0 +1,121 @@
+"""Tests for Data Plane admission control (concurrency limit, queue, deadlines)."""
+
+import time
+
+import anyio
+import pytest
+
+from ad_injector.mcp.admission import AdmissionController, Overloaded
+
+
+def _run(fn):
+    return anyio.run(fn)
+
+
+def test_limits_concurrency_and_serves_everyone():
+    controller = AdmissionController(max_concurrent=2, max_queue=10)
+    active = peak = done = 0
+
+    async def one():
+        nonlocal active, peak, done
+        async with controller.admit():
+            active += 1
+            peak = max(peak, active)
+            await anyio.sleep(0.02)
+            active -= 1
+            done += 1
+
+    async def main():
+        async with anyio.create_task_group() as tg:
+            for _ in range(6):
+                tg.start_soon(one)
+
+    _run(main)
+    assert (peak, done) == (2, 6)
+    stats = controller.stats()
+    assert (stats["in_flight"], stats["queued"], stats["admitted"]) == (0, 0, 6)
+
+
+def test_full_queue_sheds():
+    controller = AdmissionController(max_concurrent=1, max_queue=1)
+    errors = []
+
+    async def hold(delay):
+        try:
+            async with controller.admit():
+                await anyio.sleep(delay)
+        except Overloaded as e:
+            errors.append(e.reason)
+
+    async def main():
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(hold, 0.1)
+            await anyio.sleep(0.01)
+            tg.start_soon(hold, 0.0)
+            await anyio.sleep(0.01)
+            tg.start_soon(hold, 0.0)
+
+    _run(main)
+    assert errors == ["queue_full"]
+    assert controller.stats()["queue_full"] == 1
+
+
+def test_waiter_times_out_at_its_deadline():
+    controller = AdmissionController(max_concurrent=1, max_queue=10)
+    result = {}
+
+    async def main():
+        async def holder():
+            async with controller.admit():
+                await anyio.sleep(0.3)
+
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(holder)
+            await anyio.sleep(0.01)
+            t0 = time.monotonic()
+            with pytest.raises(Overloaded) as exc:
+                async with controller.admit(timeout_ms=50):
+                    pass
+            result["reason"] = exc.value.reason
+            result["elapsed"] = time.monotonic() - t0
+
+    _run(main)
+    assert result["reason"] == "timeout"
+    assert 0.04 <= result["elapsed"] < 0.25
+    assert controller.stats()["queued"] == 0
+
+
+def test_hopeless_request_is_rejected_without_waiting():
+    controller = AdmissionController(max_concurrent=1, max_queue=10)
+    result = {}
+
+    async def main():
+        async with controller.admit():  # establishes a ~50 ms service time
+            await anyio.sleep(0.05)
+
+        async def holder():
+            async with controller.admit():
+                await anyio.sleep(0.2)
+
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(holder)
+            await anyio.sleep(0.01)
+            t0 = time.monotonic()
+            with pytest.raises(Overloaded) as exc:
+                async with controller.admit(timeout_ms=10):
+                    pass
+            result["reason"] = exc.value.reason
+            result["elapsed"] = time.monotonic() - t0
+            result["retry_after_ms"] = exc.value.to_dict()["retry_after_ms"]
+
+    _run(main)
+    assert result["reason"] == "deadline"
+    assert result["elapsed"] < 0.01
+    assert result["retry_after_ms"] >= 40
+
+
+def test_budget_is_capped_by_default_timeout():
+    controller = AdmissionController(default_timeout_seconds=2.0)
+    assert controller.budget(None) == 2.0
+    assert controller.budget(500) == 0.5
+    assert controller.budget(60_000) == 2.0
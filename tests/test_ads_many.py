@@ -0,0 +1,75 @@
+"""Tests for the batched ads_get_many / ads_delete_many Control Plane tools and their port methods."""
+
+import json
+
+import pytest
+
+from ad_injector.adapters.memory_vector_store import InMemoryVectorStore
+from ad_injector.adapters.qdrant_vector_store import QdrantVectorStore
+from ad_injector.config.runtime import RuntimeSettings, get_settings
+from ad_injector.mcp import tools
+from ad_injector.mcp.server import create_server
+from ad_injector.models import Ad, AdTargeting
+from ad_injector.services.index_service import IndexService
+
+
+class FakeEmbedder:
+    def embed(self, text):
+        return [1.0, float(len(text) % 3), 0.5]
+
+
+def _ad(ad_id):
+    return Ad(
+        ad_id=ad_id,
+        advertiser_id="adv-1",
+        title=f"Title {ad_id}",
+        body="Body",
+        cta_text="Click",
+        landing_url=f"https://example.com/{ad_id}",
+        targeting=AdTargeting(topics=["tech"]),
+    )
+
+
+def _service(store_cls=InMemoryVectorStore):
+    settings = RuntimeSettings(_env_file=None, embedding_dimension=3, qdrant_location=":memory:")
+    service = IndexService(FakeEmbedder(), store_cls(settings), settings)
+    service.ensure_collection()
+    service.upsert_ads([_ad(f"ad-{i}") for i in range(5)])
+    return service
+
+
+@pytest.mark.parametrize("store_cls", [InMemoryVectorStore, QdrantVectorStore])
+def test_get_ads_and_delete_ads_report_only_stored_ids(store_cls):
+    service = _service(store_cls)
+    store = service.vector_store
+    got = store.get_ads(["ad-1", "nope", "ad-3"])
+    assert set(got) == {"ad-1", "ad-3"} and got["ad-1"]["title"] == "Title ad-1"
+    assert store.get_ads(["ad-2"], fields=["ad_id", "enabled"]) == {"ad-2": {"ad_id": "ad-2", "enabled": True}}
+
+    version = service.collection_info()["catalog_version"]
+    assert service.delete_ads(["ad-0", "nope", "ad-4", "ad-0"]) == ["ad-0", "ad-4"]
+    assert service.collection_info()["points_count"] == 3
+    assert service.vector_store.catalog_state()["catalog_version"] == version + 1
+    assert service.delete_ads(["nope"]) == []
+
+
+def test_tools_shape_results_and_refuse_bad_input(monkeypatch):
+    service = _service()
+    monkeypatch.setattr(tools, "_get_index_service", lambda: service)
+    registered = create_server("admin")._tool_manager._tools
+    get_many, delete_many = registered["ads_get_many"].fn, registered["ads_delete_many"].fn
+
+    out = json.loads(get_many(json.dumps(["ad-2", "missing", "ad-1"])))
+    assert [ad["ad_id"] for ad in out["ads"]] == ["ad-2", "ad-1"] and out["not_found"] == ["missing"]
+    assert all(set(ad) <= tools.ALLOWED_ADS_GET_KEYS for ad in out["ads"])
+    assert "content_hash" not in out["ads"][0]
+
+    out = json.loads(delete_many(json.dumps(["ad-1", "missing"])))
+    assert out == {"deleted": ["ad-1"], "not_found": ["missing"]}
+    assert service.get_ad("ad-1") is None
+
+    assert "error" in json.loads(get_many('{"ad_id": "x"}'))
+    assert "error" in json.loads(delete_many("not json"))
+    limit = get_settings().max_ids_per_call
+    out = json.loads(delete_many(json.dumps([f"x-{i}" for i in range(limit + 1)])))
+    assert out["error"] == "too many ad_ids" and out["received"] == limit + 1
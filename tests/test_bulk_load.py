@@ -0,0 +1,121 @@
+"""Tests for the staged, checkpointed bulk-load pipeline."""
+
+import json
+import random
+import time
+
+import pytest
+
+from ad_injector.adapters.memory_vector_store import InMemoryVectorStore
+from ad_injector.config.runtime import RuntimeSettings
+from ad_injector.ops.ingest import bulk_ingest
+from ad_injector.services.index_service import IndexService
+
+
+class SlowEmbedder:
+    """Random per-batch delay so the embedder pool finishes batches out of order."""
+
+    def __init__(self):
+        self.texts = 0
+
+    def embed(self, text):
+        return [1.0, 0.0, 0.0]
+
+    def embed_batch(self, texts):
+        time.sleep(random.random() * 0.01)
+        self.texts += len(texts)
+        return [[1.0, 0.0, 0.0] for _ in texts]
+
+
+class RecordingStore(InMemoryVectorStore):
+    def __init__(self, settings, fail_on_call=None):
+        super().__init__(settings)
+        self.waits = []
+        self.fail_on_call = fail_on_call
+
+    def upsert_batch(self, ads_with_embeddings, wait=True):
+        if len(self.waits) + 1 == self.fail_on_call:
+            raise ConnectionError("vector store went away")
+        self.waits.append(wait)
+        return super().upsert_batch(ads_with_embeddings, wait)
+
+
+def _service(store=None, fail_on_call=None):
+    settings = RuntimeSettings(_env_file=None, embedding_dimension=3, max_batch_size=2)
+    store = store or RecordingStore(settings, fail_on_call)
+    store.ensure_collection(3)
+    embedder = SlowEmbedder()
+    return IndexService(embedding_provider=embedder, vector_store=store, settings=settings), store, embedder
+
+
+def _row(ad_id, title="Title"):
+    return json.dumps({
+        "ad_id": ad_id, "advertiser_id": "adv-1", "title": title, "body": "Body",
+        "cta_text": "Click", "landing_url": f"https://example.com/{ad_id}",
+    })
+
+
+def _write(tmp_path, rows):
+    path = tmp_path / "catalog.ndjson"
+    path.write_text("\n".join(rows) + "\n", encoding="utf-8")
+    return path
+
+
+def test_staged_load_orders_batches_and_barriers(tmp_path):
+    rows = [_row("dup", "first")] + [_row(f"ad-{i}") for i in range(10)] + ["{bad", _row("dup", "last")]
+    path = _write(tmp_path, rows)
+    state = tmp_path / "state.json"
+    service, store, _ = _service()
+    checkpoints = []
+
+    report = bulk_ingest(
+        service, path, state, reject_path=tmp_path / "rejects.ndjson",
+        progress=lambda r: checkpoints.append(r.checkpoint), embed_workers=3, barrier_every=2,
+    )
+
+    assert (report.read, report.upserted, report.rejected) == (13, 12, 1)
+    assert store.get_ad("dup")["title"] == "last"
+    assert store.waits == [False, True, False, True, False, True, True]  # last upsert is the final barrier
+    assert checkpoints == [4, 8, 12, 13] and not state.exists()
+    assert store.catalog_state()["catalog_version"] == 4
+    stages = report.to_dict()["stages"]
+    assert stages["read"]["items"] == 13 and stages["embed"]["items"] == 12 and stages["upload"]["items"] == 12
+
+
+def test_resume_after_crash_skips_durable_rows(tmp_path):
+    path = _write(tmp_path, [_row(f"ad-{i}") for i in range(12)])
+    state = tmp_path / "state.json"
+    service, store, _ = _service(fail_on_call=4)
+    with pytest.raises(ConnectionError):
+        bulk_ingest(service, path, state, barrier_every=2)
+    saved = json.loads(state.read_text())
+    assert saved["offset"] == 4  # only the first barrier completed
+
+    store.fail_on_call = None
+    resumed_service, _, embedder = _service(store)
+    report = bulk_ingest(resumed_service, path, state, barrier_every=2)
+    assert report.skipped == 4 and embedder.texts == 8
+    assert store.collection_info()["points_count"] == 12 and not state.exists()
+
+
+def test_checkpoint_for_another_file_is_refused(tmp_path):
+    path = _write(tmp_path, [_row("a")])
+    state = tmp_path / "state.json"
+    state.write_text(json.dumps({"source": "/elsewhere.ndjson", "size": 1, "mtime_ns": 1, "offset": 9}))
+    service, _, _ = _service()
+    with pytest.raises(ValueError, match="remove it to start over"):
+        bulk_ingest(service, path, state)
+    assert bulk_ingest(service, path, state, restart=True).upserted == 1
+
+
+def test_precomputed_vectors_are_upserted_without_embedding(tmp_path):
+    rows = [_row(f"ad-{i}") for i in range(5)]
+    rows[1] = json.dumps({**json.loads(rows[1]), "embedding": [0.0, 1.0, 0.0]})
+    rows[3] = json.dumps({**json.loads(rows[3]), "embedding": [0.0, 0.0, 1.0]})
+    path = _write(tmp_path, rows)
+    service, store, embedder = _service()
+
+    report = bulk_ingest(service, path, tmp_path / "state.json", embed_workers=2)
+
+    assert (report.upserted, report.rejected, embedder.texts) == (5, 0, 3)
+    assert store.collection_info()["points_count"] == 5
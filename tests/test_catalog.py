@@ -0,0 +1,213 @@
+"""Tests for the catalog version counter, change log and Data Plane invalidation."""
+
+import threading
+
+from ad_injector.adapters.memory_vector_store import InMemoryVectorStore
+from ad_injector.adapters.qdrant_vector_store import QdrantVectorStore
+from ad_injector.config.runtime import RuntimeSettings
+from ad_injector.domain.filters import VectorFilter
+from ad_injector.mcp.serialization import ResponseSerializer
+from ad_injector.models import Ad, AdTargeting
+from ad_injector.models.mcp_requests import MatchRequest
+from ad_injector.services.caches import ResultCache
+from ad_injector.services.catalog import CatalogWatcher, changed_since, next_catalog_state
+from ad_injector.services.degradation import FallbackResults
+from ad_injector.services.index_service import IndexService
+from ad_injector.services.match_result import Candidate, MatchResult
+
+from .test_match_service import _make_hit
+
+
+class UnitEmbedder:
+    def embed(self, text):
+        return [1.0, 0.0, 0.0]
+
+
+def _settings(**kwargs):
+    return RuntimeSettings(_env_file=None, embedding_dimension=3, **kwargs)
+
+
+def _ad(ad_id, advertiser_id="adv-1"):
+    return Ad(
+        ad_id=ad_id,
+        advertiser_id=advertiser_id,
+        title=f"Title {ad_id}",
+        body="Body",
+        cta_text="Click",
+        landing_url=f"https://example.com/{ad_id}",
+        targeting=AdTargeting(topics=["tech"]),
+    )
+
+
+def _index(store=None, **settings):
+    settings = _settings(**settings)
+    store = store or InMemoryVectorStore(settings)
+    service = IndexService(embedding_provider=UnitEmbedder(), vector_store=store, settings=settings)
+    service.ensure_collection()
+    return service, store
+
+
+class TestChangeLog:
+    def test_versions_increase_and_log_is_bounded_by_ids(self):
+        state = {}
+        for ids in (["a", "b"], ["c"], ["d", "e"]):
+            state = next_catalog_state(state, ids, max_logged_ids=2)
+        assert state["catalog_version"] == 3
+        assert state["catalog_changes"] == [[3, ["d", "e"]]]
+        assert changed_since(state, 2) == {"d", "e"}
+        assert changed_since(state, 1) is None  # entry 2 was trimmed
+
+    def test_oversized_and_collection_wide_changes_are_logged_as_none(self):
+        state = next_catalog_state({}, ["a", "b", "c"], max_logged_ids=2)
+        assert state["catalog_changes"] == [[1, None]]
+        state = next_catalog_state(next_catalog_state({}, ["a"]), None)
+        assert changed_since(state, 1) is None
+        assert changed_since(state, 2) == frozenset()
+        assert changed_since(state, 5) is None
+
+
+class TestIndexServiceBumps:
+    def test_every_mutation_bumps_the_version(self):
+        service, store = _index()
+        base = store.catalog_state().get("catalog_version", 0)
+        service.upsert_ads([_ad("a"), _ad("b", "adv-2")])
+        service.delete_ad("a")
+        service.bulk_disable({"ad_id": "b"})
+        service.bulk_disable({"advertiser_id": "nobody"})  # nothing changed
+        state = store.catalog_state()
+        assert state["catalog_version"] == base + 3
+        assert changed_since(state, base) == {"a", "b"}
+        service.bulk_disable({"advertiser_id": "adv-2"})
+        assert changed_since(store.catalog_state(), base + 3) is None
+        assert service.collection_info()["catalog_version"] == base + 4
+
+    def test_noop_ensure_keeps_the_version(self):
+        service, store = _index()
+        version = store.catalog_version()
+        service.ensure_collection()
+        assert store.catalog_version() == version
+        service.ensure_collection(embedding_model_id="other/model")
+        assert store.catalog_version() == version + 1
+
+    def test_version_survives_collection_recreate(self):
+        service, store = _index()
+        service.upsert_ads([_ad("a")])
+        before = store.catalog_state()["catalog_version"]
+        service.delete_collection()
+        service.ensure_collection()
+        assert store.catalog_state()["catalog_version"] > before
+
+    def test_qdrant_keeps_state_on_the_meta_point(self):
+        settings = _settings(qdrant_location=":memory:")
+        service, store = _index(QdrantVectorStore(settings), qdrant_location=":memory:")
+        service.upsert_ads([_ad("a")])
+        version = store.catalog_state()["catalog_version"]
+        service.ensure_collection()  # rewrites the meta point, nothing changed
+        assert store.catalog_state()["catalog_version"] == version
+        service.ensure_collection(schema_version="2")
+        state = store.catalog_state()
+        assert state["catalog_version"] == version + 1
+        assert changed_since(state, version - 1) is None
+        assert store.collection_info()["catalog_version"] == version + 1
+
+
+class TestConcurrentBumps:
+    def test_threads_lose_no_versions_or_ids(self):
+        service, store = _index()
+        base = store.catalog_version()
+        other = IndexService(embedding_provider=UnitEmbedder(), vector_store=store, settings=_settings())
+
+        def bump(svc, prefix):
+            for i in range(20):
+                svc.record_catalog_change([f"{prefix}-{i}"])
+
+        threads = [threading.Thread(target=bump, args=(svc, p)) for svc, p in ((service, "a"), (other, "b"))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert store.catalog_version() == base + 40
+        assert len(changed_since(store.catalog_state(), base)) == 40
+
+    def test_retries_when_another_process_moved_the_version(self):
+        service, store = _index()
+        original = store.set_catalog_state
+        raced = []
+
+        def set_catalog_state(state, expected_version=None):
+            if not raced:  # another node's write lands between our read and our write
+                raced.append(True)
+                original(next_catalog_state(store.catalog_state(), ["theirs"]))
+            return original(state, expected_version)
+
+        store.set_catalog_state = set_catalog_state
+        base = store.catalog_version()
+        assert service.record_catalog_change(["ours"]) == base + 2
+        assert changed_since(store.catalog_state(), base) == {"theirs", "ours"}
+
+    def test_qdrant_write_is_conditional_on_the_version(self):
+        settings = _settings(qdrant_location=":memory:")
+        service, store = _index(QdrantVectorStore(settings), qdrant_location=":memory:")
+        version = service.record_catalog_change(["a"])
+        assert store.catalog_version() == version
+        stale = next_catalog_state({"catalog_version": version - 1}, ["b"])
+        assert store.set_catalog_state(stale, expected_version=version - 1) is False
+        assert store.set_catalog_state(next_catalog_state(store.catalog_state(), ["b"]), expected_version=version)
+        assert store.catalog_version() == version + 1 and "catalog_writer" not in store.catalog_state()
+
+
+def _candidate(ad_id):
+    return Candidate(ad_id, "adv-1", "T", "B", "C", "https://x", 0.5, f"m-{ad_id}")
+
+
+class TestWatcher:
+    def test_invalidates_only_changed_ads(self):
+        service, store = _index()
+        results = ResultCache(10, 0)
+        results.put("q1", [_make_hit("ad-1", 0.9)])
+        results.put("q2", [_make_hit("ad-2", 0.9)])
+        fallback = FallbackResults()
+        fallback.remember("q1", [_make_hit("ad-1", 0.9), _make_hit("ad-2", 0.8)])
+        serializer = ResponseSerializer()
+        serializer.render_match(MatchResult("r", "inline", [_candidate("ad-1"), _candidate("ad-2")]))
+        watcher = CatalogWatcher(store)
+        for listener in (results, fallback, serializer):
+            watcher.subscribe(listener)
+
+        assert watcher.poll() is False  # first poll only records the version
+        service.delete_ad("ad-1")
+        assert watcher.poll() is True
+        assert results.get("q1") is None and results.get("q2") is not None
+        assert fallback.last_known_good("q1", MatchRequest(context_text="x"), VectorFilter()) is None
+        hits, _ = fallback.topic_fallback(MatchRequest(context_text="x"), VectorFilter())
+        assert [h.ad_id for h in hits] == ["ad-2"]
+        assert serializer.stats()["entries"] == 1
+        assert watcher.poll() is False
+
+    def test_poll_reads_the_log_only_when_the_version_moved(self):
+        service, store = _index()
+        reads = []
+        original = store.catalog_state
+        store.catalog_state = lambda: reads.append(1) or original()
+        watcher = CatalogWatcher(store)
+        for _ in range(3):
+            watcher.poll()
+        assert reads == []
+        service.delete_ad("ad-1")
+        reads.clear()
+        assert watcher.poll() is True and len(reads) == 1
+
+    def test_collection_wide_change_flushes(self):
+        service, store = _index()
+        results = ResultCache(10, 0)
+        serializer = ResponseSerializer()
+        watcher = CatalogWatcher(store)
+        watcher.subscribe(results)
+        watcher.subscribe(serializer)
+        watcher.poll()
+        results.put("q", [_make_hit("ad-9", 0.9)])
+        service.record_catalog_change(None)
+        watcher.poll()
+        assert results.get("q") is None
+        assert serializer.catalog_version == str(watcher.version)
+        assert watcher.stats()["full_invalidations"] == 1
@@ -16,8 +16,19 @@ FORBIDDEN_TOOLS = {
     "collection_create",
     "ads_upsert_batch",
     "ads_delete",
+    "ads_delete_many",
     "ads_bulk_disable",
     "ads_get",
+    "ads_get_many",
+    "upload_open",
+    "upload_append",
+    "upload_commit",
+    "upload_status",
+    "upload_abort",
+    "jobs_status",
+    "jobs_list",
+    "jobs_cancel",
+    "ads_flight_recorder",
     "query_ads",
     "delete_ad",
     "upsert_ad",
@@ -57,4 +68,7 @@ def test_control_plane_has_admin_tools():
     assert "collection_ensure" in tool_names
     assert "ads_upsert_batch" in tool_names
     assert "ads_delete" in tool_names
+    assert {"ads_delete_many", "ads_get_many", "ads_flight_recorder"} <= tool_names
+    assert {"jobs_status", "jobs_list", "jobs_cancel"} <= tool_names
+    assert {"upload_open", "upload_append", "upload_commit", "upload_status", "upload_abort"} <= tool_names
     assert "ads_match" not in tool_names, "ads_match must not be on Control Plane"
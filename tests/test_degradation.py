@@ -0,0 +1,184 @@
+"""Tests for degraded mode: circuit breaker, stage budgets and fallback results."""
+
+import threading
+import time
+
+import pytest
+
+from ad_injector.domain.filters import VectorFilter
+from ad_injector.models.mcp_requests import MatchConstraints, MatchRequest
+from ad_injector.services import degradation
+from ad_injector.services.degradation import CircuitBreaker, FallbackResults
+from ad_injector.services.match_service import MatchService
+
+from .test_match_service import FakeEmbeddingProvider, FakeVectorStore, _make_hit
+
+
+class FlakyStore(FakeVectorStore):
+    def __init__(self, hits=None):
+        super().__init__(hits)
+        self.down = False
+        self.delay = 0.0
+        self.calls = 0
+
+    def query(self, vector, vector_filter, top_k):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        if self.down:
+            raise ConnectionError("qdrant unavailable")
+        return super().query(vector, vector_filter, top_k)
+
+
+def _service(store, **kwargs):
+    kwargs.setdefault("fallback", FallbackResults())
+    return MatchService(embedding_provider=FakeEmbeddingProvider(), vector_store=store, **kwargs)
+
+
+def _wait_for_abandoned_calls(timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while any(degradation.stage_pool_stats().values()) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not any(degradation.stage_pool_stats().values())
+
+
+def _request(text="learn python", **constraints):
+    return MatchRequest(context_text=text, top_k=3, constraints=MatchConstraints(**constraints))
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold_and_probes_after_cooldown(self, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr(degradation.time, "monotonic", lambda: now[0])
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout_seconds=5)
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == "open" and not breaker.allow()
+        now[0] += 6
+        assert breaker.allow()          # the single half-open probe
+        assert not breaker.allow()
+        breaker.record_failure()        # probe failed: open again
+        assert breaker.state == "open"
+        now[0] += 6
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == "closed" and breaker.stats()["trips"] == 2
+
+
+class TestDegradedMatch:
+    def test_store_failure_serves_last_known_good(self):
+        store = FlakyStore()
+        svc = _service(store)
+        live, live_trace = svc.match(_request())
+        assert live_trace.degraded is None
+        store.down = True
+        result, trace = svc.match(_request("learn   python"))
+        assert trace.degraded == ("query_error", "last_known_good")
+        assert [c.ad_id for c in result.candidates] == [c.ad_id for c in live.candidates]
+        assert trace.to_dict()["degraded"] == {"reason": "query_error", "source": "last_known_good"}
+
+    def test_topic_fallback_is_policy_checked_against_current_context(self):
+        hits = [_make_hit("ad-1", 0.9, blocked_keywords=["casino"]), _make_hit("ad-2", 0.8)]
+        store = FlakyStore(hits)
+        svc = _service(store)
+        svc.match(_request("learn python"))
+        store.down = True
+        result, trace = svc.match(_request("casino night tips", topics=["tech"]))
+        assert trace.degraded == ("query_error", "topic_fallback")
+        assert [c.ad_id for c in result.candidates] == ["ad-2"]
+        assert trace.decisions()[0]["reason"] == "denied: blocked_keywords"
+
+    def test_fallback_respects_targeting_constraints(self):
+        store = FlakyStore()
+        svc = _service(store)
+        svc.match(_request())
+        store.down = True
+        result, trace = svc.match(_request("other", exclude_ad_ids=["ad-1"]))
+        assert trace.degraded[1] == "topic_fallback"
+        assert "ad-1" not in [c.ad_id for c in result.candidates]
+        with pytest.raises(ConnectionError):  # nothing eligible to fall back on: the outage is not hidden
+            svc.match(_request("other", topics=["finance"]))
+
+    def test_open_breaker_skips_the_store(self):
+        store = FlakyStore()
+        svc = _service(store, circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout_seconds=60))
+        svc.match(_request())
+        store.down = True
+        for _ in range(5):
+            svc.match(_request())
+        assert store.calls == 3
+        _, trace = svc.match(_request())
+        assert trace.degraded == ("circuit_open", "last_known_good")
+
+    def test_query_budget_bounds_latency(self):
+        store = FlakyStore()
+        svc = _service(store, stage_budgets={"query": 0.02})
+        svc.match(_request())
+        store.delay = 0.3
+        t0 = time.perf_counter()
+        result, trace = svc.match(_request())
+        assert time.perf_counter() - t0 < 0.2
+        assert trace.degraded == ("query_timeout", "last_known_good")
+        assert result.candidates
+
+    def test_deadline_bounds_stages_without_a_budget(self):
+        store = FlakyStore()
+        svc = _service(store)
+        svc.match(_request())
+        store.delay = 0.3
+        t0 = time.perf_counter()
+        _, trace = svc.match(_request(), deadline=time.monotonic() + 0.05)
+        assert time.perf_counter() - t0 < 0.2
+        assert trace.degraded == ("query_timeout", "last_known_good")
+        assert trace.timings_ms["query"] >= 40 and trace.timings_ms["fallback"] < 40
+
+    def test_pool_full_of_abandoned_calls_fails_fast(self, monkeypatch):
+        release = threading.Event()
+
+        class HungStore(FlakyStore):
+            def query(self, vector, vector_filter, top_k):
+                if self.down:
+                    self.calls += 1
+                    release.wait(5)
+                return super().query(vector, vector_filter, top_k)
+
+        _wait_for_abandoned_calls()  # earlier timeout tests leave sleeping queries behind
+        monkeypatch.setattr(degradation, "_STAGE_WORKERS", 2)
+        store = HungStore()
+        svc = _service(store, stage_budgets={"query": 0.02})
+        svc.match(_request())
+        store.down, store.calls = True, 0
+        try:
+            for _ in range(2):
+                svc.match(_request())
+            assert degradation.stage_pool_stats()["query"] == 2
+            _, trace = svc.match(_request())
+            assert store.calls == 2  # not queued behind the hung calls
+            assert trace.degraded == ("query_timeout", "last_known_good")
+        finally:
+            release.set()
+        _wait_for_abandoned_calls()
+
+    def test_expired_deadline_goes_straight_to_fallback(self):
+        store = FlakyStore()
+        svc = _service(store, stage_budgets={"query": 1.0})
+        svc.match(_request())
+        _, trace = svc.match(_request(), deadline=time.monotonic() - 1)
+        assert trace.degraded == ("embed_timeout", "last_known_good")
+        assert store.calls == 1
+
+    def test_without_fallback_errors_propagate(self):
+        store = FlakyStore()
+        store.down = True
+        svc = MatchService(embedding_provider=FakeEmbeddingProvider(), vector_store=store)
+        with pytest.raises(ConnectionError):
+            svc.match(_request())
+
+
+def test_pinned_topic_list_is_not_overwritten():
+    fallback = FallbackResults(per_topic=2)
+    fallback.set_topic_fallback("tech", [_make_hit("ad-9", 0.5)])
+    fallback.remember(None, [_make_hit("ad-1", 0.99)])
+    hits, source = fallback.lookup(None, _request(topics=["tech"]), VectorFilter())
+    assert source == "topic_fallback" and [h.ad_id for h in hits] == ["ad-9"]
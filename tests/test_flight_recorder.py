@@ -0,0 +1,104 @@
+"""FlightRecorder tests: slowest-N retention, window expiry, sampling profiler output."""
+
+import json
+import time
+
+import pytest
+
+from ad_injector.mcp.flight_recorder import FlightRecorder, list_dumps, write_request
+
+
+def _entry(i):
+    return lambda: {"tool": "ads_match", "request_id": f"req-{i}"}
+
+
+class TestSlowestBuffer:
+    def test_keeps_n_slowest_sorted(self, tmp_path):
+        rec = FlightRecorder(capacity=3, profile_dir=tmp_path)
+        for i, latency in enumerate([5.0, 50.0, 1.0, 30.0, 10.0, 2.0]):
+            rec.record(latency, _entry(i))
+        assert [e["latency_ms"] for e in rec.slowest()] == [50.0, 30.0, 10.0]
+
+    def test_fast_request_does_not_build_entry(self, tmp_path):
+        rec = FlightRecorder(capacity=1, profile_dir=tmp_path)
+        rec.record(100.0, _entry(0))
+
+        def explode():
+            raise AssertionError("entry built for a request that is not kept")
+
+        rec.record(1.0, explode)
+        assert len(rec.slowest()) == 1
+
+    def test_entries_expire_after_window(self, tmp_path):
+        rec = FlightRecorder(capacity=2, window_seconds=0.05, profile_dir=tmp_path)
+        rec.record(100.0, _entry(0))
+        time.sleep(0.1)
+        rec.record(1.0, _entry(1))
+        assert [e["request_id"] for e in rec.slowest()] == ["req-1"]
+
+    def test_dump_writes_json(self, tmp_path):
+        rec = FlightRecorder(capacity=2, profile_dir=tmp_path)
+        rec.record(12.5, _entry(0))
+        path = rec.dump()
+        data = json.loads(path.read_text())
+        assert data["slowest"][0]["request_id"] == "req-0"
+        assert path in list_dumps(tmp_path)
+
+
+class TestSamplingProfiler:
+    def test_profiles_next_k_requests_then_writes_folded_stacks(self, tmp_path):
+        rec = FlightRecorder(capacity=2, profile_dir=tmp_path, sample_interval=0.001)
+        assert rec.arm_profiler(2)["armed"] is True
+
+        def busy_request():
+            deadline = time.perf_counter() + 0.05
+            while time.perf_counter() < deadline:
+                pass
+
+        for _ in range(2):
+            with rec.profile_request() as profiled:
+                assert profiled
+                busy_request()
+        with rec.profile_request() as profiled:
+            assert not profiled
+
+        status = rec.status()
+        assert status["profile_pending"] == 0
+        folded = [p for p in list_dumps(tmp_path) if p.suffix == ".folded"]
+        assert len(folded) == 1
+        text = folded[0].read_text()
+        assert "busy_request" in text
+        assert text.splitlines()[0].rsplit(" ", 1)[1].isdigit()
+
+    def test_rejects_second_arm_while_running(self, tmp_path):
+        rec = FlightRecorder(profile_dir=tmp_path)
+        rec.arm_profiler(1)
+        assert rec.arm_profiler(1)["armed"] is False
+        with rec.profile_request():
+            pass
+
+
+class TestControlPlaneRequests:
+    def test_request_file_is_handled_once_per_recorder(self, tmp_path):
+        stale = write_request(tmp_path, "dump")
+        rec = FlightRecorder(profile_dir=tmp_path, request_poll_seconds=0)
+        rec.record(12.0, _entry(0))
+        assert rec.poll_requests() is None  # written before the recorder started
+        time.sleep(0.01)
+
+        request = write_request(tmp_path, "dump")
+        assert request["id"] != stale["id"]
+        assert rec.poll_requests()["id"] == request["id"]
+        assert rec.poll_requests() is None
+        dumps = [p for p in list_dumps(tmp_path) if p.suffix == ".json"]
+        assert len(dumps) == 1 and json.loads(dumps[0].read_text())["slowest"][0]["latency_ms"] == 12.0
+
+        write_request(tmp_path, "profile", requests=1)
+        with rec.profile_request() as profiled:
+            assert profiled
+
+    def test_rejects_unknown_actions(self, tmp_path):
+        with pytest.raises(ValueError):
+            write_request(tmp_path, "shell")
+        with pytest.raises(ValueError):
+            write_request(tmp_path, "profile", requests=0)
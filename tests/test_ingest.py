@@ -0,0 +1,132 @@
+"""Tests for streaming NDJSON / gzip ingestion (ad-index seed)."""
+
+import gzip
+import json
+
+import pytest
+
+from ad_injector.adapters.memory_vector_store import InMemoryVectorStore
+from ad_injector.config.runtime import RuntimeSettings
+from ad_injector.ops.ingest import ingest, iter_records
+from ad_injector.services.index_service import IndexService
+
+
+class BatchEmbedder:
+    def __init__(self):
+        self.batches = []
+
+    def embed(self, text):
+        raise AssertionError("embed_batch should be used")
+
+    def embed_batch(self, texts):
+        self.batches.append(len(texts))
+        return [[1.0, 0.0, 0.0] for _ in texts]
+
+
+def _ad(ad_id):
+    return {
+        "ad_id": ad_id,
+        "advertiser_id": "adv-1",
+        "title": f"Title {ad_id}",
+        "body": "Body",
+        "cta_text": "Click",
+        "landing_url": f"https://example.com/{ad_id}",
+    }
+
+
+def _service():
+    settings = RuntimeSettings(_env_file=None, embedding_dimension=3)
+    store = InMemoryVectorStore(settings)
+    store.ensure_collection(3)
+    embedder = BatchEmbedder()
+    return IndexService(embedding_provider=embedder, vector_store=store, settings=settings), store, embedder
+
+
+def _lines(n, bad=()):
+    out = []
+    for i in range(n):
+        if i in bad:
+            out.append('{"ad_id": "broken"' if i % 2 else json.dumps({"ad_id": f"ad-{i}"}))
+        else:
+            out.append(json.dumps(_ad(f"ad-{i}")))
+    return "\n".join(out) + "\n"
+
+
+def test_ndjson_streams_in_batches_and_rejects_bad_rows(tmp_path):
+    path = tmp_path / "ads.ndjson"
+    path.write_text(_lines(10, bad={3, 4}) + "\n\n", encoding="utf-8")
+    rejects = tmp_path / "rejects.ndjson"
+    service, store, embedder = _service()
+    seen = []
+
+    report = ingest(service, path, batch_size=3, reject_path=rejects, progress=lambda r: seen.append(r.upserted))
+
+    assert (report.read, report.upserted, report.rejected, report.batches) == (10, 8, 2, 3)
+    assert embedder.batches == [3, 3, 2] and seen == [3, 6, 8]
+    assert store.collection_info()["points_count"] == 8
+    rows = [json.loads(line) for line in rejects.read_text().splitlines()]
+    assert [r["line"] for r in rows] == [4, 5]
+    assert rows[0]["error"].startswith("JSONDecodeError") and rows[1]["error"].startswith("ValidationError")
+
+
+def test_gzip_and_json_array_inputs(tmp_path):
+    gz = tmp_path / "ads.ndjson.gz"
+    with gzip.open(gz, "wt", encoding="utf-8") as f:
+        f.write(_lines(4))
+    array = tmp_path / "ads.json"
+    array.write_text(json.dumps([_ad("x"), _ad("y")], indent=2), encoding="utf-8")
+
+    assert [n for n, _ in iter_records(gz)] == [1, 2, 3, 4]
+    service, store, _ = _service()
+    assert ingest(service, gz).upserted == 4
+    report = ingest(service, array, reject_path=tmp_path / "unused.ndjson")
+    assert report.upserted == 2 and not (tmp_path / "unused.ndjson").exists()
+    assert store.collection_info()["points_count"] == 6
+
+
+def test_file_level_errors_propagate(tmp_path):
+    path = tmp_path / "ads.json"
+    path.write_text("[{", encoding="utf-8")
+    service, _, _ = _service()
+    with pytest.raises(ValueError):
+        ingest(service, path)
+
+
+def test_precomputed_vectors_skip_local_embedding(tmp_path):
+    import numpy as np
+
+    rows = [
+        {**_ad("a"), "embedding": [0.0, 1.0, 0.0]},
+        {**_ad("b"), "embedding": [0.0, 1.0], "embedding_model_id": "BAAI/bge-small-en-v1.5"},
+        {**_ad("c"), "embedding": [0.0, 0.0, 1.0], "embedding_model_id": "other/model"},
+        _ad("d"),
+        _ad("e"),
+    ]
+    path = tmp_path / "ads.ndjson"
+    path.write_text("\n".join(json.dumps(r) for r in rows) + "\n", encoding="utf-8")
+    npy = tmp_path / "ads.npy"
+    np.save(npy, np.array([[9, 9, 9], [9, 9, 9], [9, 9, 9], [np.nan] * 3, [0, 0, 2]], dtype=np.float32))
+    rejects = tmp_path / "rejects.ndjson"
+    service, store, embedder = _service()
+
+    report = ingest(service, path, reject_path=rejects, vectors_path=npy)
+
+    assert (report.upserted, report.rejected) == (3, 2)
+    assert embedder.batches == [1]  # only "d" (NaN row) is embedded; the field wins over the npy row for "a"
+    errors = [json.loads(line)["error"] for line in rejects.read_text().splitlines()]
+    assert "2 dimensions" in errors[0] and "other/model" in errors[1]
+    assert json.loads(json.loads(rejects.read_text().splitlines()[0])["raw"])["ad_id"] == "b"
+    with pytest.raises(ValueError, match="cannot go into"):
+        ingest(service, path, embedding_model_id="other/model")
+
+
+def test_vectors_file_shorter_than_input_rejects_the_rest(tmp_path):
+    import numpy as np
+
+    path = tmp_path / "ads.ndjson"
+    path.write_text(_lines(3), encoding="utf-8")
+    npy = tmp_path / "ads.npy"
+    np.save(npy, np.ones((2, 3), dtype=np.float32))
+    service, _, embedder = _service()
+    report = ingest(service, path, vectors_path=npy)
+    assert (report.upserted, report.rejected) == (2, 1) and embedder.batches == []
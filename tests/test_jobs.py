@@ -0,0 +1,85 @@
+"""Tests for the Control Plane background job scheduler and its on-disk records."""
+
+import threading
+import time
+
+import pytest
+
+from ad_injector.adapters.file_job_store import FileJobStore
+from ad_injector.services.jobs import JobError, JobScheduler
+
+
+def _wait(scheduler, job_id, states=("succeeded", "failed", "cancelled"), timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        record = scheduler.status(job_id)
+        if record["state"] in states:
+            return record
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} still {scheduler.status(job_id)['state']}")
+
+
+def test_progress_result_failure_and_durable_records(tmp_path):
+    store = FileJobStore(tmp_path / "jobs")
+    scheduler = JobScheduler(store, max_workers=1, persist_interval_seconds=0)
+
+    def work(ctx):
+        for done in (2, 4):
+            ctx.progress(done)
+        return {"upserted": 4}
+
+    ok = scheduler.submit("ads_upsert_batch", work, {"ads": 4}, total=4)
+    assert ok["state"] == "queued"
+    bad = scheduler.submit("ads_bulk_disable", lambda ctx: 1 / 0)
+    record = _wait(scheduler, ok["job_id"])
+    assert (record["state"], record["done"], record["total"], record["result"]) == ("succeeded", 4, 4, {"upserted": 4})
+    record = _wait(scheduler, bad["job_id"])
+    assert record["state"] == "failed" and record["error"].startswith("ZeroDivisionError")
+    assert [j["kind"] for j in scheduler.list()] == ["ads_bulk_disable", "ads_upsert_batch"]
+    scheduler.close()
+
+    restarted = JobScheduler(FileJobStore(tmp_path / "jobs"))
+    assert restarted.status(ok["job_id"])["result"] == {"upserted": 4}
+    assert restarted.stats() == {"succeeded": 1, "failed": 1}
+    with pytest.raises(JobError):
+        restarted.status("nope")
+    restarted.close()
+
+
+def test_cancel_queued_and_running_jobs():
+    scheduler = JobScheduler(max_workers=1, max_queued=1)
+    started, release = threading.Event(), threading.Event()
+    steps = []
+
+    def work(ctx):
+        started.set()
+        release.wait(5)
+        for i in range(3):
+            ctx.check_cancelled()
+            steps.append(i)
+        return {"steps": len(steps)}
+
+    running = scheduler.submit("ads_upsert_batch", work)
+    started.wait(5)
+    queued = scheduler.submit("collection_ensure", lambda ctx: {"created": True})
+    with pytest.raises(JobError, match="queue full"):
+        scheduler.submit("collection_ensure", lambda ctx: {})
+
+    assert scheduler.cancel(queued["job_id"])["state"] == "cancelled"
+    assert scheduler.cancel(running["job_id"])["cancel_requested"] is True
+    release.set()
+    assert _wait(scheduler, running["job_id"])["state"] == "cancelled"
+    assert steps == []
+    scheduler.close()
+
+
+def test_unfinished_jobs_are_reported_interrupted_after_restart(tmp_path):
+    store = FileJobStore(tmp_path)
+    store.save({"job_id": "j1", "kind": "ads_upsert_batch", "state": "running", "done": 64, "total": 500,
+                "created_at": 1.0})
+    (tmp_path / "garbage.json").write_text("{", encoding="utf-8")
+    scheduler = JobScheduler(store, max_records=5)
+    record = scheduler.status("j1")
+    assert record["state"] == "interrupted" and record["done"] == 64 and record["error"]
+    assert {r["job_id"]: r["state"] for r in store.load()} == {"j1": "interrupted"}
+    scheduler.close()
@@ -16,6 +16,7 @@ from ad_injector.models.mcp_requests import (
     MatchRequest,
     PlacementContext,
 )
+from ad_injector.models.mcp_responses import MatchResponse
 from ad_injector.ports.vector_store import VectorHit
 
 # ---------------------------------------------------------------------------
@@ -314,3 +315,90 @@ class TestScoreClamping:
         svc, _ = _build_service(hits)
         resp, _ = svc.match(_simple_request())
         assert resp.candidates[0].score == 0.0
+
+
+# ---------------------------------------------------------------------------
+# Tests — stage timings
+# ---------------------------------------------------------------------------
+
+class RecordingObserver:
+    def __init__(self):
+        self.observations: list[tuple[float, dict]] = []
+
+    def observe(self, value, **labels):
+        self.observations.append((value, labels))
+
+
+class TestStageTimings:
+    """Every pipeline stage is timed and reported with placement/cache labels."""
+
+    def test_observer_receives_each_stage(self):
+        observer = RecordingObserver()
+        svc = MatchService(
+            embedding_provider=FakeEmbeddingProvider(),
+            vector_store=FakeVectorStore(),
+            stage_observer=observer,
+        )
+        svc.match(_simple_request(placement=PlacementContext(placement="sidebar")))
+        stages = [labels["stage"] for _, labels in observer.observations]
+        assert stages == ["embed", "filter", "query", "policy", "candidates", "total"]
+        assert all(labels["placement"] == "sidebar" for _, labels in observer.observations)
+        assert all(value >= 0 for value, _ in observer.observations)
+
+    def test_timings_in_audit_trace(self):
+        svc, _ = _build_service()
+        _, trace = svc.match(_simple_request())
+        assert set(trace.timings_ms) == {"embed", "filter", "query", "policy", "candidates", "total"}
+
+
+# ---------------------------------------------------------------------------
+# Tests — compact trace
+# ---------------------------------------------------------------------------
+
+class TestMatchTrace:
+    """MatchService records raw decisions; the readable trace is built on demand."""
+
+    def test_trace_columns_align_with_hits(self):
+        hits = [_make_hit("ad-1", 0.9), _make_hit("ad-2", 0.8, sensitive=True), _make_hit("ad-3", 0.7)]
+        svc, _ = _build_service(hits)
+        resp, trace = svc.match(_simple_request())
+        assert trace.ad_ids == ("ad-1", "ad-2", "ad-3")
+        assert trace.match_ids == (resp.candidates[0].match_id, None, resp.candidates[1].match_id)
+        assert trace.retrieved == 3
+
+    def test_to_dict_matches_policy_reasons(self):
+        hits = [
+            _make_hit("ad-1", 0.9),
+            _make_hit("ad-2", 0.8, sensitive=True, age_restricted=True),
+            _make_hit("ad-3", 0.7, blocked_keywords=["crash"]),
+        ]
+        svc, _ = _build_service(hits)
+        request = _simple_request(context_text="stock market crash news")
+        resp, trace = svc.match(request)
+        explained = trace.to_dict()
+        policy = PolicyEngine()
+        assert [d["reason"] for d in explained["decisions"]] == [
+            policy.reason(h, request.constraints, request.placement, context_text=request.context_text)
+            for h in hits
+        ]
+        assert explained["decisions"][0]["match_id"] == resp.candidates[0].match_id
+        assert explained["constraints"] == request.constraints.model_dump()
+
+    def test_unsampled_trace_keeps_only_timings(self):
+        svc = MatchService(
+            embedding_provider=FakeEmbeddingProvider(),
+            vector_store=FakeVectorStore(),
+            trace_sample_rate=0.0,
+        )
+        resp, trace = svc.match(_simple_request())
+        assert len(resp.candidates) == 3
+        assert not trace.sampled
+        assert trace.ad_ids == () and trace.retrieved == 3
+        assert "total" in trace.timings_ms
+
+    def test_result_converts_to_boundary_dto(self):
+        svc, _ = _build_service()
+        result, _ = svc.match(_simple_request())
+        response = result.to_response()
+        assert MatchResponse.model_validate(response.model_dump()) == response
+        assert [c.match_id for c in response.candidates] == [c.match_id for c in result.candidates]
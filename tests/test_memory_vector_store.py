@@ -0,0 +1,113 @@
+"""InMemoryVectorStore tests: ranking, domain filter semantics, enabled flag, mutations."""
+
+from ad_injector.adapters.memory_vector_store import InMemoryVectorStore
+from ad_injector.config.runtime import RuntimeSettings
+from ad_injector.domain.filters import FieldFilter, FilterOp, VectorFilter
+from ad_injector.models import Ad, AdTargeting
+
+
+def _settings(**kw) -> RuntimeSettings:
+    return RuntimeSettings(_env_file=None, embedding_dimension=3, **kw)
+
+
+def _ad(ad_id: str, topics=None, locale=None, advertiser_id="adv-1") -> Ad:
+    return Ad(
+        ad_id=ad_id,
+        advertiser_id=advertiser_id,
+        title=f"Title {ad_id}",
+        body="Body",
+        cta_text="Click",
+        landing_url=f"https://example.com/{ad_id}",
+        targeting=AdTargeting(topics=topics or ["tech"], locale=locale or ["en-US"]),
+    )
+
+
+def _store() -> InMemoryVectorStore:
+    store = InMemoryVectorStore(_settings())
+    store.ensure_collection(3)
+    store.upsert_batch([
+        (_ad("a", topics=["python"]), [1.0, 0.0, 0.0]),
+        (_ad("b", topics=["travel"], locale=[""]), [0.9, 0.1, 0.0]),
+        (_ad("c", topics=["python"], advertiser_id="adv-2"), [0.0, 1.0, 0.0]),
+    ])
+    return store
+
+
+class TestQuery:
+    def test_ranked_by_cosine(self):
+        hits = _store().query([1.0, 0.0, 0.0], VectorFilter(), top_k=3)
+        assert [h.ad_id for h in hits] == ["a", "b", "c"]
+        assert hits[0].score > hits[1].score > hits[2].score
+
+    def test_top_k_and_max_top_k(self):
+        store = InMemoryVectorStore(_settings(max_top_k=2))
+        store.upsert_batch([(_ad(str(i)), [1.0, float(i), 0.0]) for i in range(5)])
+        assert len(store.query([1.0, 0.0, 0.0], VectorFilter(), top_k=10)) == 2
+
+    def test_must_any_of(self):
+        vf = VectorFilter(must=[FieldFilter(field="topics", op=FilterOp.any_of, value=["python"])])
+        assert [h.ad_id for h in _store().query([1.0, 0.0, 0.0], vf, 5)] == ["a", "c"]
+
+    def test_locale_global_matches(self):
+        vf = VectorFilter(must=[FieldFilter(field="locale", op=FilterOp.any_of, value=["de-DE", ""])])
+        assert [h.ad_id for h in _store().query([1.0, 0.0, 0.0], vf, 5)] == ["b"]
+
+    def test_must_not_excludes(self):
+        vf = VectorFilter(must_not=[FieldFilter(field="advertiser_id", op=FilterOp.not_in, value=["adv-1"])])
+        assert [h.ad_id for h in _store().query([1.0, 0.0, 0.0], vf, 5)] == ["c"]
+
+    def test_selective_filter_beyond_oversample_pool(self):
+        store = InMemoryVectorStore(_settings())
+        store.upsert_batch([(_ad(f"x{i}"), [1.0, 0.0, 0.0]) for i in range(50)])
+        store.upsert_batch([(_ad("rare", topics=["rare"]), [0.0, 0.0, 1.0])])
+        vf = VectorFilter(must=[FieldFilter(field="topics", op=FilterOp.any_of, value=["rare"])])
+        assert [h.ad_id for h in store.query([1.0, 0.0, 0.0], vf, 1)] == ["rare"]
+
+
+class TestMutations:
+    def test_bulk_disable_hides_from_query(self):
+        store = _store()
+        assert store.bulk_disable({"advertiser_id": "adv-1"}) == 2
+        assert [h.ad_id for h in store.query([1.0, 0.0, 0.0], VectorFilter(), 5)] == ["c"]
+        assert store.get_ad("a")["enabled"] is False
+
+    def test_upsert_replaces_and_delete_removes(self):
+        store = _store()
+        store.upsert_batch([(_ad("a", topics=["new"]), [0.0, 0.0, 1.0])])
+        assert store.get_ad("a")["topics"] == ["new"]
+        store.delete_ad("b")
+        assert store.get_ad("b") is None
+        assert store.collection_info()["points_count"] == 2
+        assert [h.ad_id for h in store.query([0.0, 0.0, 1.0], VectorFilter(), 1)] == ["a"]
+
+    def test_delete_ads_counts_only_stored_ids(self):
+        store = _store()
+        assert store.delete_ads(["a", "missing", "c"]) == 2
+        assert store.delete_ads(["a"]) == 0
+        assert store.collection_info()["points_count"] == 1
+
+    def test_switch_alias_carries_the_collection_meta(self):
+        store = _store()
+        name = store.next_collection_name()
+        target = store.open_collection(name, 4)
+        target.ensure_collection(4, embedding_model_id="new/model", schema_version="2")
+        store.switch_alias(name)
+        info = store.collection_info()
+        assert (info["dimension"], info["embedding_model_id"], info["schema_version"]) == (4, "new/model", "2")
+
+
+def test_match_and_index_services_share_one_store(monkeypatch):
+    from ad_injector import wiring
+    from ad_injector.mcp import tools
+
+    built = []
+    monkeypatch.setattr(wiring, "build_vector_store", lambda settings=None: built.append(1) or _store())
+    caches = (tools._get_vector_store, tools._get_match_service, tools._get_index_service)
+    for cached in caches:
+        cached.cache_clear()
+    try:
+        index = tools._get_index_service()
+        assert tools._get_match_service()._store is index.vector_store and len(built) == 1
+    finally:
+        for cached in caches:
+            cached.cache_clear()
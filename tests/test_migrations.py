@@ -0,0 +1,134 @@
+"""Tests for collection_migrate: background re-index into a versioned collection and alias cutover."""
+
+import hashlib
+
+import pytest
+
+from ad_injector.adapters.memory_vector_store import InMemoryVectorStore
+from ad_injector.adapters.qdrant_vector_store import QdrantVectorStore
+from ad_injector.config.runtime import RuntimeSettings
+from ad_injector.domain.filters import VectorFilter
+from ad_injector.models import Ad, AdTargeting
+from ad_injector.ops.migrations import PAYLOAD_TRANSFORMS, MigrationPlan, migrate_collection, register_transform
+from ad_injector.services.index_service import IndexService
+
+
+class HashEmbedder:
+    """Deterministic vectors of any dimension from a SHA-256 of the text (independent of PYTHONHASHSEED)."""
+
+    def __init__(self, dimension=3):
+        self.dimension = dimension
+        self.texts = 0
+
+    def embed(self, text):
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts):
+        self.texts += len(texts)
+        return [[float(b + 1) for b in hashlib.sha256(t.encode()).digest()[: self.dimension]] for t in texts]
+
+
+def _ad(ad_id):
+    return Ad(
+        ad_id=ad_id,
+        advertiser_id="adv-1",
+        title=f"Title {ad_id}",
+        body="Body",
+        cta_text="Click",
+        landing_url=f"https://example.com/{ad_id}",
+        targeting=AdTargeting(topics=["tech"]),
+    )
+
+
+def _index(store_cls=InMemoryVectorStore, n=25, embedder=None, **settings):
+    settings = RuntimeSettings(_env_file=None, embedding_dimension=3, **settings)
+    embedder = embedder or HashEmbedder()
+    service = IndexService(embedding_provider=embedder, vector_store=store_cls(settings), settings=settings)
+    service.ensure_collection()
+    service.upsert_ads([_ad(f"ad-{i}") for i in range(n)])
+    return service
+
+
+class Stop(Exception):
+    pass
+
+
+def test_copy_is_resumable_and_catches_up_with_live_writes(tmp_path):
+    embedder = HashEmbedder()
+    service = _index(embedder=embedder)
+    service.bulk_disable({"ad_id": "ad-3"})
+    store = service.vector_store
+    state = tmp_path / "migration.json"
+    plan = MigrationPlan("1", "2")
+    calls = []
+
+    def stop_after_two_pages():
+        calls.append(1)
+        if len(calls) == 3:
+            service.delete_ad("ad-0")  # live writes while the copy runs
+            service.upsert_ads([_ad("ad-new")])
+            raise Stop
+
+    with pytest.raises(Stop):
+        migrate_collection(service, plan, state, page_size=10, check=stop_after_two_pages)
+    assert state.exists() and store.live_collection() == "ads"
+    assert service.collection_info()["schema_version"] == "1"  # nothing switched yet
+    embedded = embedder.texts
+
+    seen = []
+    summary = migrate_collection(service, plan, state, page_size=10, progress=lambda d, t: seen.append(d))
+    assert seen == [26]  # resumed at the third page, which now ends with ad-new
+    assert (summary["target"], summary["previous"], summary["copied"]) == ("ads_v2", "ads", 26)
+    assert (summary["caught_up"], summary["deleted"], summary["points_count"]) == (1, 1, 25)
+    assert embedder.texts == embedded  # caught-up ads keep their stored vectors
+    assert summary["sample_recall"] == 1.0 and not state.exists()
+    info = service.collection_info()
+    assert (info["schema_version"], store.live_collection()) == ("2", "ads_v2")
+    assert store.get_ad("ad-0") is None and store.get_ad("ad-new") is not None
+    assert store.get_ad("ad-3")["enabled"] is False  # payloads are copied verbatim
+
+
+def test_transform_reembed_and_plan_checks(tmp_path):
+    service = _index(n=5)
+    state = tmp_path / "migration.json"
+    with pytest.raises(ValueError, match="schema_version"):
+        migrate_collection(service, MigrationPlan("7", "8"), state)
+    with pytest.raises(ValueError, match="embedding provider"):
+        migrate_collection(service, MigrationPlan("1", "2", embedding_model_id="new/model"), state)
+
+    @register_transform("1", "2")
+    def add_topic(payload):
+        return {**payload, "topics": payload["topics"] + ["migrated"]}
+
+    try:
+        new_model = HashEmbedder(dimension=4)
+        plan = MigrationPlan("1", "2", embedding_model_id="new/model")
+        summary = migrate_collection(service, plan, state, new_model, workers=3, drop_old=True)
+    finally:
+        PAYLOAD_TRANSFORMS.pop(("1", "2"))
+    assert summary["reembedded"] and summary["dimension"] == 4 and summary["dropped_old"]
+    assert new_model.texts == 5 + 1  # one dimension probe
+    info = service.collection_info()
+    assert (info["dimension"], info["embedding_model_id"]) == (4, "new/model")
+    payload = service.get_ad("ad-1")
+    assert payload["topics"] == ["tech", "migrated"] and payload["embedding_version"] == "new/model"
+    hits = service.vector_store.query(new_model.embed("x"), VectorFilter(), 10)
+    assert len(hits) == 5
+
+
+def test_qdrant_serves_through_an_alias_and_switches_atomically(tmp_path):
+    service = _index(QdrantVectorStore, n=12, qdrant_location=":memory:")
+    store = service.vector_store
+    assert store.live_collection() == "ads_v1"
+    points = store.get_points(["ad-1", "nope"])
+    assert list(points) == ["ad-1"] and points["ad-1"][0]["ad_id"] == "ad-1" and len(points["ad-1"][1]) == 3
+    plan = MigrationPlan("1", "2")
+    summary = migrate_collection(service, plan, tmp_path / "m.json", page_size=5, drop_old=True)
+    assert (summary["previous"], summary["target"], summary["dropped_old"]) == ("ads_v1", "ads_v2", True)
+    assert store.live_collection() == "ads_v2"
+    assert service.collection_info()["points_count"] == 12
+    assert service.get_ad("ad-4")["ad_id"] == "ad-4"
+    with pytest.raises(ValueError, match="live collection"):
+        store.drop_collection("ads_v2")
+    service.delete_collection()  # the alias and the collection behind it
+    assert service.ensure_collection()["created"] is True and store.live_collection() == "ads_v1"
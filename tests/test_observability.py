@@ -0,0 +1,89 @@
+"""Metrics registry tests: histogram accounting, exposition format, thread safety."""
+
+import threading
+
+import pytest
+
+from ad_injector.mcp.observability import MetricsRegistry
+
+
+class TestHistogram:
+    def test_observe_counts_and_sum(self):
+        reg = MetricsRegistry()
+        h = reg.histogram("t_seconds", "test", ("stage",), buckets=(0.01, 0.1, 1.0))
+        h.observe(0.005, stage="embed")
+        h.observe(0.05, stage="embed")
+        h.observe(5.0, stage="embed")
+        (series,) = h.snapshot()
+        assert series["labels"] == {"stage": "embed"}
+        assert series["count"] == 3
+        assert series["sum"] == pytest.approx(5.055)
+
+    def test_missing_label_rejected(self):
+        reg = MetricsRegistry()
+        h = reg.histogram("t_seconds", "test", ("stage", "placement"))
+        with pytest.raises(ValueError):
+            h.observe(0.1, stage="embed")
+
+    def test_quantiles_interpolated_within_bucket(self):
+        reg = MetricsRegistry()
+        h = reg.histogram("t_seconds", "test", buckets=(0.1, 0.2))
+        for _ in range(100):
+            h.observe(0.15)
+        (series,) = h.snapshot()
+        assert 0.1 <= series["p50"] <= 0.2
+        assert 0.1 <= series["p99"] <= 0.2
+
+    def test_time_context_manager_observes_on_error(self):
+        reg = MetricsRegistry()
+        h = reg.histogram("t_seconds", "test", ("op",))
+        with pytest.raises(RuntimeError):
+            with h.time(op="x"):
+                raise RuntimeError("boom")
+        assert h.snapshot()[0]["count"] == 1
+
+    def test_concurrent_observations_not_lost(self):
+        reg = MetricsRegistry()
+        h = reg.histogram("t_seconds", "test", ("stage",))
+        c = reg.counter("t_total", "test")
+
+        def worker():
+            for _ in range(2000):
+                h.observe(0.001, stage="query")
+                c.inc()
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert h.snapshot()[0]["count"] == 16000
+        assert c.value() == 16000
+
+
+class TestExposition:
+    def test_prometheus_text_format(self):
+        reg = MetricsRegistry()
+        h = reg.histogram("lat_seconds", "latency", ("stage",), buckets=(0.5, 1.0))
+        h.observe(0.2, stage="embed")
+        h.observe(0.7, stage="embed")
+        reg.counter("calls_total", "calls", ("tool",)).inc(tool="ads_match")
+        text = reg.render()
+        assert "# TYPE lat_seconds histogram" in text
+        assert 'lat_seconds_bucket{stage="embed",le="0.5"} 1' in text
+        assert 'lat_seconds_bucket{stage="embed",le="1"} 2' in text
+        assert 'lat_seconds_bucket{stage="embed",le="+Inf"} 2' in text
+        assert 'lat_seconds_count{stage="embed"} 2' in text
+        assert 'calls_total{tool="ads_match"} 1' in text
+
+    def test_label_values_escaped(self):
+        reg = MetricsRegistry()
+        reg.counter("c_total", "c", ("placement",)).inc(placement='a"b')
+        assert 'placement="a\\"b"' in reg.render()
+
+    def test_reregistering_with_other_schema_fails(self):
+        reg = MetricsRegistry()
+        reg.counter("x_total", "x", ("a",))
+        assert reg.counter("x_total", "x", ("a",)) is reg.counter("x_total", "x", ("a",))
+        with pytest.raises(ValueError):
+            reg.histogram("x_total", "x", ("a",))
@@ -0,0 +1,206 @@
+"""Tests for request canonicalization, the query log, caches and replay."""
+
+import json
+
+from ad_injector.mcp import query_log, serving
+from ad_injector.mcp.query_log import QueryLogger, iter_log_records, rotated_log_files, worker_log_path
+from ad_injector.models.mcp_requests import MatchConstraints, MatchRequest, PlacementContext
+from ad_injector.ops.replay import load_records, replay, warm_caches
+from ad_injector.services.caches import (
+    CachingEmbeddingProvider,
+    LruCache,
+    ResultCache,
+    canonical_request,
+    request_from_canonical,
+    result_cache_key,
+)
+from ad_injector.services.match_service import MatchService
+
+from .test_match_service import FakeEmbeddingProvider, FakeVectorStore
+
+
+class CountingEmbedder(FakeEmbeddingProvider):
+    def __init__(self):
+        self.calls = 0
+
+    def embed(self, text):
+        self.calls += 1
+        return super().embed(text)
+
+
+class CountingStore(FakeVectorStore):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def query(self, vector, vector_filter, top_k):
+        self.calls += 1
+        return super().query(vector, vector_filter, top_k)
+
+
+def _request(text="learn  python\n fast", **constraints):
+    return MatchRequest(
+        context_text=text,
+        top_k=3,
+        placement=PlacementContext(placement="sidebar", surface="search"),
+        constraints=MatchConstraints(**constraints),
+    )
+
+
+class TestCanonicalRequest:
+    def test_equivalent_requests_share_key(self):
+        a = canonical_request(_request(topics=["b", "a", "a"]))
+        b = canonical_request(_request("learn python fast", topics=["a", "b"]))
+        assert a == b
+        assert a["context_text"] == "learn python fast"
+        assert result_cache_key(a) == result_cache_key(b)
+
+    def test_roundtrip(self):
+        original = _request(locale="en-US", exclude_ad_ids=["x"])
+        rebuilt = request_from_canonical(json.loads(json.dumps(canonical_request(original))))
+        assert canonical_request(rebuilt) == canonical_request(original)
+        assert rebuilt.placement.placement == "sidebar"
+
+
+class TestCaches:
+    def test_lru_evicts_oldest(self):
+        cache = LruCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+
+    def test_ttl_expiry(self, monkeypatch):
+        import ad_injector.services.caches as caches
+
+        now = [100.0]
+        monkeypatch.setattr(caches.time, "monotonic", lambda: now[0])
+        cache = LruCache(10, ttl_seconds=5)
+        cache.put("k", "v")
+        now[0] += 6
+        assert cache.get("k") is None
+
+    def test_embedding_cache(self):
+        inner = CountingEmbedder()
+        embedder = CachingEmbeddingProvider(inner, 10)
+        embedder.embed("hello")
+        embedder.embed("hello")
+        assert inner.calls == 1
+
+    def test_embedding_cache_batches_the_misses(self):
+        class BatchEmbedder:
+            def __init__(self):
+                self.batches = []
+
+            def embed(self, text):
+                raise AssertionError("embed_batch callers must not fall back to per-text calls")
+
+            def embed_batch(self, texts):
+                self.batches.append(list(texts))
+                return [[float(len(t)), 1.0] for t in texts]
+
+        inner = BatchEmbedder()
+        embedder = CachingEmbeddingProvider(inner, 10)
+        assert embedder.embed_batch(["a", "bb"]) == [[1.0, 1.0], [2.0, 1.0]]
+        assert embedder.embed_batch(["bb", "ccc", "a", "ccc"]) == [[2.0, 1.0], [3.0, 1.0], [1.0, 1.0], [3.0, 1.0]]
+        assert inner.batches == [["a", "bb"], ["ccc"]]
+        assert embedder.embed_batch(["a"]) == [[1.0, 1.0]] and len(inner.batches) == 2
+
+    def test_result_cache_hit_skips_embed_and_query(self):
+        embedder, store = CountingEmbedder(), CountingStore()
+        svc = MatchService(embedding_provider=embedder, vector_store=store, result_cache=ResultCache(10, 0))
+        first, trace1 = svc.match(_request())
+        second, trace2 = svc.match(_request("learn python fast"))
+        assert (embedder.calls, store.calls) == (1, 1)
+        assert (trace1.cache, trace2.cache) == ("miss", "hit")
+        assert "embed" not in trace2.timings_ms
+        assert [c.ad_id for c in first.candidates] == [c.ad_id for c in second.candidates]
+        assert first.candidates[0].match_id != second.candidates[0].match_id
+
+
+class TestQueryLogger:
+    def test_sample_rate_zero_never_builds(self, tmp_path):
+        logger = QueryLogger(tmp_path / "q.log", sample_rate=0.0)
+
+        def explode():
+            raise AssertionError("record built for unsampled request")
+
+        assert logger.maybe_log(explode) is False
+        logger.close()
+
+    def test_writes_and_rotates(self, tmp_path):
+        path = tmp_path / "q.log"
+        logger = QueryLogger(path, sample_rate=1.0, max_bytes=200, backups=2)
+        for i in range(30):
+            assert logger.maybe_log(lambda i=i: {"i": i, "pad": "x" * 40})
+        logger.close()
+        files = rotated_log_files(path)
+        assert len(files) <= 3 and files[-1] == path
+        seen = [r["i"] for r in iter_log_records(files)]
+        assert seen == sorted(seen) and seen[-1] == 29
+
+
+    def test_each_forked_worker_writes_its_own_file(self, tmp_path, monkeypatch):
+        from ad_injector.config import runtime
+
+        path = tmp_path / "q.ndjson"
+        settings = runtime.RuntimeSettings(_env_file=None, query_log_path=path, mcp_workers=2)
+        monkeypatch.setattr(runtime, "get_settings", lambda: settings)
+        monkeypatch.setattr(serving, "_WORKER", {"worker_id": 1, "pid": 1, "started_at": 0.0})
+        query_log.get_query_logger.cache_clear()
+        try:
+            logger = query_log.get_query_logger()
+            assert logger._path == tmp_path / "q.w1.ndjson" == worker_log_path(path, 1)
+            logger.close()
+        finally:
+            query_log.get_query_logger.cache_clear()
+
+
+class TestReplay:
+    def _log(self, tmp_path, svc, n=4):
+        path = tmp_path / "q.log"
+        lines = []
+        for i in range(n):
+            req = _request(f"query {i}")
+            resp, _ = svc.match(req)
+            lines.append({
+                "ts": 1000.0 + i,
+                "request": canonical_request(req),
+                "latency_ms": 1.0,
+                "ad_ids": [c.ad_id for c in resp.candidates],
+            })
+        path.write_text("".join(json.dumps(r) + "\n" for r in lines) + "not json\n")
+        return path
+
+    def test_replay_reports_recall(self, tmp_path):
+        svc = MatchService(embedding_provider=FakeEmbeddingProvider(), vector_store=FakeVectorStore())
+        path = self._log(tmp_path, svc)
+        records = load_records(path)
+        assert len(records) == 4
+        result = replay(svc, records, speed=0, concurrency=2)
+        assert result["completed"] == 4
+        assert result["recall_at_k"] == 1.0
+        assert result["exact_match_rate"] == 1.0
+
+        changed = MatchService(embedding_provider=FakeEmbeddingProvider(), vector_store=FakeVectorStore([]))
+        assert replay(changed, records)["recall_at_k"] == 0.0
+
+    def test_per_worker_logs_are_merged_by_time(self, tmp_path):
+        svc = MatchService(embedding_provider=FakeEmbeddingProvider(), vector_store=FakeVectorStore())
+        path = self._log(tmp_path, svc)
+        lines = path.read_text().splitlines()[:4]
+        path.unlink()
+        worker_log_path(path, 0).write_text("\n".join(lines[0::2]) + "\n")
+        worker_log_path(path, 1).write_text("\n".join(lines[1::2]) + "\n")
+        worker_log_path(path, 1).with_name("q.w1.log.1").write_text("")
+        assert [r["ts"] for r in load_records(path)] == [1000.0, 1001.0, 1002.0, 1003.0]
+
+    def test_warm_caches_fills_result_cache(self, tmp_path):
+        path = self._log(tmp_path, MatchService(embedding_provider=FakeEmbeddingProvider(), vector_store=FakeVectorStore()))
+        store = CountingStore()
+        svc = MatchService(embedding_provider=FakeEmbeddingProvider(), vector_store=store, result_cache=ResultCache(10, 0))
+        assert warm_caches(svc, path, limit=2) == 2
+        svc.match(_request("query 3"))
+        assert store.calls == 2
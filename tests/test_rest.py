@@ -0,0 +1,85 @@
+"""Tests for the REST ads_match fast path (POST /v1/match)."""
+
+import json
+
+import pytest
+from starlette.testclient import TestClient
+
+from ad_injector.mcp import rest, tools
+from ad_injector.mcp.admission import AdmissionController
+from ad_injector.mcp.rest import REST_MATCH_PATH
+from ad_injector.mcp.server import create_server
+from ad_injector.mcp.trace_store import get_trace_store
+
+from .test_match_service import _build_service
+
+
+@pytest.fixture
+def client(monkeypatch):
+    service, _ = _build_service()
+    monkeypatch.setattr(tools, "_get_match_service", lambda: service)
+    return TestClient(create_server("data", http=True).streamable_http_app())
+
+
+def test_single_request_matches_tool_shape(client):
+    resp = client.post(REST_MATCH_PATH, json={"context_text": "learn python", "top_k": 2, "placement": "sidebar"})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert set(body) == {"candidates", "request_id", "placement"}
+    assert body["placement"] == "sidebar"
+    assert 0 < len(body["candidates"]) <= 2
+    assert set(body["candidates"][0]) == {
+        "ad_id", "advertiser_id", "title", "body", "cta_text", "landing_url", "score", "match_id",
+    }
+    # Traces are shared with ads_explain
+    assert get_trace_store().get(body["candidates"][0]["match_id"]) is not None
+
+
+def test_batch_preserves_order_and_isolates_errors(client):
+    resp = client.post(REST_MATCH_PATH, json={"requests": [
+        {"context_text": "learn python", "top_k": 1},
+        {"top_k": 1},
+        {"context_text": "cook dinner", "placement": "footer"},
+    ]})
+    assert resp.status_code == 200
+    responses = resp.json()["responses"]
+    assert len(responses) == 3
+    assert len(responses[0]["candidates"]) == 1
+    assert "context_text" in responses[1]["error"]
+    assert responses[2]["placement"] == "footer"
+
+
+def test_keep_alive_connection_serves_many_requests(client):
+    ids = {client.post(REST_MATCH_PATH, json={"context_text": f"q {i}"}).json()["request_id"] for i in range(5)}
+    assert len(ids) == 5
+
+
+@pytest.mark.parametrize("body, status", [
+    (b"{not json", 400),
+    (json.dumps({"context_text": "x", "bogus": 1}).encode(), 400),
+    (json.dumps({"context_text": 3}).encode(), 400),
+    (json.dumps({"context_text": "x", "top_k": "5"}).encode(), 400),
+    (json.dumps(["context_text"]).encode(), 400),
+    (json.dumps({"requests": []}).encode(), 400),
+    (json.dumps({"requests": [{"context_text": "x"}] * 101}).encode(), 413),
+])
+def test_invalid_bodies_rejected(client, body, status):
+    resp = client.post(REST_MATCH_PATH, content=body, headers={"content-type": "application/json"})
+    assert resp.status_code == status
+    assert "error" in resp.json()
+
+
+def test_not_registered_for_stdio_or_control_plane():
+    for server in (create_server("data"), create_server("admin", http=True)):
+        paths = {getattr(r, "path", None) for r in server._custom_starlette_routes}
+        assert REST_MATCH_PATH not in paths
+
+
+def test_shed_request_gets_503_with_retry_after(client, monkeypatch):
+    saturated = AdmissionController(max_concurrent=1, max_queue=0)
+    saturated._in_flight = 1
+    monkeypatch.setattr(rest, "get_admission_controller", lambda: saturated)
+    resp = client.post(REST_MATCH_PATH, json={"context_text": "learn python", "timeout_ms": 100})
+    assert resp.status_code == 503
+    assert resp.headers["retry-after"] == "1"
+    assert resp.json()["error"] == "overloaded" and resp.json()["reason"] == "queue_full"
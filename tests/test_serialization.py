@@ -0,0 +1,77 @@
+"""Tests for the fast ads_match JSON path."""
+
+import json
+
+from ad_injector.mcp.serialization import ResponseSerializer, dumps
+from ad_injector.mcp.tools import ALLOWED_MATCH_CANDIDATE_KEYS, ALLOWED_MATCH_RESPONSE_KEYS
+from ad_injector.models.mcp_responses import AdCandidate, MatchResponse
+from ad_injector.services.match_result import Candidate, MatchResult
+
+
+def _candidate(ad_id="ad-1", title='Say "hi" — ünïcode', score=0.5, match_id="m-1"):
+    return AdCandidate(
+        ad_id=ad_id,
+        advertiser_id="adv-1",
+        title=title,
+        body="Body\nline",
+        cta_text="Click",
+        landing_url="https://example.com/x?a=1&b=2",
+        score=score,
+        match_id=match_id,
+    )
+
+
+def _response(*candidates):
+    return MatchResponse(candidates=list(candidates), request_id="req-1", placement="inline")
+
+
+class TestResponseSerializer:
+    def test_output_equals_allowlisted_shape(self):
+        response = _response(_candidate(), _candidate("ad-2", score=1.0, match_id="m-2"))
+        out = ResponseSerializer().render_match(response)
+        expected = response.model_dump(include=set(ALLOWED_MATCH_RESPONSE_KEYS))
+        expected["candidates"] = [
+            {k: v for k, v in c.items() if k in ALLOWED_MATCH_CANDIDATE_KEYS} for c in expected["candidates"]
+        ]
+        assert json.loads(out) == expected
+        assert "\n" not in out
+
+    def test_slim_result_renders_like_dto(self):
+        response = _response(_candidate())
+        c = response.candidates[0]
+        slim = MatchResult(
+            request_id="req-1",
+            placement="inline",
+            candidates=[Candidate(c.ad_id, c.advertiser_id, c.title, c.body, c.cta_text, c.landing_url, c.score, c.match_id)],
+        )
+        serializer = ResponseSerializer()
+        assert serializer.render_match(slim) == serializer.render_match(response)
+
+    def test_empty_candidates(self):
+        out = ResponseSerializer().render_match(_response())
+        assert json.loads(out) == {"candidates": [], "request_id": "req-1", "placement": "inline"}
+
+    def test_fragment_reused_per_ad(self):
+        serializer = ResponseSerializer()
+        serializer.render_match(_response(_candidate(match_id="m-1")))
+        out = serializer.render_match(_response(_candidate(match_id="m-2", score=0.25)))
+        assert serializer.stats()["hits"] == 1
+        assert json.loads(out)["candidates"][0]["match_id"] == "m-2"
+        assert json.loads(out)["candidates"][0]["score"] == 0.25
+
+    def test_changed_creative_not_served_from_cache(self):
+        serializer = ResponseSerializer()
+        serializer.render_match(_response(_candidate(title="Old")))
+        out = serializer.render_match(_response(_candidate(title="New")))
+        assert json.loads(out)["candidates"][0]["title"] == "New"
+
+    def test_catalog_version_partitions_cache(self):
+        serializer = ResponseSerializer()
+        serializer.render_match(_response(_candidate()))
+        serializer.catalog_version = "v2"
+        serializer.render_match(_response(_candidate()))
+        assert serializer.stats()["entries"] == 2
+
+
+def test_dumps_is_compact():
+    assert dumps({"a": [1, 2]}) == '{"a":[1,2]}'
@@ -0,0 +1,170 @@
+"""Tests for the Data Plane HTTP serving mode (routes, readiness, pre-fork workers)."""
+
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import pytest
+from starlette.testclient import TestClient
+
+from ad_injector.adapters.qdrant_vector_store import QdrantVectorStore
+from ad_injector.config.runtime import RuntimeSettings
+from ad_injector.mcp import serving, tools
+from ad_injector.mcp.server import create_server
+from ad_injector.mcp.tools import DATA_PLANE_ALLOWED_TOOLS
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _client():
+    return TestClient(create_server("data", http=True).streamable_http_app())
+
+
+class TestHttpRoutes:
+    def test_http_server_keeps_data_plane_tool_set(self):
+        server = create_server("data", http=True)
+        assert set(server._tool_manager._tools) == DATA_PLANE_ALLOWED_TOOLS
+
+    def test_metrics_route(self):
+        resp = _client().get("/metrics")
+        assert resp.status_code == 200
+        assert "ad_match_stage_seconds" in resp.text
+
+    def test_healthz_reflects_worker_state(self, monkeypatch):
+        worker = {"worker_id": 3, "pid": os.getpid(), "ready": True, "draining": False, "started_at": time.time()}
+        monkeypatch.setattr(serving, "_WORKER", worker)
+        client = _client()
+        resp = client.get("/healthz")
+        assert resp.status_code == 200 and resp.json()["worker"]["worker_id"] == 3
+        worker["draining"] = True
+        assert client.get("/healthz").status_code == 503
+
+
+def test_bind_socket_is_tcp_so_connections_get_nodelay():
+    sock = serving.bind_socket("127.0.0.1", 0)
+    try:
+        assert sock.proto == socket.IPPROTO_TCP
+    finally:
+        sock.close()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="pre-fork serving needs os.fork")
+@pytest.mark.filterwarnings("ignore:Failed to obtain server version")
+def test_forked_worker_does_not_share_the_parents_client(monkeypatch):
+    from ad_injector.services.match_service import MatchService
+
+    settings = RuntimeSettings(_env_file=None, qdrant_host="127.0.0.1", qdrant_port=_free_port())
+    store = QdrantVectorStore(settings)
+    service = MatchService(embedding_provider=None, vector_store=store)
+    monkeypatch.setattr(tools, "_get_match_service", lambda: service)
+    parent_client = store._get_client()  # what preload used for the warm-up reads
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        ok = False
+        try:
+            serving.reset_after_fork()
+            ok = store._get_client() is not parent_client
+        finally:
+            os.write(write_fd, b"1" if ok else b"0")
+            os._exit(0)
+    os.close(write_fd)
+    assert os.read(read_fd, 1) == b"1"
+    os.waitpid(pid, 0)
+    os.close(read_fd)
+    assert store._get_client() is parent_client  # the parent keeps its own
+
+
+def test_preload_starts_no_background_threads(monkeypatch):
+    from ad_injector import main_runtime
+    from ad_injector.adapters.memory_vector_store import InMemoryVectorStore
+    from ad_injector.models.mcp_requests import MatchConstraints, MatchRequest
+    from ad_injector.services.catalog import CatalogWatcher
+    from ad_injector.services.match_service import MatchService
+    from ad_injector.services.top_ads import TopAdsRefresher
+
+    from .test_match_service import FakeEmbeddingProvider
+
+    store = InMemoryVectorStore(RuntimeSettings(_env_file=None, embedding_dimension=3))
+    watcher = CatalogWatcher(store, 60)
+    refresher = TopAdsRefresher(store, version_source=watcher.version_source, check_interval_seconds=60)
+    service = MatchService(
+        embedding_provider=FakeEmbeddingProvider(),
+        vector_store=store,
+        catalog_watcher=watcher,
+        top_ads=refresher,
+        top_ads_max_context_chars=32,
+    )
+    request = MatchRequest(context_text="python", constraints=MatchConstraints(topics=["python"]))
+    monkeypatch.setattr(tools, "_get_match_service", lambda: service)
+    monkeypatch.setattr(main_runtime, "_warm_caches", lambda: service.match(request))
+    serving.preload(RuntimeSettings(_env_file=None))
+    assert watcher._thread_pid is None and refresher._thread_pid is None
+    service.match(request)  # the first served request starts them
+    assert watcher._thread_pid == os.getpid() == refresher._thread_pid
+    watcher.close()
+    refresher.close()
+
+
+def test_embedded_qdrant_client_survives_reconnect():
+    store = QdrantVectorStore(RuntimeSettings(_env_file=None, qdrant_location=":memory:"))
+    client = store._get_client()
+    store.reconnect()
+    assert store._get_client() is client
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _post(port, payload, path="/mcp"):
+    req = urllib.request.Request(
+        f"http://127.0.0.1:{port}{path}",
+        data=json.dumps(payload).encode(),
+        headers={"content-type": "application/json", "accept": "application/json, text/event-stream"},
+    )
+    with urllib.request.urlopen(req, timeout=5) as resp:
+        return json.loads(resp.read())
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="pre-fork serving needs os.fork")
+def test_prefork_workers_serve_and_shut_down_gracefully():
+    port = _free_port()
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(ROOT / "src"), str(ROOT)])}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.serve", "--port", str(port), "--workers", "2",
+         "--ads", "50", "--dimension", "32"],
+        env=env,
+        cwd=ROOT,
+    )
+    try:
+        pids = set()
+        probes = 0
+        deadline = time.monotonic() + 20
+        while time.monotonic() < deadline and len(pids) < 2 and probes < 40:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/healthz", timeout=1) as resp:
+                    pids.add(json.loads(resp.read())["worker"]["pid"])
+                probes += 1
+            except OSError:
+                time.sleep(0.1)
+        assert pids and proc.pid not in pids
+        result = _post(port, {
+            "jsonrpc": "2.0", "id": 1, "method": "tools/call",
+            "params": {"name": "ads_match", "arguments": {"context_text": "learn python", "top_k": 2}},
+        })
+        assert "candidates" in json.loads(result["result"]["content"][0]["text"])
+        rest = _post(port, {"requests": [{"context_text": "learn python", "top_k": 2}]}, path="/v1/match")
+        assert "candidates" in rest["responses"][0]
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=15) == 0
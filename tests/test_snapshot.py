@@ -0,0 +1,109 @@
+"""Tests for catalog snapshot export/import and serving a memory-mapped snapshot."""
+
+import json
+
+import numpy as np
+import pytest
+
+from ad_injector.adapters.catalog_snapshot import CatalogSnapshot
+from ad_injector.adapters.memory_vector_store import InMemoryVectorStore
+from ad_injector.adapters.qdrant_vector_store import QdrantVectorStore
+from ad_injector.config.runtime import RuntimeSettings
+from ad_injector.domain.filters import VectorFilter
+from ad_injector.models import Ad, AdTargeting
+from ad_injector.ops.snapshot import export_snapshot, import_snapshot
+from ad_injector.services.index_service import IndexService
+from ad_injector.wiring import build_vector_store
+
+
+class CountingEmbedder:
+    def __init__(self):
+        self.texts = 0
+
+    def embed(self, text):
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts):
+        self.texts += len(texts)
+        return [[float(len(t) % 5 + 1), float(sum(map(ord, t)) % 7 + 1), 1.0] for t in texts]
+
+
+def _ad(ad_id):
+    return Ad(
+        ad_id=ad_id,
+        advertiser_id="adv-1",
+        title=f"Title {ad_id}",
+        body="Body",
+        cta_text="Click",
+        landing_url=f"https://example.com/{ad_id}",
+        targeting=AdTargeting(topics=["tech"]),
+    )
+
+
+def _index(store_cls=InMemoryVectorStore, **settings):
+    settings = RuntimeSettings(_env_file=None, embedding_dimension=3, **settings)
+    embedder = CountingEmbedder()
+    service = IndexService(embedding_provider=embedder, vector_store=store_cls(settings), settings=settings)
+    service.ensure_collection()
+    return service, embedder
+
+
+def test_export_round_trips_vectors_and_payloads(tmp_path):
+    service, _ = _index()
+    service.upsert_ads([_ad(f"ad-{i}") for i in range(7)])
+    service.bulk_disable({"ad_id": "ad-2"})
+    manifest = export_snapshot(service, tmp_path / "snap", page_size=3)
+    assert (manifest["count"], manifest["dimension"]) == (7, 3)
+    assert manifest["ads_meta"]["embedding_model_id"] == service.collection_info()["embedding_model_id"]
+    assert (tmp_path / "snap" / "vectors.f32").stat().st_size == 7 * 3 * 4
+    assert json.loads((tmp_path / "snap" / "manifest.json").read_text())["columns"].keys() >= {"ad_id", "enabled"}
+
+    snapshot = CatalogSnapshot(tmp_path / "snap")
+    assert isinstance(snapshot.vectors, np.memmap)
+    rows = snapshot.row_index()
+    expected = service.vector_store.get_ad("ad-2")
+    assert snapshot.payload(rows["ad-2"]) == expected and expected["enabled"] is False
+    np.testing.assert_allclose(np.linalg.norm(snapshot.vectors, axis=1), 1.0, rtol=1e-5)
+
+    (tmp_path / "snap" / "manifest.json").unlink()
+    with pytest.raises(ValueError, match="not a complete snapshot"):
+        CatalogSnapshot(tmp_path / "snap")
+
+
+def test_import_needs_no_embedding_and_checks_the_model(tmp_path):
+    source, _ = _index()
+    source.upsert_ads([_ad(f"ad-{i}") for i in range(5)])
+    export_snapshot(source, tmp_path / "snap")
+
+    target, embedder = _index(QdrantVectorStore, qdrant_location=":memory:")
+    summary = import_snapshot(target, tmp_path / "snap", batch_size=2)
+    assert summary["upserted"] == 5 and embedder.texts == 0
+    assert target.collection_info()["points_count"] == 5
+    assert target.get_ad("ad-3")["ad_id"] == "ad-3"
+    assert target.vector_store.catalog_state()["catalog_version"] == 1
+
+    other, _ = _index(embedding_model_id="other/model")
+    other.upsert_ads([_ad("x")])
+    with pytest.raises(ValueError, match="does not match"):
+        import_snapshot(other, tmp_path / "snap")
+
+
+def test_memory_backend_serves_a_mapped_snapshot(tmp_path):
+    source, embedder = _index()
+    source.upsert_ads([_ad(f"ad-{i}") for i in range(6)])
+    export_snapshot(source, tmp_path / "snap")
+    query = embedder.embed("query")
+    expected = [hit.ad_id for hit in source.vector_store.query(query, VectorFilter(), 4)]
+
+    settings = RuntimeSettings(
+        _env_file=None, embedding_dimension=3, vector_store_backend="memory", snapshot_path=tmp_path / "snap"
+    )
+    store = build_vector_store(settings)
+    assert store.collection_info()["points_count"] == 6
+    assert [hit.ad_id for hit in store.query(query, VectorFilter(), 4)] == expected
+    assert store.get_ad("ad-1") == source.vector_store.get_ad("ad-1")
+
+    store.upsert_payloads([({**store.get_ad("ad-1"), "title": "changed"}, [1.0, 0.0, 0.0])])
+    store.delete_ad("ad-0")
+    assert store.get_ad("ad-1")["title"] == "changed" and store.get_ad("ad-0") is None
+    assert len(store.query(query, VectorFilter(), 10)) == 5
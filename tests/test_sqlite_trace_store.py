@@ -0,0 +1,88 @@
+"""Tests for the SQLite (WAL) trace store shared across worker processes."""
+
+import sqlite3
+import time
+
+from ad_injector.adapters.sqlite_trace_store import SqliteTraceStore
+from ad_injector.ports.trace_store import TraceStorePort
+
+from .test_trace_store import _trace
+
+
+def _store(tmp_path, **kwargs):
+    kwargs.setdefault("flush_interval_seconds", 0.01)
+    return SqliteTraceStore(tmp_path / "traces.db", **kwargs)
+
+
+class TestSqliteTraceStore:
+    def test_satisfies_port(self, tmp_path):
+        store = _store(tmp_path)
+        assert isinstance(store, TraceStorePort)
+        store.close()
+
+    def test_pending_trace_visible_before_commit(self, tmp_path):
+        store = _store(tmp_path, flush_interval_seconds=60)
+        assert store.put(_trace("r1"))
+        assert store.get("r1-m0")["request_id"] == "r1"
+        assert store.stats()["pending"] == 1
+        store.close()
+        assert store.stats()["written"] == 1
+
+    def test_other_worker_reads_committed_trace(self, tmp_path):
+        writer = _store(tmp_path)
+        reader = _store(tmp_path)
+        writer.put(_trace("r1"))
+        writer.flush()
+        explained = reader.get("r1-m2")
+        assert explained["request_id"] == "r1"
+        assert [d["reason"] for d in explained["decisions"]] == ["allowed", "denied: sensitive", "allowed"]
+        assert reader.get("unknown") is None
+        assert writer.stats()["written"] == 1
+        writer.close()
+        reader.close()
+
+    def test_uses_wal(self, tmp_path):
+        store = _store(tmp_path)
+        store.close()
+        conn = sqlite3.connect(tmp_path / "traces.db")
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        conn.close()
+
+    def test_expired_rows_hidden_and_deleted(self, tmp_path, monkeypatch):
+        import ad_injector.adapters.sqlite_trace_store as mod
+
+        store = _store(tmp_path, ttl_seconds=10, expire_interval_seconds=0.01)
+        now = [mod.time.time()]
+        monkeypatch.setattr(mod.time, "time", lambda: now[0])
+        store.put(_trace("r1"))
+        store.flush()
+        now[0] += 11
+        assert store.get("r1-m0") is None
+        time.sleep(0.1)  # let the writer run an expiry pass
+        store.close()
+        conn = sqlite3.connect(tmp_path / "traces.db")
+        assert conn.execute("SELECT COUNT(*) FROM traces").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM match_index").fetchone()[0] == 0
+        conn.close()
+
+    def test_oldest_rows_pruned_to_max_bytes(self, tmp_path):
+        store = _store(tmp_path, max_bytes=64 * 1024, ttl_seconds=0, expire_interval_seconds=0.01)
+        for i in range(400):
+            store.put(_trace(f"r{i}"))
+            if i % 50 == 49:
+                store.flush()
+                time.sleep(0.03)  # let the writer run a maintenance pass
+        store.flush()
+        time.sleep(0.1)
+        stats = store.stats()
+        store.close()
+        assert stats["pruned"] > 0 and stats["max_bytes"] == 64 * 1024
+        conn = sqlite3.connect(tmp_path / "traces.db")
+        page_size, page_count = (conn.execute(f"PRAGMA {p}").fetchone()[0] for p in ("page_size", "page_count"))
+        assert page_count * page_size <= 64 * 1024
+        remaining = {row[0] for row in conn.execute("SELECT request_id FROM traces")}
+        assert "r399" in remaining and "r0" not in remaining
+        orphans = conn.execute("SELECT COUNT(*) FROM match_index WHERE request_id NOT IN (SELECT request_id FROM traces)")
+        assert orphans.fetchone()[0] == 0
+        conn.close()
+        assert not (tmp_path / "traces.db-wal").exists() or (tmp_path / "traces.db-wal").stat().st_size == 0
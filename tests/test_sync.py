@@ -0,0 +1,97 @@
+"""Tests for ad-index sync: content/embedding hashes and applying only the catalog delta."""
+
+import json
+
+import pytest
+
+from ad_injector.adapters.memory_vector_store import InMemoryVectorStore
+from ad_injector.adapters.qdrant_vector_store import QdrantVectorStore
+from ad_injector.config.runtime import RuntimeSettings
+from ad_injector.models import Ad, AdTargeting
+from ad_injector.ops.sync import sync_catalog
+from ad_injector.services.index_service import IndexService
+
+
+class CountingEmbedder:
+    def __init__(self):
+        self.texts = []
+
+    def embed(self, text):
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts):
+        self.texts.extend(texts)
+        return [[float(len(t) % 5 + 1), float(sum(map(ord, t)) % 7 + 1), 1.0] for t in texts]
+
+
+def _ad(ad_id, title=None, cta="Click"):
+    return Ad(
+        ad_id=ad_id,
+        advertiser_id="adv-1",
+        title=title or f"Title {ad_id}",
+        body="Body",
+        cta_text=cta,
+        landing_url=f"https://example.com/{ad_id}",
+        targeting=AdTargeting(topics=["tech"]),
+    )
+
+
+def _write(path, ads, extra_lines=()):
+    lines = [ad.model_dump_json() for ad in ads] + list(extra_lines)
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+def test_hashes_track_content_and_embedding_text():
+    ad = _ad("a")
+    payload = ad.to_pinecone_metadata()
+    assert payload["content_hash"] == ad.content_hash and payload["embedding_hash"] == ad.embedding_hash
+    cta_changed = _ad("a", cta="Buy")
+    assert cta_changed.content_hash != ad.content_hash and cta_changed.embedding_hash == ad.embedding_hash
+    assert _ad("a", title="New").embedding_hash != ad.embedding_hash
+
+
+@pytest.mark.parametrize("store_cls", [InMemoryVectorStore, QdrantVectorStore])
+def test_sync_applies_only_the_delta(tmp_path, store_cls):
+    settings = RuntimeSettings(_env_file=None, embedding_dimension=3, qdrant_location=":memory:")
+    embedder = CountingEmbedder()
+    service = IndexService(embedding_provider=embedder, vector_store=store_cls(settings), settings=settings)
+    service.ensure_collection()
+    service.upsert_ads([_ad(f"ad-{i}") for i in range(6)])
+    service.bulk_disable({"ad_id": "ad-5"})
+    embedder.texts.clear()
+    version = service.collection_info()["catalog_version"]
+
+    catalog = [_ad("ad-0"), _ad("ad-1", cta="Buy now"), _ad("ad-2", title="Fresh title"), _ad("ad-5"), _ad("ad-9")]
+    path = _write(tmp_path / "catalog.ndjson", catalog, ['{"ad_id": "ad-3", "title": "missing fields"}'])
+
+    dry = sync_catalog(service, path, batch_size=2, dry_run=True)
+    assert (dry.added, dry.deleted, embedder.texts) == (1, 1, [])
+    assert service.collection_info()["catalog_version"] == version
+
+    report = sync_catalog(service, path, batch_size=2, reject_path=tmp_path / "rejects.ndjson")
+    assert (report.read, report.unchanged, report.rejected) == (6, 2, 1)
+    assert (report.added, report.updated, report.reembedded, report.deleted) == (1, 1, 1, 1)
+    expected_texts = [_ad("ad-2", title="Fresh title").embedding_text, _ad("ad-9").embedding_text]
+    assert sorted(embedder.texts) == sorted(expected_texts)
+    assert service.get_ad("ad-1")["cta_text"] == "Buy now"
+    assert service.get_ad("ad-4") is None  # gone from the file
+    assert service.get_ad("ad-3") is not None  # its row was rejected, not removed
+    assert service.get_ad("ad-5")["enabled"] is False  # unchanged ads are not rewritten
+    assert json.loads((tmp_path / "rejects.ndjson").read_text().splitlines()[0])["line"] == 6
+
+    embedder.texts.clear()
+    again = sync_catalog(service, path)
+    assert (again.unchanged, again.added + again.updated + again.reembedded + again.deleted) == (5, 0)
+    assert embedder.texts == []
+
+
+def test_unparseable_rows_skip_deletions(tmp_path):
+    settings = RuntimeSettings(_env_file=None, embedding_dimension=3)
+    service = IndexService(CountingEmbedder(), InMemoryVectorStore(settings), settings)
+    service.ensure_collection()
+    service.upsert_ads([_ad("ad-0"), _ad("ad-1")])
+    path = _write(tmp_path / "catalog.ndjson", [_ad("ad-0")], ["{not json"])
+    report = sync_catalog(service, path)
+    assert report.deletes_skipped and report.deleted == 0
+    assert service.get_ad("ad-1") is not None
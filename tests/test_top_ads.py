@@ -0,0 +1,152 @@
+"""Tests for materialized per-(topic|vertical, locale) top-ads lists."""
+
+import pytest
+
+from ad_injector.adapters.memory_vector_store import InMemoryVectorStore
+from ad_injector.config.runtime import RuntimeSettings
+from ad_injector.domain.targeting_engine import TargetingEngine
+from ad_injector.models import Ad, AdTargeting
+from ad_injector.models.mcp_requests import MatchConstraints, MatchRequest, PlacementContext
+from ad_injector.services.match_service import MatchService
+from ad_injector.services.top_ads import ANY_LOCALE, LIST_FIELDS, TopAdsRefresher, build_top_ads
+
+from .test_match_service import FakeEmbeddingProvider
+
+
+def _ad(ad_id, topics=("python",), locale=("en-US",), verticals=("tech",)):
+    return Ad(
+        ad_id=ad_id,
+        advertiser_id="adv-1",
+        title=f"Title {ad_id}",
+        body="Body",
+        cta_text="Click",
+        landing_url=f"https://example.com/{ad_id}",
+        targeting=AdTargeting(topics=list(topics), locale=list(locale), verticals=list(verticals)),
+    )
+
+
+def _store():
+    store = InMemoryVectorStore(RuntimeSettings(_env_file=None, embedding_dimension=3))
+    store.ensure_collection(3)
+    store.upsert_batch([
+        (_ad("central"), [1.0, 0.1, 0.0]),
+        (_ad("edge"), [0.2, 1.0, 0.0]),
+        (_ad("middle", locale=("",)), [1.0, 0.5, 0.0]),
+        (_ad("fr", locale=("fr-FR",)), [1.0, 0.2, 0.0]),
+        (_ad("travel", topics=("travel",), verticals=("leisure",)), [0.0, 0.0, 1.0]),
+    ])
+    return store
+
+
+def _request(text="ads", top_k=5, **constraints):
+    return MatchRequest(
+        context_text=text,
+        top_k=top_k,
+        placement=PlacementContext(),
+        constraints=MatchConstraints(**constraints),
+    )
+
+
+def _lookup(lists, request):
+    return lists.lookup(request, TargetingEngine().build_filter(request.constraints, request.placement))
+
+
+class TestBuildTopAds:
+    def test_ranked_by_centroid_similarity_per_locale(self):
+        lists = build_top_ads(_store().scroll_ads(), per_list=10)
+        ranked = [h.ad_id for h in lists.lists[("topic", "python", ANY_LOCALE)]]
+        assert ranked[-1] == "edge" and set(ranked) == {"central", "edge", "middle", "fr"}
+        assert [h.ad_id for h in lists.lists[("topic", "python", "fr-FR")]] == ["fr"]
+
+    def test_lookup_merges_locale_with_global_and_applies_filter(self):
+        lists = build_top_ads(_store().scroll_ads())
+        hits = _lookup(lists, _request(top_k=2, topics=["python"], locale="en-US", exclude_ad_ids=["central"]))
+        assert {h.ad_id for h in hits} == {"edge", "middle"}
+        assert [h.ad_id for h in _lookup(lists, _request(top_k=1, verticals=["leisure"]))] == ["travel"]
+        assert _lookup(lists, _request(locale="en-US")) is None
+
+    def test_lookup_declines_when_fewer_than_top_k_survive(self):
+        lists = build_top_ads(_store().scroll_ads())
+        request = _request(top_k=3, topics=["python"], locale="en-US", exclude_ad_ids=["central"])
+        assert _lookup(lists, request) is None
+        partial = lists.lookup(request, TargetingEngine().build_filter(request.constraints, request.placement), True)
+        assert {h.ad_id for h in partial} == {"edge", "middle"}
+
+    def test_listed_payloads_are_projected(self):
+        store = _store()
+        assert "content_hash" in store.get_ad("central")
+        lists = build_top_ads(store.scroll_ads())
+        payload = lists.lists[("topic", "python", ANY_LOCALE)][0].payload
+        assert set(payload) <= set(LIST_FIELDS) and payload["title"].startswith("Title")
+
+    def test_disabled_ads_are_skipped(self):
+        store = _store()
+        store.bulk_disable({"ad_id": "central"})
+        lists = build_top_ads(store.scroll_ads())
+        assert "central" not in {h.ad_id for h in lists.lists[("topic", "python", ANY_LOCALE)]}
+
+
+class TestRefresher:
+    def test_rebuilds_only_on_version_change(self):
+        version = ["v1"]
+        refresher = TopAdsRefresher(_store(), version_source=lambda: version[0], check_interval_seconds=60)
+        assert refresher.refresh() is True
+        assert refresher.refresh() is False
+        version[0] = "v2"
+        assert refresher.refresh() is True
+        assert refresher.stats()["version"] == "v2"
+        refresher.close()
+
+
+class RaisingEmbedder(FakeEmbeddingProvider):
+    def __init__(self, fail=True):
+        self.fail = fail
+        self.calls = 0
+
+    def embed(self, text):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("model unavailable")
+        return [1.0, 0.0, 0.0]
+
+
+class TestMatchServiceFastPath:
+    def _service(self, embedder, max_chars=32):
+        store = _store()
+        refresher = TopAdsRefresher(store, check_interval_seconds=60)
+        refresher.refresh()
+        return MatchService(
+            embedding_provider=embedder,
+            vector_store=store,
+            top_ads=refresher,
+            top_ads_max_context_chars=max_chars,
+        )
+
+    def test_short_context_skips_embedding(self):
+        embedder = RaisingEmbedder()
+        result, trace = self._service(embedder).match(_request("python?", top_k=2, topics=["python"]))
+        assert embedder.calls == 0
+        assert trace.retrieval == "materialized" and trace.degraded is None
+        assert len(result.candidates) == 2
+        assert "embed" not in trace.timings_ms and trace.to_dict()["retrieval"] == "materialized"
+
+    def test_too_few_listed_ads_use_ann(self):
+        embedder = RaisingEmbedder(fail=False)
+        result, trace = self._service(embedder).match(_request("python?", top_k=5, topics=["python"]))
+        assert trace.retrieval == "ann" and embedder.calls == 1
+
+    def test_long_or_unconstrained_context_uses_ann(self):
+        embedder = RaisingEmbedder(fail=False)
+        svc = self._service(embedder)
+        _, trace = svc.match(_request("a much longer context about learning python quickly", topics=["python"]))
+        assert trace.retrieval == "ann"
+        _, trace = svc.match(_request("short"))
+        assert trace.retrieval == "ann" and embedder.calls == 2
+
+    def test_embedder_failure_falls_back_to_lists(self):
+        svc = self._service(RaisingEmbedder(), max_chars=0)
+        result, trace = svc.match(_request("a long context about python", topics=["python"]))
+        assert trace.degraded == ("embed_error", "materialized")
+        assert result.candidates
+        with pytest.raises(RuntimeError):
+            svc.match(_request("no typed constraints here"))
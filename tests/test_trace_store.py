@@ -0,0 +1,80 @@
+"""Tests for the bounded ads_explain trace store."""
+
+from ad_injector.domain.policy_engine import DENY_SENSITIVE
+from ad_injector.mcp.trace_store import TraceStore
+from ad_injector.models.mcp_requests import MatchConstraints
+from ad_injector.services.match_trace import MatchTrace
+
+
+def _trace(request_id, n=3, context="hello world"):
+    return MatchTrace(
+        request_id=request_id,
+        placement="inline",
+        context_text=context,
+        constraints=MatchConstraints(topics=["a"]),
+        timings_ms={"total": 1.5},
+        cache="bypass",
+        retrieved=n,
+        ad_ids=tuple(f"ad-{i}" for i in range(n)),
+        scores=tuple(1.0 / (i + 1) for i in range(n)),
+        verdicts=bytes(0 if i % 2 == 0 else DENY_SENSITIVE for i in range(n)),
+        match_ids=tuple(f"{request_id}-m{i}" if i % 2 == 0 else None for i in range(n)),
+    )
+
+
+class TestTraceStore:
+    def test_roundtrip_via_any_match_id(self):
+        store = TraceStore()
+        assert store.put(_trace("r1"))
+        explained = store.get("r1-m0")
+        assert explained == store.get("r1-m2")
+        assert explained["request_id"] == "r1"
+        assert explained["constraints"]["topics"] == ["a"]
+        assert explained["decisions"] == [
+            {"ad_id": "ad-0", "score": 1.0, "reason": "allowed", "match_id": "r1-m0"},
+            {"ad_id": "ad-1", "score": 0.5, "reason": "denied: sensitive"},
+            {"ad_id": "ad-2", "score": 1.0 / 3, "reason": "allowed", "match_id": "r1-m2"},
+        ]
+        assert store.stats()["records"] == 1
+        assert store.stats()["match_ids"] == 2
+
+    def test_unsampled_or_empty_trace_not_stored(self):
+        store = TraceStore()
+        unsampled = _trace("r1")
+        unsampled.sampled = False
+        assert not store.put(unsampled)
+        assert not store.put(_trace("r2", n=0))
+        assert store.stats()["records"] == 0
+
+    def test_context_truncated(self):
+        store = TraceStore(max_context_chars=5)
+        store.put(_trace("r1", context="x" * 100))
+        assert store.get("r1-m0")["context_text"] == "xxxxx"
+
+    def test_byte_budget_evicts_lru(self):
+        probe = TraceStore()
+        probe.put(_trace("probe"))
+        per_record = probe.stats()["bytes"]
+        store = TraceStore(max_bytes=per_record * 2 + per_record // 2)
+        store.put(_trace("r1"))
+        store.put(_trace("r2"))
+        store.get("r1-m0")  # refresh r1
+        store.put(_trace("r3"))
+        assert store.get("r2-m0") is None
+        assert store.get("r1-m0") is not None
+        stats = store.stats()
+        assert stats["evictions"]["capacity"] == 1
+        assert stats["bytes"] <= stats["max_bytes"]
+        assert stats["match_ids"] == 4
+
+    def test_ttl_expiry(self, monkeypatch):
+        import ad_injector.mcp.trace_store as ts
+
+        now = [1000.0]
+        monkeypatch.setattr(ts.time, "monotonic", lambda: now[0])
+        store = TraceStore(ttl_seconds=10)
+        store.put(_trace("r1"))
+        now[0] += 11
+        assert store.get("r1-m0") is None
+        assert store.stats()["evictions"]["ttl"] == 1
+        assert store.stats()["bytes"] == 0
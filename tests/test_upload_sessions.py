@@ -0,0 +1,128 @@
+"""Tests for chunked upload sessions and ads_upsert_batch limits."""
+
+import json
+import threading
+import time
+
+import pytest
+
+from ad_injector.adapters.memory_vector_store import InMemoryVectorStore
+from ad_injector.config.runtime import RuntimeSettings, get_settings
+from ad_injector.mcp.server import create_server
+from ad_injector.services.index_service import IndexService
+from ad_injector.services.upload_sessions import (
+    ChunkFormatError,
+    UploadSessionError,
+    UploadSessionManager,
+    validate_chunk,
+)
+
+
+class GatedEmbedder:
+    """Blocks embedding until released so background progress can be observed."""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def embed(self, text):
+        self.gate.wait(5)
+        return [1.0, 0.0, 0.0]
+
+
+def _ad(ad_id, **overrides):
+    return {
+        "ad_id": ad_id, "advertiser_id": "adv-1", "title": "Title", "body": "Body",
+        "cta_text": "Click", "landing_url": f"https://example.com/{ad_id}", **overrides,
+    }
+
+
+def _manager(**kwargs):
+    settings = RuntimeSettings(_env_file=None, embedding_dimension=3)
+    store = InMemoryVectorStore(settings)
+    store.ensure_collection(3)
+    embedder = GatedEmbedder()
+    index = IndexService(embedding_provider=embedder, vector_store=store, settings=settings)
+    return UploadSessionManager(index, **kwargs), store, embedder
+
+
+def _wait_for(manager, session_id, state):
+    deadline = time.monotonic() + 5
+    while manager.status(session_id)["state"] != state and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return manager.status(session_id)
+
+
+def test_validate_chunk_keeps_valid_items_and_locates_errors():
+    chunk = json.dumps([_ad("a"), {"ad_id": "b"}, _ad("c", landing_url=5)])
+    ads, errors = validate_chunk(chunk)
+    assert [a.ad_id for a in ads] == ["a"]
+    assert [(i, ad_id) for i, ad_id, _ in errors] == [(1, "b"), (2, "c")]
+    assert "landing_url" in errors[1][2]
+    with pytest.raises(ChunkFormatError):
+        validate_chunk('{"ad_id": "a"}')
+    with pytest.raises(ChunkFormatError):
+        validate_chunk("[{")
+
+
+def test_session_lifecycle_with_background_upserts():
+    manager, store, embedder = _manager()
+    session_id = manager.open(expected_items=4)["session_id"]
+    embedder.gate.clear()
+    first = manager.append(session_id, json.dumps([_ad("a"), _ad("b")]))
+    second = manager.append(session_id, json.dumps([_ad("c"), {"ad_id": "bad"}]))
+    assert (first["chunk"], first["accepted"]) == (0, 2)
+    assert second["rejected"] == 1 and second["errors"][0]["index"] == 1
+
+    assert manager.commit(session_id)["state"] == "committing"
+    with pytest.raises(UploadSessionError):
+        manager.append(session_id, json.dumps([_ad("d")]))
+    embedder.gate.set()
+    status = _wait_for(manager, session_id, "completed")
+    assert (status["received"], status["accepted"], status["rejected"], status["upserted"]) == (4, 3, 1, 3)
+    assert status["errors"] == [{"chunk": 1, "index": 1, "ad_id": "bad", "error": status["errors"][0]["error"]}]
+    assert store.collection_info()["points_count"] == 3
+
+
+def test_backpressure_limits_and_abort():
+    manager, store, embedder = _manager(max_pending_chunks=1, max_chunk_items=2, max_sessions=1)
+    session_id = manager.open()["session_id"]
+    with pytest.raises(UploadSessionError, match="too many"):
+        manager.open()
+    with pytest.raises(UploadSessionError, match="at most 2"):
+        manager.append(session_id, json.dumps([_ad("a"), _ad("b"), _ad("c")]))
+    embedder.gate.clear()
+    manager.append(session_id, json.dumps([_ad("a")]))
+    with pytest.raises(UploadSessionError, match="busy"):
+        manager.append(session_id, json.dumps([_ad("b")]))
+    assert manager.abort(session_id)["state"] == "aborted"
+    embedder.gate.set()
+    manager.close()
+    assert manager.status(session_id)["pending_chunks"] == 0
+    with pytest.raises(UploadSessionError, match="unknown"):
+        manager.status("nope")
+
+
+def test_ads_upsert_batch_refuses_oversized_batches_instead_of_truncating():
+    upsert_batch = create_server("admin")._tool_manager._tools["ads_upsert_batch"].fn
+    limit = get_settings().max_batch_size
+    out = json.loads(upsert_batch(json.dumps([_ad(f"ad-{i}") for i in range(limit + 1)])))
+    assert out["error"] == "batch too large" and out["received"] == limit + 1
+    out = json.loads(upsert_batch(json.dumps([_ad("a"), {"ad_id": "b"}])))
+    assert out["error"] == "invalid ad at index 1" and out["errors"][0]["ad_id"] == "b"
+
+
+def test_upload_tools_report_the_actual_session_error(monkeypatch):
+    from ad_injector.mcp import tools
+
+    manager, _, _ = _manager()
+    monkeypatch.setattr(tools, "_get_upload_manager", lambda: manager)
+    fns = {name: tool.fn for name, tool in create_server("admin")._tool_manager._tools.items()}
+    out = json.loads(fns["upload_append"]("nope", json.dumps([_ad("a")])))
+    assert out == {"error": "unknown upload session 'nope'"}
+    session_id = json.loads(fns["upload_open"]())["session_id"]
+    out = json.loads(fns["upload_append"](session_id, '{"ad_id": "a"}'))
+    assert out["error"] == "ads_json must be a JSON array" and "detail" in out
+    json.loads(fns["upload_commit"](session_id))
+    assert json.loads(fns["upload_commit"](session_id))["error"].endswith(", not open")
+    manager.close()